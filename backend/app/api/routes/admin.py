@@ -891,6 +891,28 @@ async def trigger_model_retrain(admin: AdminResponse = Depends(require_permissio
     return {"message": "Model retraining triggered", "status": "queued"}
 
 
+@router.get("/settings/dataset")
+async def get_dataset_status(admin: AdminResponse = Depends(require_permission("view"))):
+    """Serving dataset snapshot and background reload state"""
+    from app.services.dataset_reloader import get_dataset_reloader
+    return get_dataset_reloader().status()
+
+
+@router.post("/settings/dataset/reload")
+async def trigger_dataset_reload(admin: AdminResponse = Depends(require_permission("edit"))):
+    """
+    Reload the dataset in the background and swap it in when ready.
+
+    Only the worker process that receives this request reloads; other workers
+    pick up a changed CSV through their own file watcher on its next poll.
+    """
+    from app.services.dataset_reloader import get_dataset_reloader
+    log_admin_action(admin.id, "trigger_dataset_reload", "dataset")
+    if not get_dataset_reloader().trigger():
+        return {"message": "Dataset reload already in progress", "status": "running"}
+    return {"message": "Dataset reload triggered", "status": "queued"}
+
+
 # Reports
 @router.get("/reports/daily-feedback")
 async def get_daily_feedback_report(
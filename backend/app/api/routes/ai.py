@@ -74,6 +74,7 @@ def _resolve_listing_image_paths(listing_id: int) -> List[str]:
 def _run_detection_and_update(
     listing_id: int,
     image_paths: List[str],
+    crop: Optional[bool] = None,
 ) -> dict:
     """Load valid makes/models, run detect_car_from_images, update listing. Returns detection dict."""
     valid_makes = None
@@ -97,6 +98,7 @@ def _run_detection_and_update(
         image_paths,
         valid_makes=valid_makes,
         valid_models_by_make=valid_models_by_make,
+        crop=crop,
     )
 
     best = detection.get("best") or {}
@@ -176,12 +178,14 @@ async def detect_car_vision(
 async def detect_car(
     listing_id: int = Form(...),
     images: Optional[List[UploadFile]] = File(default=None),
+    crop: Optional[bool] = Form(default=None),
     current_user: Optional[UserResponse] = Depends(get_current_user),
 ):
     """
     Run car detection on 2-6 images. Accepts multipart: listing_id (required), images (optional).
     - If images provided: replace listing images, save, run detection. Returns image_urls.
     - If no images: run detection on existing listing images (re-run). Requires at least 2.
+    - crop (optional): false skips the YOLO car crop for lower latency (default: CAR_CROP_ENABLED).
     """
     files = images or []
     logger.info("detect-car: listing_id=%s, num_images=%s", listing_id, len(files))
@@ -236,7 +240,7 @@ async def detect_car(
         }
 
     try:
-        detection = _run_detection_and_update(listing_id, image_paths)
+        detection = _run_detection_and_update(listing_id, image_paths, crop=crop)
     except Exception as e:
         logger.error("Detection failed: %s", e, exc_info=True)
         return {
@@ -3,10 +3,13 @@ Budget finder endpoint - search cars within budget range
 """
 
 from fastapi import APIRouter, HTTPException, Query
-from typing import List, Optional
+from typing import Dict, Iterator, List, Optional
 from pydantic import BaseModel
+from app.api.routes.cars import load_image_metadata
 from app.services.dataset_loader import DatasetLoader
 from app.services.marketplace_service import search_listings, get_listing
+import heapq
+import itertools
 import logging
 import pandas as pd
 import numpy as np
@@ -47,6 +50,156 @@ class BudgetSearchResponse(BaseModel):
     error: Optional[str] = None
 
 
+def _sort_key(price: float, target_budget: Optional[float]) -> tuple:
+    """Result order: closest to the budget (then cheapest), or cheapest first"""
+    return (abs(price - target_budget), price) if target_budget is not None else (price,)
+
+
+def _top_k_order(primary: np.ndarray, secondary: np.ndarray, k: int) -> np.ndarray:
+    """
+    Positions of the k smallest (primary, secondary) pairs, in order.
+    argpartition finds the k-th primary value; only rows at or below it
+    (ties included) are sorted.
+    """
+    if k < len(primary):
+        cutoff = primary[np.argpartition(primary, k - 1)[k - 1]]
+        candidates = np.flatnonzero(primary <= cutoff)
+    else:
+        candidates = np.arange(len(primary))
+    return candidates[np.lexsort((secondary[candidates], primary[candidates]))][:k]
+
+
+def _dataset_stream(positions: np.ndarray, prices: np.ndarray, target_budget: Optional[float]) -> Iterator[tuple]:
+    for pos, price in zip(positions.tolist(), prices.tolist()):
+        yield _sort_key(price, target_budget), "database", pos
+
+
+def _marketplace_stream(listings: List[dict], target_budget: Optional[float]) -> Iterator[tuple]:
+    # search_listings orders in SQL; re-sorting the (at most one page deep) list keeps NULL prices consistent
+    keyed = [(_sort_key(float(listing.get('price') or 0), target_budget), "marketplace", listing)
+             for listing in listings]
+    return iter(sorted(keyed, key=lambda entry: entry[0]))
+
+
+def _image_filenames() -> Optional[np.ndarray]:
+    """Filenames from image_metadata.csv (read once, see cars.load_image_metadata)"""
+    image_metadata = load_image_metadata()
+    if image_metadata is None or len(image_metadata) == 0 or 'filename' not in image_metadata.columns:
+        return None
+    return image_metadata['filename'].to_numpy()
+
+
+def _dataset_results(df: pd.DataFrame, positions: List[int], price_col: str,
+                     target_budget: Optional[float]) -> Dict[int, BudgetCarResult]:
+    """BudgetCarResult per dataset row position (rows that fail conversion are left out)"""
+    image_filenames = _image_filenames()
+    page = df.iloc[positions]
+    results = {}
+    for pos, idx, row in zip(positions, page.index, page.to_dict('records')):
+        try:
+            car_price = float(row.get(price_col, 0))
+
+            # Image for the car (metadata row by dataset index)
+            image_filename = None
+            if image_filenames is not None:
+                car_idx = int(idx) if isinstance(idx, (int, np.integer)) else 0
+                image_filename = image_filenames[car_idx % len(image_filenames)]
+
+            price_diff = None
+            if target_budget is not None:
+                price_diff = abs(car_price - target_budget)
+
+            results[pos] = BudgetCarResult(
+                make=str(row.get('make', 'Unknown')).strip(),
+                model=str(row.get('model', 'Unknown')).strip(),
+                year=int(row.get('year', 2020)),
+                mileage=float(row.get('mileage', 0)),
+                condition=str(row.get('condition', 'Good')).strip(),
+                fuel_type=str(row.get('fuel_type', 'Gasoline')).strip(),
+                location=str(row.get('location', 'Unknown')).strip(),
+                engine_size=float(row.get('engine_size', 2.0)),
+                cylinders=int(row.get('cylinders', 4)),
+                price=round(car_price, 2),
+                trim=str(row.get('trim', '')).strip() if pd.notna(row.get('trim')) else None,
+                image_filename=image_filename,
+                price_difference=round(price_diff, 2) if price_diff is not None else None,
+                source="database"
+            )
+        except Exception as e:
+            logger.debug(f"Error processing dataset car at index {idx}: {e}")
+    return results
+
+
+def _marketplace_result(listing: dict, target_budget: Optional[float], now: datetime) -> Optional[BudgetCarResult]:
+    """BudgetCarResult for a marketplace listing (None if it can't be converted)"""
+    try:
+        # Check if listing is new (created in last 24 hours)
+        created_at = listing.get('created_at')
+        is_new = False
+        if created_at:
+            try:
+                if isinstance(created_at, str):
+                    created_dt = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
+                else:
+                    created_dt = created_at
+                is_new = (now - created_dt.replace(tzinfo=None) if created_dt.tzinfo else created_dt) < timedelta(hours=24)
+            except Exception:
+                pass
+
+        # Get cover image URL
+        cover_image_url = None
+        images = listing.get('images', [])
+        if images:
+            # Find primary image or first image
+            primary = next((img for img in images if img.get('is_primary')), None)
+            if primary:
+                cover_image_url = primary.get('url') or primary.get('file_path')
+            elif images:
+                cover_image_url = images[0].get('url') or images[0].get('file_path')
+
+        # Convert mileage if needed
+        mileage = float(listing.get('mileage', 0))
+        mileage_unit = listing.get('mileage_unit', 'km')
+        if mileage_unit == 'mi':
+            mileage = mileage * 1.60934  # Convert to km
+
+        # Build location string
+        loc_parts = []
+        if listing.get('location_city'):
+            loc_parts.append(listing['location_city'])
+        if listing.get('location_state'):
+            loc_parts.append(listing['location_state'])
+        if listing.get('location_country'):
+            loc_parts.append(listing['location_country'])
+        location_str = ', '.join(loc_parts) if loc_parts else 'Unknown'
+
+        price_diff = None
+        if target_budget is not None:
+            price_diff = abs(listing.get('price', 0) - target_budget)
+
+        return BudgetCarResult(
+            make=str(listing.get('make', 'Unknown')).strip(),
+            model=str(listing.get('model', 'Unknown')).strip(),
+            year=int(listing.get('year', 2020)),
+            mileage=round(mileage, 2),
+            condition=str(listing.get('condition', 'Good')).strip(),
+            fuel_type=str(listing.get('fuel_type', 'Gasoline')).strip(),
+            location=location_str,
+            engine_size=float(listing.get('engine_size', 2.0)) if listing.get('engine_size') else 2.0,
+            cylinders=int(listing.get('cylinders', 4)) if listing.get('cylinders') else 4,
+            price=round(float(listing.get('price', 0)), 2),
+            trim=str(listing.get('trim', '')).strip() if listing.get('trim') else None,
+            image_url=cover_image_url,
+            price_difference=round(price_diff, 2) if price_diff is not None else None,
+            source="marketplace",
+            listing_id=int(listing.get('id', 0)),
+            is_new=is_new
+        )
+    except Exception as e:
+        logger.debug(f"Error processing marketplace listing {listing.get('id')}: {e}")
+        return None
+
+
 @router.get("/search", response_model=BudgetSearchResponse)
 async def search_budget(
     budget: Optional[float] = Query(None, ge=0, description="Target budget (will search ±15% range)"),
@@ -83,112 +236,73 @@ async def search_budget(
             max_price = budget * 1.15  # 15% above
             logger.info(f"Budget search: ${budget:,.2f} (±15% = ${min_price:,.2f} - ${max_price:,.2f})")
 
-        all_results = []
+        # Page bounds; only the first `end` results of the merged order are ever ranked
+        start = (page - 1) * page_size
+        end = start + page_size
+
+        # Each source yields (sort_key, source, item) in sort order
+        streams = []
+        dataset = None  # (frame, price column) the dataset stream's row positions address
+        dataset_total = 0
+        marketplace_total = 0
 
         # ===== SEARCH DATASET CARS =====
         if source is None or source.lower() in ['database', 'both']:
             try:
-                dataset_loader = DatasetLoader.get_instance()
-                df = dataset_loader.dataset
+                # One snapshot: rows from its index address its dataset
+                snapshot = DatasetLoader.get_instance().snapshot
+                df = snapshot.dataset
 
                 if df is not None and len(df) > 0:
-                    price_col = dataset_loader.get_price_column() or 'price'
+                    price_col = snapshot.price_col or 'price'
                     if price_col in df.columns:
-                        filtered = df.copy()
+                        index = snapshot.index
 
-                        # Apply price filters
+                        # Candidate rows: the make/model group from the index, else the whole dataset
+                        if make:
+                            rows = index.rows(make, model) if model else index.rows(make)
+                        else:
+                            rows = np.arange(len(df))
+
+                        # Apply price filters (one boolean mask over the candidates)
+                        keep = np.ones(len(rows), dtype=bool)
+                        prices = pd.to_numeric(df[price_col], errors='coerce').to_numpy(dtype=np.float64)[rows]
                         if min_price is not None:
-                            filtered = filtered[
-                                (filtered[price_col] >= min_price) &
-                                (filtered[price_col] > 0) &
-                                (filtered[price_col].notna())
-                            ]
+                            keep &= prices >= min_price
                         if max_price is not None:
-                            filtered = filtered[filtered[price_col] <= max_price]
+                            keep &= prices <= max_price
 
                         # Apply other filters
-                        if make:
-                            filtered = filtered[filtered['make'].str.lower() == make.lower()]
-                        if model and make:
-                            filtered = filtered[filtered['model'].str.lower() == model.lower()]
                         if min_year is not None:
-                            filtered = filtered[filtered['year'] >= min_year]
+                            keep &= df['year'].to_numpy()[rows] >= min_year
                         if max_year is not None:
-                            filtered = filtered[filtered['year'] <= max_year]
+                            keep &= df['year'].to_numpy()[rows] <= max_year
                         if max_mileage is not None:
-                            filtered = filtered[filtered['mileage'] <= max_mileage]
+                            keep &= df['mileage'].to_numpy()[rows] <= max_mileage
                         if condition:
-                            filtered = filtered[filtered['condition'].str.lower() == condition.lower()]
+                            keep &= index.mask('condition', condition)[rows]
                         if fuel_type:
-                            filtered = filtered[filtered['fuel_type'].str.lower() == fuel_type.lower()]
+                            keep &= index.mask('fuel_type', fuel_type)[rows]
                         if location:
-                            filtered = filtered[filtered['location'].str.lower() == location.lower()]
+                            keep &= index.mask('location', location)[rows]
 
-                        # Remove rows with missing critical data
-                        required_cols = ['make', 'model', 'year', price_col]
-                        for col in required_cols:
-                            if col in filtered.columns:
-                                filtered = filtered[filtered[col].notna()]
+                        # Rows that can't become a result: missing critical data, no price
+                        keep &= prices > 0
+                        for col in ['make', 'model', 'year', 'cylinders']:
+                            if col in df.columns:
+                                keep &= df[col].notna().to_numpy()[rows]
 
-                        # Calculate price difference for sorting
+                        rows, prices = rows[keep], prices[keep]
+                        dataset_total = len(rows)
+
+                        # Closest to budget (then cheapest), else cheapest first
                         if target_budget is not None:
-                            filtered = filtered.copy()
-                            filtered['price_difference'] = abs(filtered[price_col] - target_budget)
-                            filtered = filtered.sort_values('price_difference')
+                            primary, secondary = np.abs(prices - target_budget), prices
                         else:
-                            filtered = filtered.sort_values(price_col)
-
-                        # Load image metadata
-                        image_metadata = None
-                        try:
-                            from pathlib import Path
-                            metadata_path = Path('image_metadata.csv')
-                            if metadata_path.exists():
-                                image_metadata = pd.read_csv(metadata_path)
-                        except Exception as e:
-                            logger.debug(f"Could not load image metadata: {e}")
-
-                        # Convert dataset rows to BudgetCarResult
-                        for idx, row in filtered.iterrows():
-                            try:
-                                car_price = float(row.get(price_col, 0))
-                                if car_price <= 0:
-                                    continue
-
-                                # Find matching image
-                                image_filename = None
-                                if image_metadata is not None and len(image_metadata) > 0:
-                                    try:
-                                        car_idx = int(idx) if isinstance(idx, (int, np.integer)) else 0
-                                        image_idx = car_idx % len(image_metadata)
-                                        match = image_metadata.iloc[image_idx]
-                                        image_filename = match.get('filename')
-                                    except Exception:
-                                        pass
-
-                                price_diff = None
-                                if target_budget is not None:
-                                    price_diff = abs(car_price - target_budget)
-
-                                all_results.append(BudgetCarResult(
-                                    make=str(row.get('make', 'Unknown')).strip(),
-                                    model=str(row.get('model', 'Unknown')).strip(),
-                                    year=int(row.get('year', 2020)),
-                                    mileage=float(row.get('mileage', 0)),
-                                    condition=str(row.get('condition', 'Good')).strip(),
-                                    fuel_type=str(row.get('fuel_type', 'Gasoline')).strip(),
-                                    location=str(row.get('location', 'Unknown')).strip(),
-                                    engine_size=float(row.get('engine_size', 2.0)),
-                                    cylinders=int(row.get('cylinders', 4)),
-                                    price=round(car_price, 2),
-                                    trim=str(row.get('trim', '')).strip() if pd.notna(row.get('trim')) else None,
-                                    image_filename=image_filename,
-                                    price_difference=round(price_diff, 2) if price_diff is not None else None,
-                                    source="database"
-                                ))
-                            except Exception as e:
-                                logger.debug(f"Error processing dataset car at index {idx}: {e}")
-                                continue
+                            primary, secondary = prices, rows.astype(np.float64)
+                        order = _top_k_order(primary, secondary, end)
+                        streams.append(_dataset_stream(rows[order], prices[order], target_budget))
+                        dataset = (df, price_col)
             except Exception as e:
                 logger.warning(f"Error searching dataset: {e}")
 
@@ -219,116 +333,48 @@ async def search_budget(
                     marketplace_filters['transmission'] = transmission
                 if location:
                     marketplace_filters['location'] = location
+                if target_budget is not None:
+                    marketplace_filters['target_price'] = target_budget
 
-                # Search marketplace (get all matching, we'll paginate after merging)
+                # Only the first `end` listings in result order can land on this page
                 marketplace_listings, marketplace_total = search_listings(
                     marketplace_filters,
                     page=1,
-                    page_size=10000,  # Get all to merge properly
-                    sort_by='newest'
+                    page_size=end,
+                    sort_by='closest_price' if target_budget is not None else 'price_low'
                 )
-
-                # Convert marketplace listings to BudgetCarResult
-                now = datetime.now()
-                for listing in marketplace_listings:
-                    try:
-                        # Check if listing is new (created in last 24 hours)
-                        created_at = listing.get('created_at')
-                        is_new = False
-                        if created_at:
-                            try:
-                                if isinstance(created_at, str):
-                                    created_dt = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
-                                else:
-                                    created_dt = created_at
-                                is_new = (now - created_dt.replace(tzinfo=None) if created_dt.tzinfo else created_dt) < timedelta(hours=24)
-                            except Exception:
-                                pass
-
-                        # Get cover image URL
-                        cover_image_url = None
-                        images = listing.get('images', [])
-                        if images:
-                            # Find primary image or first image
-                            primary = next((img for img in images if img.get('is_primary')), None)
-                            if primary:
-                                cover_image_url = primary.get('url') or primary.get('file_path')
-                            elif images:
-                                cover_image_url = images[0].get('url') or images[0].get('file_path')
-
-                        # Convert mileage if needed
-                        mileage = float(listing.get('mileage', 0))
-                        mileage_unit = listing.get('mileage_unit', 'km')
-                        if mileage_unit == 'mi':
-                            mileage = mileage * 1.60934  # Convert to km
-
-                        # Build location string
-                        loc_parts = []
-                        if listing.get('location_city'):
-                            loc_parts.append(listing['location_city'])
-                        if listing.get('location_state'):
-                            loc_parts.append(listing['location_state'])
-                        if listing.get('location_country'):
-                            loc_parts.append(listing['location_country'])
-                        location_str = ', '.join(loc_parts) if loc_parts else 'Unknown'
-
-                        price_diff = None
-                        if target_budget is not None:
-                            price_diff = abs(listing.get('price', 0) - target_budget)
-
-                        all_results.append(BudgetCarResult(
-                            make=str(listing.get('make', 'Unknown')).strip(),
-                            model=str(listing.get('model', 'Unknown')).strip(),
-                            year=int(listing.get('year', 2020)),
-                            mileage=round(mileage, 2),
-                            condition=str(listing.get('condition', 'Good')).strip(),
-                            fuel_type=str(listing.get('fuel_type', 'Gasoline')).strip(),
-                            location=location_str,
-                            engine_size=float(listing.get('engine_size', 2.0)) if listing.get('engine_size') else 2.0,
-                            cylinders=int(listing.get('cylinders', 4)) if listing.get('cylinders') else 4,
-                            price=round(float(listing.get('price', 0)), 2),
-                            trim=str(listing.get('trim', '')).strip() if listing.get('trim') else None,
-                            image_url=cover_image_url,
-                            price_difference=round(price_diff, 2) if price_diff is not None else None,
-                            source="marketplace",
-                            listing_id=int(listing.get('id', 0)),
-                            is_new=is_new
-                        ))
-                    except Exception as e:
-                        logger.debug(f"Error processing marketplace listing {listing.get('id')}: {e}")
-                        continue
+                streams.append(_marketplace_stream(marketplace_listings, target_budget))
             except Exception as e:
                 logger.warning(f"Error searching marketplace: {e}")
 
-        # ===== MERGE AND SORT ALL RESULTS =====
-        # Ensure all_results is a list
-        if not isinstance(all_results, list):
-            all_results = []
-        
-        # Filter out any None or invalid results
-        all_results = [r for r in all_results if r is not None and isinstance(r, BudgetCarResult)]
-        
-        # Sort by price difference (closest to budget) if budget provided, otherwise by price
-        if target_budget is not None:
-            all_results.sort(key=lambda x: (x.price_difference or float('inf'), x.price))
-        else:
-            all_results.sort(key=lambda x: x.price)
-
-        # Get total count
-        total = len(all_results)
-
-        # Paginate
-        start_idx = (page - 1) * page_size
-        end_idx = start_idx + page_size
-        paginated_results = all_results[start_idx:end_idx]
-
-        logger.info(f"Budget search completed: {total} total results ({len([r for r in all_results if r.source == 'database'])} database, {len([r for r in all_results if r.source == 'marketplace'])} marketplace), returning {len(paginated_results)} for page {page}")
+        # ===== MERGE BY SORT KEY AND MATERIALIZE THE PAGE =====
+        # heapq.merge is stable: on equal keys dataset cars come before listings
+        total = dataset_total + marketplace_total
+        merged = heapq.merge(*streams, key=lambda entry: entry[0])
+        page_entries = list(itertools.islice(merged, start, end))
+
+        # Only the page's rows become response objects (dataset rows in one batch)
+        dataset_results = {}
+        positions = [item for _, result_source, item in page_entries if result_source == "database"]
+        if positions and dataset is not None:
+            dataset_results = _dataset_results(dataset[0], positions, dataset[1], target_budget)
+        now = datetime.now()
+        paginated_results = []
+        for _, result_source, item in page_entries:
+            if result_source == "database":
+                result = dataset_results.get(item)
+            else:
+                result = _marketplace_result(item, target_budget, now)
+            if result is not None:
+                paginated_results.append(result)
+
+        logger.info(f"Budget search completed: {total} total results ({dataset_total} database, {marketplace_total} marketplace), returning {len(paginated_results)} for page {page}")
 
         return BudgetSearchResponse(
             total=total,
             page=page,
             page_size=page_size,
-            results=paginated_results if paginated_results else []
+            results=paginated_results
         )
 
     except Exception as e:
@@ -343,12 +389,3 @@ async def search_budget(
             results=[],  # Ensure results is always an array
             error=f"Error searching budget: {str(e)}"
         )
-
-
-
-
-
-
-
-
-
@@ -1,10 +1,17 @@
 """
 Car data endpoints - provides makes, models, and locations from dataset
+
+The option lists are served from the dataset snapshot's VehicleCatalog with
+strong ETags, so repeat requests revalidate to a 304.
 """
 
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Request, Response
 from typing import List, Optional
+from app.config import settings
+from app.core.http_cache import cached_json_response
+from app.services.dataset_index import canonical
 from app.services.dataset_loader import DatasetLoader
+from app.services.vehicle_catalog import COMMON_ENGINE_SIZES, VALID_FUEL_TYPES, VehicleCatalog, infer_fuel_types
 import logging
 import pandas as pd
 import os
@@ -14,19 +21,22 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-# Cache for image metadata
+# Cache for image metadata (also used by the budget search)
 _image_metadata_cache = None
+_image_metadata_missing_logged = False
 
 
 def load_image_metadata():
     """Load image metadata CSV into memory"""
-    global _image_metadata_cache
+    global _image_metadata_cache, _image_metadata_missing_logged
     if _image_metadata_cache is not None:
         return _image_metadata_cache
 
     metadata_path = Path('image_metadata.csv')
     if not metadata_path.exists():
-        logger.warning("image_metadata.csv not found")
+        if not _image_metadata_missing_logged:
+            logger.warning("image_metadata.csv not found")
+            _image_metadata_missing_logged = True
         return None
 
     try:
@@ -39,27 +49,26 @@ def load_image_metadata():
         return None
 
 
+def _catalog_response(request: Request, catalog: VehicleCatalog, key, build) -> Response:
+    """Catalog-backed JSON body for key, served with its ETag (304 when unchanged)"""
+    return cached_json_response(request, catalog.body(key, build), settings.CATALOG_CACHE_MAX_AGE_SECONDS)
+
+
 @router.get("/makes", response_model=List[str])
-async def get_makes():
+async def get_makes(request: Request):
     """
     Get list of all unique car makes from the dataset
 
     Returns sorted list of make names
     """
     try:
-        dataset_loader = DatasetLoader.get_instance()
-        df = dataset_loader.dataset
+        catalog = DatasetLoader.get_instance().catalog
 
-        if df is None or len(df) == 0:
+        if catalog is None:
             logger.warning("Dataset not available for makes")
             return []
 
-        # Get unique makes, sorted
-        makes = df['make'].dropna().unique().tolist()
-        makes = [str(m).strip() for m in makes if str(m).strip()]
-        makes = sorted(list(set(makes)))
-
-        return makes
+        return _catalog_response(request, catalog, 'makes', lambda: catalog.makes)
     except Exception as e:
         logger.error(f"Error getting makes: {e}", exc_info=True)
         raise HTTPException(
@@ -67,7 +76,7 @@ async def get_makes():
 
 
 @router.get("/models/{make}", response_model=List[str])
-async def get_models(make: str):
+async def get_models(request: Request, make: str):
     """
     Get list of models for a specific make
 
@@ -77,25 +86,15 @@ async def get_models(make: str):
     Returns sorted list of model names for the given make
     """
     try:
-        dataset_loader = DatasetLoader.get_instance()
-        df = dataset_loader.dataset
+        catalog = DatasetLoader.get_instance().catalog
 
-        if df is None or len(df) == 0:
+        if catalog is None:
             logger.warning("Dataset not available for models")
             return []
 
-        # Filter by make (case-insensitive)
-        filtered = df[df['make'].str.lower() == make.lower()]
-
-        if len(filtered) == 0:
-            return []
-
-        # Get unique models, sorted
-        models = filtered['model'].dropna().unique().tolist()
-        models = [str(m).strip() for m in models if str(m).strip()]
-        models = sorted(list(set(models)))
-
-        return models
+        # Case-insensitive make; unknown makes share one (empty) entry
+        key = canonical(make) if canonical(make) in catalog.models else None
+        return _catalog_response(request, catalog, ('models', key), lambda: catalog.models_for(make))
     except Exception as e:
         logger.error(f"Error getting models for {make}: {e}", exc_info=True)
         raise HTTPException(
@@ -103,47 +102,29 @@ async def get_models(make: str):
 
 
 @router.get("/locations", response_model=List[str])
-async def get_locations():
+async def get_locations(request: Request):
     """
     Get list of all unique locations from the dataset (e.g. cleaned_car_data.csv).
     Reads the 'location' (or 'city', 'region') column and returns sorted unique values.
     """
     try:
-        dataset_loader = DatasetLoader.get_instance()
-        df = dataset_loader.dataset
+        catalog = DatasetLoader.get_instance().catalog
 
-        if df is None or len(df) == 0:
+        if catalog is None:
             logger.warning("Dataset not available for locations")
             return []
 
-        # Log columns to see what's available
-        print("Dataset columns:", df.columns.tolist())
-
-        # Check for location column
-        location_col = None
-        for col in ['location', 'Location', 'city', 'City', 'region', 'Region']:
-            if col in df.columns:
-                location_col = col
-                break
-
-        if location_col is None:
+        if catalog.location_col is None:
             logger.warning("Location column not found in dataset")
-            return []
-
-        locations = df[location_col].dropna().unique().tolist()
-        locations = sorted([str(loc).strip() for loc in locations if loc and str(loc).strip()])
-        locations = [loc for loc in locations if loc.lower() not in ['nan', 'none', 'null', 'n/a', '', 'unknown']]
-        locations = sorted(list(set(locations)))
 
-        logger.info(f"Returning {len(locations)} locations")
-        return locations
+        return _catalog_response(request, catalog, 'locations', lambda: catalog.locations)
     except Exception as e:
         logger.error(f"Error getting locations: {e}", exc_info=True)
         return []
 
 
 @router.get("/trims/{make}/{model}", response_model=List[str])
-async def get_trims(make: str, model: str):
+async def get_trims(request: Request, make: str, model: str):
     """
     Get list of trims for a specific make and model
 
@@ -154,38 +135,15 @@ async def get_trims(make: str, model: str):
     Returns sorted list of trim names for the given make/model combination
     """
     try:
-        dataset_loader = DatasetLoader.get_instance()
-        df = dataset_loader.dataset
+        catalog = DatasetLoader.get_instance().catalog
 
-        if df is None or len(df) == 0:
+        if catalog is None:
             logger.warning("Dataset not available for trims")
             return []
 
-        # Check for trim column
-        trim_col = None
-        for col in ['trim', 'Trim', 'variant', 'Variant', 'version', 'Version']:
-            if col in df.columns:
-                trim_col = col
-                break
-
-        if trim_col is None:
-            return []
-
-        # Filter by make and model (case-insensitive)
-        filtered = df[
-            (df['make'].str.lower() == make.lower()) &
-            (df['model'].str.lower() == model.lower())
-        ]
-
-        if len(filtered) == 0:
-            return []
-
-        trims = filtered[trim_col].dropna().unique().tolist()
-        trims = sorted([str(t).strip() for t in trims if t and str(t).strip()])
-        trims = [t for t in trims if t.lower() not in ['nan', 'none', 'null', 'n/a', 'na', '', 'undefined']]
-        trims = sorted(list(set(trims)))
-
-        return trims
+        node = catalog.node(make, model)
+        trims = list(node.trims) if node is not None else []
+        return _catalog_response(request, catalog, ('trims', tuple(trims)), lambda: trims)
     except Exception as e:
         logger.error(
             f"Error getting trims for {make}/{model}: {e}", exc_info=True)
@@ -194,7 +152,7 @@ async def get_trims(make: str, model: str):
 
 
 @router.get("/fuel-types/{make}/{model}", response_model=List[str])
-async def get_fuel_types(make: str, model: str):
+async def get_fuel_types(request: Request, make: str, model: str):
     """
     Get list of fuel types available for a specific make and model combination
 
@@ -204,116 +162,35 @@ async def get_fuel_types(make: str, model: str):
 
     Returns sorted list of fuel type names for the given make/model combination
     """
+    # Infer fuel type from model name patterns (case-insensitive)
+    inferred_fuel_types = infer_fuel_types(model)
     try:
-        dataset_loader = DatasetLoader.get_instance()
-        df = dataset_loader.dataset
-
-        valid_fuel_types = ['Gasoline', 'Diesel',
-                            'Electric', 'Hybrid', 'Plug-in Hybrid', 'Other']
-
-        # Infer fuel type from model name patterns (case-insensitive)
-        model_lower = model.lower()
-        inferred_fuel_types = set()
-
-        # Plug-in Hybrid patterns
-        if any(pattern in model_lower for pattern in ['dm-i', 'dm-i', 'phev', 'plug-in', 'plug in', 'phev', 'e-hybrid']):
-            inferred_fuel_types.add('Plug-in Hybrid')
+        catalog = DatasetLoader.get_instance().catalog
 
-        # Hybrid patterns (but not plug-in)
-        if any(pattern in model_lower for pattern in ['hybrid', 'hev']) and 'plug-in' not in model_lower and 'phev' not in model_lower and 'dm-i' not in model_lower:
-            inferred_fuel_types.add('Hybrid')
-
-        # Electric patterns
-        if any(pattern in model_lower for pattern in ['ev', 'electric', 'e-', 'bev', 'zev']):
-            inferred_fuel_types.add('Electric')
-
-        # Diesel patterns
-        if any(pattern in model_lower for pattern in ['diesel', 'tdi', 'tdci', 'cdi']):
-            inferred_fuel_types.add('Diesel')
-
-        if df is None or len(df) == 0:
+        if catalog is None:
             logger.warning("Dataset not available for fuel types")
             # Return inferred types if available, otherwise all valid types
             if inferred_fuel_types:
-                return sorted(list(inferred_fuel_types))
-            return valid_fuel_types
+                return sorted(inferred_fuel_types)
+            return VALID_FUEL_TYPES
 
-        # Filter by make and model (case-insensitive)
-        filtered = df[
-            (df['make'].str.lower() == make.lower()) &
-            (df['model'].str.lower() == model.lower())
-        ]
-
-        fuel_types = set()
-
-        # Get fuel types from dataset
-        if len(filtered) > 0 and 'fuel_type' in filtered.columns:
-            dataset_fuel_types = filtered['fuel_type'].dropna(
-            ).unique().tolist()
-            dataset_fuel_types = [str(f).strip()
-                                  for f in dataset_fuel_types if str(f).strip()]
-            # Normalize and map fuel types
-            fuel_type_map = {
-                'Gasoline': 'Gasoline',
-                'Diesel': 'Diesel',
-                'Electric': 'Electric',
-                'EV': 'Electric',
-                'Hybrid': 'Hybrid',
-                'Plug-in Hybrid': 'Plug-in Hybrid',
-                'Plug-In Hybrid': 'Plug-in Hybrid',
-                'PHEV': 'Plug-in Hybrid',
-                'LPG': 'Other',
-                'Other': 'Other'
-            }
-            # Filter to only include valid fuel types (normalize first)
-            for fuel in dataset_fuel_types:
-                # Normalize fuel type
-                normalized = fuel_type_map.get(fuel, fuel)
-                if normalized in valid_fuel_types:
-                    fuel_types.add(normalized)
-                elif fuel.lower() in ['gasoline', 'petrol', 'gas']:
-                    fuel_types.add('Gasoline')
-                elif fuel.lower() in ['diesel']:
-                    fuel_types.add('Diesel')
-                elif fuel.lower() in ['electric', 'ev', 'bev', 'zev']:
-                    fuel_types.add('Electric')
-                elif fuel.lower() in ['hybrid', 'hev']:
-                    fuel_types.add('Hybrid')
-                elif fuel.lower() in ['plug-in hybrid', 'phev', 'plug in hybrid']:
-                    fuel_types.add('Plug-in Hybrid')
-
-        # If no fuel types found in dataset, use inferred types
-        if not fuel_types:
-            fuel_types = inferred_fuel_types
-
-        # If still no fuel types, add inferred types to dataset types (union)
-        if inferred_fuel_types:
-            fuel_types = fuel_types.union(inferred_fuel_types)
+        node = catalog.node(make, model)
+        # Dataset fuel types plus the ones the model name implies
+        fuel_types = (node.fuel_types if node is not None else frozenset()) | inferred_fuel_types
 
         # If no fuel types at all, return all valid types as fallback
-        if not fuel_types:
-            fuel_types = set(valid_fuel_types)
-
-        return sorted(list(fuel_types))
+        result = sorted(fuel_types or VALID_FUEL_TYPES)
+        return _catalog_response(request, catalog, ('fuel-types', tuple(result)), lambda: result)
     except Exception as e:
         logger.error(
             f"Error getting fuel types for {make}/{model}: {e}", exc_info=True)
-        # Try to infer from model name even on error
-        model_lower = model.lower()
-        inferred = set()
-        if any(p in model_lower for p in ['dm-i', 'phev', 'plug-in', 'plug in']):
-            inferred.add('Plug-in Hybrid')
-        if any(p in model_lower for p in ['hybrid', 'hev']) and 'plug-in' not in model_lower:
-            inferred.add('Hybrid')
-        if any(p in model_lower for p in ['ev', 'electric', 'bev']):
-            inferred.add('Electric')
-        if inferred:
-            return sorted(list(inferred))
-        return valid_fuel_types
+        if inferred_fuel_types:
+            return sorted(inferred_fuel_types)
+        return VALID_FUEL_TYPES
 
 
 @router.get("/engine-sizes", response_model=List[float])
-async def get_engine_sizes():
+async def get_engine_sizes(request: Request):
     """
     Get list of all unique engine sizes from the dataset
 
@@ -321,54 +198,27 @@ async def get_engine_sizes():
     This endpoint returns all engine sizes regardless of make/model.
     """
     try:
-        dataset_loader = DatasetLoader.get_instance()
-        df = dataset_loader.dataset
+        catalog = DatasetLoader.get_instance().catalog
 
-        if df is None or len(df) == 0:
+        if catalog is None:
             logger.warning("Dataset not available for engine sizes")
             # Return common engine sizes as fallback
-            return [1.0, 1.2, 1.4, 1.5, 1.6, 1.8, 2.0, 2.5, 3.0, 3.5, 4.0, 5.0, 6.0]
+            return COMMON_ENGINE_SIZES
 
-        # Get unique engine sizes from entire dataset
-        if 'engine_size' not in df.columns:
+        if catalog.engine_sizes is None:
             logger.warning("Engine size column not found in dataset")
-            return [1.0, 1.2, 1.4, 1.5, 1.6, 1.8, 2.0, 2.5, 3.0, 3.5, 4.0, 5.0, 6.0]
-
-        engine_sizes = df['engine_size'].dropna().unique().tolist()
-
-        # Convert to float and filter valid values
-        valid_sizes = []
-        for size in engine_sizes:
-            try:
-                size_float = float(size)
-                # Validate range (0.5 to 10.0 liters)
-                if 0.5 <= size_float <= 10.0:
-                    valid_sizes.append(size_float)
-            except (ValueError, TypeError):
-                continue
-
-        # Remove duplicates and sort
-        engine_sizes = sorted(list(set(valid_sizes)))
-
-        # Ensure common engine sizes are included even if not in dataset
-        common_sizes = [1.0, 1.2, 1.4, 1.5, 1.6,
-                        1.8, 2.0, 2.5, 3.0, 3.5, 4.0, 5.0, 6.0]
-        for common_size in common_sizes:
-            if common_size not in engine_sizes:
-                engine_sizes.append(common_size)
-
-        # Sort again after adding common sizes
-        engine_sizes = sorted(engine_sizes)
-
-        return engine_sizes
+
+        # Dataset sizes in 0.5-10 L plus the common sizes
+        return _catalog_response(request, catalog, 'engine-sizes',
+                                 lambda: catalog.engine_sizes or COMMON_ENGINE_SIZES)
     except Exception as e:
         logger.error(f"Error getting engine sizes: {e}", exc_info=True)
         # Return common engine sizes on error
-        return [1.0, 1.2, 1.4, 1.5, 1.6, 1.8, 2.0, 2.5, 3.0, 3.5, 4.0, 5.0, 6.0]
+        return COMMON_ENGINE_SIZES
 
 
 @router.get("/metadata")
-async def get_metadata():
+async def get_metadata(request: Request):
     """
     Get dataset metadata including conditions, fuel types, and ranges
 
@@ -379,10 +229,9 @@ async def get_metadata():
     - mileage_range: {min, max} mileage values
     """
     try:
-        dataset_loader = DatasetLoader.get_instance()
-        df = dataset_loader.dataset
+        catalog = DatasetLoader.get_instance().catalog
 
-        if df is None or len(df) == 0:
+        if catalog is None:
             logger.warning("Dataset not available for metadata")
             return {
                 "conditions": [],
@@ -391,100 +240,7 @@ async def get_metadata():
                 "mileage_range": {"min": 0, "max": 500000}
             }
 
-        # Get unique conditions from dataset, but also include all valid conditions
-        # This ensures the form shows all possible conditions even if dataset only has some
-        valid_conditions = ['New', 'Like New',
-                            'Excellent', 'Good', 'Fair', 'Poor', 'Salvage']
-        conditions = []
-        if 'condition' in df.columns:
-            dataset_conditions = df['condition'].dropna().unique().tolist()
-            dataset_conditions = [str(c).strip()
-                                  for c in dataset_conditions if str(c).strip()]
-            # Merge dataset conditions with valid conditions, preserving order
-            all_conditions = set(valid_conditions)
-            for cond in dataset_conditions:
-                # Normalize condition names (handle "Used" as "Good", etc.)
-                normalized = cond
-                if cond.lower() == 'used':
-                    normalized = 'Good'
-                if normalized in all_conditions:
-                    conditions.append(normalized)
-            # Add any valid conditions not in dataset
-            for cond in valid_conditions:
-                if cond not in conditions:
-                    conditions.append(cond)
-        else:
-            conditions = valid_conditions
-
-        # Get unique fuel types - filter to only valid values
-        valid_fuel_types = ['Gasoline', 'Diesel',
-                            'Electric', 'Hybrid', 'Plug-in Hybrid', 'Other']
-        fuel_types = []
-        if 'fuel_type' in df.columns:
-            dataset_fuel_types = df['fuel_type'].dropna().unique().tolist()
-            dataset_fuel_types = [str(f).strip()
-                                  for f in dataset_fuel_types if str(f).strip()]
-            # Normalize and map fuel types
-            fuel_type_map = {
-                'Gasoline': 'Gasoline',
-                'Diesel': 'Diesel',
-                'Electric': 'Electric',
-                'EV': 'Electric',
-                'Hybrid': 'Hybrid',
-                'Plug-in Hybrid': 'Plug-in Hybrid',
-                'Plug-In Hybrid': 'Plug-in Hybrid',
-                'PHEV': 'Plug-in Hybrid',
-                'LPG': 'Other',
-                'Other': 'Other'
-            }
-            # Filter to only include valid fuel types (normalize first)
-            for fuel in dataset_fuel_types:
-                # Normalize fuel type
-                normalized = fuel_type_map.get(fuel, fuel)
-                if normalized in valid_fuel_types:
-                    fuel_types.append(normalized)
-                elif fuel.lower() in ['gasoline', 'petrol', 'gas']:
-                    fuel_types.append('Gasoline')
-                elif fuel.lower() in ['diesel']:
-                    fuel_types.append('Diesel')
-                elif fuel.lower() in ['electric', 'ev', 'bev', 'zev']:
-                    fuel_types.append('Electric')
-                elif fuel.lower() in ['hybrid', 'hev']:
-                    fuel_types.append('Hybrid')
-                elif fuel.lower() in ['plug-in hybrid', 'phev', 'plug in hybrid']:
-                    fuel_types.append('Plug-in Hybrid')
-            # Remove duplicates and sort
-            fuel_types = sorted(list(set(fuel_types)))
-            # If no valid fuel types found in dataset, use all valid types as fallback
-            if not fuel_types:
-                fuel_types = valid_fuel_types
-        else:
-            fuel_types = valid_fuel_types
-
-        # Get year range
-        year_min = 2000
-        year_max = 2025
-        if 'year' in df.columns:
-            year_values = df['year'].dropna()
-            if len(year_values) > 0:
-                year_min = int(year_values.min())
-                year_max = int(year_values.max())
-
-        # Get mileage range
-        mileage_min = 0
-        mileage_max = 500000
-        if 'mileage' in df.columns:
-            mileage_values = df['mileage'].dropna()
-            if len(mileage_values) > 0:
-                mileage_min = int(mileage_values.min())
-                mileage_max = int(mileage_values.max())
-
-        return {
-            "conditions": conditions,
-            "fuel_types": fuel_types,
-            "year_range": {"min": year_min, "max": year_max},
-            "mileage_range": {"min": mileage_min, "max": mileage_max}
-        }
+        return _catalog_response(request, catalog, 'metadata', lambda: catalog.metadata)
     except Exception as e:
         logger.error(f"Error getting metadata: {e}", exc_info=True)
         raise HTTPException(
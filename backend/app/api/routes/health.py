@@ -22,6 +22,29 @@ async def health_check_simple():
     return {"ok": True}
 
 
+@router.get("/health/memory")
+async def health_memory():
+    """
+    Memory of the worker serving this request: rss, pss, shared and private
+    bytes. Shared should dominate when the master preloaded models and dataset.
+    """
+    import gc
+    from app.core.preload import memory_report
+    report = memory_report()
+    report['frozen_objects'] = gc.get_freeze_count()
+    return report
+
+
+@router.get("/health/executors")
+async def health_executors():
+    """
+    Per-pool executor metrics (cpu / io / db): queue length, running and
+    rejected (503) counts, queue-wait and run-time histograms in ms.
+    """
+    from app.core.executors import executor_metrics
+    return executor_metrics()
+
+
 @router.get("/health/detailed", response_model=HealthResponse)
 async def health_check():
     """
@@ -45,8 +68,8 @@ async def health_check():
                 CORE_DIR = os.path.join(BASE_DIR, 'core')
                 if CORE_DIR not in sys.path:
                     sys.path.insert(0, CORE_DIR)
-                from core.predict_price import load_model
-                result = load_model()
+                from core.predict_price import _get_cached_model
+                result = _get_cached_model()
                 # Handle tuple return (now includes version and RMSE)
                 if isinstance(result, tuple) and len(result) >= 3:
                     model_name = result[2]
@@ -12,6 +12,7 @@ from pathlib import Path
 import shutil
 
 from app.services.image_analyzer import ImageAnalyzer
+from app.core.executors import run_cpu
 from app.config import settings
 
 logger = logging.getLogger(__name__)
@@ -48,6 +49,11 @@ def _validate_image_magic_bytes(contents: bytes, filename: str) -> bool:
     return False
 
 
+def _analyze_saved_images(paths: List[str]) -> dict:
+    """First call loads the feature extractor; keep both off the event loop."""
+    return ImageAnalyzer().analyze_images(paths)
+
+
 @router.post("/analyze-images")
 async def analyze_images(
     images: List[UploadFile] = File(...)
@@ -117,9 +123,8 @@ async def analyze_images(
 
                 saved_paths.append(str(file_path))
 
-            # Analyze images
-            analyzer = ImageAnalyzer()
-            result = analyzer.analyze_images(saved_paths)
+            # Analyze images (model load + inference on the cpu pool)
+            result = await run_cpu(_analyze_saved_images, saved_paths)
 
             # Validate image_features if present
             image_features = result.get("image_features")
@@ -28,6 +28,7 @@ from app.services.marketplace_service import (
 )
 from app.services.car_detection_service import detect_car_from_images, get_image_hash, get_labels_version
 from app.api.routes.auth import get_current_user, UserResponse
+from app.core.executors import CPU, DB, offload, run_db
 from app.services.feedback_service import save_prediction  # For auto-save to training
 
 logger = logging.getLogger(__name__)
@@ -110,7 +111,8 @@ class ListingResponse(BaseModel):
 
 
 @router.post("/listings/draft", response_model=Dict[str, Any])
-async def create_draft_listing_endpoint(
+@offload(DB)
+def create_draft_listing_endpoint(
     listing_data: Optional[Dict[str, Any]] = None,
     current_user: Optional[UserResponse] = Depends(get_current_user)
 ):
@@ -137,7 +139,8 @@ async def create_draft_listing_endpoint(
 
 
 @router.post("/listings", response_model=Dict[str, Any])
-async def create_car_listing(
+@offload(DB)
+def create_car_listing(
     listing_data: ListingCreateRequest,
     current_user: Optional[UserResponse] = Depends(get_current_user)
 ):
@@ -217,7 +220,7 @@ async def create_listing_with_images(
         if missing:
             raise HTTPException(status_code=400, detail=f"Missing required fields: {', '.join(missing)}")
 
-        listing_id = create_listing(data, user_id)
+        listing_id = await run_db(create_listing, data, user_id)
         image_urls: List[str] = []
         files = images or []
 
@@ -235,7 +238,7 @@ async def create_listing_with_images(
                 fp_rel = f"listings/{listing_id}/{fn}"
                 image_urls.append(url)
                 uploaded.append({"url": url, "file_path": fp_rel, "is_primary": idx == 0, "display_order": idx})
-            add_listing_images(listing_id, uploaded)
+            await run_db(add_listing_images, listing_id, uploaded)
 
         return {"listing_id": listing_id, "success": True, "image_urls": image_urls, "message": "Listing created"}
     except json.JSONDecodeError as e:
@@ -256,7 +259,7 @@ async def upload_listing_images(
     """Upload images for a listing"""
     try:
         # Verify listing exists and belongs to user
-        listing = get_listing(listing_id)
+        listing = await run_db(get_listing, listing_id)
         if not listing:
             raise HTTPException(status_code=404, detail="Listing not found")
         
@@ -287,7 +290,7 @@ async def upload_listing_images(
                 "display_order": idx,
             })
         
-        image_ids = add_listing_images(listing_id, uploaded_images)
+        image_ids = await run_db(add_listing_images, listing_id, uploaded_images)
         image_urls = [u["url"] for u in uploaded_images]
         
         return {
@@ -304,7 +307,8 @@ async def upload_listing_images(
 
 
 @router.delete("/listings/{listing_id}/images/{image_id}")
-async def delete_listing_image_endpoint(
+@offload(DB)
+def delete_listing_image_endpoint(
     listing_id: int,
     image_id: int,
     current_user: Optional[UserResponse] = Depends(get_current_user)
@@ -322,8 +326,10 @@ async def delete_listing_image_endpoint(
 
 
 @router.post("/listings/{listing_id}/auto-detect")
-async def auto_detect_car(
+@offload(CPU)
+def auto_detect_car(
     listing_id: int,
+    crop: Optional[bool] = Query(None, description="YOLO car crop before detection (false: faster, default: CAR_CROP_ENABLED)"),
     current_user: Optional[UserResponse] = Depends(get_current_user)
 ):
     """
@@ -490,7 +496,8 @@ async def auto_detect_car(
             detection_result = detect_car_from_images(
                 image_paths,
                 valid_makes=valid_makes_list,
-                valid_models_by_make=valid_models_by_make_dict
+                valid_models_by_make=valid_models_by_make_dict,
+                crop=crop
             )
             logger.info(f"Detection completed successfully: {detection_result.get('meta', {}).get('status', 'unknown')}")
         except Exception as e:
@@ -570,7 +577,8 @@ async def auto_detect_car(
 
 
 @router.get("/listings/{listing_id}", response_model=Dict[str, Any])
-async def get_listing_detail(
+@offload(DB)
+def get_listing_detail(
     listing_id: str,
     current_user: Optional[UserResponse] = Depends(get_current_user)
 ):
@@ -742,7 +750,8 @@ _JSON_FIELDS = {'features', 'location_coords', 'preferred_contact_methods'}
 
 
 @router.patch("/listings/{listing_id}")
-async def update_draft_listing(
+@offload(DB)
+def update_draft_listing(
     listing_id: int,
     data: Dict[str, Any],
     current_user: Optional[UserResponse] = Depends(get_current_user)
@@ -781,7 +790,8 @@ async def update_draft_listing(
 
 
 @router.get("/listings", response_model=Dict[str, Any])
-async def search_car_listings(
+@offload(DB)
+def search_car_listings(
     page: int = Query(1, ge=1),
     page_size: int = Query(15, ge=1, le=50),
     sort_by: str = Query("newest", regex="^(newest|price_low|price_high)$"),
@@ -854,7 +864,8 @@ async def search_car_listings(
 
 
 @router.post("/listings/{listing_id}/save")
-async def save_listing_to_favorites(
+@offload(DB)
+def save_listing_to_favorites(
     listing_id: int,
     current_user: UserResponse = Depends(get_current_user)
 ):
@@ -876,7 +887,8 @@ async def save_listing_to_favorites(
 
 
 @router.delete("/listings/{listing_id}/save")
-async def unsave_listing_from_favorites(
+@offload(DB)
+def unsave_listing_from_favorites(
     listing_id: int,
     current_user: UserResponse = Depends(get_current_user)
 ):
@@ -898,7 +910,8 @@ async def unsave_listing_from_favorites(
 
 
 @router.put("/listings/{listing_id}/publish")
-async def publish_listing(
+@offload(DB)
+def publish_listing(
     listing_id: int,
     current_user: UserResponse = Depends(get_current_user)
 ):
@@ -952,7 +965,8 @@ async def publish_listing(
 
 
 @router.get("/listings/{listing_id}/analytics")
-async def get_listing_analytics(
+@offload(DB)
+def get_listing_analytics(
     listing_id: int,
     current_user: UserResponse = Depends(get_current_user)
 ):
@@ -1051,7 +1065,8 @@ async def get_listing_analytics(
 
 
 @router.get("/my-listings")
-async def get_my_listings(
+@offload(DB)
+def get_my_listings(
     status: Optional[str] = Query(None, regex="^(active|draft|sold|expired)$"),
     current_user: UserResponse = Depends(get_current_user)
 ):
@@ -1129,7 +1144,8 @@ async def get_my_listings(
 
 
 @router.put("/listings/{listing_id}/mark-sold")
-async def mark_listing_as_sold(
+@offload(DB)
+def mark_listing_as_sold(
     listing_id: int,
     current_user: UserResponse = Depends(get_current_user)
 ):
@@ -1164,7 +1180,8 @@ async def mark_listing_as_sold(
 
 
 @router.put("/listings/{listing_id}/user-overrides")
-async def update_user_overrides(
+@offload(DB)
+def update_user_overrides(
     listing_id: int,
     overrides: Dict[str, Any],
     current_user: Optional[UserResponse] = Depends(get_current_user)
@@ -1195,7 +1212,8 @@ async def update_user_overrides(
 
 
 @router.delete("/listings/{listing_id}")
-async def delete_listing(
+@offload(DB)
+def delete_listing(
     listing_id: int,
     current_user: UserResponse = Depends(get_current_user)
 ):
@@ -24,6 +24,20 @@ class ModelInfoResponse(BaseModel):
     has_price_range_models: bool
     status: str
     message: str
+    active_version: Optional[str] = None
+    pending_version: Optional[str] = None
+    last_swap_at: Optional[float] = None
+
+
+def _swap_status() -> Dict[str, Any]:
+    """Active and pending production model versions (content hashes)"""
+    try:
+        from app.core.model_hot_swap import get_model_hot_swapper
+        status = get_model_hot_swapper().status()
+        return {key: status[key] for key in ('active_version', 'pending_version', 'last_swap_at')}
+    except Exception as e:
+        logger.debug(f"Could not get model swap status: {e}")
+        return {}
 
 
 @router.get("/model-info", response_model=ModelInfoResponse)
@@ -44,8 +58,8 @@ async def get_model_info():
             sys.path.insert(0, CORE_DIR)
 
         try:
-            from core.predict_price import load_model
-            result = load_model()
+            from core.predict_price import _get_cached_model
+            result = _get_cached_model()
 
             # Handle tuple return (old format)
             if isinstance(result, tuple) and len(result) >= 3:
@@ -54,7 +68,6 @@ async def get_model_info():
                 price_range_models = result[17] if len(result) > 17 else {}
 
                 # Try to get model path from model data
-                import pickle
                 import os
                 BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
                 model_paths = [
@@ -92,16 +105,13 @@ async def get_model_info():
                     if model_rmse:
                         metrics['rmse'] = model_rmse
 
-                # Try to load full model data for metrics
+                # Full metrics from the model data already held by the registry
                 try:
-                    import pickle
-                    full_path = os.path.join(BASE_DIR, model_path)
-                    if os.path.exists(full_path):
-                        with open(full_path, 'rb') as f:
-                            model_data = pickle.load(f)
-                            if 'metrics' in model_data:
-                                metrics = model_data['metrics']
-                except:
+                    from app.core.model_registry import get_model_registry
+                    model_data = get_model_registry().get_object('tabular')
+                    if isinstance(model_data, dict) and 'metrics' in model_data:
+                        metrics = model_data['metrics']
+                except Exception:
                     pass
 
                 info = {
@@ -130,6 +140,7 @@ async def get_model_info():
                     'message': 'Model loaded successfully'
                 }
 
+            info.update(_swap_status())
             return ModelInfoResponse(**info)
 
         except ImportError:
@@ -146,7 +157,8 @@ async def get_model_info():
                 has_encoders=False,
                 has_price_range_models=False,
                 status='loaded',
-                message='Model loaded but info not available'
+                message='Model loaded but info not available',
+                **_swap_status()
             )
 
     except Exception as e:
@@ -155,3 +167,27 @@ async def get_model_info():
             status_code=500,
             detail=f"Error getting model info: {str(e)}"
         )
+
+
+@router.get("/model-info/artifacts")
+async def get_model_artifacts():
+    """
+    Serving artifacts held by this worker: version, load time and resident size
+    """
+    from app.core.model_registry import get_model_registry
+    registry = get_model_registry()
+    artifacts = registry.report()
+    resident = [a['resident_mb'] for a in artifacts if a['resident_mb'] is not None]
+    return {
+        'artifacts': artifacts,
+        'total_resident_mb': round(sum(resident), 2),
+    }
+
+
+@router.get("/model-info/swap")
+async def get_model_swap_status():
+    """
+    Hot swap state: active/pending versions, last swap and warmup time
+    """
+    from app.core.model_hot_swap import get_model_hot_swapper
+    return get_model_hot_swapper().status()
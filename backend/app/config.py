@@ -111,6 +111,89 @@ class Settings(BaseSettings):
     CONFIDENCE_LEVEL: float = 0.95
     CONFIDENCE_Z_SCORE: float = 1.96
 
+    # Prediction result cache: in-process LRU size (0 disables) and optional
+    # SQLite file shared by all workers, e.g. "prediction_cache.db"
+    PREDICTION_CACHE_SIZE: int = 10000
+    PREDICTION_CACHE_DB: Optional[str] = None
+
+    # Micro-batching for /api/predict: gather concurrent calls for up to
+    # WINDOW_MS milliseconds or MAX_SIZE rows, then run one model call
+    PREDICT_BATCH_ENABLED: bool = True
+    PREDICT_BATCH_WINDOW_MS: float = 5.0
+    PREDICT_BATCH_MAX_SIZE: int = 32
+
+    # Hot swap: poll models/ for a new production_model.pkl and swap it in
+    # after a background load + warmup (no restart)
+    MODEL_HOT_SWAP_ENABLED: bool = True
+    MODEL_WATCH_INTERVAL_SECONDS: float = 30.0
+
+    # Tabular inference engine: "catboost" (DataFrame) or "onnxruntime"
+    # (models/production_model.onnx from scripts/export_onnx.py)
+    TABULAR_INFERENCE_BACKEND: str = "catboost"
+
+    # Vision engine for CLIP detection and ImageAnalyzer: "eager" (transformers /
+    # torchvision fp32) or "torchscript" (int8 models/clip_image_int8.pt and
+    # models/resnet50_int8.pt from scripts/export_vision_models.py, CPU only)
+    VISION_INFERENCE_BACKEND: str = "eager"
+
+    # Per-stage latency for /api/predict*: Server-Timing header + histograms at
+    # /api/predict/metrics. Verbose per-step logs only for a sampled fraction.
+    SERVER_TIMING_ENABLED: bool = True
+    DEBUG_LOG_SAMPLE_RATE: float = 0.01
+
+    # Bounded executor pools behind async routes (app/core/executors.py).
+    # Workers + queue is the most a pool accepts; beyond that routes return 503.
+    # EXECUTOR_CPU_WORKERS=0 means one per CPU core.
+    EXECUTOR_CPU_WORKERS: int = 0
+    EXECUTOR_CPU_QUEUE: int = 64
+    EXECUTOR_IO_WORKERS: int = 16
+    EXECUTOR_IO_QUEUE: int = 128
+    EXECUTOR_DB_WORKERS: int = 4
+    EXECUTOR_DB_QUEUE: int = 128
+
+    # Similar cars (app/services/similar_cars.py): weights of the standardized
+    # |year|, |log mileage| and |log price| distances
+    SIMILAR_CARS_YEAR_WEIGHT: float = 1.0
+    SIMILAR_CARS_MILEAGE_WEIGHT: float = 1.0
+    SIMILAR_CARS_PRICE_WEIGHT: float = 2.0
+
+    # Binary copy of DATA_FILE next to it (app/services/dataset_cache.py),
+    # rebuilt only when the CSV's size/mtime/SHA-256 change
+    DATASET_CACHE_ENABLED: bool = True
+
+    # Reload: poll DATA_FILE and swap in a rebuilt dataset snapshot in the
+    # background when it changes (app/services/dataset_reloader.py)
+    DATASET_WATCH_ENABLED: bool = True
+    DATASET_WATCH_INTERVAL_SECONDS: float = 30.0
+
+    # Option lists (/api/cars/makes, /api/available-*, ...): max-age sent with
+    # their ETags; clients revalidate with If-None-Match afterwards
+    CATALOG_CACHE_MAX_AGE_SECONDS: int = 300
+
+    # CLIP text-embedding bank for car detection (app/services/clip_text_bank.py),
+    # persisted per labels version. If unset, uses {ROOT}/models/clip_text_bank
+    CLIP_TEXT_BANK_DIR: Optional[str] = None
+
+    # Multi-image detection: threads decoding a listing's photos in parallel
+    # and images per batched CLIP image-tower forward
+    CLIP_DECODE_WORKERS: int = 4
+    CLIP_DETECT_BATCH_SIZE: int = 32
+
+    # Image embeddings (CLIP, ResNet50) keyed by SHA-256 of the image bytes
+    # (app/services/embedding_store.py), LRU-evicted beyond MAX_MB.
+    # If unset, uses {ROOT}/models/embedding_store
+    EMBEDDING_STORE_ENABLED: bool = True
+    EMBEDDING_STORE_DIR: Optional[str] = None
+    EMBEDDING_STORE_MAX_MB: int = 1024
+
+    # YOLO car crop before CLIP detection (app/services/car_cropper.py).
+    # ENABLED is the default for requests that don't pass crop=...;
+    # WARMUP loads the weights and runs one batch at startup
+    CAR_CROP_ENABLED: bool = True
+    CAR_CROP_MODEL: str = "yolov8n.pt"
+    CAR_CROP_BATCH_SIZE: int = 16
+    CAR_CROP_WARMUP: bool = False
+
     @property
     def is_production(self) -> bool:
         return self.ENV.lower() == "production"
@@ -182,3 +265,9 @@ MODEL_ENCODER_FILE = MODEL_DIR / "model_encoder.pkl"
 DATA_DIR = ROOT_DIR / "data"
 CLEANED_DATA_FILE = DATA_DIR / "cleaned_car_data.csv"
 
+# Production model training data and its holdout split (core/retrain_iqcars.py);
+# scripts/export_onnx.py checks ONNX parity on the same test split
+IQCARS_TRAINING_FILE = DATA_DIR / "iqcars_cleaned.csv"
+TRAINING_TEST_SIZE = 0.2
+TRAINING_RANDOM_STATE = 42
+
@@ -0,0 +1,207 @@
+"""
+Bounded executor pools for blocking work behind async routes.
+
+Async handlers must never run model inference, scraping or SQLite on the event
+loop. Each kind of work gets its own pool so one cannot starve the others:
+
+- cpu: model inference, image analysis, CLIP detection
+- io:  outbound HTTP (listing scrapers) and file work
+- db:  SQLite queries in marketplace routes
+
+Every pool has a fixed number of workers plus a bounded queue. When both are
+full, run() raises PoolSaturatedError, which main.py turns into a 503 with
+Retry-After instead of letting requests pile up unbounded. Queue length, wait
+time and run time per pool are exposed at /api/health/executors.
+"""
+
+import asyncio
+import contextvars
+import functools
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Coroutine, Dict
+
+from app.core.metrics import LATENCY_MS_BUCKETS, Histogram
+
+logger = logging.getLogger(__name__)
+
+CPU = 'cpu'
+IO = 'io'
+DB = 'db'
+
+
+class PoolSaturatedError(RuntimeError):
+    """All workers busy and the pool's queue is full"""
+
+    def __init__(self, pool: str, retry_after: int = 1):
+        super().__init__(f"Executor pool '{pool}' is saturated")
+        self.pool = pool
+        self.retry_after = retry_after
+
+
+class BoundedExecutor:
+    """ThreadPoolExecutor with admission control and wait/run-time metrics"""
+
+    def __init__(self, name: str, max_workers: int, max_queue: int):
+        self.name = name
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=f"pool-{name}")
+        self._lock = threading.Lock()
+        self._pending = 0   # queued + running
+        self._running = 0
+
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.wait_ms = Histogram(LATENCY_MS_BUCKETS)
+        self.run_ms = Histogram(LATENCY_MS_BUCKETS)
+
+    @property
+    def capacity(self) -> int:
+        return self.max_workers + self.max_queue
+
+    @property
+    def queue_length(self) -> int:
+        with self._lock:
+            return self._pending - self._running
+
+    async def run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run fn(*args, **kwargs) on this pool; raises PoolSaturatedError when full."""
+        with self._lock:
+            if self._pending >= self.capacity:
+                self.rejected += 1
+                raise PoolSaturatedError(self.name)
+            self._pending += 1
+            self.submitted += 1
+
+        loop = asyncio.get_running_loop()
+        ctx = contextvars.copy_context()
+        try:
+            future = self._executor.submit(ctx.run, self._timed, fn, args, kwargs, time.perf_counter())
+        except RuntimeError:
+            self._release(ok=False)
+            raise
+        # Cancelled before a worker picked it up (client gone, shutdown): free the slot
+        future.add_done_callback(lambda f: f.cancelled() and self._release(ok=False))
+        return await asyncio.wrap_future(future, loop=loop)
+
+    def _timed(self, fn: Callable[..., Any], args: tuple, kwargs: dict, enqueued: float) -> Any:
+        started = time.perf_counter()
+        self.wait_ms.observe((started - enqueued) * 1000.0)
+        with self._lock:
+            self._running += 1
+        ok = False
+        try:
+            result = fn(*args, **kwargs)
+            ok = True
+            return result
+        finally:
+            self.run_ms.observe((time.perf_counter() - started) * 1000.0)
+            with self._lock:
+                self._running -= 1
+            self._release(ok)
+
+    def _release(self, ok: bool) -> None:
+        with self._lock:
+            self._pending -= 1
+            if ok:
+                self.completed += 1
+            else:
+                self.failed += 1
+
+    def metrics(self) -> dict:
+        with self._lock:
+            pending, running = self._pending, self._running
+        return {
+            'workers': self.max_workers,
+            'max_queue': self.max_queue,
+            'running': running,
+            'queue_length': pending - running,
+            'submitted': self.submitted,
+            'completed': self.completed,
+            'failed': self.failed,
+            'rejected': self.rejected,
+            'wait_ms': self.wait_ms.snapshot(),
+            'run_ms': self.run_ms.snapshot(),
+        }
+
+    def shutdown(self, wait: bool = False) -> None:
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+
+_pools: Dict[str, BoundedExecutor] = {}
+_pools_lock = threading.Lock()
+
+
+def _pool_sizes() -> Dict[str, tuple]:
+    from app.config import settings
+    cpu_workers = settings.EXECUTOR_CPU_WORKERS or (os.cpu_count() or 2)
+    return {
+        CPU: (cpu_workers, settings.EXECUTOR_CPU_QUEUE),
+        IO: (settings.EXECUTOR_IO_WORKERS, settings.EXECUTOR_IO_QUEUE),
+        DB: (settings.EXECUTOR_DB_WORKERS, settings.EXECUTOR_DB_QUEUE),
+    }
+
+
+def get_pool(name: str) -> BoundedExecutor:
+    """Process-wide pool by name (cpu / io / db), created on first use."""
+    pool = _pools.get(name)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(name)
+            if pool is None:
+                workers, queue = _pool_sizes()[name]
+                pool = BoundedExecutor(name, workers, queue)
+                _pools[name] = pool
+                logger.info(f"✅ Executor pool '{name}': {pool.max_workers} workers, queue {pool.max_queue}")
+    return pool
+
+
+async def run_in_pool(name: str, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    return await get_pool(name).run(fn, *args, **kwargs)
+
+
+async def run_cpu(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    return await run_in_pool(CPU, fn, *args, **kwargs)
+
+
+async def run_io(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    return await run_in_pool(IO, fn, *args, **kwargs)
+
+
+async def run_db(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    return await run_in_pool(DB, fn, *args, **kwargs)
+
+
+def offload(name: str) -> Callable:
+    """
+    Route decorator: the sync handler body runs on the named pool.
+
+    FastAPI still sees the original signature (functools.wraps), so request
+    parsing and dependencies are unchanged; only the body leaves the loop.
+    Handlers that await the inference scheduler stay async instead and send
+    only their blocking parts to a pool with run_cpu() / run_io(), so pool
+    threads never sit waiting on the event loop.
+    """
+    def decorator(fn: Callable[..., Any]) -> Callable[..., Coroutine[Any, Any, Any]]:
+        @functools.wraps(fn)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            return await run_in_pool(name, fn, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def executor_metrics() -> Dict[str, dict]:
+    return {name: pool.metrics() for name, pool in list(_pools.items())}
+
+
+def shutdown_executors() -> None:
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.shutdown(wait=False)
+        _pools.clear()
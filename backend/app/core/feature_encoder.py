@@ -0,0 +1,201 @@
+"""
+Compiled feature encoder for the production tabular model.
+Built once from model_info.json and encoders.pkl when the model loads, then
+reused for every request: categorical vocabularies are plain dicts, defaults
+and column order are resolved up front, and rows are written straight into
+preallocated float32 buffers.
+
+Encodings are deterministic across processes (no salted hash()), so the same
+car encodes to the same vector in every worker and can key a shared cache.
+"""
+
+import logging
+import zlib
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+CURRENT_YEAR = 2026  # Match training
+CONDITION_MAP = {
+    'Excellent': 0,
+    'Very Good': 1,
+    'Good': 2,
+    'Fair': 3,
+    'Poor': 4
+}
+FUEL_TYPE_MAP = {
+    'Gasoline': 0,
+    'Diesel': 1,
+    'Hybrid': 2,
+    'Electric': 3,
+    'Other': 4
+}
+NUMERIC_DEFAULTS = {
+    'year': 2020,
+    'mileage': 50000,
+    'engine_size': 2.0,
+    'cylinders': 4
+}
+
+HASH_BUCKETS = 1000
+
+# Categorical inputs: encoded column -> (source key, default value)
+CATEGORICAL_COLUMNS = {
+    'make_encoded': ('make', ''),
+    'model_encoded': ('model', ''),
+    'location_encoded': ('location', 'Unknown'),
+}
+
+# Column kinds resolved at compile time
+_AGE = 'age'
+_VOCAB = 'vocab'
+_HASH = 'hash'
+_MAP = 'map'
+_NUMERIC = 'numeric'
+
+
+def stable_bucket(value: str, buckets: int = HASH_BUCKETS) -> int:
+    """Process-independent hash bucket for labels without a fitted encoder."""
+    return zlib.crc32(value.encode('utf-8')) % buckets
+
+
+def _vocabulary(encoder: Any) -> Optional[Dict[str, int]]:
+    """Turn a fitted LabelEncoder into a {label: code} dict (None if unusable)."""
+    classes = getattr(encoder, 'classes_', None)
+    if classes is None:
+        return None
+    return {str(c): i for i, c in enumerate(list(classes))}
+
+
+class FeatureEncoder:
+    """Encodes car feature dicts into the model's exact feature matrix"""
+
+    def __init__(self, feature_columns: List[str], encoders: Optional[dict] = None):
+        encoders = encoders or {}
+        self.feature_columns = list(feature_columns)
+        self.n_features = len(self.feature_columns)
+        self.vocabularies: Dict[str, Dict[str, int]] = {}
+
+        # (column index, kind, source key, default, lookup table)
+        self._plan = []
+        for j, col in enumerate(self.feature_columns):
+            if col == 'age_of_car':
+                self._plan.append((j, _AGE, 'year', NUMERIC_DEFAULTS['year'], None))
+            elif col in CATEGORICAL_COLUMNS:
+                key, default = CATEGORICAL_COLUMNS[col]
+                if key in encoders:
+                    # Encoder objects without classes_ encode everything as 0
+                    vocab = _vocabulary(encoders[key]) or {}
+                    self.vocabularies[key] = vocab
+                    self._plan.append((j, _VOCAB, key, default, vocab))
+                else:
+                    self._plan.append((j, _HASH, key, default, None))
+            elif col == 'condition_encoded':
+                self._plan.append((j, _MAP, 'condition', 'Good', (CONDITION_MAP, 2)))
+            elif col == 'fuel_type_encoded':
+                self._plan.append((j, _MAP, 'fuel_type', 'Gasoline', (FUEL_TYPE_MAP, 0)))
+            else:
+                self._plan.append((j, _NUMERIC, col, NUMERIC_DEFAULTS.get(col, 0), None))
+
+        # Defaults row: numeric defaults pre-filled, categoricals overwritten per row
+        self.defaults = np.zeros(self.n_features, dtype=np.float32)
+        for j, kind, key, default, _ in self._plan:
+            if kind == _NUMERIC:
+                self.defaults[j] = default
+            elif kind == _AGE:
+                self.defaults[j] = max(0, CURRENT_YEAR - default)
+
+    @classmethod
+    def from_artifacts(cls, model_info: dict, encoders: Optional[dict] = None) -> Optional['FeatureEncoder']:
+        """Build from model_info.json contents; None when it lists no features."""
+        feature_columns = model_info.get('feature_columns') or model_info.get('features', [])
+        if not feature_columns:
+            return None
+        return cls(feature_columns, encoders)
+
+    # ------------------------------------------------------------------
+    # Single row
+    # ------------------------------------------------------------------
+
+    def encode_row(self, car_data: dict, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Encode one car into a float32 vector of length n_features.
+        Raises ValueError/TypeError for values that cannot be parsed.
+        """
+        if out is None:
+            out = self.defaults.copy()
+        else:
+            out[:] = self.defaults
+        for j, kind, key, default, table in self._plan:
+            if kind == _NUMERIC:
+                val = car_data.get(key)
+                if val is not None and not pd.isna(val):
+                    out[j] = float(val)
+            elif kind == _AGE:
+                out[j] = max(0, CURRENT_YEAR - int(car_data.get(key, default)))
+            elif kind == _VOCAB:
+                out[j] = table.get(str(car_data.get(key, default)).strip(), 0)
+            elif kind == _MAP:
+                mapping, fallback = table
+                out[j] = mapping.get(str(car_data.get(key, default)).strip(), fallback)
+            else:
+                out[j] = stable_bucket(str(car_data.get(key, default)).strip())
+        return out
+
+    # ------------------------------------------------------------------
+    # Batch
+    # ------------------------------------------------------------------
+
+    def encode_many(self, rows: List[dict], errors: Optional[List[Optional[str]]] = None) -> np.ndarray:
+        """
+        Encode many cars column-wise into a preallocated (n_rows, n_features)
+        float32 matrix. Rows with unparseable numeric values get an entry in
+        errors (when given) and keep the column default.
+        """
+        n = len(rows)
+        X = np.empty((n, self.n_features), dtype=np.float32)
+        if errors is None:
+            errors = [None] * n
+        numeric_cache = {}
+
+        def numeric(key, default):
+            if key not in numeric_cache:
+                numeric_cache[key] = self._numeric_column(rows, key, default, errors)
+            return numeric_cache[key]
+
+        for j, kind, key, default, table in self._plan:
+            if kind == _NUMERIC:
+                X[:, j] = numeric(key, default)
+            elif kind == _AGE:
+                X[:, j] = np.maximum(0, CURRENT_YEAR - np.trunc(numeric(key, default)))
+            else:
+                values = [str(r.get(key, default)).strip() for r in rows]
+                if kind == _VOCAB:
+                    X[:, j] = [table.get(v, 0) for v in values]
+                elif kind == _MAP:
+                    mapping, fallback = table
+                    X[:, j] = [mapping.get(v, fallback) for v in values]
+                else:
+                    X[:, j] = [stable_bucket(v) for v in values]
+        return X
+
+    @staticmethod
+    def _numeric_column(rows: List[dict], key: str, default: float,
+                        errors: List[Optional[str]]) -> np.ndarray:
+        """Parse one numeric column; missing values take the default."""
+        raw = pd.Series([r.get(key) for r in rows], dtype=object)
+        values = pd.to_numeric(raw, errors='coerce').to_numpy(dtype=np.float64, copy=True)
+        missing = raw.isna().to_numpy()
+        invalid = np.isnan(values) & ~missing
+        for i in np.flatnonzero(invalid):
+            if errors[i] is None:
+                errors[i] = f"Invalid {key}: {raw.iat[i]!r}"
+        values[missing | invalid] = default
+        return values
+
+    def to_frame(self, X: np.ndarray) -> pd.DataFrame:
+        """Wrap an encoded matrix with the training column names (CatBoost input)."""
+        return pd.DataFrame(np.atleast_2d(X), columns=self.feature_columns, copy=False)
@@ -0,0 +1,43 @@
+"""
+Conditional JSON responses: pre-serialized bodies with strong ETags.
+
+A CachedBody is encoded once (same JSON as FastAPI's default response) and
+served as is. The ETag is a hash of the body, so it is identical across
+workers and restarts and changes exactly when the content does; requests
+whose If-None-Match lists it get a bodiless 304.
+"""
+
+import hashlib
+import json
+from typing import Any, NamedTuple
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+
+class CachedBody(NamedTuple):
+    body: bytes
+    etag: str
+
+
+def encode(payload: Any) -> CachedBody:
+    body = json.dumps(jsonable_encoder(payload), ensure_ascii=False, allow_nan=False,
+                      separators=(",", ":")).encode("utf-8")
+    return CachedBody(body, '"' + hashlib.sha256(body).hexdigest()[:32] + '"')
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def cached_json_response(request: Request, cached: CachedBody, max_age: int) -> Response:
+    """200 with the body, or 304 when the client already holds this ETag."""
+    headers = {"ETag": cached.etag, "Cache-Control": f"public, max-age={max_age}, must-revalidate"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, cached.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=cached.body, media_type="application/json", headers=headers)
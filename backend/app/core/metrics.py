@@ -0,0 +1,45 @@
+"""
+In-process metrics shared by the serving layers (inference scheduler,
+executor pools). Plain counters and cumulative histograms; no external
+metrics dependency.
+"""
+
+import bisect
+import threading
+from typing import List
+
+import numpy as np
+
+# Milliseconds; used for queue waits and run times
+LATENCY_MS_BUCKETS = [1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+
+
+class Histogram:
+    """Cumulative-bucket histogram (Prometheus style: count of values <= bound)"""
+
+    def __init__(self, buckets: List[float]):
+        self.buckets = list(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        with self._lock:
+            self.counts[bisect.bisect_left(self.buckets, value)] += 1
+            self.count += 1
+            self.sum += value
+            self.max = max(self.max, value)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counts, count, total, peak = list(self.counts), self.count, self.sum, self.max
+        cumulative = np.cumsum(counts).tolist()
+        return {
+            'buckets': {**{str(b): c for b, c in zip(self.buckets, cumulative)}, '+Inf': cumulative[-1]},
+            'count': count,
+            'sum': round(total, 3),
+            'avg': round(total / count, 3) if count else 0.0,
+            'max': round(peak, 3),
+        }
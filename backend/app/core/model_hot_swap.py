@@ -0,0 +1,143 @@
+"""
+Zero-downtime hot swap of the production model.
+
+A daemon thread polls models/ for a changed production_model.pkl (mtime/size,
+confirmed by content hash) or refreshed sidecars (model_info.json,
+encoders.pkl, ONNX export). A new artifact is loaded and warmed up in the
+background while the old model keeps serving, then installed with a single
+reference swap; requests already in flight finish on the version they pinned.
+"""
+
+import logging
+import threading
+import time
+from typing import Optional
+
+from app.core.model_registry import file_version, get_model_registry
+
+logger = logging.getLogger(__name__)
+
+
+class ModelHotSwapper:
+    """Watches the production model file and swaps in new versions"""
+
+    def __init__(self, interval_seconds: float = 30.0):
+        self.interval_seconds = interval_seconds
+        self.pending_version: Optional[str] = None
+        self.last_swap_at: Optional[float] = None
+        self.last_warmup_ms: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.swaps = 0
+        self._check_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="model-hot-swap", daemon=True)
+        self._thread.start()
+        logger.info(f"Model hot swap watcher started (every {self.interval_seconds:g}s)")
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_seconds):
+            try:
+                self.check_now()
+            except Exception as e:
+                self.last_error = str(e)
+                logger.error(f"Model hot swap check failed: {e}", exc_info=True)
+
+    def check_now(self) -> bool:
+        """Swap in a changed production model. Returns True if a swap happened."""
+        from app.core import predict_price
+
+        with self._check_lock:
+            registry = get_model_registry()
+            names = predict_price.serving_artifact_names()
+            if predict_price.get_serving_model() is not None and not any(registry.file_changed(n) for n in names):
+                return False
+
+            path = registry.find('tabular')
+            if path is None:
+                return False
+            active = predict_price.get_model_version()
+            new_version = file_version(path)
+            # model_info/encoders/ONNX export can be refreshed for the same model
+            sidecars_changed = any(registry.file_changed(n) for n in names if n != 'tabular')
+            if new_version == active and not sidecars_changed:
+                registry.touch('tabular')  # same bytes, new mtime
+                return False
+
+            self.pending_version = new_version
+            logger.info(f"🔄 New production model detected: v{new_version} (active: v{active})")
+            try:
+                # Artifacts that ship together with a retrained model
+                handles = {name: registry.load_fresh(name) for name in names}
+                handles = {name: h for name, h in handles.items() if h is not None}
+                # Sidecars deleted since the last load (e.g. an ONNX export) are dropped
+                removed = [name for name in names if name not in handles and registry.find(name, fresh=True) is None]
+                serving = predict_price.build_serving_model(handles)
+                if serving is None:
+                    raise RuntimeError(f"{path} does not contain a usable model")
+                self.last_warmup_ms = round(predict_price.warmup(serving) * 1000, 1)
+
+                # Point of no return: single reference swaps
+                registry.install(handles, removed)
+                predict_price.activate(serving)
+                self._refresh_dependents()
+            except Exception as e:
+                self.last_error = str(e)
+                self.pending_version = None
+                logger.error(f"❌ Hot swap to v{new_version} failed, keeping v{active}: {e}", exc_info=True)
+                return False
+
+            self.pending_version = None
+            self.last_error = None
+            self.last_swap_at = time.time()
+            self.swaps += 1
+            logger.info(f"✅ Swapped production model v{active} -> v{serving.version} "
+                        f"(warmup {self.last_warmup_ms} ms)")
+            return True
+
+    @staticmethod
+    def _refresh_dependents() -> None:
+        """Let other holders of the old model re-read the registry lazily."""
+        import sys
+        try:
+            from app.services.model_service import ModelService
+            ModelService._loaded = False
+        except Exception:
+            pass
+        core_module = sys.modules.get('core.predict_price')
+        if core_module is not None:
+            core_module._model_cache = None
+
+    def status(self) -> dict:
+        from app.core import predict_price
+        return {
+            'active_version': predict_price.get_model_version(),
+            'pending_version': self.pending_version,
+            'last_swap_at': self.last_swap_at,
+            'last_warmup_ms': self.last_warmup_ms,
+            'swaps': self.swaps,
+            'last_error': self.last_error,
+            'watching': self._thread is not None and self._thread.is_alive(),
+        }
+
+
+_instance: Optional[ModelHotSwapper] = None
+
+
+def get_model_hot_swapper() -> ModelHotSwapper:
+    global _instance
+    if _instance is None:
+        from app.config import settings
+        _instance = ModelHotSwapper(interval_seconds=settings.MODEL_WATCH_INTERVAL_SECONDS)
+    return _instance
@@ -0,0 +1,318 @@
+"""
+Model registry - single owner of every serving artifact.
+
+The production tabular model, encoders, scaler, feature info, multimodal model
+and price-range sub-models are each unpickled exactly once per process and
+shared by app.core.predict_price, ModelService and core/predict_price.py.
+Every artifact is exposed as a versioned handle (content hash of its file)
+with load time and resident size, so /api/model-info can report what a worker
+actually holds in memory.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import pickle
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from app.core.onnx_backend import ONNX_FILENAME, ONNX_META_FILENAME, load_onnx_session
+from app.core.vision_backend import (
+    CLIP_IMAGE_FILENAME, CLIP_IMAGE_META_FILENAME, RESNET50_FILENAME, RESNET50_META_FILENAME, load_torchscript,
+)
+
+logger = logging.getLogger(__name__)
+
+CURRENT_FILE = Path(__file__)
+BACKEND_DIR = CURRENT_FILE.parent.parent.parent
+ROOT_DIR = BACKEND_DIR.parent
+
+# Searched in order; first directory containing the file wins
+MODEL_DIRS = [
+    BACKEND_DIR / "models",
+    Path("/app/models"),
+    ROOT_DIR / "models",
+]
+
+
+def _load_pickle(path: Path) -> Any:
+    """pickle first (training scripts save with pickle), joblib as fallback."""
+    try:
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+    except Exception as pickle_error:
+        try:
+            import joblib
+            return joblib.load(path)
+        except Exception:
+            raise pickle_error
+
+
+def _load_json(path: Path) -> Any:
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+@dataclass(frozen=True)
+class ArtifactSpec:
+    """Where an artifact lives and how to load it"""
+    name: str
+    filenames: List[str]
+    loader: Callable[[Path], Any] = _load_pickle
+    # Artifact this one ships with; looked up in that artifact's directory first
+    sidecar_of: Optional[str] = None
+
+
+# Every artifact the API serves with; no directory globbing
+ARTIFACTS: Dict[str, ArtifactSpec] = {spec.name: spec for spec in [
+    ArtifactSpec('tabular', ['production_model.pkl']),
+    ArtifactSpec('model_info', ['model_info.json'], _load_json, sidecar_of='tabular'),
+    ArtifactSpec('encoders', ['encoders.pkl'], sidecar_of='tabular'),
+    ArtifactSpec('scaler', ['scaler.pkl'], sidecar_of='tabular'),
+    ArtifactSpec('feature_info', ['feature_info.pkl'], sidecar_of='tabular'),
+    ArtifactSpec('multimodal', ['multimodal_model.pkl']),
+    # Optional ONNX export of 'tabular' (scripts/export_onnx.py)
+    ArtifactSpec('tabular_onnx', [ONNX_FILENAME], load_onnx_session, sidecar_of='tabular'),
+    ArtifactSpec('tabular_onnx_meta', [ONNX_META_FILENAME], _load_json, sidecar_of='tabular'),
+    # Optional int8 TorchScript vision models (scripts/export_vision_models.py)
+    ArtifactSpec('clip_image_int8', [CLIP_IMAGE_FILENAME], load_torchscript),
+    ArtifactSpec('clip_image_int8_meta', [CLIP_IMAGE_META_FILENAME], _load_json, sidecar_of='clip_image_int8'),
+    ArtifactSpec('resnet50_int8', [RESNET50_FILENAME], load_torchscript),
+    ArtifactSpec('resnet50_int8_meta', [RESNET50_META_FILENAME], _load_json, sidecar_of='resnet50_int8'),
+]}
+
+
+@dataclass
+class ArtifactHandle:
+    """A loaded artifact pinned to the file version it came from"""
+    name: str
+    obj: Any
+    path: Optional[Path]
+    version: str
+    loaded_at: float
+    load_seconds: float
+    file_bytes: int
+    resident_bytes: Optional[int]
+    mtime_ns: int = 0
+    derived_from: Optional[str] = None
+
+    def describe(self) -> dict:
+        return {
+            'name': self.name,
+            'version': self.version,
+            'path': str(self.path) if self.path else None,
+            'type': type(self.obj).__name__,
+            'loaded_at': self.loaded_at,
+            'load_ms': round(self.load_seconds * 1000, 1),
+            'file_mb': round(self.file_bytes / (1024 * 1024), 2),
+            'resident_mb': round(self.resident_bytes / (1024 * 1024), 2) if self.resident_bytes is not None else None,
+            'derived_from': self.derived_from,
+        }
+
+
+def _rss_bytes() -> Optional[int]:
+    """Current resident set size of this process (None if unavailable)."""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def file_version(path: Path) -> str:
+    """Content hash of an artifact file (changes whenever the file changes)."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()[:16]
+
+
+class ModelRegistry:
+    """Loads each serving artifact once and hands out versioned handles"""
+
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(ModelRegistry, cls).__new__(cls)
+            cls._instance._handles = {}
+            cls._instance._missing = set()
+            cls._instance._lock = threading.RLock()
+        return cls._instance
+
+    @classmethod
+    def get_instance(cls) -> 'ModelRegistry':
+        return cls()
+
+    # ------------------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------------------
+
+    def find(self, name: str, fresh: bool = False) -> Optional[Path]:
+        """
+        First existing file for an artifact across MODEL_DIRS. A sidecar is
+        looked up in its owner's directory first (the loaded handle's, or
+        with fresh=True wherever the owner's file is found now), so
+        model_info/encoders never come from another model's directory.
+        """
+        spec = ARTIFACTS[name]
+        model_dirs = MODEL_DIRS
+        if spec.sidecar_of is not None:
+            owner = None if fresh else self._handles.get(spec.sidecar_of)
+            owner_path = owner.path if owner is not None else self.find(spec.sidecar_of, fresh)
+            if owner_path is not None:
+                model_dirs = [owner_path.parent] + [d for d in MODEL_DIRS if d != owner_path.parent]
+        for model_dir in model_dirs:
+            for filename in spec.filenames:
+                path = model_dir / filename
+                if path.is_file():
+                    return path
+        return None
+
+    def get(self, name: str) -> Optional[ArtifactHandle]:
+        """Handle for an artifact, loading it on first use (None if absent or unloadable)."""
+        handle = self._handles.get(name)
+        if handle is not None or name in self._missing:
+            return handle
+        with self._lock:
+            if name in self._handles or name in self._missing:
+                return self._handles.get(name)
+            if name == 'price_range_models':
+                handle = self._derive_price_range_models()
+            else:
+                handle = self._load(name)
+            if handle is None:
+                self._missing.add(name)
+            else:
+                self._handles[name] = handle
+            return handle
+
+    def get_object(self, name: str, default: Any = None) -> Any:
+        handle = self.get(name)
+        return handle.obj if handle is not None else default
+
+    def tabular_model(self) -> Any:
+        """The estimator inside production_model.pkl (dict or bare model)."""
+        model_data = self.get_object('tabular')
+        if isinstance(model_data, dict):
+            return model_data.get('model')
+        return model_data
+
+    def version(self, name: str) -> Optional[str]:
+        handle = self.get(name)
+        return handle.version if handle is not None else None
+
+    # ------------------------------------------------------------------
+    # Reporting
+    # ------------------------------------------------------------------
+
+    def report(self) -> List[dict]:
+        """Load time and resident size for every artifact loaded so far."""
+        return [handle.describe() for handle in list(self._handles.values())]
+
+    # ------------------------------------------------------------------
+    # Hot swap
+    # ------------------------------------------------------------------
+
+    def file_changed(self, name: str) -> bool:
+        """Cheap check: has the artifact's file appeared, moved or changed mtime/size?"""
+        handle = self._handles.get(name)
+        path = self.find(name, fresh=True)
+        if handle is None or path is None:
+            return (handle is None) != (path is None)
+        try:
+            stat = path.stat()
+        except OSError:
+            return False
+        return path != handle.path or stat.st_mtime_ns != handle.mtime_ns or stat.st_size != handle.file_bytes
+
+    def load_fresh(self, name: str) -> Optional[ArtifactHandle]:
+        """Load the current file for an artifact without installing it."""
+        return self._load(name, fresh=True)
+
+    def install(self, handles: Dict[str, ArtifactHandle], removed: Iterable[str] = ()) -> None:
+        """
+        Atomically replace handles (readers see either the old or new set).
+        Artifacts in removed no longer have a file and are forgotten.
+        """
+        removed = set(removed) - set(handles)
+        with self._lock:
+            updated = {n: h for n, h in self._handles.items() if n not in removed}
+            updated.update(handles)
+            if 'tabular' in handles:
+                updated.pop('price_range_models', None)
+            self._missing = {n for n in self._missing if n not in handles and n != 'price_range_models'} | removed
+            self._handles = updated
+
+    def touch(self, name: str) -> None:
+        """Record the file's current mtime for an unchanged artifact (same content hash)."""
+        handle = self._handles.get(name)
+        path = self.find(name)
+        if handle is not None and path is not None:
+            stat = path.stat()
+            handle.mtime_ns = stat.st_mtime_ns
+            handle.file_bytes = stat.st_size
+
+    def clear(self) -> None:
+        """Forget all handles (next get() reloads from disk)."""
+        with self._lock:
+            self._handles = {}
+            self._missing = set()
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+
+    def _load(self, name: str, fresh: bool = False) -> Optional[ArtifactHandle]:
+        path = self.find(name, fresh)
+        if path is None:
+            logger.info(f"Artifact '{name}' not found in {[str(d) for d in MODEL_DIRS]}")
+            return None
+        try:
+            stat = path.stat()
+            version = file_version(path)
+            rss_before = _rss_bytes()
+            start = time.perf_counter()
+            obj = ARTIFACTS[name].loader(path)
+            load_seconds = time.perf_counter() - start
+            rss_after = _rss_bytes()
+        except Exception as e:
+            logger.error(f"Failed to load artifact '{name}' from {path}: {e}", exc_info=True)
+            return None
+
+        resident = max(0, rss_after - rss_before) if rss_before is not None and rss_after is not None else None
+        handle = ArtifactHandle(
+            name=name, obj=obj, path=path, version=version, loaded_at=time.time(),
+            load_seconds=load_seconds, file_bytes=stat.st_size, resident_bytes=resident,
+            mtime_ns=stat.st_mtime_ns,
+        )
+        info = handle.describe()
+        logger.info(f"✅ Loaded artifact '{name}' v{version} from {path} "
+                    f"in {info['load_ms']} ms (file {info['file_mb']} MB, resident {info['resident_mb']} MB)")
+        return handle
+
+    def _derive_price_range_models(self) -> Optional[ArtifactHandle]:
+        """Price-range sub-models ship inside production_model.pkl; no second load."""
+        tabular = self.get('tabular')
+        if tabular is None or not isinstance(tabular.obj, dict):
+            return None
+        sub_models = tabular.obj.get('price_range_models') or {}
+        return ArtifactHandle(
+            name='price_range_models', obj=sub_models, path=tabular.path, version=tabular.version,
+            loaded_at=tabular.loaded_at, load_seconds=0.0, file_bytes=0, resident_bytes=0,
+            derived_from='tabular',
+        )
+
+
+def get_model_registry() -> ModelRegistry:
+    return ModelRegistry.get_instance()
@@ -0,0 +1,135 @@
+"""
+ONNX Runtime inference backend for the production tabular model.
+
+The CatBoost model is exported to models/production_model.onnx by
+scripts/export_onnx.py. Categorical handling stays in the FeatureEncoder
+(vocabularies -> float32 codes), so the ONNX graph takes the encoder's float32
+matrix directly - no pandas DataFrame per call. A sidecar
+production_model.onnx.json records which production_model.pkl version the
+graph came from and the parity check result; a stale export is never served.
+
+Select with TABULAR_INFERENCE_BACKEND=onnxruntime (default: catboost).
+"""
+
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+CATBOOST = 'catboost'
+ONNXRUNTIME = 'onnxruntime'
+ONNX_FILENAME = 'production_model.onnx'
+ONNX_META_FILENAME = 'production_model.onnx.json'
+
+# Float32 graph vs float64 CatBoost: relative tolerance on prices
+PARITY_RTOL = 1e-4
+
+
+def load_onnx_session(path: Path) -> Any:
+    """onnxruntime InferenceSession on CPU with full graph optimizations."""
+    import onnxruntime as ort
+    options = ort.SessionOptions()
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    return ort.InferenceSession(str(path), sess_options=options, providers=['CPUExecutionProvider'])
+
+
+class OnnxTabularModel:
+    """predict() over the FeatureEncoder's float32 matrix"""
+
+    def __init__(self, session: Any):
+        self.session = session
+        self.input_name = session.get_inputs()[0].name
+        # CatBoost regressors export a single 'predictions' output
+        self.output_name = session.get_outputs()[0].name
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        X = np.ascontiguousarray(np.atleast_2d(X), dtype=np.float32)
+        out = self.session.run([self.output_name], {self.input_name: X})[0]
+        return np.asarray(out, dtype=np.float64).reshape(-1)
+
+
+def export_catboost_to_onnx(model: Any, out_path: Path, source_version: str,
+                            feature_columns: List[str]) -> Dict[str, Any]:
+    """
+    Export a CatBoost regressor to ONNX and write the metadata sidecar.
+    Raises ValueError for models ONNX cannot represent (native cat_features).
+    """
+    if not hasattr(model, 'save_model'):
+        raise ValueError(f"{type(model).__name__} is not a CatBoost model")
+    cat_features = list(model.get_cat_feature_indices()) if hasattr(model, 'get_cat_feature_indices') else []
+    if cat_features:
+        raise ValueError(
+            f"Model uses native categorical features {cat_features}; CatBoost cannot export those to ONNX. "
+            "Retrain on FeatureEncoder codes (make_encoded, model_encoded, ...) instead.")
+
+    model.save_model(
+        str(out_path),
+        format='onnx',
+        export_parameters={
+            'onnx_domain': 'ai.catboost',
+            'onnx_model_version': 1,
+            'onnx_doc_string': f'CarWiseIQ production model {source_version}',
+            'onnx_graph_name': 'CarPriceModel',
+        },
+    )
+    meta = {
+        'source_version': source_version,
+        'feature_columns': list(feature_columns),
+        'exported_at': time.time(),
+    }
+    write_onnx_meta(out_path, meta)
+    return meta
+
+
+def onnx_meta_path(onnx_path: Path) -> Path:
+    return onnx_path.with_name(onnx_path.name + '.json')
+
+
+def write_onnx_meta(onnx_path: Path, meta: Dict[str, Any]) -> None:
+    with open(onnx_meta_path(onnx_path), 'w') as f:
+        json.dump(meta, f, indent=2)
+
+
+def parity_report(reference: Callable[[np.ndarray], np.ndarray], candidate: Callable[[np.ndarray], np.ndarray],
+                  X: np.ndarray, rtol: float = PARITY_RTOL) -> Dict[str, Any]:
+    """Compare two engines on the same encoded rows."""
+    expected = np.asarray(reference(X), dtype=np.float64).reshape(-1)
+    actual = np.asarray(candidate(X), dtype=np.float64).reshape(-1)
+    abs_diff = np.abs(actual - expected)
+    rel_diff = abs_diff / np.maximum(np.abs(expected), 1.0)
+    return {
+        'rows': int(len(X)),
+        'max_abs_diff': float(abs_diff.max()) if len(X) else 0.0,
+        'max_rel_diff': float(rel_diff.max()) if len(X) else 0.0,
+        'mean_abs_diff': float(abs_diff.mean()) if len(X) else 0.0,
+        'rtol': rtol,
+        'passed': bool((rel_diff <= rtol).all()),
+    }
+
+
+def attach_onnx(onnx_handle: Any, meta_handle: Any, source_version: Optional[str],
+                feature_columns: List[str]) -> Optional[OnnxTabularModel]:
+    """
+    Wrap a loaded ONNX session if it was exported from this exact model
+    version with the same feature order and passed parity; None otherwise.
+    """
+    if onnx_handle is None:
+        logger.warning(f"{ONNX_FILENAME} not found; run scripts/export_onnx.py. Using CatBoost")
+        return None
+    meta = meta_handle.obj if meta_handle is not None else {}
+    if meta.get('source_version') != source_version:
+        logger.warning(f"{ONNX_FILENAME} was exported from v{meta.get('source_version')}, "
+                       f"active model is v{source_version}; re-export. Using CatBoost")
+        return None
+    if meta.get('feature_columns') != list(feature_columns):
+        logger.warning(f"{ONNX_FILENAME} feature order differs from model_info.json; using CatBoost")
+        return None
+    if not meta.get('parity', {}).get('passed', False):
+        logger.warning(f"{ONNX_FILENAME} has no passing parity check; run scripts/export_onnx.py. Using CatBoost")
+        return None
+    return OnnxTabularModel(onnx_handle.obj)
@@ -1,126 +1,207 @@
 """
 Backend-specific prediction module for production model (91.1% accuracy)
-Loads production_model.pkl and uses DataFrame for CatBoost prediction.
+Gets production_model.pkl from the ModelRegistry and uses DataFrame for CatBoost prediction.
 Falls back to dataset-based estimate when model file is not found.
 """
 
-import pickle
-import json
 import logging
-from pathlib import Path
-from typing import Tuple, Optional, Any
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Tuple, Optional, Any, List
 import pandas as pd
 import numpy as np
 
+from app.core.feature_encoder import FeatureEncoder
+from app.core.model_registry import MODEL_DIRS, ArtifactHandle, get_model_registry
+from app.core.onnx_backend import ONNXRUNTIME, OnnxTabularModel, attach_onnx
+from app.core.prediction_cache import PredictionCache, get_prediction_cache
+
 logger = logging.getLogger(__name__)
 
-# Global cache for model and info
-_cached_model = None
-_cached_model_info = None
-_cached_encoders = None
-_using_fallback = False
 
+@dataclass(frozen=True)
+class ServingModel:
+    """Everything one prediction needs, swapped as a single reference"""
+    model: Any
+    model_info: dict
+    encoders: dict
+    feature_encoder: Optional[FeatureEncoder]
+    version: Optional[str]
+    loaded_at: float
+    onnx: Optional[OnnxTabularModel] = None
 
-def _model_paths() -> list:
-    """Return list of paths to check for production_model.pkl (first existing wins)."""
-    current_file = Path(__file__)
-    backend_dir = current_file.parent.parent.parent
-    root_dir = backend_dir.parent
-    return [
-        backend_dir / "models" / "production_model.pkl",
-        Path("/app/models/production_model.pkl"),
-        root_dir / "models" / "production_model.pkl",
-    ]
+    @property
+    def engine(self) -> str:
+        return 'onnxruntime' if self.onnx is not None else 'catboost'
 
+    def predict_matrix(self, X: np.ndarray) -> np.ndarray:
+        """Raw model output for encoded rows (float64, one value per row)."""
+        if self.onnx is not None:
+            return self.onnx.predict(X)
+        # CatBoost expects the training column names, so wrap the matrix once
+        raw = self.model.predict(self.feature_encoder.to_frame(X))
+        return np.asarray(raw, dtype=np.float64).reshape(-1)
 
-def _find_model_path() -> Optional[Path]:
-    for p in _model_paths():
-        if p.exists():
-            return p
-    return None
 
+def _inference_backend() -> str:
+    try:
+        from app.config import settings
+        return settings.TABULAR_INFERENCE_BACKEND.lower()
+    except Exception:
+        return 'catboost'
 
-def load_model() -> Tuple[Any, dict, dict]:
-    """Load the production model (91.1% accurate) or return None for fallback."""
-    global _cached_model, _cached_model_info, _cached_encoders, _using_fallback
-
-    if _cached_model is not None:
-        return _cached_model, _cached_model_info, _cached_encoders
-
-    model_path = _find_model_path()
-    if not model_path:
-        logger.warning("Model not found in any of: %s; using dataset fallback", [str(p) for p in _model_paths()])
-        _using_fallback = True
-        _cached_model = None
-        _cached_model_info = {}
-        _cached_encoders = {}
-        return None, {}, {}
 
-    models_dir = model_path.parent
-    logger.info(f"Loading model from: {model_path}")
+def serving_artifact_names() -> Tuple[str, ...]:
+    """Registry artifacts that make up a ServingModel for the configured backend."""
+    names = ('tabular', 'model_info', 'encoders')
+    if _inference_backend() == ONNXRUNTIME:
+        names += ('tabular_onnx', 'tabular_onnx_meta')
+    return names
 
-    try:
-        with open(model_path, 'rb') as f:
-            model_data = pickle.load(f)
-
-        # Extract model from model_data dict
-        if isinstance(model_data, dict):
-            model = model_data.get('model')
-            if model is None:
-                raise ValueError("Model not found in model_data dict")
-        else:
-            model = model_data
 
-        logger.info(f"✅ Model loaded successfully!")
-        logger.info(f"   Model type: {type(model).__name__}")
+# Active model (None until first load); replaced atomically on hot swap so
+# in-flight requests finish on the version they started with
+_active: Optional[ServingModel] = None
+_using_fallback = False
+_load_lock = threading.Lock()
+_prediction_cache: Optional[PredictionCache] = None
 
-    except Exception as e:
-        logger.error(f"Failed to load model: {e}", exc_info=True)
-        _using_fallback = True
-        _cached_model = None
-        _cached_model_info = {}
-        _cached_encoders = {}
-        return None, {}, {}
 
-    # Load model info JSON
-    model_info_path = models_dir / "model_info.json"
-    model_info = {}
-    if model_info_path.exists():
-        try:
-            with open(model_info_path, 'r') as f:
-                model_info = json.load(f)
-            logger.info(f"✅ Model info loaded")
-            logger.info(
-                f"   Accuracy (R²): {model_info.get('metrics', {}).get('test', {}).get('r2', 'N/A')}")
-        except Exception as e:
-            logger.warning(f"Could not load model_info.json: {e}")
+def build_serving_model(handles: Dict[str, ArtifactHandle]) -> Optional[ServingModel]:
+    """Assemble a ServingModel from registry handles (tabular, model_info, encoders)."""
+    tabular = handles.get('tabular')
+    model_data = tabular.obj if tabular is not None else None
+    model = model_data.get('model') if isinstance(model_data, dict) else model_data
+    if model is None:
+        return None
+
+    model_info = handles['model_info'].obj if handles.get('model_info') is not None else {}
+    if model_info:
+        logger.info(f"✅ Model info loaded")
+        logger.info(
+            f"   Accuracy (R²): {model_info.get('metrics', {}).get('test', {}).get('r2', 'N/A')}")
     else:
-        logger.warning(f"model_info.json not found at {model_info_path}")
+        logger.warning(f"model_info.json not found in {tabular.path.parent if tabular.path else 'the model directory'} "
+                       f"or the other model directories")
 
-    # Load encoders if available
-    encoders_path = models_dir / "encoders.pkl"
-    encoders = {}
-    if encoders_path.exists():
-        try:
-            with open(encoders_path, 'rb') as f:
-                encoders = pickle.load(f)
-            logger.info(f"✅ Encoders loaded")
-        except Exception as e:
-            logger.warning(f"Could not load encoders.pkl: {e}")
+    # Load encoders if available (copy: merged below, registry object is shared)
+    encoders = dict(handles['encoders'].obj or {}) if handles.get('encoders') is not None else {}
+    if encoders:
+        logger.info(f"✅ Encoders loaded")
 
     # Also check if encoders are in model_data
     if isinstance(model_data, dict) and 'encoders' in model_data:
         if not encoders:
-            encoders = model_data['encoders']
+            encoders = dict(model_data['encoders'])
         else:
             # Merge, preferring separate file
             encoders.update(model_data.get('encoders', {}))
 
-    _cached_model = model
-    _cached_model_info = model_info
-    _cached_encoders = encoders
+    # Compile the feature encoder once (vocabularies, defaults, column order)
+    feature_encoder = FeatureEncoder.from_artifacts(model_info, encoders)
+
+    onnx = None
+    if _inference_backend() == ONNXRUNTIME and feature_encoder is not None:
+        onnx = attach_onnx(handles.get('tabular_onnx'), handles.get('tabular_onnx_meta'),
+                           tabular.version, feature_encoder.feature_columns)
+
+    return ServingModel(
+        model=model,
+        model_info=model_info,
+        encoders=encoders,
+        feature_encoder=feature_encoder,
+        version=tabular.version,
+        loaded_at=time.time(),
+        onnx=onnx,
+    )
+
+
+def activate(serving: ServingModel) -> None:
+    """Make a ServingModel the active one (single reference swap)."""
+    global _active, _using_fallback, _prediction_cache
+    # Cached predictions are only valid for this exact model file
+    try:
+        _prediction_cache = get_prediction_cache()
+        _prediction_cache.set_model_version(serving.version)
+    except Exception as e:
+        logger.warning(f"Prediction cache disabled: {e}")
+        _prediction_cache = None
+    _active = serving
+    _using_fallback = False
+    logger.info(f"   Model version: {serving.version} (engine: {serving.engine})")
+
+
+def warmup(serving: ServingModel, n_rows: int = 32) -> float:
+    """
+    Run a synthetic batch through a model before it serves traffic, so the
+    first real request does not pay lazy initialization. Returns seconds taken.
+    """
+    if serving.feature_encoder is None:
+        return 0.0
+    vocab = {key: list(v)[:n_rows] or [''] for key, v in serving.feature_encoder.vocabularies.items()}
+    rows = [{
+        'year': 2010 + i % 15,
+        'mileage': 10000.0 * (i % 20),
+        'make': vocab['make'][i % len(vocab['make'])] if 'make' in vocab else '',
+        'model': vocab['model'][i % len(vocab['model'])] if 'model' in vocab else '',
+    } for i in range(n_rows)]
+    start = time.perf_counter()
+    X = serving.feature_encoder.encode_many(rows)
+    serving.predict_matrix(X)
+    serving.predict_matrix(X[:1])
+    return time.perf_counter() - start
+
+
+def get_serving_model() -> Optional[ServingModel]:
+    """The active ServingModel, loading it on first use (None without a model)."""
+    global _using_fallback
+    if _active is not None or _using_fallback:
+        return _active
+    with _load_lock:
+        if _active is not None or _using_fallback:
+            return _active
+        # Artifacts are unpickled once per process by the registry and shared
+        # with ModelService and core/predict_price.py
+        registry = get_model_registry()
+        serving = build_serving_model({name: registry.get(name) for name in serving_artifact_names()})
+        if serving is None:
+            logger.warning("Model not found in any of: %s; using dataset fallback",
+                           [str(d / "production_model.pkl") for d in MODEL_DIRS])
+            _using_fallback = True
+            return None
+        logger.info(f"✅ Model loaded successfully!")
+        logger.info(f"   Model type: {type(serving.model).__name__}")
+        activate(serving)
+        return serving
+
+
+def _cache_for(serving: ServingModel) -> Optional[PredictionCache]:
+    """The prediction cache, if it is bound to this model's version."""
+    cache = _prediction_cache
+    if cache is not None and cache.model_version == serving.version:
+        return cache
+    return None
+
+
+def load_model() -> Tuple[Any, dict, dict]:
+    """Load the production model (91.1% accurate) or return None for fallback."""
+    serving = get_serving_model()
+    if serving is None:
+        return None, {}, {}
+    return serving.model, serving.model_info, serving.encoders
 
-    return model, model_info, encoders
+
+def get_feature_encoder() -> Optional[FeatureEncoder]:
+    """Return the active model's FeatureEncoder (None without a model)."""
+    serving = get_serving_model()
+    return serving.feature_encoder if serving is not None else None
+
+
+def get_model_version() -> Optional[str]:
+    """Content hash of the active production_model.pkl (None without a model)."""
+    serving = get_serving_model()
+    return serving.version if serving is not None else None
 
 
 def _predict_from_dataset(car_data: dict) -> float:
@@ -186,158 +267,35 @@ def predict_price(car_data: dict, return_confidence: bool = False):
         Predicted price as float
     """
     try:
-        # Load model (may return None when file not found)
-        model, model_info, encoders = load_model()
+        # Pin the active model for this whole request (hot swaps don't mix versions)
+        serving = get_serving_model()
 
-        if model is None:
+        if serving is None:
             return _predict_from_dataset(car_data)
 
-        # Get feature columns from model_info (try both keys)
-        feature_columns = model_info.get(
-            'feature_columns') or model_info.get('features', [])
-
-        if not feature_columns:
+        feature_encoder = serving.feature_encoder
+        if feature_encoder is None:
             logger.warning("feature_columns not found in model_info; using dataset fallback")
             return _predict_from_dataset(car_data)
 
         logger.info(
-            f"Using {len(feature_columns)} features: {feature_columns[:5]}...")
+            f"Using {feature_encoder.n_features} features from model_info.json")
 
-        logger.info(
-            f"Using {len(feature_columns)} features from model_info.json")
-
-        # Prepare input data dictionary
-        input_data = {}
-        current_year = 2026  # Match training
-
-        for col in feature_columns:
-            if col == 'age_of_car':
-                # Calculate age from year
-                year = int(car_data.get('year', 2020))
-                input_data[col] = max(0, current_year - year)
-            elif col == 'make_encoded':
-                # Encode make
-                make = str(car_data.get('make', '')).strip()
-                if encoders and 'make' in encoders:
-                    try:
-                        encoder = encoders['make']
-                        # Check if it's a LabelEncoder
-                        if hasattr(encoder, 'classes_'):
-                            # Handle unseen values - use 0 as default
-                            try:
-                                input_data[col] = encoder.transform([make])[0]
-                            except ValueError:
-                                # Unseen value - use 0
-                                input_data[col] = 0
-                                logger.warning(
-                                    f"Unseen make '{make}', using default encoding 0")
-                        else:
-                            input_data[col] = 0
-                    except Exception as e:
-                        logger.warning(
-                            f"Error encoding make '{make}': {e}, using 0")
-                        input_data[col] = 0
-                else:
-                    # Fallback: hash-based encoding
-                    input_data[col] = abs(hash(make)) % 1000
-            elif col == 'model_encoded':
-                # Encode model
-                model_name = str(car_data.get('model', '')).strip()
-                if encoders and 'model' in encoders:
-                    try:
-                        encoder = encoders['model']
-                        if hasattr(encoder, 'classes_'):
-                            try:
-                                input_data[col] = encoder.transform([model_name])[
-                                    0]
-                            except ValueError:
-                                # Unseen value - use 0
-                                input_data[col] = 0
-                                logger.warning(
-                                    f"Unseen model '{model_name}', using default encoding 0")
-                        else:
-                            input_data[col] = 0
-                    except Exception as e:
-                        logger.warning(
-                            f"Error encoding model '{model_name}': {e}, using 0")
-                        input_data[col] = 0
-                else:
-                    input_data[col] = abs(hash(model_name)) % 1000
-            elif col == 'condition_encoded':
-                # Map condition to encoded value
-                condition = str(car_data.get('condition', 'Good')).strip()
-                condition_map = {
-                    'Excellent': 0,
-                    'Very Good': 1,
-                    'Good': 2,
-                    'Fair': 3,
-                    'Poor': 4
-                }
-                input_data[col] = condition_map.get(
-                    condition, 2)  # Default to 'Good'
-            elif col == 'fuel_type_encoded':
-                # Map fuel type to encoded value
-                fuel_type = str(car_data.get('fuel_type', 'Gasoline')).strip()
-                fuel_map = {
-                    'Gasoline': 0,
-                    'Diesel': 1,
-                    'Hybrid': 2,
-                    'Electric': 3,
-                    'Other': 4
-                }
-                input_data[col] = fuel_map.get(
-                    fuel_type, 0)  # Default to 'Gasoline'
-            elif col == 'location_encoded':
-                # Hash-based encoding for location
-                location = str(car_data.get('location', 'Unknown')).strip()
-                input_data[col] = abs(hash(location)) % 1000
-            elif col in car_data:
-                # Direct mapping for numeric columns
-                val = car_data[col]
-                if pd.isna(val) or val is None:
-                    # Use default values
-                    defaults = {
-                        'year': 2020,
-                        'mileage': 50000,
-                        'engine_size': 2.0,
-                        'cylinders': 4
-                    }
-                    input_data[col] = defaults.get(col, 0)
-                else:
-                    input_data[col] = float(val)
-            else:
-                # Missing feature - use default
-                defaults = {
-                    'year': 2020,
-                    'mileage': 50000,
-                    'engine_size': 2.0,
-                    'cylinders': 4
-                }
-                input_data[col] = defaults.get(col, 0)
-                logger.warning(
-                    f"Missing feature '{col}', using default value: {input_data[col]}")
-
-        # Create DataFrame with EXACT feature order (CatBoost requires DataFrame!)
-        df = pd.DataFrame([input_data])
-
-        # Ensure column order matches training exactly
-        df = df[feature_columns]
-
-        logger.info(f"Predicting with features: {list(df.columns)}")
-        logger.info(f"Feature values: {df.iloc[0].to_dict()}")
-
-        # Predict (CatBoost handles categorical features automatically in DataFrame)
-        try:
-            prediction = model.predict(df)
+        # Encode into a float32 row with EXACT feature order
+        vector = feature_encoder.encode_row(car_data)
+        cache = _cache_for(serving)
+        if cache is not None:
+            cached = cache.get(vector)
+            if cached is not None:
+                logger.debug(f"Prediction cache hit: ${cached:,.2f}")
+                return cached
 
-            # Handle different return types
-            if isinstance(prediction, np.ndarray):
-                prediction = float(prediction[0])
-            elif isinstance(prediction, (list, tuple)):
-                prediction = float(prediction[0])
-            else:
-                prediction = float(prediction)
+        logger.info(f"Predicting with features: {feature_encoder.feature_columns}")
+        logger.info(f"Feature values: {dict(zip(feature_encoder.feature_columns, vector.tolist()))}")
 
+        # Predict with the active engine (CatBoost DataFrame or ONNX float32 matrix)
+        try:
+            prediction = float(serving.predict_matrix(vector[None, :])[0])
         except Exception as e:
             logger.error(f"Prediction failed: {e}", exc_info=True)
             raise RuntimeError(f"Model prediction failed: {e}")
@@ -354,6 +312,8 @@ def predict_price(car_data: dict, return_confidence: bool = False):
 
         logger.info(f"✅ Predicted price: ${prediction:,.2f}")
 
+        if cache is not None:
+            cache.put(vector, prediction, version=serving.version)
         return float(prediction)
 
     except FileNotFoundError as e:
@@ -366,3 +326,72 @@ def predict_price(car_data: dict, return_confidence: bool = False):
         # Return fallback price instead of crashing
         logger.warning("Returning fallback price due to error")
         return 15000.0
+
+
+def predict_price_many(rows: List[dict]) -> Tuple[np.ndarray, List[Optional[str]]]:
+    """
+    Predict prices for many cars with a single model call.
+
+    Rows are encoded column-wise by the FeatureEncoder and passed to the
+    model in one batch. Falls back to the dataset estimate per row when the model file is
+    missing.
+
+    Args:
+        rows: List of car feature dictionaries (same keys as predict_price)
+
+    Returns:
+        (prices, errors): float64 array of predicted prices (NaN where the row
+        failed) and a list with an error message or None for each row
+    """
+    rows = [dict(r) for r in rows]
+    n = len(rows)
+    prices = np.full(n, np.nan, dtype=np.float64)
+    errors: List[Optional[str]] = [None] * n
+    if n == 0:
+        return prices, errors
+
+    serving = get_serving_model()
+    model = serving.model if serving is not None else None
+    feature_encoder = serving.feature_encoder if serving is not None else None
+
+    if feature_encoder is None:
+        if model is not None:
+            logger.warning("feature_columns not found in model_info; using dataset fallback")
+        for i, car_data in enumerate(rows):
+            prices[i] = _predict_from_dataset(car_data)
+        return prices, errors
+
+    X = feature_encoder.encode_many(rows, errors)
+    valid = np.array([e is None for e in errors])
+    if not valid.any():
+        return prices, errors
+
+    # Serve repeat valuations from the cache; only misses reach the model
+    cache = _cache_for(serving)
+    valid_idx = np.flatnonzero(valid)
+    if cache is not None:
+        prices[valid_idx] = cache.get_many(X[valid_idx])
+    todo = valid_idx[np.isnan(prices[valid_idx])]
+    if len(todo) == 0:
+        logger.info(f"✅ Batch served {len(valid_idx)}/{n} cars from cache")
+        return prices, errors
+
+    try:
+        raw = serving.predict_matrix(X[todo])
+    except Exception as e:
+        logger.error(f"Batch prediction failed: {e}", exc_info=True)
+        for i in todo:
+            errors[i] = f"Model prediction failed: {e}"
+        return prices, errors
+
+    # Same sanity bounds as predict_price
+    invalid = ~np.isfinite(raw) | (raw < 500)
+    if invalid.any():
+        logger.warning(f"⚠️ {int(invalid.sum())} invalid predictions in batch, using fallback")
+    raw = np.where(invalid, 15000.0, np.minimum(raw, 1000000.0))
+    prices[todo] = raw
+    if cache is not None:
+        cache.put_many(X[todo], raw, version=serving.version)
+
+    logger.info(f"✅ Batch predicted {len(todo)}/{n} cars ({len(valid_idx) - len(todo)} cached)")
+    return prices, errors
@@ -0,0 +1,220 @@
+"""
+Prediction result cache for the production model.
+Keyed by the encoded float32 feature vector plus the model version (content
+hash of production_model.pkl), so identical valuations skip the model.
+
+Two tiers:
+- in-process LRU (always on)
+- optional SQLite file shared by all uvicorn workers (PREDICTION_CACHE_DB)
+
+Entries from other model versions are never returned; switching version clears
+the LRU. SQLite rows of older versions are left alone (workers swap models one
+by one, so another worker may still be serving the old version) and age out
+through the size trim like any other row.
+"""
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Trim the SQLite tier every N writes
+_DB_TRIM_EVERY = 1000
+
+
+class PredictionCache:
+    """Two-tier (LRU + optional SQLite) cache of predicted prices"""
+
+    def __init__(self, max_size: int = 10000, db_path: Optional[str] = None,
+                 db_max_rows: int = 200000):
+        self.max_size = max_size
+        self.db_path = db_path
+        self.db_max_rows = db_max_rows
+        self.model_version: Optional[str] = None
+        self.hits = 0
+        self.misses = 0
+        self._lru: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._db_writes = 0
+        # SQLite connections must not cross fork() (preloaded gunicorn master)
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._reset_connections)
+        if db_path:
+            try:
+                conn = self._db()
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS prediction_cache (
+                        key TEXT PRIMARY KEY,
+                        model_version TEXT NOT NULL,
+                        price REAL NOT NULL,
+                        created_at REAL NOT NULL
+                    )
+                """)
+                conn.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_prediction_cache_version ON prediction_cache(model_version)")
+                conn.commit()
+                logger.info(f"✅ Shared prediction cache at {db_path}")
+            except Exception as e:
+                logger.warning(f"Shared prediction cache disabled ({db_path}): {e}")
+                self.db_path = None
+
+    # ------------------------------------------------------------------
+    # Versioning
+    # ------------------------------------------------------------------
+
+    def set_model_version(self, version: Optional[str]) -> None:
+        """Bind the cache to a model version; a new version invalidates old entries."""
+        with self._lock:
+            if version == self.model_version:
+                return
+            self.model_version = version
+            self._lru.clear()
+
+    @property
+    def enabled(self) -> bool:
+        return self.model_version is not None and self.max_size > 0
+
+    # ------------------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------------------
+
+    def key(self, vector: np.ndarray) -> str:
+        """Canonical key: model version + float32 bytes of the encoded row."""
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(self.model_version.encode('utf-8'))
+        digest.update(np.ascontiguousarray(vector, dtype=np.float32).tobytes())
+        return digest.hexdigest()
+
+    def get(self, vector: np.ndarray) -> Optional[float]:
+        if not self.enabled:
+            return None
+        return self._get_key(self.key(vector))
+
+    def put(self, vector: np.ndarray, price: float, version: Optional[str] = None) -> None:
+        """Store a price; dropped if it came from a model other than the current one."""
+        if self.enabled and (version is None or version == self.model_version):
+            self._put_keys([(self.key(vector), float(price))])
+
+    def get_many(self, X: np.ndarray) -> np.ndarray:
+        """Cached prices for each row of X (NaN for misses)."""
+        prices = np.full(len(X), np.nan, dtype=np.float64)
+        if not self.enabled:
+            return prices
+        for i, row in enumerate(X):
+            cached = self._get_key(self.key(row))
+            if cached is not None:
+                prices[i] = cached
+        return prices
+
+    def put_many(self, X: np.ndarray, prices: np.ndarray, version: Optional[str] = None) -> None:
+        if self.enabled and len(X) and (version is None or version == self.model_version):
+            self._put_keys([(self.key(row), float(p)) for row, p in zip(X, prices)])
+
+    def clear(self) -> None:
+        with self._lock:
+            self._lru.clear()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            'model_version': self.model_version,
+            'size': len(self._lru),
+            'max_size': self.max_size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+            'shared': bool(self.db_path),
+        }
+
+    # ------------------------------------------------------------------
+    # Tiers
+    # ------------------------------------------------------------------
+
+    def _get_key(self, key: str) -> Optional[float]:
+        with self._lock:
+            price = self._lru.get(key)
+            if price is not None:
+                self._lru.move_to_end(key)
+                self.hits += 1
+                return price
+        if self.db_path:
+            try:
+                row = self._db().execute(
+                    "SELECT price FROM prediction_cache WHERE key = ? AND model_version = ?",
+                    (key, self.model_version)).fetchone()
+            except Exception as e:
+                logger.warning(f"Shared prediction cache read failed: {e}")
+                row = None
+            if row is not None:
+                self._lru_put(key, row[0])
+                self.hits += 1
+                return row[0]
+        self.misses += 1
+        return None
+
+    def _put_keys(self, items) -> None:
+        for key, price in items:
+            self._lru_put(key, price)
+        if not self.db_path:
+            return
+        try:
+            conn = self._db()
+            now = time.time()
+            conn.executemany(
+                "INSERT OR REPLACE INTO prediction_cache (key, model_version, price, created_at) VALUES (?, ?, ?, ?)",
+                [(key, self.model_version, price, now) for key, price in items])
+            self._db_writes += len(items)
+            if self._db_writes >= _DB_TRIM_EVERY:
+                self._db_writes = 0
+                conn.execute("""
+                    DELETE FROM prediction_cache WHERE key IN (
+                        SELECT key FROM prediction_cache ORDER BY created_at DESC LIMIT -1 OFFSET ?
+                    )
+                """, (self.db_max_rows,))
+            conn.commit()
+        except Exception as e:
+            logger.warning(f"Shared prediction cache write failed: {e}")
+
+    def _lru_put(self, key: str, price: float) -> None:
+        with self._lock:
+            self._lru[key] = price
+            self._lru.move_to_end(key)
+            while len(self._lru) > self.max_size:
+                self._lru.popitem(last=False)
+
+    def _reset_connections(self) -> None:
+        self._local = threading.local()
+
+    def _db(self) -> sqlite3.Connection:
+        """One connection per thread; WAL lets workers read while another writes."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+
+_instance: Optional[PredictionCache] = None
+
+
+def get_prediction_cache() -> PredictionCache:
+    """Process-wide cache configured from settings."""
+    global _instance
+    if _instance is None:
+        from app.config import settings
+        _instance = PredictionCache(
+            max_size=settings.PREDICTION_CACHE_SIZE,
+            db_path=settings.PREDICTION_CACHE_DB or None,
+        )
+    return _instance
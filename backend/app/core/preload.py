@@ -0,0 +1,106 @@
+"""
+Preload mode for multi-worker deployments.
+
+The gunicorn master (gunicorn.conf.py, preload_app) loads every serving
+artifact from the ModelRegistry and the DatasetLoader data once, consolidates
+the dataset into contiguous NumPy blocks, then calls gc.freeze() before
+forking. Workers inherit those pages copy-on-write instead of each unpickling
+the model and re-reading the CSV, and frozen objects are skipped by the cyclic
+GC, so collections do not dirty the shared pages.
+
+The master only loads; it never predicts. CatBoost/OpenMP and onnxruntime
+start their native thread pools on first use, and those do not survive
+fork(), so the serving model is built and warmed up in each worker
+(warm_up_worker(), called at app startup).
+"""
+
+import gc
+import logging
+import os
+import time
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Artifacts every worker would otherwise load on its own
+PRELOAD_ARTIFACTS = ('tabular', 'model_info', 'encoders', 'scaler', 'feature_info', 'multimodal')
+
+
+def preload_serving_state(freeze: bool = True) -> Dict[str, float]:
+    """Load models and dataset in the master process before workers fork (no inference)."""
+    from app.core.model_registry import get_model_registry
+    from app.services.dataset_loader import DatasetLoader
+
+    before = memory_report()
+    start = time.perf_counter()
+
+    registry = get_model_registry()
+    for name in PRELOAD_ARTIFACTS:
+        registry.get(name)
+
+    loader = DatasetLoader.get_instance()
+    loader.prepare_for_fork()
+
+    if freeze:
+        gc.collect()
+        gc.freeze()
+
+    after = memory_report()
+    elapsed = time.perf_counter() - start
+    logger.info(f"✅ Preloaded serving state in master (pid {os.getpid()}) in {elapsed:.1f}s: "
+                f"RSS {_mb(before.get('rss'))} -> {_mb(after.get('rss'))} MB, "
+                f"{gc.get_freeze_count():,} objects frozen")
+    return {'seconds': elapsed, 'rss_before': before.get('rss'), 'rss_after': after.get('rss')}
+
+
+def warm_up_worker() -> Optional[float]:
+    """
+    Build the serving model and run its warmup batch in this worker, so native
+    thread pools start after fork. Returns seconds taken (None without a model).
+    """
+    from app.core import predict_price
+
+    serving = predict_price.get_serving_model()
+    if serving is None:
+        return None
+    seconds = predict_price.warmup(serving)
+    logger.info(f"✅ Serving model v{serving.version} warmed up in worker (pid {os.getpid()}) in {seconds * 1000:.0f} ms")
+    return seconds
+
+
+def _mb(value: Optional[int]) -> str:
+    return f"{value / (1024 * 1024):.1f}" if value is not None else "n/a"
+
+
+def memory_report() -> Dict[str, Optional[int]]:
+    """
+    This process's memory split into shared and private pages (bytes).
+    pss divides shared pages among the processes mapping them, so summing
+    pss across workers gives the node's real footprint.
+    """
+    report = {'pid': os.getpid(), 'rss': None, 'pss': None, 'shared': None, 'private': None}
+    try:
+        fields = {}
+        with open('/proc/self/smaps_rollup') as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 3 and parts[1].isdigit():
+                    fields[parts[0].rstrip(':')] = int(parts[1]) * 1024
+        report.update({
+            'rss': fields.get('Rss'),
+            'pss': fields.get('Pss'),
+            'shared': fields.get('Shared_Clean', 0) + fields.get('Shared_Dirty', 0),
+            'private': fields.get('Private_Clean', 0) + fields.get('Private_Dirty', 0),
+        })
+        return report
+    except (OSError, ValueError):
+        pass
+    try:
+        import psutil
+        info = psutil.Process().memory_full_info()
+        report.update({'rss': info.rss, 'pss': getattr(info, 'pss', None),
+                       'shared': getattr(info, 'shared', None), 'private': getattr(info, 'uss', None)})
+    except Exception:
+        from app.core.model_registry import _rss_bytes
+        report['rss'] = _rss_bytes()
+    return report
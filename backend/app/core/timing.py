@@ -0,0 +1,156 @@
+"""
+Per-request stage timings for the prediction pipeline.
+
+ServerTimingMiddleware starts a RequestTimer for timed routes and keeps it in a
+context variable, so any code on the request path (including the executor
+pool thread the handler body runs on) can record stages without passing it
+around:
+
+    lap("validate")              # time since the previous lap -> "validate"
+    with span("market.demand"):  # time of the block -> "market.demand"
+        ...
+
+Outside a timed request both are no-ops. The middleware sends the stages as
+a Server-Timing header and folds them into per-route histograms served by
+/api/predict/metrics.
+
+Hot-path logging: only a sampled fraction of requests (DEBUG_LOG_SAMPLE_RATE)
+gets the verbose per-step logs; see log_sampled() and debug_sampled().
+"""
+
+import contextvars
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from app.core.metrics import LATENCY_MS_BUCKETS, Histogram
+
+logger = logging.getLogger(__name__)
+
+_current: contextvars.ContextVar[Optional['RequestTimer']] = \
+    contextvars.ContextVar('request_timer', default=None)
+
+
+class RequestTimer:
+    """Ordered stage durations (ms) for one request"""
+
+    def __init__(self, route: str, sampled: bool = False):
+        self.route = route
+        self.sampled = sampled
+        self.started = time.perf_counter()
+        self._last_lap = self.started
+        self.stages: List[Tuple[str, float]] = []
+
+    def record(self, name: str, ms: float) -> None:
+        self.stages.append((name, ms))
+
+    def lap(self, name: str) -> None:
+        now = time.perf_counter()
+        self.record(name, (now - self._last_lap) * 1000.0)
+        self._last_lap = now
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, (time.perf_counter() - started) * 1000.0)
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.started) * 1000.0
+
+    def totals(self) -> Dict[str, float]:
+        """Stage -> total ms, in first-seen order (repeated stages are summed)."""
+        totals: Dict[str, float] = {}
+        for name, ms in self.stages:
+            totals[name] = totals.get(name, 0.0) + ms
+        return totals
+
+    def server_timing(self) -> str:
+        """Server-Timing header value: stage;dur=ms, ..., total;dur=ms"""
+        parts = [f"{name};dur={ms:.1f}" for name, ms in self.totals().items()]
+        parts.append(f"total;dur={self.elapsed_ms():.1f}")
+        return ", ".join(parts)
+
+
+def start(route: str, sample_rate: float = 0.0) -> Tuple[RequestTimer, contextvars.Token]:
+    timer = RequestTimer(route, sampled=sample_rate > 0 and random.random() < sample_rate)
+    return timer, _current.set(timer)
+
+
+def finish(token: contextvars.Token) -> None:
+    _current.reset(token)
+
+
+def current() -> Optional[RequestTimer]:
+    return _current.get()
+
+
+def lap(name: str) -> None:
+    timer = _current.get()
+    if timer is not None:
+        timer.lap(name)
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    timer = _current.get()
+    if timer is None:
+        yield
+        return
+    with timer.span(name):
+        yield
+
+
+def debug_sampled() -> bool:
+    """True when the current request was picked for verbose logging."""
+    timer = _current.get()
+    return timer is not None and timer.sampled
+
+
+def log_sampled(log: logging.Logger, msg: str, *args) -> None:
+    """INFO log line emitted only for sampled requests (hot-path chatter)."""
+    if debug_sampled():
+        log.info(msg, *args)
+
+
+class StageMetrics:
+    """Per-route, per-stage latency histograms aggregated across requests"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes: Dict[str, Dict[str, Histogram]] = {}
+        self.requests: Dict[str, int] = {}
+
+    def observe(self, timer: RequestTimer, total_ms: float) -> None:
+        with self._lock:
+            stages = self._routes.setdefault(timer.route, {})
+            self.requests[timer.route] = self.requests.get(timer.route, 0) + 1
+            for name, ms in list(timer.totals().items()) + [('total', total_ms)]:
+                histogram = stages.get(name)
+                if histogram is None:
+                    histogram = stages[name] = Histogram(LATENCY_MS_BUCKETS)
+                histogram.observe(ms)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            routes = {route: dict(stages) for route, stages in self._routes.items()}
+            requests = dict(self.requests)
+        return {
+            route: {
+                'requests': requests.get(route, 0),
+                'stages_ms': {name: h.snapshot() for name, h in stages.items()},
+            }
+            for route, stages in routes.items()
+        }
+
+
+_stage_metrics = StageMetrics()
+
+
+def get_stage_metrics() -> StageMetrics:
+    return _stage_metrics
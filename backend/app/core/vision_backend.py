@@ -0,0 +1,187 @@
+"""
+CPU-optimized inference artifacts for the vision models.
+
+scripts/export_vision_models.py turns the serving vision models into
+TorchScript files under models/:
+
+- clip_image_int8.pt   CLIP image tower (vision transformer + projection,
+                       L2-normalized output), Linear layers dynamically
+                       quantized to int8, traced and frozen. The fine-tuned
+                       make classifier head rides along as the preserved
+                       head_weight / head_bias attributes.
+- resnet50_int8.pt     torchvision ResNet50 feature extractor (fc removed),
+                       statically quantized to int8 (FX, calibrated on
+                       training photos), traced and frozen.
+
+Each has a <file>.json sidecar with the source weights it came from, the
+logit scale / make mapping serving needs, and the parity check on the
+classifier validation split. A stale export, or one whose parity check did
+not pass, is never served.
+
+Select with VISION_INFERENCE_BACKEND=torchscript (default: eager). The
+artifacts run on CPU only; on CUDA the eager models are used.
+
+No torch import at module level; the registry imports this module.
+"""
+
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+EAGER = 'eager'
+TORCHSCRIPT = 'torchscript'
+CLIP_IMAGE_FILENAME = 'clip_image_int8.pt'
+CLIP_IMAGE_META_FILENAME = 'clip_image_int8.pt.json'
+RESNET50_FILENAME = 'resnet50_int8.pt'
+RESNET50_META_FILENAME = 'resnet50_int8.pt.json'
+
+# ImageAnalyzer's torchvision weights (source_version of resnet50_int8.pt)
+RESNET50_SOURCE = 'torchvision:resnet50:IMAGENET1K_V1'
+
+# Parity on the validation photos: mean cosine similarity to the fp32
+# embeddings, and the most make accuracy (CLIP) the int8 model may lose
+PARITY_MIN_COSINE = 0.98
+PARITY_MAX_ACCURACY_DROP = 0.01
+
+
+def load_torchscript(path: Path) -> Any:
+    """Frozen TorchScript module on CPU, in eval mode."""
+    import torch
+    module = torch.jit.load(str(path), map_location='cpu')
+    module.eval()
+    return module
+
+
+def meta_path(artifact_path: Path) -> Path:
+    return artifact_path.with_name(artifact_path.name + '.json')
+
+
+def write_meta(artifact_path: Path, meta: Dict[str, Any]) -> None:
+    with open(meta_path(artifact_path), 'w') as f:
+        json.dump(meta, f, indent=2)
+
+
+def _quantized_engine() -> str:
+    import torch
+    engines = torch.backends.quantized.supported_engines
+    engine = 'x86' if 'x86' in engines else 'fbgemm' if 'fbgemm' in engines else engines[-1]
+    torch.backends.quantized.engine = engine
+    return engine
+
+
+def export_clip_image_tower(clip_model: Any, example_pixels: Any, out_path: Path, source_version: str,
+                            classifier: Optional[tuple] = None,
+                            idx_to_make: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    """
+    Export CLIPModel's image tower as dynamic-int8 TorchScript and write the
+    sidecar. classifier is the make head as (weight, bias) NumPy arrays.
+    """
+    import torch
+
+    dim = clip_model.config.projection_dim
+    weight, bias = classifier if classifier is not None else (np.zeros((0, dim)), np.zeros(0))
+
+    class ClipImageTower(torch.nn.Module):
+        def __init__(self):
+            super().__init__()
+            self.vision_model = clip_model.vision_model
+            self.visual_projection = clip_model.visual_projection
+            self.register_buffer('head_weight', torch.as_tensor(weight, dtype=torch.float32))
+            self.register_buffer('head_bias', torch.as_tensor(bias, dtype=torch.float32))
+
+        def forward(self, pixel_values):
+            pooled = self.vision_model(pixel_values=pixel_values)[1]
+            embeds = self.visual_projection(pooled)
+            return embeds / embeds.norm(dim=-1, keepdim=True)
+
+    engine = _quantized_engine()
+    tower = ClipImageTower().to('cpu').eval()
+    quantized = torch.ao.quantization.quantize_dynamic(tower, {torch.nn.Linear}, dtype=torch.qint8)
+    with torch.no_grad():
+        traced = torch.jit.trace(quantized, example_pixels.to('cpu'), strict=False)
+        frozen = torch.jit.freeze(traced, preserved_attrs=['head_weight', 'head_bias'])
+    torch.jit.save(frozen, str(out_path))
+    meta = {
+        'source_version': source_version,
+        'quantization': f'dynamic_int8 ({engine})',
+        'image_size': int(example_pixels.shape[-1]),
+        'projection_dim': dim,
+        'logit_scale': float(clip_model.logit_scale.exp().item()),
+        'idx_to_make': idx_to_make or {},
+        'exported_at': time.time(),
+    }
+    write_meta(out_path, meta)
+    return meta
+
+
+def export_resnet50_features(model: Any, calibration: Iterable[Any], out_path: Path,
+                             source_version: str = RESNET50_SOURCE) -> Dict[str, Any]:
+    """
+    Export a torchvision ResNet50 feature extractor (fc = Identity) as static
+    int8 TorchScript, calibrated on batches of preprocessed images.
+    """
+    import torch
+    from torch.ao.quantization import get_default_qconfig_mapping
+    from torch.ao.quantization.quantize_fx import convert_fx, prepare_fx
+
+    engine = _quantized_engine()
+    batches = [batch.to('cpu') for batch in calibration]
+    if not batches:
+        raise ValueError("ResNet50 int8 export needs calibration images")
+    model = model.to('cpu').eval()
+    prepared = prepare_fx(model, get_default_qconfig_mapping(engine), example_inputs=(batches[0],))
+    with torch.no_grad():
+        for batch in batches:
+            prepared(batch)
+        quantized = convert_fx(prepared)
+        traced = torch.jit.trace(quantized, batches[0])
+        frozen = torch.jit.freeze(traced)
+    torch.jit.save(frozen, str(out_path))
+    meta = {
+        'source_version': source_version,
+        'quantization': f'static_int8 ({engine})',
+        'calibration_images': int(sum(len(b) for b in batches)),
+        'exported_at': time.time(),
+    }
+    write_meta(out_path, meta)
+    return meta
+
+
+def cosine_report(reference: np.ndarray, candidate: np.ndarray) -> Dict[str, Any]:
+    """Row-wise cosine similarity between fp32 and optimized embeddings of the same images."""
+    reference = np.asarray(reference, dtype=np.float64)
+    candidate = np.asarray(candidate, dtype=np.float64)
+    norms = np.linalg.norm(reference, axis=1) * np.linalg.norm(candidate, axis=1)
+    cosine = (reference * candidate).sum(axis=1) / np.maximum(norms, 1e-12)
+    return {
+        'images': int(len(cosine)),
+        'min_cosine': float(cosine.min()) if len(cosine) else 0.0,
+        'mean_cosine': float(cosine.mean()) if len(cosine) else 0.0,
+        'min_cosine_required': PARITY_MIN_COSINE,
+    }
+
+
+def attach_vision(handle: Any, meta_handle: Any, filename: str, source_version: Optional[str]) -> Optional[Any]:
+    """
+    The loaded TorchScript module if it was exported from these source
+    weights and passed parity; None otherwise (serve the eager model).
+    """
+    if handle is None:
+        logger.warning(f"{filename} not found; run scripts/export_vision_models.py. Using the eager model")
+        return None
+    meta = meta_handle.obj if meta_handle is not None else {}
+    if meta.get('source_version') != source_version:
+        logger.warning(f"{filename} was exported from {meta.get('source_version')}, serving weights are "
+                       f"{source_version}; re-export. Using the eager model")
+        return None
+    if not meta.get('parity', {}).get('passed', False):
+        logger.warning(f"{filename} has no passing parity check; run scripts/export_vision_models.py. "
+                       f"Using the eager model")
+        return None
+    return handle.obj
@@ -10,6 +10,7 @@ import logging
 import sys
 import uvicorn
 from app.middleware.security import SecurityMiddleware
+from app.middleware.timing import ServerTimingMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 import re
@@ -17,6 +18,7 @@ from fastapi.responses import JSONResponse, Response
 from fastapi import FastAPI, Request
 from app.api.routes import health, predict, cars, budget, stats, auth, options, images, model_info, feedback, admin, marketplace, messaging, favorites, ai, dataset, export, services, providers
 from app.config import settings
+from app.core.executors import PoolSaturatedError
 import os
 from pathlib import Path
 from dotenv import load_dotenv
@@ -53,6 +55,13 @@ app = FastAPI(
     redoc_url=None if _is_production else "/redoc",
 )
 
+# Per-stage timings for prediction routes (Server-Timing + histograms)
+app.add_middleware(
+    ServerTimingMiddleware,
+    sample_rate=settings.DEBUG_LOG_SAMPLE_RATE,
+    send_header=settings.SERVER_TIMING_ENABLED,
+)
+
 # Security middleware (path-specific rate limiting, HSTS, CSP)
 app.add_middleware(SecurityMiddleware)
 
@@ -131,6 +140,17 @@ async def global_exception_handler(request: Request, exc: Exception):
     )
 
 
+@app.exception_handler(PoolSaturatedError)
+async def pool_saturated_handler(request: Request, exc: PoolSaturatedError):
+    """Backpressure: an executor pool is full, ask the client to retry shortly."""
+    logging.warning("Rejected %s %s: %s", request.method, request.url.path, exc)
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Server is busy. Please try again shortly."},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
 @app.on_event("startup")
 async def startup_event():
     """Initialize database and model on startup. Fail if critical env missing in production."""
@@ -230,6 +250,31 @@ async def startup_event():
     except Exception as e:
         logging.error(f"Failed to load model at startup: {e}")
 
+    # Build and warm up the serving model in this worker (never in the preloading master)
+    try:
+        from app.core.preload import warm_up_worker
+        warm_up_worker()
+    except Exception as e:
+        logging.warning(f"Failed to warm up serving model: {e}")
+
+    # Watch models/ for retrained production models (background load + warmup + swap)
+    try:
+        from app.config import settings
+        if settings.MODEL_HOT_SWAP_ENABLED:
+            from app.core.model_hot_swap import get_model_hot_swapper
+            get_model_hot_swapper().start()
+    except Exception as e:
+        logging.warning(f"Failed to start model hot swap watcher: {e}")
+
+    # Watch the dataset CSV (daily update pipeline) for background reloads
+    try:
+        from app.config import settings
+        if settings.DATASET_WATCH_ENABLED:
+            from app.services.dataset_reloader import get_dataset_reloader
+            get_dataset_reloader().start()
+    except Exception as e:
+        logging.warning(f"Failed to start dataset reload watcher: {e}")
+
     # Pre-load CLIP model for auto-detection (warmup)
     try:
         from app.services.car_detection_service import warmup_clip_model
@@ -240,6 +285,15 @@ async def startup_event():
         # Non-critical - model will load on first request instead
         # This is just an optimization to avoid first-request delay
 
+    # Load the shared YOLO car cropper and run one batch (optional)
+    try:
+        from app.config import settings
+        if settings.CAR_CROP_ENABLED and settings.CAR_CROP_WARMUP:
+            from app.services.car_cropper import get_car_cropper
+            get_car_cropper().warmup()
+    except Exception as e:
+        logging.warning(f"Failed to warm up YOLO car cropper: {e}")
+
     # Start retraining scheduler (runs in background)
     try:
         from app.services.retrain_scheduler import start_scheduler
@@ -270,6 +324,34 @@ async def shutdown_event():
         except Exception as e:
             logging.warning("Error stopping retraining scheduler: %s", e)
 
+        # Stop model hot swap watcher
+        try:
+            from app.core.model_hot_swap import get_model_hot_swapper
+            get_model_hot_swapper().stop()
+        except Exception as e:
+            logging.warning("Error stopping model hot swap watcher: %s", e)
+
+        # Stop dataset reload watcher
+        try:
+            from app.services.dataset_reloader import get_dataset_reloader
+            get_dataset_reloader().stop()
+        except Exception as e:
+            logging.warning("Error stopping dataset reload watcher: %s", e)
+
+        # Stop prediction micro-batching (fails any queued callers)
+        try:
+            from app.services.inference_scheduler import shutdown_inference_scheduler
+            await shutdown_inference_scheduler()
+        except Exception as e:
+            logging.warning("Error stopping inference scheduler: %s", e)
+
+        # Shutdown bounded executor pools (cpu / io / db)
+        try:
+            from app.core.executors import shutdown_executors
+            shutdown_executors()
+        except Exception as e:
+            logging.warning("Error shutting down executor pools: %s", e)
+
         # Shutdown thread pool executor for PDF generation
         try:
             from app.api.routes.export import shutdown_executor
@@ -0,0 +1,49 @@
+"""
+Server-Timing middleware: per-stage latency for the prediction routes.
+- Starts a RequestTimer (app.core.timing) for paths under TIMED_PREFIXES
+- Adds a Server-Timing header with every recorded stage plus total
+- Aggregates stage histograms for /api/predict/metrics
+Plain ASGI (not BaseHTTPMiddleware) so the response body is never buffered.
+"""
+import logging
+
+from app.core import timing
+
+logger = logging.getLogger(__name__)
+
+TIMED_PREFIXES = ("/api/predict",)
+UNTIMED_PATHS = ("/api/predict/metrics",)
+
+
+class ServerTimingMiddleware:
+    """Time stages of prediction requests and report them in Server-Timing."""
+
+    def __init__(self, app, sample_rate: float = 0.0, send_header: bool = True):
+        self.app = app
+        self.sample_rate = sample_rate
+        self.send_header = send_header
+
+    async def __call__(self, scope, receive, send):
+        path = scope.get("path", "")
+        if scope["type"] != "http" or not path.startswith(TIMED_PREFIXES) or path in UNTIMED_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        timer, token = timing.start(path, self.sample_rate)
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start" and self.send_header:
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", timer.server_timing().encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            total_ms = timer.elapsed_ms()
+            timing.finish(token)
+            timing.get_stage_metrics().observe(timer, total_ms)
+            if timer.sampled:
+                stages = ", ".join(f"{name}={ms:.1f}" for name, ms in timer.totals().items())
+                logger.info(f"⏱️ {scope.get('method')} {path} {total_ms:.1f} ms: {stages}")
@@ -0,0 +1,133 @@
+"""
+Canonical make / model / trim - computed once when the dataset loads.
+
+Preview-image matching used to normalize the whole dataset per request
+(normalize_make via .apply, then a Python loop over every row for the
+"Ghost Black Badge" model/trim rewrite). DatasetLoader now runs
+add_canonical_columns() once, which adds:
+
+- make_norm:        lowercase, stripped, spaces/underscores -> '-', MAKE_RULES applied
+- model_norm:       lowercase, stripped, MODEL_TRIM_RULES applied
+- trim_norm:        lowercase, stripped ('' when missing), MODEL_TRIM_RULES applied
+- model_trim_norm:  "model_norm trim_norm" (stripped)
+
+as Categoricals. The string work runs on the unique values / unique
+(model, trim) pairs with vectorized .str ops, then is broadcast back by
+code. Request input goes through canonical_make() / canonical_model_trim(),
+scalar versions of the same rules, so handlers only compare for equality.
+"""
+
+import logging
+import time
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+CANONICAL_COLUMNS = ['make_norm', 'model_norm', 'trim_norm', 'model_trim_norm']
+
+# Make rewrites: every substring in 'all' present -> 'make'
+MAKE_RULES = [
+    {'all': ('rolls', 'royce'), 'make': 'rolls-royce'},
+]
+
+# Model/trim rewrites, tested against "model trim": every substring in 'all'
+# and at least one in 'any' present -> ('model', 'trim')
+MODEL_TRIM_RULES = [
+    {'all': ('ghost',), 'any': ('black', 'badge'), 'model': 'ghost', 'trim': 'black badge'},
+]
+
+
+def _clean(values: pd.Series) -> pd.Series:
+    """Lowercase/stripped strings; missing -> ''."""
+    return values.astype(object).where(values.notna(), '').astype(str).str.lower().str.strip()
+
+
+def _contains_all(text: pd.Series, parts) -> pd.Series:
+    mask = pd.Series(True, index=text.index)
+    for part in parts:
+        mask &= text.str.contains(part, regex=False)
+    return mask
+
+
+def _contains_any(text: pd.Series, parts) -> pd.Series:
+    mask = pd.Series(False, index=text.index)
+    for part in parts:
+        mask |= text.str.contains(part, regex=False)
+    return mask
+
+
+def normalize_makes(makes: pd.Series) -> pd.Series:
+    """Vectorized make canonicalization (see MAKE_RULES)."""
+    cleaned = _clean(makes)
+    out = cleaned.str.replace(' ', '-', regex=False).str.replace('_', '-', regex=False)
+    for rule in MAKE_RULES:
+        out = out.mask(_contains_all(cleaned, rule['all']), rule['make'])
+    return out
+
+
+def normalize_model_trims(models: pd.Series, trims: pd.Series) -> Tuple[pd.Series, pd.Series]:
+    """Vectorized model/trim canonicalization (see MODEL_TRIM_RULES)."""
+    model_out = _clean(models)
+    trim_out = _clean(trims)
+    combined = (model_out + ' ' + trim_out).str.strip()
+    for rule in MODEL_TRIM_RULES:
+        hit = _contains_all(combined, rule['all']) & _contains_any(combined, rule['any'])
+        model_out = model_out.mask(hit, rule['model'])
+        trim_out = trim_out.mask(hit, rule['trim'])
+    return model_out, trim_out
+
+
+def _clean_scalar(value) -> str:
+    return '' if value is None or (isinstance(value, float) and np.isnan(value)) else str(value).lower().strip()
+
+
+def canonical_make(make) -> str:
+    """Canonical make for one input value (same rules as make_norm)."""
+    cleaned = _clean_scalar(make)
+    for rule in MAKE_RULES:
+        if all(part in cleaned for part in rule['all']):
+            return rule['make']
+    return cleaned.replace(' ', '-').replace('_', '-')
+
+
+def canonical_model_trim(model, trim=None) -> Tuple[str, str]:
+    """Canonical (model, trim) for one input value (same rules as model_norm / trim_norm)."""
+    model_out, trim_out = _clean_scalar(model), _clean_scalar(trim)
+    combined = f"{model_out} {trim_out}".strip()
+    for rule in MODEL_TRIM_RULES:
+        if all(part in combined for part in rule['all']) and any(part in combined for part in rule['any']):
+            model_out, trim_out = rule['model'], rule['trim']
+    return model_out, trim_out
+
+
+def _by_unique(values: pd.Series, fn) -> pd.Categorical:
+    """Apply a vectorized Series -> Series function to the unique values only."""
+    codes, uniques = pd.factorize(values, use_na_sentinel=False)
+    mapped_codes, categories = pd.factorize(fn(pd.Series(uniques, dtype=object)).to_numpy())
+    return pd.Categorical.from_codes(mapped_codes[codes], categories=pd.Index(categories, dtype=object))
+
+
+def add_canonical_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """Add make_norm / model_norm / trim_norm / model_trim_norm to the dataset (in place)."""
+    started = time.perf_counter()
+    if 'make' in df.columns:
+        df['make_norm'] = _by_unique(df['make'], normalize_makes)
+
+    if 'model' in df.columns:
+        trims = df['trim'] if 'trim' in df.columns else pd.Series(None, index=df.index, dtype=object)
+        pairs = pd.DataFrame({'model': df['model'].astype(object), 'trim': trims.astype(object)})
+        pair_codes, pair_uniques = pd.factorize(pd.MultiIndex.from_frame(pairs), use_na_sentinel=False)
+        unique_pairs = pd.DataFrame(list(pair_uniques), columns=['model', 'trim'])
+        model_norm, trim_norm = normalize_model_trims(unique_pairs['model'], unique_pairs['trim'])
+        model_trim_norm = (model_norm + ' ' + trim_norm).str.strip()
+        for col, values in (('model_norm', model_norm), ('trim_norm', trim_norm),
+                            ('model_trim_norm', model_trim_norm)):
+            codes, categories = pd.factorize(values.to_numpy())
+            df[col] = pd.Categorical.from_codes(codes[pair_codes], categories=pd.Index(categories, dtype=object))
+
+    logger.info(f"✅ Canonical make/model/trim columns added in "
+                f"{(time.perf_counter() - started) * 1000:.0f} ms")
+    return df
@@ -0,0 +1,116 @@
+"""
+Car cropper - crops listing photos to the largest vehicle before CLIP detection.
+
+The YOLO detector (CAR_CROP_MODEL, COCO-pretrained yolov8n by default) is
+loaded once per process and shared by all requests. crop_images() runs one
+batched YOLO call over images that are already decoded and crops them in
+memory, so each photo is decoded once for YOLO and CLIP.
+
+ultralytics is optional: without it, or when the weights fail to load, no
+crops are returned and callers keep the full images.
+"""
+
+import importlib.util
+import logging
+import threading
+from typing import List, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+YOLO_AVAILABLE = importlib.util.find_spec("ultralytics") is not None
+
+# COCO classes: car, motorcycle, bus, truck
+VEHICLE_CLASSES = (2, 3, 5, 7)
+
+Box = Tuple[int, int, int, int]
+
+
+class CarCropper:
+    """Process-wide YOLO vehicle detector, loaded on first use"""
+
+    def __init__(self, weights: str = "yolov8n.pt", batch_size: int = 16):
+        self.weights = weights
+        self.batch_size = max(1, batch_size)
+        self._model = None
+        self._failed = False
+        self._load_lock = threading.Lock()
+        # One predictor per process; ultralytics predictors are not thread-safe
+        self._predict_lock = threading.Lock()
+
+    @property
+    def available(self) -> bool:
+        return YOLO_AVAILABLE and not self._failed
+
+    def load(self) -> bool:
+        """Load the weights once; False when ultralytics or the weights are unavailable."""
+        if self._model is not None or not self.available:
+            return self._model is not None
+        with self._load_lock:
+            if self._model is None and not self._failed:
+                try:
+                    from ultralytics import YOLO
+                    self._model = YOLO(self.weights)
+                    logger.info(f"✅ YOLO car cropper loaded ({self.weights})")
+                except Exception as e:
+                    logger.warning(f"YOLO car cropper unavailable ({self.weights}): {e}, using full images")
+                    self._failed = True
+        return self._model is not None
+
+    def warmup(self) -> None:
+        """Load the weights and run one dummy batch, so the first request skips both."""
+        if self.load():
+            self.boxes([Image.new('RGB', (640, 480), color=(90, 90, 110))])
+            logger.info("YOLO car cropper warmup completed")
+
+    def boxes(self, images: List[Image.Image]) -> List[Optional[Box]]:
+        """Largest vehicle box (x1, y1, x2, y2) per image, None when no vehicle was found."""
+        if not images or not self.load():
+            return [None] * len(images)
+        found: List[Optional[Box]] = []
+        try:
+            with self._predict_lock:
+                for start in range(0, len(images), self.batch_size):
+                    results = self._model(images[start:start + self.batch_size], verbose=False)
+                    found.extend(self._largest_vehicle(result) for result in results)
+        except Exception as e:
+            logger.warning(f"YOLO crop failed: {e}, using full images")
+            return [None] * len(images)
+        return found
+
+    def crop_images(self, images: List[Image.Image]) -> List[Optional[Image.Image]]:
+        """Each image cropped to its largest vehicle (None when there is none)."""
+        crops = []
+        for img, box in zip(images, self.boxes(images)):
+            crops.append(img.crop(box) if box is not None else None)
+            if box is not None:
+                logger.debug(f"Cropped car bbox: {box}")
+        return crops
+
+    @staticmethod
+    def _largest_vehicle(result) -> Optional[Box]:
+        if result.boxes is None or len(result.boxes) == 0:
+            return None
+        classes = result.boxes.cls.cpu().numpy().astype(int)
+        xyxy = result.boxes.xyxy.cpu().numpy()[np.isin(classes, VEHICLE_CLASSES)]
+        if len(xyxy) == 0:
+            return None
+        areas = (xyxy[:, 2] - xyxy[:, 0]) * (xyxy[:, 3] - xyxy[:, 1])
+        return tuple(int(v) for v in xyxy[int(np.argmax(areas))])
+
+
+_instance: Optional[CarCropper] = None
+_instance_lock = threading.Lock()
+
+
+def get_car_cropper() -> CarCropper:
+    """Process-wide cropper configured from settings."""
+    global _instance
+    if _instance is None:
+        with _instance_lock:
+            if _instance is None:
+                from app.config import settings
+                _instance = CarCropper(settings.CAR_CROP_MODEL, settings.CAR_CROP_BATCH_SIZE)
+    return _instance
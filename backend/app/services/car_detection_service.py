@@ -2,6 +2,14 @@
 Car Detection Service - Real CLIP-based car detection from images
 Uses OpenAI CLIP for zero-shot classification
 Supports fine-tuned models when available
+
+Prompt embeddings come from a TextEmbeddingBank (app/services/clip_text_bank.py)
+built once per labels version; per image only the image tower runs. The
+images of a listing (or of several, detect_cars_from_image_sets) are decoded
+in parallel, cropped to the car by the shared YOLO cropper
+(app/services/car_cropper.py) and embedded in one batched forward; image
+embeddings are kept in the content-addressed embedding store
+(app/services/embedding_store.py).
 """
 
 import logging
@@ -16,13 +24,22 @@ import re
 from datetime import datetime
 from PIL import Image
 import difflib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from app.services.clip_text_bank import (
+    TextEmbeddingBank, color_prompt, detection_prompts, make_prompt, model_prompt, year_range_prompt,
+)
+from app.services.car_cropper import get_car_cropper
+from app.services.embedding_store import get_embedding_store, image_sha256
 
 try:
     import torch
-    from transformers import CLIPProcessor, CLIPModel
+    from transformers import CLIPImageProcessor, CLIPProcessor, CLIPModel
     ML_AVAILABLE = True
 except ImportError:
     torch = None
+    CLIPImageProcessor = None
     CLIPProcessor = None
     CLIPModel = None
     ML_AVAILABLE = False
@@ -40,10 +57,22 @@ _device = None
 _labels_cache = None
 _labels_version = None
 _is_finetuned = False  # Track if using fine-tuned model
+_clip_model_id = None  # Identifies the loaded weights (part of the text bank key)
+_logit_scale = None  # CLIP logit scale (exp), from the model or the exported tower
+_embedding_dim = None  # CLIP projection dim
+_image_tower = None  # int8 TorchScript image tower (VISION_INFERENCE_BACKEND=torchscript)
+_image_processor = None  # Image preprocessing for _image_tower
+_vision_loaded = False
+_vision_lock = threading.Lock()
+_text_bank = None  # TextEmbeddingBank for the current labels version
+_text_bank_lock = threading.Lock()
 
 # Path to fine-tuned model
 FINETUNED_MODEL_DIR = Path(__file__).parent.parent.parent.parent / "models" / "car_clip_finetuned"
 
+# Default location of the persisted text bank (CLIP_TEXT_BANK_DIR overrides)
+TEXT_BANK_DIR = FINETUNED_MODEL_DIR.parent / "clip_text_bank"
+
 # Color labels (fixed - must match Step 4 dropdown)
 COLOR_LABELS = ["Black", "White", "Silver", "Gray", "Blue", "Red", "Green", "Yellow", "Brown", "Beige", "Gold", "Orange"]
 
@@ -66,12 +95,22 @@ def _get_device():
     return _device
 
 
+def _clip_source_id() -> str:
+    """Identifies the CLIP weights _load_clip_model loads (fine-tuned checkpoint or base)"""
+    finetuned_checkpoint = FINETUNED_MODEL_DIR / "best_model.pt"
+    if finetuned_checkpoint.exists():
+        stat = finetuned_checkpoint.stat()
+        return f"finetuned:{stat.st_size}:{stat.st_mtime_ns}"
+    return "openai/clip-vit-base-patch32"
+
+
 def _load_clip_model():
     """Load CLIP model and processor (cached globally)
     
     Tries to load fine-tuned model with classifier head first, falls back to base CLIP if not available.
     """
-    global _clip_model, _clip_processor, _make_classifier, _finetuned_mappings, _is_finetuned
+    global _clip_model, _clip_processor, _make_classifier, _finetuned_mappings, _is_finetuned, _clip_model_id
+    global _logit_scale, _embedding_dim
     
     if not ML_AVAILABLE:
         raise RuntimeError("Car detection is not available (torch/transformers not installed)")
@@ -121,6 +160,9 @@ def _load_clip_model():
             _clip_model.to(device)
             _clip_model.eval()
             _is_finetuned = True
+            _clip_model_id = _clip_source_id()
+            _logit_scale = float(_clip_model.logit_scale.exp().item())
+            _embedding_dim = _clip_model.config.projection_dim
             
             logger.info(f"Fine-tuned CLIP model loaded successfully on {device}")
             return _clip_model, _clip_processor
@@ -138,6 +180,9 @@ def _load_clip_model():
         _clip_model.to(device)
         _clip_model.eval()
         _is_finetuned = False
+        _clip_model_id = "openai/clip-vit-base-patch32"
+        _logit_scale = float(_clip_model.logit_scale.exp().item())
+        _embedding_dim = _clip_model.config.projection_dim
         
         logger.info(f"Base CLIP model loaded successfully on {device}")
         return _clip_model, _clip_processor
@@ -147,17 +192,153 @@ def _load_clip_model():
         raise
 
 
+def _load_image_tower() -> bool:
+    """
+    Attach the int8 TorchScript image tower (models/clip_image_int8.pt) with
+    its make head and image processor, if it was exported from the serving
+    weights and passed parity. False means: use the eager model.
+    """
+    global _image_tower, _image_processor, _make_classifier, _finetuned_mappings, _is_finetuned
+    global _clip_model_id, _logit_scale, _embedding_dim
+    from app.core.model_registry import get_model_registry
+    from app.core.vision_backend import CLIP_IMAGE_FILENAME, attach_vision
+
+    registry = get_model_registry()
+    source = _clip_source_id()
+    tower = attach_vision(registry.get('clip_image_int8'), registry.get('clip_image_int8_meta'),
+                          CLIP_IMAGE_FILENAME, source)
+    if tower is None:
+        return False
+    meta = registry.get_object('clip_image_int8_meta')
+    processor_path = FINETUNED_MODEL_DIR / "processor"
+    _image_processor = CLIPImageProcessor.from_pretrained(
+        processor_path if processor_path.exists() else "openai/clip-vit-base-patch32"
+    )
+    head_weight, head_bias = tower.head_weight, tower.head_bias
+    if head_weight.shape[0] > 0:
+        _make_classifier = torch.nn.Linear(head_weight.shape[1], head_weight.shape[0])
+        with torch.no_grad():
+            _make_classifier.weight.copy_(head_weight)
+            _make_classifier.bias.copy_(head_bias)
+        _make_classifier.eval()
+        _finetuned_mappings = {"idx_to_make": meta.get("idx_to_make", {})}
+    _is_finetuned = source.startswith("finetuned:")
+    _clip_model_id = source
+    _logit_scale = float(meta["logit_scale"])
+    _embedding_dim = int(meta["projection_dim"])
+    _image_tower = tower
+    logger.info(f"✅ Serving int8 CLIP image tower ({meta.get('quantization')}) for {source}")
+    return True
+
+
+def _load_vision():
+    """
+    Load what image scoring needs, once: the int8 image tower
+    (VISION_INFERENCE_BACKEND=torchscript, CPU) or the full CLIP model. With
+    the tower the full model is only loaded to encode prompts (text bank
+    build, prompts outside the bank).
+    """
+    global _vision_loaded
+    if not ML_AVAILABLE:
+        raise RuntimeError("Car detection is not available (torch/transformers not installed)")
+    if _vision_loaded:
+        return
+    with _vision_lock:
+        if _vision_loaded:
+            return
+        from app.config import settings
+        from app.core.vision_backend import TORCHSCRIPT
+        tower_loaded = False
+        if settings.VISION_INFERENCE_BACKEND == TORCHSCRIPT:
+            if _get_device() == "cpu":
+                tower_loaded = _load_image_tower()
+            else:
+                logger.info(f"int8 CLIP image tower is CPU-only; using the eager model on {_get_device()}")
+        if not tower_loaded:
+            _load_clip_model()
+        _vision_loaded = True
+
+
 def is_using_finetuned_model() -> bool:
     """Check if using fine-tuned model."""
     return _is_finetuned
 
 
-def _predict_make_with_classifier(image: Image.Image) -> Optional[Dict]:
+def _image_embeddings(images: List[Image.Image]) -> np.ndarray:
+    """
+    Normalized CLIP image embeddings (image tower only), float32 of shape
+    (len(images), dim); one batched forward per CLIP_DETECT_BATCH_SIZE images
+    """
+    from app.config import settings
+    _load_vision()
+    device = _get_device()
+    batch_size = max(1, settings.CLIP_DETECT_BATCH_SIZE)
+    chunks = []
+    with torch.no_grad():
+        for start in range(0, len(images), batch_size):
+            batch = images[start:start + batch_size]
+            if _image_tower is not None:
+                # Normalized embeddings straight from the int8 tower
+                pixel_values = _image_processor(images=batch, return_tensors="pt")["pixel_values"]
+                image_features = _image_tower(pixel_values)
+            else:
+                model, processor = _load_clip_model()
+                inputs = processor(images=batch, return_tensors="pt")
+                inputs = {k: v.to(device) for k, v in inputs.items()}
+                image_features = model.get_image_features(**inputs)
+                image_features = image_features / image_features.norm(dim=-1, keepdim=True)
+            chunks.append(image_features.cpu().numpy().astype(np.float32))
+    return np.concatenate(chunks) if chunks else np.zeros((0, _embedding_dim), dtype=np.float32)
+
+
+def _image_embedding(image: Image.Image) -> np.ndarray:
+    """Normalized CLIP image embedding of one image, float32 of shape (dim,)"""
+    return _image_embeddings([image])[0]
+
+
+def _encode_texts(texts: List[str]) -> np.ndarray:
+    """Normalized CLIP text embeddings (text tower only), float32 of shape (len(texts), dim)"""
+    model, processor = _load_clip_model()
+    device = _get_device()
+    with torch.no_grad():
+        inputs = processor(text=texts, return_tensors="pt", padding=True)
+        inputs = {k: v.to(device) for k, v in inputs.items()}
+        text_features = model.get_text_features(**inputs)
+        text_features = text_features / text_features.norm(dim=-1, keepdim=True)
+    return text_features.cpu().numpy().astype(np.float32)
+
+
+def _get_text_bank() -> TextEmbeddingBank:
+    """
+    Text embeddings of every detection prompt for the current labels version
+    and CLIP weights: loaded from disk when persisted, else encoded once.
+    """
+    global _text_bank
+    _load_vision()
+    key = f"{get_labels_version()}_{hashlib.md5(str(_clip_model_id).encode()).hexdigest()[:8]}"
+    bank = _text_bank
+    if bank is not None and bank.key == key:
+        return bank
+    with _text_bank_lock:
+        if _text_bank is not None and _text_bank.key == key:
+            return _text_bank
+        from app.config import settings
+        bank_dir = Path(settings.CLIP_TEXT_BANK_DIR) if settings.CLIP_TEXT_BANK_DIR else TEXT_BANK_DIR
+        prompts = detection_prompts(_load_labels_from_dataset(), COLOR_LABELS, YEAR_RANGE_LABELS)
+        _text_bank = TextEmbeddingBank.load_or_build(
+            bank_dir, key, prompts, _encode_texts, logit_scale=_logit_scale
+        )
+        return _text_bank
+
+
+def _classifier_make_probs(image_features: np.ndarray, makes: List[str]) -> Optional[np.ndarray]:
     """
-    Predict car make using the trained classifier head.
-    Returns dict with make predictions and confidence scores.
+    Make probabilities from the trained classifier head for a batch of
+    normalized image embeddings, shape (n_images, len(makes)). Columns follow
+    `makes` (exact, then case-insensitive name match with the trained makes;
+    0 when the head doesn't know a make), renormalized per image.
     """
-    global _clip_model, _clip_processor, _make_classifier, _finetuned_mappings
+    global _make_classifier, _finetuned_mappings
     
     if _make_classifier is None or _finetuned_mappings is None:
         return None
@@ -165,48 +346,31 @@ def _predict_make_with_classifier(image: Image.Image) -> Optional[Dict]:
     device = _get_device()
     
     try:
-        # Process image
-        inputs = _clip_processor(images=image, return_tensors="pt")
-        inputs = {k: v.to(device) for k, v in inputs.items()}
-        
         with torch.no_grad():
-            # Get image embeddings from CLIP
-            image_features = _clip_model.get_image_features(**inputs)
-            
-            # Normalize embeddings
-            image_features = image_features / image_features.norm(dim=-1, keepdim=True)
-            
-            # Get make predictions from classifier
-            logits = _make_classifier(image_features)
-            probs = torch.softmax(logits, dim=-1).cpu().numpy()[0]
+            # Get make predictions from classifier (on the normalized CLIP image embeddings)
+            features = torch.from_numpy(np.ascontiguousarray(image_features, dtype=np.float32)).to(device)
+            logits = _make_classifier(features)
+            probs = torch.softmax(logits, dim=-1).cpu().numpy()
         
-        # Get idx_to_make mapping
+        # Trained make name -> classifier column
         idx_to_make = _finetuned_mappings.get('idx_to_make', {})
+        trained = {}
+        for idx in range(probs.shape[1]):
+            trained[idx_to_make.get(str(idx), f"Unknown_{idx}")] = idx
+        trained_lower = {}
+        for name, idx in trained.items():
+            trained_lower.setdefault(name.lower(), idx)
         
-        # Create predictions dict
-        make_probs = {}
-        for idx, prob in enumerate(probs):
-            make_name = idx_to_make.get(str(idx), f"Unknown_{idx}")
-            make_probs[make_name] = float(prob)
+        columns = np.array([trained.get(make, trained_lower.get(make.lower(), -1)) for make in makes], dtype=np.intp)
+        filtered = np.where(columns >= 0, probs[:, np.maximum(columns, 0)], 0.0)
         
-        # Get top predictions
-        top_indices = np.argsort(probs)[::-1][:10]
-        top_predictions = []
-        for idx in top_indices:
-            make_name = idx_to_make.get(str(idx), f"Unknown_{idx}")
-            top_predictions.append({
-                'make': make_name,
-                'confidence': float(probs[idx])
-            })
-        
-        logger.debug(f"Classifier predictions: top={top_predictions[0]['make']} ({top_predictions[0]['confidence']:.2%})")
+        # Normalize
+        totals = filtered.sum(axis=1, keepdims=True)
+        filtered = np.divide(filtered, totals, out=filtered, where=totals > 0)
         
-        return {
-            'make_probs': make_probs,
-            'top_predictions': top_predictions,
-            'best_make': top_predictions[0]['make'],
-            'best_confidence': top_predictions[0]['confidence']
-        }
+        if len(filtered):
+            logger.debug(f"Classifier predictions: top={makes[int(np.argmax(filtered[0]))]} ({filtered[0].max():.2%})")
+        return filtered
         
     except Exception as e:
         logger.error(f"Classifier prediction failed: {e}", exc_info=True)
@@ -224,8 +388,8 @@ def warmup_clip_model():
     try:
         logger.info("Warming up CLIP model...")
         
-        # Load model
-        model, processor = _load_clip_model()
+        # Load model (or the int8 image tower)
+        _load_vision()
         device = _get_device()
         
         # Load labels (this also validates dataset is available)
@@ -236,16 +400,13 @@ def warmup_clip_model():
             logger.warning("No makes found in labels, skipping warmup inference")
             return
         
+        # Load (or encode and persist) the prompt embeddings for this labels version
+        bank = _get_text_bank()
+
         # Run a dummy inference with a simple test image
-        # Create a small test image (1x1 pixel RGB)
         test_image = Image.new('RGB', (224, 224), color='red')
-        test_labels = [f"a photo of a {makes[0]} vehicle"] if makes else ["a photo of a car"]
-        
-        with torch.no_grad():
-            inputs = processor(text=test_labels, images=test_image, return_tensors="pt", padding=True)
-            inputs = {k: v.to(device) for k, v in inputs.items()}
-            outputs = model(**inputs)
-            _ = outputs.logits_per_image.softmax(dim=1)
+        _clip_classify(_image_embedding(test_image), [make_prompt(makes[0])])
+        logger.info(f"CLIP text bank ready: {len(bank)} prompts on {device}")
         
         logger.info("CLIP model warmup completed successfully")
         
@@ -264,6 +425,14 @@ def _normalize_model_name(model: str) -> str:
     return normalized
 
 
+def invalidate_labels() -> None:
+    """Drop cached labels and labels version (the dataset was reloaded)"""
+    global _labels_cache, _labels_version, _text_bank
+    _labels_cache = None
+    _labels_version = None
+    _text_bank = None
+
+
 def get_labels_version() -> str:
     """Get version hash for labels (based on dataset file mtime + size)"""
     global _labels_version
@@ -414,86 +583,105 @@ def _normalize_prediction(value: str, valid_options: List[str]) -> Optional[str]
     return None
 
 
-def _crop_car_bbox(image_path: str) -> Optional[Image.Image]:
-    """
-    Optional: Crop car bounding box using YOLO
-    Returns cropped image or None if YOLO not available or no car detected
-    """
-    try:
-        from ultralytics import YOLO
-        
-        # Load YOLO model (COCO pretrained)
-        yolo_model = YOLO('yolov8n.pt')  # nano model for speed
-        
-        # Run detection
-        results = yolo_model(image_path, verbose=False)
-        
-        # Find car class (COCO class 2 = car, 3 = motorcycle, 5 = bus, 7 = truck)
-        car_classes = [2, 3, 5, 7]
-        car_boxes = []
-        
-        for result in results:
-            boxes = result.boxes
-            for box in boxes:
-                cls = int(box.cls[0])
-                if cls in car_classes:
-                    car_boxes.append(box.xyxy[0].cpu().numpy())
-        
-        if not car_boxes:
-            return None
-        
-        # Use the largest car bbox
-        largest_box = max(car_boxes, key=lambda b: (b[2] - b[0]) * (b[3] - b[1]))
-        
-        # Load and crop image
-        img = Image.open(image_path).convert('RGB')
-        x1, y1, x2, y2 = map(int, largest_box)
-        cropped = img.crop((x1, y1, x2, y2))
-        
-        logger.debug(f"Cropped car bbox: {x1},{y1},{x2},{y2}")
-        return cropped
-        
-    except ImportError:
-        # YOLO not installed, skip cropping
-        return None
-    except Exception as e:
-        logger.warning(f"YOLO crop failed: {e}, using full image")
-        return None
+def _softmax(logits: np.ndarray) -> np.ndarray:
+    exp = np.exp(logits - logits.max(axis=-1, keepdims=True))
+    return exp / exp.sum(axis=-1, keepdims=True)
 
 
-def _clip_classify(image: Image.Image, text_labels: List[str], model, processor, device: str, return_logits: bool = False) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+def _clip_classify(image_features: np.ndarray, text_labels: List[str], return_logits: bool = False) -> Tuple[np.ndarray, Optional[np.ndarray]]:
     """
     Run CLIP zero-shot classification
     
     Args:
-        image: PIL Image
-        text_labels: List of text prompts
-        model: CLIP model
-        processor: CLIP processor
-        device: Device string
+        image_features: Normalized CLIP image embedding(s), (dim,) or (n_images, dim)
+        text_labels: List of text prompts (looked up in the text bank)
         return_logits: If True, also return raw logits
     
     Returns:
-        (probabilities array, logits array or None)
+        (probabilities array, logits array or None), one row per image for a batch
     """
-    with torch.no_grad():
-        # Process inputs
-        inputs = processor(text=text_labels, images=image, return_tensors="pt", padding=True)
-        inputs = {k: v.to(device) for k, v in inputs.items()}
-        
-        # Get embeddings
-        outputs = model(**inputs)
-        
-        # Compute similarity (cosine similarity)
-        logits_per_image = outputs.logits_per_image
-        probs = logits_per_image.softmax(dim=1).cpu().numpy()[0]
-        logits = logits_per_image.cpu().numpy()[0] if return_logits else None
-        
-        return probs, logits
+    # Cosine similarity scaled by CLIP's logit scale == logits_per_image
+    logits = _get_text_bank().logits(image_features, text_labels, encode=_encode_texts)
+    return _softmax(logits), (logits if return_logits else None)
+
+
+def _load_image(image_path: str) -> Optional[Image.Image]:
+    """Decoded RGB image (None if unreadable)"""
+    try:
+        img = Image.open(image_path).convert('RGB')
+        logger.debug(f"Loaded image: {image_path}, size: {img.size}")
+        return img
+    except Exception as e:
+        logger.error(f"Failed to load PIL image from {image_path}: {e}", exc_info=True)
+        return None
+
+
+_decode_pool = None
+_decode_pool_lock = threading.Lock()
 
 
-def _detect_from_single_image(
-    image_path: str,
+def _parallel_map(fn, image_paths: List[str]) -> list:
+    """fn over image_paths on the decode pool (inline for a single path)"""
+    global _decode_pool
+    if len(image_paths) <= 1:
+        return [fn(p) for p in image_paths]
+    if _decode_pool is None:
+        with _decode_pool_lock:
+            if _decode_pool is None:
+                from app.config import settings
+                _decode_pool = ThreadPoolExecutor(max_workers=max(1, settings.CLIP_DECODE_WORKERS),
+                                                  thread_name_prefix="clip-decode")
+    return list(_decode_pool.map(fn, image_paths))
+
+
+def _load_images(image_paths: List[str]) -> List[Optional[Image.Image]]:
+    """_load_image for every path; several images are decoded in parallel"""
+    return _parallel_map(_load_image, image_paths)
+
+
+def _crop_images(images: List[Image.Image]) -> List[Image.Image]:
+    """Each image cropped to its largest car by the shared YOLO cropper (full image if none)"""
+    crops = get_car_cropper().crop_images(images)
+    return [crop if crop is not None else img for img, crop in zip(images, crops)]
+
+
+def _embedding_space(crop: bool) -> str:
+    """Embedding store space of the decode/crop + _image_embeddings pipeline: CLIP weights, engine and crop step"""
+    _load_vision()
+    crop_step = "yolo" if crop and get_car_cropper().available else "full"
+    engine = "-int8" if _image_tower is not None else ""
+    return f"clip-{hashlib.md5(str(_clip_model_id).encode()).hexdigest()[:8]}{engine}-{crop_step}"
+
+
+def _stored_image_embeddings(image_paths: List[str], crop: bool) -> List[Optional[np.ndarray]]:
+    """
+    CLIP embedding per path (None if unreadable), of the photo cropped to the
+    car when crop is set. Photos whose content is already in the embedding
+    store are neither decoded nor embedded again.
+    """
+    store = get_embedding_store()
+    space = _embedding_space(crop)
+    keys = _parallel_map(image_sha256, image_paths) if store else [None] * len(image_paths)
+    vectors = store.get_many(space, keys) if store else [None] * len(image_paths)
+    missing = [i for i, vector in enumerate(vectors) if vector is None]
+    if missing:
+        images = _load_images([image_paths[i] for i in missing])
+        computed = [(i, img) for i, img in zip(missing, images) if img is not None]
+        if computed:
+            decoded = [img for _, img in computed]
+            features = _image_embeddings(_crop_images(decoded) if crop else decoded)
+            for (i, _), vector in zip(computed, features):
+                vectors[i] = vector
+            if store:
+                # The space again: the cropper may have failed to load in the meantime
+                store.put_many(_embedding_space(crop), [keys[i] for i, _ in computed], features)
+    if store and len(image_paths) > len(missing):
+        logger.info(f"Reused {len(image_paths) - len(missing)}/{len(image_paths)} stored image embeddings")
+    return vectors
+
+
+def _score_images(
+    image_features: np.ndarray,
     makes: List[str],
     models_by_make: Dict[str, List[str]],
     models_by_make_filtered: Dict[str, List[str]],
@@ -502,139 +690,78 @@ def _detect_from_single_image(
     debug_mode: bool = False
 ) -> Dict:
     """
-    Detect car attributes from single image using CLIP
+    Detect car attributes for a batch of image embeddings using CLIP.
     Uses trained classifier head when available for better make detection.
+
+    Returns per-image probabilities: "make" (n_images, len(makes)),
+    "color" (n_images, len(colors)), "year_range" (n_images, len(year_ranges))
+    and, per image, {model: prob} dicts "model" (filtered, for best) and
+    "model_full" (for topk).
     """
-    try:
-        clip_model, processor = _load_clip_model()
-        device = _get_device()
-        
-        # Load image
-        try:
-            img = Image.open(image_path).convert('RGB')
-            logger.debug(f"Loaded image: {image_path}, size: {img.size}")
-        except Exception as e:
-            logger.error(f"Failed to load PIL image from {image_path}: {e}", exc_info=True)
-            raise ValueError(f"Cannot load image {image_path}: {str(e)}")
-        
-        # Optional: Crop car bbox
-        cropped = _crop_car_bbox(image_path)
-        if cropped is not None:
-            img = cropped
-        
-        # 1. Detect Make - Use trained classifier if available
-        classifier_result = _predict_make_with_classifier(img)
-        
-        if classifier_result is not None and _is_finetuned:
-            # Use trained classifier predictions
-            logger.debug("Using trained classifier for make detection")
-            make_probs_dict = classifier_result['make_probs']
-            
-            # Filter to only makes in the provided list (merge with dataset makes)
-            filtered_make_probs = {}
-            for make in makes:
-                if make in make_probs_dict:
-                    filtered_make_probs[make] = make_probs_dict[make]
-                else:
-                    # Check for close matches
-                    best_match = None
-                    for trained_make in make_probs_dict:
-                        if trained_make.lower() == make.lower():
-                            best_match = trained_make
-                            break
-                    if best_match:
-                        filtered_make_probs[make] = make_probs_dict[best_match]
-                    else:
-                        filtered_make_probs[make] = 0.0
-            
-            # Normalize
-            total_prob = sum(filtered_make_probs.values())
-            if total_prob > 0:
-                make_probs_dict = {k: v/total_prob for k, v in filtered_make_probs.items()}
-            else:
-                make_probs_dict = filtered_make_probs
-        else:
-            # Fall back to zero-shot CLIP
-            logger.debug("Using zero-shot CLIP for make detection")
-            make_labels = [f"a photo of a {make} vehicle" for make in makes]
-            make_probs, make_logits = _clip_classify(img, make_labels, clip_model, processor, device, return_logits=debug_mode)
-            make_probs_dict = {make: float(prob) for make, prob in zip(makes, make_probs)}
-        
-        # 2. Detect Model (for top-5 makes, use filtered models for best, full for topk)
-        top5_makes = sorted(make_probs_dict.items(), key=lambda x: x[1], reverse=True)[:5]
+    n_images = len(image_features)
+
+    # 1. Detect Make - Use trained classifier if available
+    make_probs = _classifier_make_probs(image_features, makes) if _is_finetuned else None
+    make_logits = None
+    if make_probs is not None:
+        logger.debug("Using trained classifier for make detection")
+    else:
+        # Fall back to zero-shot CLIP
+        logger.debug("Using zero-shot CLIP for make detection")
+        make_probs, make_logits = _clip_classify(image_features, [make_prompt(make) for make in makes], return_logits=debug_mode)
+
+    # 2. Detect Model (for top-5 makes of each image, use filtered models for best, full for topk)
+    def weighted_model_probs(features, make, make_prob, models, into):
+        model_probs, _ = _clip_classify(features, [model_prompt(make, model) for model in models])
+        # Weight by make confidence
+        for model, prob in zip(models, model_probs):
+            weighted_prob = float(prob) * make_prob
+            into[model] = max(into.get(model, 0), weighted_prob)
+
+    model_probs_per_image = []
+    model_probs_full_per_image = []
+    for i in range(n_images):
         model_probs_dict = {}
         model_probs_dict_full = {}  # For topk (all models)
-        
-        for make, make_prob in top5_makes:
-            # Use filtered models for best prediction
-            if make in models_by_make_filtered and models_by_make_filtered[make]:
-                models_filtered = models_by_make_filtered[make]
-                model_labels = [f"a photo of a {make} {model} vehicle" for model in models_filtered]
-                
-                if model_labels:
-                    model_probs, _ = _clip_classify(img, model_labels, clip_model, processor, device)
-                    # Weight by make confidence
-                    for model, prob in zip(models_filtered, model_probs):
-                        weighted_prob = float(prob) * make_prob
-                        model_probs_dict[model] = max(model_probs_dict.get(model, 0), weighted_prob)
-            
-            # Use full models for topk
-            if make in models_by_make and models_by_make[make]:
-                models_full = models_by_make[make]
-                model_labels_full = [f"a photo of a {make} {model} vehicle" for model in models_full]
-                
-                if model_labels_full:
-                    model_probs_full, _ = _clip_classify(img, model_labels_full, clip_model, processor, device)
-                    for model, prob in zip(models_full, model_probs_full):
-                        weighted_prob = float(prob) * make_prob
-                        model_probs_dict_full[model] = max(model_probs_dict_full.get(model, 0), weighted_prob)
+        for make_idx in np.argsort(-make_probs[i], kind='stable')[:5]:
+            make, make_prob = makes[make_idx], float(make_probs[i, make_idx])
+            if models_by_make_filtered.get(make):
+                weighted_model_probs(image_features[i], make, make_prob, models_by_make_filtered[make], model_probs_dict)
+            if models_by_make.get(make):
+                weighted_model_probs(image_features[i], make, make_prob, models_by_make[make], model_probs_dict_full)
         
         # Normalize model probs
-        model_sum = sum(model_probs_dict.values())
-        if model_sum > 0:
-            model_probs_dict = {k: v / model_sum for k, v in model_probs_dict.items()}
-        
-        model_sum_full = sum(model_probs_dict_full.values())
-        if model_sum_full > 0:
-            model_probs_dict_full = {k: v / model_sum_full for k, v in model_probs_dict_full.items()}
-        
-        # 3. Detect Color (better prompt)
-        color_labels = [f"a photo of a {color} car in daylight" for color in colors]
-        color_probs, color_logits = _clip_classify(img, color_labels, clip_model, processor, device, return_logits=debug_mode)
-        color_probs_dict = {color: float(prob) for color, prob in zip(colors, color_probs)}
-        
-        # 4. Detect Year Range (better prompt)
-        year_range_labels = [f"a photo of a car from the {range_str}" for range_str in year_ranges]
-        year_range_probs, year_logits = _clip_classify(img, year_range_labels, clip_model, processor, device, return_logits=debug_mode)
-        year_range_probs_dict = {range_str: float(prob) for range_str, prob in zip(year_ranges, year_range_probs)}
-        
-        result = {
-            "make": make_probs_dict,
-            "model": model_probs_dict,  # Filtered for best
-            "model_full": model_probs_dict_full,  # Full for topk
-            "color": color_probs_dict,
-            "year_range": year_range_probs_dict
-        }
-        
-        if debug_mode:
-            result["debug"] = {
-                "make_logits": make_logits.tolist() if make_logits is not None else None,
-                "color_logits": color_logits.tolist() if color_logits is not None else None,
-                "year_logits": year_logits.tolist() if year_logits is not None else None,
-            }
-        
-        return result
-        
-    except Exception as e:
-        logger.error(f"Error detecting from image {image_path}: {e}", exc_info=True)
-        return {
-            "make": {},
-            "model": {},
-            "model_full": {},
-            "color": {},
-            "year_range": {}
+        for probs in (model_probs_dict, model_probs_dict_full):
+            total = sum(probs.values())
+            if total > 0:
+                for model in probs:
+                    probs[model] /= total
+        model_probs_per_image.append(model_probs_dict)
+        model_probs_full_per_image.append(model_probs_dict_full)
+
+    # 3. Detect Color (better prompt)
+    color_probs, color_logits = _clip_classify(image_features, [color_prompt(color) for color in colors], return_logits=debug_mode)
+
+    # 4. Detect Year Range (better prompt)
+    year_range_probs, year_logits = _clip_classify(image_features, [year_range_prompt(r) for r in year_ranges], return_logits=debug_mode)
+
+    result = {
+        "make": make_probs,
+        "model": model_probs_per_image,  # Filtered for best
+        "model_full": model_probs_full_per_image,  # Full for topk
+        "color": color_probs,
+        "year_range": year_range_probs
+    }
+
+    if debug_mode:
+        result["debug"] = {
+            "make_logits": make_logits,
+            "color_logits": color_logits,
+            "year_logits": year_logits,
         }
 
+    return result
+
 
 def _year_range_to_years(range_str: str, confidence: float) -> List[Tuple[int, float]]:
     """
@@ -684,52 +811,251 @@ def get_image_hash(image_paths: List[str]) -> str:
     return hashlib.md5(hash_str.encode()).hexdigest()
 
 
-def detect_car_from_images(
-    image_paths: List[str],
+def _mean_votes(per_image: List[Dict[str, float]], num_images: int) -> Dict[str, float]:
+    """Sum of per-image {label: prob} votes over num_images (labels missing in an image count 0)"""
+    vocab = list(dict.fromkeys(label for probs in per_image for label in probs))
+    if not vocab:
+        return {}
+    columns = {label: i for i, label in enumerate(vocab)}
+    votes = np.zeros((len(per_image), len(vocab)))
+    for row, probs in enumerate(per_image):
+        votes[row, [columns[label] for label in probs]] = list(probs.values())
+    return dict(zip(vocab, (votes.sum(axis=0) / num_images).tolist()))
+
+
+def _top1(labels: List[str], probs: np.ndarray) -> Optional[Tuple[str, float]]:
+    if not len(labels):
+        return None
+    idx = int(np.argmax(probs))
+    return labels[idx], float(probs[idx])
+
+
+def _detection_error(image_paths: List[str], status: str, error: str, image_hash: str,
+                     labels_version: str, runtime_ms: int, device: str) -> Dict:
+    return {
+        "best": {},
+        "topk": {},
+        "meta": {
+            "confidence_level": "low",
+            "status": status,
+            "error": error,
+            "num_images": len(image_paths),
+            "image_hash": image_hash,
+            "labels_version": labels_version,
+            "runtime_ms": runtime_ms,
+            "device": device,
+            "created_at": datetime.utcnow().isoformat()
+        }
+    }
+
+
+def _summarize_detection(
+    scores: Dict,
+    rows: List[int],
+    row_images: List[Tuple[int, str]],
+    num_images: int,
+    makes: List[str],
+    colors: List[str],
+    valid_makes: Optional[List[str]],
+    valid_models_by_make: Optional[Dict[str, List[str]]],
+    image_hash: str,
+    labels_version: str,
+    device: str,
+    start_time: float,
+    debug_mode: bool
+) -> Dict:
+    """Aggregate the per-image scores of one listing (rows of `scores`) into the detection result"""
+    # Normalize votes (mean across images)
+    if num_images == 0:
+        raise ValueError("No valid images found")
+
+    make_probs, model_probs, model_probs_full, color_probs, year_range_probs = {}, {}, {}, {}, {}
+    if rows:
+        make_probs = dict(zip(makes, (scores["make"][rows].sum(axis=0) / num_images).tolist()))
+        model_probs = _mean_votes([scores["model"][r] for r in rows], num_images)  # Filtered
+        model_probs_full = _mean_votes([scores["model_full"][r] for r in rows], num_images)  # Full
+        color_probs = dict(zip(colors, (scores["color"][rows].sum(axis=0) / num_images).tolist()))
+        year_range_probs = dict(zip(YEAR_RANGE_LABELS, (scores["year_range"][rows].sum(axis=0) / num_images).tolist()))
+
+    per_image_results = []  # For debug mode
+    if debug_mode:
+        debug = scores.get("debug", {})
+        for r, (image_idx, image_path) in zip(rows, row_images):
+            model_top = max(scores["model"][r].items(), key=lambda x: x[1]) if scores["model"][r] else None
+            per_image_results.append({
+                "image_idx": image_idx,
+                "image_path": image_path,
+                "top1_make": _top1(makes, scores["make"][r]),
+                "top1_model": model_top,
+                "top1_color": _top1(colors, scores["color"][r]),
+                "debug": {name: (logits[r].tolist() if logits is not None else None) for name, logits in debug.items()}
+            })
+
+    # Get best predictions (from filtered models)
+    best_make = max(make_probs.items(), key=lambda x: x[1]) if make_probs else (None, 0.0)
+    best_model = max(model_probs.items(), key=lambda x: x[1]) if model_probs else (None, 0.0)
+    best_color = max(color_probs.items(), key=lambda x: x[1]) if color_probs else (None, 0.0)
+    best_year_range = max(year_range_probs.items(), key=lambda x: x[1]) if year_range_probs else (None, 0.0)
+
+    # Normalize predictions to match dropdown values
+    best_make_normalized = None
+    best_model_normalized = None
+    best_color_normalized = None
+
+    if best_make[0] and valid_makes:
+        best_make_normalized = _normalize_prediction(best_make[0], valid_makes)
+        if not best_make_normalized:
+            logger.warning(f"Could not normalize make '{best_make[0]}' to valid options")
+
+    if best_model[0] and best_make_normalized and valid_models_by_make:
+        valid_models = valid_models_by_make.get(best_make_normalized, [])
+        if valid_models:
+            best_model_normalized = _normalize_prediction(best_model[0], valid_models)
+            if not best_model_normalized:
+                logger.warning(f"Could not normalize model '{best_model[0]}' to valid options for make '{best_make_normalized}'")
+
+    if best_color[0]:
+        best_color_normalized = _normalize_prediction(best_color[0], COLOR_LABELS)
+
+    # Check if CLIP is uncertain (fallback)
+    status = "ok"
+    if best_make[1] < 0.55:
+        status = "low_confidence"
+        logger.warning(f"Low confidence detection: make={best_make[1]:.2f}")
+
+    # Convert year range to specific years
+    year_suggestions = []
+    if best_year_range[0] and best_year_range[1] >= 0.55:
+        year_suggestions = _year_range_to_years(best_year_range[0], best_year_range[1])
+
+    # Get top-5 for each (use full models for topk)
+    top5_make = sorted(make_probs.items(), key=lambda x: x[1], reverse=True)[:5]
+    top5_model = sorted(model_probs_full.items(), key=lambda x: x[1], reverse=True)[:5]  # Use full for topk
+    top5_color = sorted(color_probs.items(), key=lambda x: x[1], reverse=True)[:5]
+
+    # Top-5 years from all ranges
+    all_year_suggestions = []
+    for range_str, conf in sorted(year_range_probs.items(), key=lambda x: x[1], reverse=True)[:3]:
+        if conf >= 0.3:  # Only include reasonable ranges
+            years = _year_range_to_years(range_str, conf)
+            all_year_suggestions.extend(years)
+
+    # Sort by confidence and take top-5
+    all_year_suggestions.sort(key=lambda x: x[1], reverse=True)
+    top5_years = all_year_suggestions[:5]
+
+    # Determine confidence level
+    make_conf = best_make[1] if best_make[0] else 0.0
+    model_conf = best_model[1] if best_model[0] else 0.0
+    year_conf = best_year_range[1] if best_year_range[0] else 0.0
+
+    min_confidence = min(make_conf, model_conf, year_conf)
+    if min_confidence >= 0.75:
+        confidence_level = "high"
+    elif min_confidence >= 0.55:
+        confidence_level = "medium"
+    else:
+        confidence_level = "low"
+
+    # Best year (from top suggestion if confidence >= 0.55)
+    best_year_value = None
+    best_year_conf = 0.0
+    if year_suggestions:
+        best_year_value = year_suggestions[0][0]
+        best_year_conf = year_suggestions[0][1]
+
+    runtime_ms = int((time.time() - start_time) * 1000)
+
+    # Build result
+    result = {
+        "best": {
+            "make": {
+                "value": best_make_normalized or best_make[0],
+                "confidence": float(best_make[1]),
+                "original": best_make[0] if best_make_normalized != best_make[0] else None
+            } if best_make[0] else None,
+            "model": {
+                "value": best_model_normalized or best_model[0],
+                "confidence": float(best_model[1]),
+                "original": best_model[0] if best_model_normalized != best_model[0] else None
+            } if best_model[0] else None,
+            "color": {
+                "value": best_color_normalized or best_color[0],
+                "confidence": float(best_color[1]),
+                "original": best_color[0] if best_color_normalized != best_color[0] else None
+            } if best_color[0] else None,
+            "year": {
+                "value": int(best_year_value) if best_year_value else None,
+                "confidence": float(best_year_conf)
+            } if best_year_value else None,
+        },
+        "topk": {
+            "make": [{"value": m, "confidence": float(c)} for m, c in top5_make],
+            "model": [{"value": m, "confidence": float(c)} for m, c in top5_model],
+            "color": [{"value": c, "confidence": float(conf)} for c, conf in top5_color],
+            "year": [{"value": int(y), "confidence": float(c)} for y, c in top5_years],
+        },
+        "meta": {
+            "confidence_level": confidence_level,
+            "num_images": num_images,
+            "image_hash": image_hash,
+            "labels_version": labels_version,
+            "runtime_ms": runtime_ms,
+            "device": device,
+            "status": status,
+            "created_at": datetime.utcnow().isoformat()
+        }
+    }
+
+    # Add debug info if enabled
+    if debug_mode:
+        result["meta"]["debug"] = {
+            "per_image_results": per_image_results,
+            "aggregated_logits": {
+                "make_probs": {k: float(v) for k, v in make_probs.items()},
+                "model_probs": {k: float(v) for k, v in model_probs.items()},
+                "color_probs": {k: float(v) for k, v in color_probs.items()},
+                "year_range_probs": {k: float(v) for k, v in year_range_probs.items()},
+            }
+        }
+
+    logger.info(f"Detection completed: {best_make_normalized or best_make[0]} {best_model_normalized or best_model[0]} ({confidence_level} confidence, {runtime_ms}ms)")
+
+    return result
+
+
+def detect_cars_from_image_sets(
+    image_sets: List[List[str]],
     makes: Optional[List[str]] = None,
-    models: Optional[List[str]] = None,
     colors: Optional[List[str]] = None,
-    years: Optional[List[int]] = None,
     valid_makes: Optional[List[str]] = None,
-    valid_models_by_make: Optional[Dict[str, List[str]]] = None
-) -> Dict:
+    valid_models_by_make: Optional[Dict[str, List[str]]] = None,
+    crop: Optional[bool] = None
+) -> List[Dict]:
     """
-    Detect car make, model, color, and year from images using CLIP
+    Detect car make, model, color and year for one or more listings at once.
     
-    Args:
-        image_paths: List of image file paths
-        makes: Optional list of makes (if None, loads from dataset)
-        models: Optional list of models (ignored, uses dataset)
-        colors: Optional list of colors (if None, uses default)
-        years: Optional list of years (ignored, uses year ranges)
-        valid_makes: Valid makes from frontend dropdown (for normalization)
-        valid_models_by_make: Valid models by make from frontend (for normalization)
+    The images of all sets are decoded in parallel (CLIP_DECODE_WORKERS),
+    cropped to the car by one batched YOLO call (unless crop is False; None
+    means CAR_CROP_ENABLED), embedded by batched image-tower forwards and
+    scored against the text bank; votes are averaged per set with NumPy.
+    Photos already in the embedding store (same content SHA-256) skip
+    decoding, cropping and the forward.
     
-    Returns:
-        Dict with:
-        - best: {make: {...}, model: {...}, color: {...}, year: {...}}
-        - topk: {make: [...], model: [...], color: [...], year: [...]}
-        - meta: {confidence_level, num_images, image_hash, labels_version, runtime_ms, device, created_at, status}
+    Returns one detect_car_from_images() result per image set, in order.
     """
     start_time = time.time()
     if not ML_AVAILABLE:
-        return {
-            "best": {},
-            "topk": {},
-            "meta": {
-                "confidence_level": "low",
-                "status": "not_available",
-                "error": "Car detection is not available (torch/transformers not installed)",
-                "num_images": len(image_paths),
-                "image_hash": get_image_hash(image_paths),
-                "labels_version": get_labels_version(),
-                "runtime_ms": 0,
-                "device": "none",
-                "created_at": datetime.utcnow().isoformat(),
-            },
-        }
+        return [
+            _detection_error(paths, "not_available", "Car detection is not available (torch/transformers not installed)",
+                             get_image_hash(paths), get_labels_version(), 0, "none")
+            for paths in image_sets
+        ]
     device = _get_device()
     debug_mode = os.getenv("AUTO_DETECT_DEBUG", "0") == "1"
+    if crop is None:
+        from app.config import settings
+        crop = settings.CAR_CROP_ENABLED
     
     if colors is None:
         colors = COLOR_LABELS
@@ -745,219 +1071,84 @@ def detect_car_from_images(
     # Get labels version for cache key
     labels_version = get_labels_version()
     
-    # Compute image hash
-    image_hash = get_image_hash(image_paths)
+    # Compute image hash per set
+    image_hashes = [get_image_hash(paths) for paths in image_sets]
     
     try:
-        logger.info(f"Detecting car from {len(image_paths)} images using CLIP on {device}")
-        
-        # Aggregate results from all images
-        make_votes: Dict[str, float] = {}
-        model_votes: Dict[str, float] = {}  # Filtered for best
-        model_votes_full: Dict[str, float] = {}  # Full for topk
-        color_votes: Dict[str, float] = {}
-        year_range_votes: Dict[str, float] = {}
-        
-        per_image_results = []  # For debug mode
-        
-        # Process each image
-        logger.info(f"Processing {len(image_paths)} images...")
-        for idx, img_path in enumerate(image_paths):
-            logger.info(f"Processing image {idx+1}/{len(image_paths)}: {img_path}")
-            
-            if not os.path.exists(img_path):
-                logger.warning(f"Image not found: {img_path}")
-                continue
-            
-            try:
-                img_results = _detect_from_single_image(
-                    img_path, makes, models_by_make, models_by_make_filtered,
-                    colors, YEAR_RANGE_LABELS, debug_mode=debug_mode
-                )
-            except Exception as e:
-                logger.error(f"Error processing image {img_path}: {e}", exc_info=True)
-                continue
-            
-            if debug_mode:
-                per_image_results.append({
-                    "image_idx": idx,
-                    "image_path": img_path,
-                    "top1_make": max(img_results.get('make', {}).items(), key=lambda x: x[1]) if img_results.get('make') else None,
-                    "top1_model": max(img_results.get('model', {}).items(), key=lambda x: x[1]) if img_results.get('model') else None,
-                    "top1_color": max(img_results.get('color', {}).items(), key=lambda x: x[1]) if img_results.get('color') else None,
-                    "debug": img_results.get('debug')
-                })
-            
-            # Aggregate votes
-            for make, conf in img_results.get('make', {}).items():
-                make_votes[make] = make_votes.get(make, 0) + conf
-            for model, conf in img_results.get('model', {}).items():
-                model_votes[model] = model_votes.get(model, 0) + conf
-            for model, conf in img_results.get('model_full', {}).items():
-                model_votes_full[model] = model_votes_full.get(model, 0) + conf
-            for color, conf in img_results.get('color', {}).items():
-                color_votes[color] = color_votes.get(color, 0) + conf
-            for year_range, conf in img_results.get('year_range', {}).items():
-                year_range_votes[year_range] = year_range_votes.get(year_range, 0) + conf
-        
-        # Normalize votes (mean across images)
-        num_images = len([p for p in image_paths if os.path.exists(p)])
-        if num_images == 0:
-            raise ValueError("No valid images found")
-        
-        make_probs = {k: v / num_images for k, v in make_votes.items()}
-        model_probs = {k: v / num_images for k, v in model_votes.items()}  # Filtered
-        model_probs_full = {k: v / num_images for k, v in model_votes_full.items()}  # Full
-        color_probs = {k: v / num_images for k, v in color_votes.items()}
-        year_range_probs = {k: v / num_images for k, v in year_range_votes.items()}
-        
-        # Get best predictions (from filtered models)
-        best_make = max(make_probs.items(), key=lambda x: x[1]) if make_probs else (None, 0.0)
-        best_model = max(model_probs.items(), key=lambda x: x[1]) if model_probs else (None, 0.0)
-        best_color = max(color_probs.items(), key=lambda x: x[1]) if color_probs else (None, 0.0)
-        best_year_range = max(year_range_probs.items(), key=lambda x: x[1]) if year_range_probs else (None, 0.0)
-        
-        # Normalize predictions to match dropdown values
-        best_make_normalized = None
-        best_model_normalized = None
-        best_color_normalized = None
-        
-        if best_make[0] and valid_makes:
-            best_make_normalized = _normalize_prediction(best_make[0], valid_makes)
-            if not best_make_normalized:
-                logger.warning(f"Could not normalize make '{best_make[0]}' to valid options")
-        
-        if best_model[0] and best_make_normalized and valid_models_by_make:
-            valid_models = valid_models_by_make.get(best_make_normalized, [])
-            if valid_models:
-                best_model_normalized = _normalize_prediction(best_model[0], valid_models)
-                if not best_model_normalized:
-                    logger.warning(f"Could not normalize model '{best_model[0]}' to valid options for make '{best_make_normalized}'")
-        
-        if best_color[0]:
-            best_color_normalized = _normalize_prediction(best_color[0], COLOR_LABELS)
-        
-        # Check if CLIP is uncertain (fallback)
-        status = "ok"
-        if best_make[1] < 0.55:
-            status = "low_confidence"
-            logger.warning(f"Low confidence detection: make={best_make[1]:.2f}")
-        
-        # Convert year range to specific years
-        year_suggestions = []
-        if best_year_range[0] and best_year_range[1] >= 0.55:
-            year_suggestions = _year_range_to_years(best_year_range[0], best_year_range[1])
-        
-        # Get top-5 for each (use full models for topk)
-        top5_make = sorted(make_probs.items(), key=lambda x: x[1], reverse=True)[:5]
-        top5_model = sorted(model_probs_full.items(), key=lambda x: x[1], reverse=True)[:5]  # Use full for topk
-        top5_color = sorted(color_probs.items(), key=lambda x: x[1], reverse=True)[:5]
-        
-        # Top-5 years from all ranges
-        all_year_suggestions = []
-        for range_str, conf in sorted(year_range_probs.items(), key=lambda x: x[1], reverse=True)[:3]:
-            if conf >= 0.3:  # Only include reasonable ranges
-                years = _year_range_to_years(range_str, conf)
-                all_year_suggestions.extend(years)
-        
-        # Sort by confidence and take top-5
-        all_year_suggestions.sort(key=lambda x: x[1], reverse=True)
-        top5_years = all_year_suggestions[:5]
-        
-        # Determine confidence level
-        make_conf = best_make[1] if best_make[0] else 0.0
-        model_conf = best_model[1] if best_model[0] else 0.0
-        year_conf = best_year_range[1] if best_year_range[0] else 0.0
-        
-        min_confidence = min(make_conf, model_conf, year_conf)
-        if min_confidence >= 0.75:
-            confidence_level = "high"
-        elif min_confidence >= 0.55:
-            confidence_level = "medium"
-        else:
-            confidence_level = "low"
-        
-        # Best year (from top suggestion if confidence >= 0.55)
-        best_year_value = None
-        best_year_conf = 0.0
-        if year_suggestions:
-            best_year_value = year_suggestions[0][0]
-            best_year_conf = year_suggestions[0][1]
-        
-        runtime_ms = int((time.time() - start_time) * 1000)
-        
-        # Build result
-        result = {
-            "best": {
-                "make": {
-                    "value": best_make_normalized or best_make[0],
-                    "confidence": float(best_make[1]),
-                    "original": best_make[0] if best_make_normalized != best_make[0] else None
-                } if best_make[0] else None,
-                "model": {
-                    "value": best_model_normalized or best_model[0],
-                    "confidence": float(best_model[1]),
-                    "original": best_model[0] if best_model_normalized != best_model[0] else None
-                } if best_model[0] else None,
-                "color": {
-                    "value": best_color_normalized or best_color[0],
-                    "confidence": float(best_color[1]),
-                    "original": best_color[0] if best_color_normalized != best_color[0] else None
-                } if best_color[0] else None,
-                "year": {
-                    "value": int(best_year_value) if best_year_value else None,
-                    "confidence": float(best_year_conf)
-                } if best_year_value else None,
-            },
-            "topk": {
-                "make": [{"value": m, "confidence": float(c)} for m, c in top5_make],
-                "model": [{"value": m, "confidence": float(c)} for m, c in top5_model],
-                "color": [{"value": c, "confidence": float(conf)} for c, conf in top5_color],
-                "year": [{"value": int(y), "confidence": float(c)} for y, c in top5_years],
-            },
-            "meta": {
-                "confidence_level": confidence_level,
-                "num_images": num_images,
-                "image_hash": image_hash,
-                "labels_version": labels_version,
-                "runtime_ms": runtime_ms,
-                "device": device,
-                "status": status,
-                "created_at": datetime.utcnow().isoformat()
-            }
-        }
-        
-        # Add debug info if enabled
-        if debug_mode:
-            result["meta"]["debug"] = {
-                "per_image_results": per_image_results,
-                "aggregated_logits": {
-                    "make_probs": {k: float(v) for k, v in make_probs.items()},
-                    "model_probs": {k: float(v) for k, v in model_probs.items()},
-                    "color_probs": {k: float(v) for k, v in color_probs.items()},
-                    "year_range_probs": {k: float(v) for k, v in year_range_probs.items()},
-                }
-            }
-        
-        logger.info(f"Detection completed: {best_make_normalized or best_make[0]} {best_model_normalized or best_model[0]} ({confidence_level} confidence, {runtime_ms}ms)")
-        
-        return result
-        
+        # (set index, index in set, path) of every existing image
+        existing = []
+        for set_idx, paths in enumerate(image_sets):
+            for img_idx, img_path in enumerate(paths):
+                if os.path.exists(img_path):
+                    existing.append((set_idx, img_idx, img_path))
+                else:
+                    logger.warning(f"Image not found: {img_path}")
+
+        logger.info(f"Detecting car from {len(existing)} images ({len(image_sets)} listing(s)) using CLIP on {device}")
+        vectors = _stored_image_embeddings([img_path for _, _, img_path in existing], crop)
+        embedded = [(entry, vector) for entry, vector in zip(existing, vectors) if vector is not None]
+
+        # One batched image-tower pass for every new image, then NumPy scoring
+        scores = None
+        if embedded:
+            image_features = np.stack([vector for _, vector in embedded])
+            scores = _score_images(image_features, makes, models_by_make, models_by_make_filtered,
+                                   colors, YEAR_RANGE_LABELS, debug_mode=debug_mode)
     except Exception as e:
         logger.error(f"Error detecting car from images: {e}", exc_info=True)
         runtime_ms = int((time.time() - start_time) * 1000)
-        return {
-            "best": {},
-            "topk": {},
-            "meta": {
-                "confidence_level": "low",
-                "status": "error",
-                "error": str(e),
-                "num_images": len(image_paths),
-                "image_hash": image_hash,
-                "labels_version": labels_version,
-                "runtime_ms": runtime_ms,
-                "device": device,
-                "created_at": datetime.utcnow().isoformat()
-            }
-        }
+        return [
+            _detection_error(paths, "error", str(e), image_hash, labels_version, runtime_ms, device)
+            for paths, image_hash in zip(image_sets, image_hashes)
+        ]
+
+    results = []
+    for set_idx, paths in enumerate(image_sets):
+        rows = [row for row, ((s, _, _), _) in enumerate(embedded) if s == set_idx]
+        try:
+            results.append(_summarize_detection(
+                scores, rows, [embedded[r][0][1:] for r in rows], sum(1 for s, _, _ in existing if s == set_idx),
+                makes, colors, valid_makes, valid_models_by_make,
+                image_hashes[set_idx], labels_version, device, start_time, debug_mode
+            ))
+        except Exception as e:
+            logger.error(f"Error detecting car from images: {e}", exc_info=True)
+            runtime_ms = int((time.time() - start_time) * 1000)
+            results.append(_detection_error(paths, "error", str(e), image_hashes[set_idx], labels_version, runtime_ms, device))
+    return results
+
+
+def detect_car_from_images(
+    image_paths: List[str],
+    makes: Optional[List[str]] = None,
+    models: Optional[List[str]] = None,
+    colors: Optional[List[str]] = None,
+    years: Optional[List[int]] = None,
+    valid_makes: Optional[List[str]] = None,
+    valid_models_by_make: Optional[Dict[str, List[str]]] = None,
+    crop: Optional[bool] = None
+) -> Dict:
+    """
+    Detect car make, model, color, and year from images using CLIP
+
+    Args:
+        image_paths: List of image file paths
+        makes: Optional list of makes (if None, loads from dataset)
+        models: Optional list of models (ignored, uses dataset)
+        colors: Optional list of colors (if None, uses default)
+        years: Optional list of years (ignored, uses year ranges)
+        valid_makes: Valid makes from frontend dropdown (for normalization)
+        valid_models_by_make: Valid models by make from frontend (for normalization)
+        crop: Crop photos to the car with YOLO first (None: CAR_CROP_ENABLED);
+            False skips the YOLO pass when latency matters
+
+    Returns:
+        Dict with:
+        - best: {make: {...}, model: {...}, color: {...}, year: {...}}
+        - topk: {make: [...], model: [...], color: [...], year: [...]}
+        - meta: {confidence_level, num_images, image_hash, labels_version, runtime_ms, device, created_at, status}
+    """
+    return detect_cars_from_image_sets(
+        [image_paths], makes=makes, colors=colors,
+        valid_makes=valid_makes, valid_models_by_make=valid_models_by_make, crop=crop
+    )[0]
@@ -0,0 +1,186 @@
+"""
+CLIP text-embedding bank - every detection prompt encoded once per labels version.
+
+Zero-shot detection compares one image against hundreds of prompts (all
+makes, the models of the top makes, colors, year ranges). The prompts only
+change when the dataset (labels_version) or the CLIP weights change, so
+their normalized text embeddings are computed once, kept in memory as one
+float32 matrix and persisted next to the models as a float16 .npy plus a
+JSON sidecar (prompt list, logit scale). Scoring an image is then a single
+matrix multiply against the rows of the requested prompts:
+
+    logits = logit_scale * image_embedding @ bank[rows].T
+
+which is what CLIPModel computes for logits_per_image. Prompts that are not
+in the bank (custom color lists, ...) are encoded on first use and kept in a
+small in-memory overflow.
+
+No torch import here; the encoder is passed in by car_detection_service.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Bump when the file layout or the prompt templates change
+BANK_FORMAT = 1
+
+# Overflow prompts kept in memory (beyond that they are encoded per call)
+MAX_EXTRA_PROMPTS = 4096
+
+# texts -> L2-normalized embeddings, shape (len(texts), dim)
+TextEncoder = Callable[[List[str]], np.ndarray]
+
+
+def make_prompt(make: str) -> str:
+    return f"a photo of a {make} vehicle"
+
+
+def model_prompt(make: str, model: str) -> str:
+    return f"a photo of a {make} {model} vehicle"
+
+
+def color_prompt(color: str) -> str:
+    return f"a photo of a {color} car in daylight"
+
+
+def year_range_prompt(range_str: str) -> str:
+    return f"a photo of a car from the {range_str}"
+
+
+def detection_prompts(labels: Dict, colors: Iterable[str], year_ranges: Iterable[str]) -> List[str]:
+    """Every prompt detection can ask for with these labels, without duplicates, in a stable order."""
+    prompts = [make_prompt(make) for make in labels.get("makes", [])]
+    for make, models in sorted(labels.get("models_by_make", {}).items()):
+        prompts.extend(model_prompt(make, model) for model in models)
+    prompts.extend(color_prompt(color) for color in colors)
+    prompts.extend(year_range_prompt(range_str) for range_str in year_ranges)
+    return list(dict.fromkeys(prompts))
+
+
+def _prompts_sha(prompts: Sequence[str]) -> str:
+    return hashlib.sha256("\n".join(prompts).encode("utf-8")).hexdigest()
+
+
+class TextEmbeddingBank:
+    """Normalized CLIP text embeddings for a fixed prompt list"""
+
+    def __init__(self, prompts: List[str], embeddings: np.ndarray, logit_scale: float, key: str):
+        self.prompts = prompts
+        self.embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+        self.logit_scale = float(logit_scale)
+        self.key = key
+        self._rows = {prompt: i for i, prompt in enumerate(prompts)}
+        self._extra: Dict[str, np.ndarray] = {}
+        self._extra_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.prompts)
+
+    @property
+    def dim(self) -> int:
+        return self.embeddings.shape[1]
+
+    def matrix(self, prompts: Sequence[str], encode: Optional[TextEncoder] = None) -> np.ndarray:
+        """(len(prompts), dim) embeddings; prompts outside the bank are encoded with `encode`."""
+        rows = [self._rows.get(p, -1) for p in prompts]
+        if min(rows, default=0) >= 0:
+            return self.embeddings[rows]
+        missing = list(dict.fromkeys(p for p, r in zip(prompts, rows) if r < 0 and p not in self._extra))
+        encoded = {}
+        if missing:
+            if encode is None:
+                raise KeyError(f"{len(missing)} prompts are not in the text bank")
+            encoded = dict(zip(missing, np.asarray(encode(missing), dtype=np.float32)))
+            if len(self._extra) + len(missing) <= MAX_EXTRA_PROMPTS:
+                with self._extra_lock:
+                    self._extra.update(encoded)
+        return np.stack([self.embeddings[r] if r >= 0 else (encoded[p] if p in encoded else self._extra[p])
+                         for p, r in zip(prompts, rows)])
+
+    def logits(self, image_embeddings: np.ndarray, prompts: Sequence[str],
+               encode: Optional[TextEncoder] = None) -> np.ndarray:
+        """CLIP logits_per_image for normalized image embeddings (dim,) or (n, dim) against prompts."""
+        return self.logit_scale * (np.asarray(image_embeddings, dtype=np.float32) @ self.matrix(prompts, encode).T)
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def paths(bank_dir: Path, key: str):
+        return bank_dir / f"clip_text_bank_{key}.npy", bank_dir / f"clip_text_bank_{key}.json"
+
+    def save(self, bank_dir: Path) -> None:
+        """Write the float16 bank and its sidecar atomically; older banks in bank_dir are removed."""
+        bank_dir.mkdir(parents=True, exist_ok=True)
+        npy_path, meta_path = self.paths(bank_dir, self.key)
+        meta = {
+            "format": BANK_FORMAT,
+            "key": self.key,
+            "logit_scale": self.logit_scale,
+            "prompts_sha256": _prompts_sha(self.prompts),
+            "prompts": self.prompts,
+        }
+        tmp_npy = npy_path.with_name(npy_path.name + f".{os.getpid()}.tmp")
+        tmp_meta = meta_path.with_name(meta_path.name + f".{os.getpid()}.tmp")
+        with open(tmp_npy, "wb") as f:
+            np.save(f, self.embeddings.astype(np.float16))
+        tmp_meta.write_text(json.dumps(meta), encoding="utf-8")
+        os.replace(tmp_npy, npy_path)
+        os.replace(tmp_meta, meta_path)  # sidecar last: a bank is valid once its sidecar exists
+        for old in bank_dir.glob("clip_text_bank_*"):
+            if old not in (npy_path, meta_path) and not old.name.endswith(".tmp"):
+                old.unlink(missing_ok=True)
+
+    @classmethod
+    def load(cls, bank_dir: Path, key: str, prompts: Sequence[str]) -> Optional["TextEmbeddingBank"]:
+        """The persisted bank for key, or None when it is missing or was built for other prompts."""
+        npy_path, meta_path = cls.paths(bank_dir, key)
+        if not npy_path.exists() or not meta_path.exists():
+            return None
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            if meta.get("format") != BANK_FORMAT or meta.get("prompts_sha256") != _prompts_sha(prompts):
+                return None
+            embeddings = np.load(npy_path)
+            if embeddings.shape[0] != len(meta["prompts"]):
+                return None
+            return cls(list(meta["prompts"]), embeddings, meta["logit_scale"], key)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable CLIP text bank {npy_path}: {e}")
+            return None
+
+    @classmethod
+    def build(cls, prompts: List[str], encode: TextEncoder, logit_scale: float, key: str,
+              batch_size: int = 256) -> "TextEmbeddingBank":
+        chunks = [np.asarray(encode(prompts[i:i + batch_size]), dtype=np.float32)
+                  for i in range(0, len(prompts), batch_size)]
+        embeddings = np.concatenate(chunks) if chunks else np.zeros((0, 0), dtype=np.float32)
+        return cls(list(prompts), embeddings, logit_scale, key)
+
+    @classmethod
+    def load_or_build(cls, bank_dir: Optional[Path], key: str, prompts: List[str],
+                      encode: TextEncoder, logit_scale: float) -> "TextEmbeddingBank":
+        """Persisted bank when it matches, else encode all prompts (and persist if bank_dir is set)."""
+        if bank_dir is not None:
+            bank = cls.load(bank_dir, key, prompts)
+            if bank is not None:
+                logger.info(f"✅ Loaded CLIP text bank {key}: {len(bank)} prompts")
+                return bank
+        bank = cls.build(prompts, encode, logit_scale, key)
+        logger.info(f"✅ Encoded CLIP text bank {key}: {len(bank)} prompts")
+        if bank_dir is not None:
+            try:
+                bank.save(bank_dir)
+            except Exception as e:
+                logger.warning(f"Could not save CLIP text bank to {bank_dir}: {e}")
+        return bank
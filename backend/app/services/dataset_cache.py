@@ -0,0 +1,177 @@
+"""
+Dataset cache - a columnar binary copy of the dataset CSV, next to the CSV.
+
+Every consumer of the dataset (DatasetLoader, the Streamlit app, the daily
+update pipeline, the retrain scripts) used to parse the full CSV on start.
+read_dataset() parses it once and writes the resulting frame next to it:
+
+- <stem>.<variant>.feather  Arrow IPC (pyarrow), categoricals kept as
+                            dictionary columns; a pickle (.pkl) when pyarrow
+                            is not installed
+- <stem>.<variant>.json     the key: source size, mtime_ns, SHA-256, variant,
+                            read_csv options, pandas version, format
+
+On the next load size + mtime are compared first (no hashing); when they
+differ the CSV is hashed, and an unchanged hash only refreshes the key (a
+touched or copied file). Any other difference rebuilds the cache. 'variant'
+names what 'transform' does to the parsed frame, so loaders with different
+dtypes keep separate caches. Cache problems are logged and never fail a
+load - the CSV is always the source of truth.
+
+This module only depends on pandas so scripts outside the backend can use
+it (sys.path.insert(0, <repo>/backend); from app.services.dataset_cache
+import read_dataset).
+"""
+
+import hashlib
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple, Union
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+CACHE_SCHEMA = 1
+HASH_CHUNK_BYTES = 1 << 20
+
+try:
+    import pyarrow  # noqa: F401
+    CACHE_FORMAT = 'feather'
+except ImportError:
+    CACHE_FORMAT = 'pickle'
+
+_SUFFIX = {'feather': '.feather', 'pickle': '.pkl'}
+
+
+def cache_paths(csv_path: Union[str, Path], variant: str = 'raw') -> Tuple[Path, Path]:
+    """(data file, key file) of the cache for csv_path."""
+    csv_path = Path(csv_path)
+    base = csv_path.with_name(f"{csv_path.stem}.{variant}")
+    return base.with_name(base.name + _SUFFIX[CACHE_FORMAT]), base.with_name(base.name + '.json')
+
+
+def file_sha256(path: Union[str, Path]) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_BYTES), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _key(csv_path: Path, variant: str, options: Dict, sha256: Optional[str] = None) -> Dict:
+    stat = csv_path.stat()
+    return {
+        'schema': CACHE_SCHEMA,
+        'source': {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns,
+                   'sha256': sha256 or file_sha256(csv_path)},
+        'variant': variant,
+        'options': repr(sorted(options.items())),
+        'pandas': pd.__version__,
+        'format': CACHE_FORMAT,
+    }
+
+
+def _read_key(key_path: Path) -> Optional[Dict]:
+    try:
+        with open(key_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_atomic(path: Path, write: Callable[[Path], None]):
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        write(tmp)
+        os.replace(tmp, path)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+
+
+def _write_key(key_path: Path, key: Dict):
+    _write_atomic(key_path, lambda p: p.write_text(json.dumps(key, indent=2), encoding='utf-8'))
+
+
+def _load_frame(data_path: Path) -> pd.DataFrame:
+    if CACHE_FORMAT == 'feather':
+        return pd.read_feather(data_path)
+    return pd.read_pickle(data_path)
+
+
+def _save_frame(df: pd.DataFrame, data_path: Path):
+    if CACHE_FORMAT == 'feather':
+        # Feather stores only a default RangeIndex
+        _write_atomic(data_path, lambda p: df.reset_index(drop=True).to_feather(p))
+    else:
+        _write_atomic(data_path, lambda p: df.to_pickle(p))
+
+
+def _cache_valid(csv_path: Path, data_path: Path, key_path: Path, variant: str, options: Dict) -> bool:
+    """True when the cache on disk was built from this CSV content (refreshes a stale mtime)."""
+    stored = _read_key(key_path)
+    if stored is None or not data_path.exists():
+        return False
+    stat = csv_path.stat()
+    source = stored.get('source', {})
+    fixed = {k: v for k, v in stored.items() if k != 'source'}
+    expected = {'schema': CACHE_SCHEMA, 'variant': variant, 'options': repr(sorted(options.items())),
+                'pandas': pd.__version__, 'format': CACHE_FORMAT}
+    if fixed != expected:
+        return False
+    if source.get('size') == stat.st_size and source.get('mtime_ns') == stat.st_mtime_ns:
+        return True
+    if source.get('size') != stat.st_size:
+        return False
+    sha256 = file_sha256(csv_path)
+    if source.get('sha256') != sha256:
+        return False
+    # Same bytes, new mtime (touched / copied): keep the cache, refresh the key
+    try:
+        _write_key(key_path, _key(csv_path, variant, options, sha256))
+    except OSError:
+        pass
+    return True
+
+
+def read_dataset(csv_path: Union[str, Path], transform: Optional[Callable[[pd.DataFrame], pd.DataFrame]] = None,
+                 variant: str = 'raw', use_cache: bool = True, **read_csv_kwargs) -> pd.DataFrame:
+    """
+    pd.read_csv(csv_path, **read_csv_kwargs), then transform(df), served from
+    the binary cache when it matches the CSV. 'variant' must change whenever
+    'transform' changes what it returns.
+    """
+    csv_path = Path(csv_path)
+    if not use_cache:
+        df = pd.read_csv(csv_path, **read_csv_kwargs)
+        return transform(df) if transform else df
+
+    data_path, key_path = cache_paths(csv_path, variant)
+    started = time.perf_counter()
+    try:
+        if _cache_valid(csv_path, data_path, key_path, variant, read_csv_kwargs):
+            df = _load_frame(data_path)
+            logger.info(f"✅ Dataset read from {CACHE_FORMAT} cache {data_path.name} in "
+                        f"{(time.perf_counter() - started) * 1000:.0f} ms ({len(df):,} rows)")
+            return df
+    except Exception as e:
+        logger.warning(f"⚠️ Dataset cache {data_path} unreadable, rebuilding from CSV: {e}")
+
+    # Key first: a CSV rewritten while it is parsed must not validate the cache
+    key = _key(csv_path, variant, read_csv_kwargs)
+    df = pd.read_csv(csv_path, **read_csv_kwargs)
+    if transform:
+        df = transform(df)
+    parsed_ms = (time.perf_counter() - started) * 1000
+    try:
+        key_path.unlink(missing_ok=True)
+        _save_frame(df, data_path)
+        _write_key(key_path, key)
+        logger.info(f"✅ Dataset parsed from CSV in {parsed_ms:.0f} ms; {CACHE_FORMAT} cache written to {data_path}")
+    except Exception as e:
+        logger.warning(f"⚠️ Could not write dataset cache {data_path}: {e}")
+    return df
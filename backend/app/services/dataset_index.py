@@ -0,0 +1,181 @@
+"""
+Dataset index - categorical lookups over the loaded car dataset.
+
+Built once per load by DatasetLoader. Read paths used to lowercase the whole
+make/model column on every call (df['make'].str.lower() == make.lower());
+here each string column is canonicalized once (stripped, lowercase) into a
+Categorical, and rows are grouped by
+
+- (make)
+- (make, model)
+- (make, model, year)
+
+into sorted row-position arrays, so a lookup costs O(matching rows) instead
+of O(dataset). Masks on other columns (location, condition, fuel_type, ...)
+compare integer codes instead of strings.
+"""
+
+import logging
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# String columns that get a canonical lowercase Categorical (when present)
+INDEXED_COLUMNS = ['make', 'model', 'trim', 'location', 'condition', 'fuel_type', 'transmission', 'color',
+                   'make_norm']
+
+_EMPTY = np.empty(0, dtype=np.intp)
+
+
+def canonical(value) -> str:
+    """Canonical form used for every lookup key: stripped, lowercase."""
+    if value is None:
+        return ''
+    return str(value).strip().lower()
+
+
+def _canonical_categorical(values: pd.Series) -> pd.Categorical:
+    """Lowercase/stripped Categorical; only the unique values go through Python."""
+    codes, uniques = pd.factorize(values, use_na_sentinel=True)
+    canonical_codes, categories = pd.factorize(pd.Index([canonical(u) for u in uniques], dtype=object))
+    mapped = np.where(codes >= 0, canonical_codes[np.maximum(codes, 0)], -1) if len(uniques) else codes
+    return pd.Categorical.from_codes(mapped, categories=pd.Index(categories, dtype=object))
+
+
+class DatasetIndex:
+    """Canonical categorical columns plus make / make-model / make-model-year row groups"""
+
+    def __init__(self, df: pd.DataFrame):
+        started = time.perf_counter()
+        self.df = df
+        self.n_rows = len(df)
+        self._columns: Dict[str, pd.Categorical] = {}
+        self._codes: Dict[str, Dict[str, int]] = {}
+        for col in INDEXED_COLUMNS:
+            if col in df.columns:
+                cat = _canonical_categorical(df[col])
+                self._columns[col] = cat
+                self._codes[col] = {c: i for i, c in enumerate(cat.categories)}
+
+        self._by_make: Dict[int, np.ndarray] = {}
+        self._by_make_model: Dict[Tuple[int, int], np.ndarray] = {}
+        self._by_make_model_year: Dict[Tuple[int, int, int], np.ndarray] = {}
+        self._models_by_make: Dict[int, Set[int]] = {}
+        if 'make' in self._columns and 'model' in self._columns:
+            self._build_groups(df)
+
+        self.build_ms = (time.perf_counter() - started) * 1000.0
+        logger.info(f"✅ Dataset index built in {self.build_ms:.0f} ms: {len(self._by_make)} makes, "
+                    f"{len(self._by_make_model)} make/models, {len(self._by_make_model_year)} make/model/years")
+
+    def _build_groups(self, df: pd.DataFrame) -> None:
+        make_codes = self._columns['make'].codes.astype(np.int64)
+        model_codes = self._columns['model'].codes.astype(np.int64)
+        if 'year' in df.columns:
+            years = pd.to_numeric(df['year'], errors='coerce').to_numpy(dtype=np.float64)
+            year_codes = np.where(np.isfinite(years), years, -1).astype(np.int64)
+        else:
+            year_codes = np.full(self.n_rows, -1, dtype=np.int64)
+        keys = pd.DataFrame({'make': make_codes, 'model': model_codes, 'year': year_codes})
+
+        # groupby(...).indices: key -> ascending row positions; -1 marks a missing value
+        self._by_make = {
+            int(mk): v for mk, v in keys.groupby('make', sort=False).indices.items() if mk >= 0
+        }
+        self._by_make_model = {
+            (int(mk), int(md)): v
+            for (mk, md), v in keys.groupby(['make', 'model'], sort=False).indices.items()
+            if mk >= 0 and md >= 0
+        }
+        self._by_make_model_year = {
+            (int(mk), int(md), int(yr)): v
+            for (mk, md, yr), v in keys.groupby(['make', 'model', 'year'], sort=False).indices.items()
+            if mk >= 0 and md >= 0 and yr >= 0
+        }
+        for mk, md in self._by_make_model:
+            self._models_by_make.setdefault(mk, set()).add(md)
+
+    # ------------------------------------------------------------------
+    # Codes and columns
+    # ------------------------------------------------------------------
+
+    def code(self, column: str, value) -> Optional[int]:
+        """Category code of a value in a column (None if the value never occurs)."""
+        codes = self._codes.get(column)
+        return codes.get(canonical(value)) if codes is not None else None
+
+    def column(self, column: str) -> Optional[pd.Series]:
+        """Canonical (lowercase) Categorical column aligned with the dataset's index."""
+        cat = self._columns.get(column)
+        return pd.Series(cat, index=self.df.index, name=column, copy=False) if cat is not None else None
+
+    def codes(self, column: str) -> Optional[np.ndarray]:
+        """Category codes per row (-1 = missing) for an indexed column."""
+        cat = self._columns.get(column)
+        return cat.codes if cat is not None else None
+
+    def categories(self, column: str) -> pd.Index:
+        """Canonical values of an indexed column; position == category code."""
+        cat = self._columns.get(column)
+        return cat.categories if cat is not None else pd.Index([], dtype=object)
+
+    def n_categories(self, column: str) -> int:
+        return len(self.categories(column))
+
+    def mask(self, column: str, value) -> np.ndarray:
+        """Boolean row mask: canonical(column) == canonical(value)."""
+        cat = self._columns.get(column)
+        code = self.code(column, value)
+        if cat is None or code is None:
+            return np.zeros(self.n_rows, dtype=bool)
+        return cat.codes == code
+
+    # ------------------------------------------------------------------
+    # Group lookups
+    # ------------------------------------------------------------------
+
+    def rows(self, make, model=None, year=None) -> np.ndarray:
+        """Row positions for a make, make/model or make/model/year (empty if none)."""
+        make_code = self.code('make', make)
+        if make_code is None:
+            return _EMPTY
+        if model is None:
+            return self._by_make.get(make_code, _EMPTY)
+        model_code = self.code('model', model)
+        if model_code is None:
+            return _EMPTY
+        if year is None:
+            return self._by_make_model.get((make_code, model_code), _EMPTY)
+        try:
+            year_code = int(year)
+        except (ValueError, TypeError):
+            return _EMPTY
+        return self._by_make_model_year.get((make_code, model_code, year_code), _EMPTY)
+
+    def frame(self, make, model=None, year=None) -> pd.DataFrame:
+        """Dataset rows for a make, make/model or make/model/year."""
+        return self.df.iloc[self.rows(make, model, year)]
+
+    def count(self, make, model=None, year=None) -> int:
+        return len(self.rows(make, model, year))
+
+    def has_make(self, make) -> bool:
+        return self.code('make', make) in self._by_make
+
+    def has_model(self, make, model) -> bool:
+        return len(self.rows(make, model)) > 0
+
+    def makes(self) -> List[str]:
+        """Canonical makes present in the dataset."""
+        categories = self._columns['make'].categories if 'make' in self._columns else []
+        return [categories[code] for code in self._by_make]
+
+    def models(self, make) -> List[str]:
+        """Canonical models present for a make."""
+        make_code = self.code('make', make)
+        categories = self._columns['model'].categories if 'model' in self._columns else []
+        return [categories[code] for code in self._models_by_make.get(make_code, ())]
@@ -1,25 +1,132 @@
 """
 Dataset loader service - loads and caches the car dataset
+
+The dataset and everything derived from it (index, market stats cube,
+similar-car index, option catalog) live in one immutable DatasetSnapshot. reload() builds a
+new snapshot while the current one keeps serving and installs it with a
+single reference swap, so a request that took the snapshot once never mixes
+generations.
 """
 
 import pandas as pd
 import numpy as np
 from pathlib import Path
-from typing import Optional
+from typing import NamedTuple, Optional, Tuple
 import logging
+import threading
+import time
 from functools import lru_cache
 
 from app.config import settings
+from app.services.canonicalization import add_canonical_columns
+from app.services.dataset_cache import read_dataset
+from app.services.dataset_index import DatasetIndex
+from app.services.market_stats import MarketStatsCube
+from app.services.similar_cars import LINK_COLUMNS, SimilarCarIndex
+from app.services.vehicle_catalog import VehicleCatalog
 
 logger = logging.getLogger(__name__)
 
+PRICE_COLUMNS = ['price', 'Price', 'PRICE', 'predicted_price', 'target']
+
+# Columns the API reads; everything else in the CSV is dropped at load
+SERVING_COLUMNS = [
+    'make', 'model', 'trim', 'year', 'mileage', 'condition', 'fuel_type', 'location',
+    'transmission', 'color', 'engine_size', 'cylinders', 'image_1',
+    # alternate names the cars routes look for
+    'Location', 'city', 'City', 'region', 'Region', 'Trim', 'variant', 'Variant', 'version', 'Version',
+] + PRICE_COLUMNS + LINK_COLUMNS
+
+# Integer columns downcast when they have no missing values (else float32)
+SMALL_INT_COLUMNS = {'year': np.int16, 'cylinders': np.int8}
+
+# String columns with at most this many distinct values per row become categoricals
+CATEGORICAL_MAX_UNIQUE_RATIO = 0.5
+
+# Name of the compact frame in the dataset cache; bump when compact_dataset() changes
+COMPACT_VARIANT = 'compact-v1'
+
+
+def source_version(path: Path) -> Optional[Tuple[int, int]]:
+    """(size, mtime_ns) of the dataset file, None when it can't be read."""
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _price_column(df: Optional[pd.DataFrame]) -> Optional[str]:
+    if df is None:
+        return None
+    for col in PRICE_COLUMNS:
+        if col in df.columns:
+            return col
+    return None
+
+
+def _memory_mb(df: pd.DataFrame) -> float:
+    return df.memory_usage(deep=True).sum() / (1024 * 1024)
+
+
+def _float32_if_exact(values: pd.Series) -> pd.Series:
+    """float32 copy of a numeric column when no value changes, else the column as is."""
+    as_float = values.to_numpy(dtype=np.float64)
+    narrowed = as_float.astype(np.float32)
+    if np.array_equal(narrowed.astype(np.float64), as_float, equal_nan=True):
+        return pd.Series(narrowed, index=values.index, name=values.name)
+    return values
+
+
+def compact_dataset(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Serving copy of the dataset: only SERVING_COLUMNS, repeated strings as
+    categoricals, year/cylinders as small ints, other numbers as float32 when
+    that is exact. Row index and values are unchanged.
+    """
+    before_mb = _memory_mb(df)
+    keep = [col for col in df.columns if col in SERVING_COLUMNS]
+    compact = df[keep].copy() if keep else df.copy()
+    for col in compact.columns:
+        values = compact[col]
+        if col in SMALL_INT_COLUMNS:
+            numeric = pd.to_numeric(values, errors='coerce')
+            info = np.iinfo(SMALL_INT_COLUMNS[col])
+            if numeric.notna().all() and numeric.between(info.min, info.max).all() \
+                    and (numeric == numeric.round()).all():
+                compact[col] = numeric.astype(SMALL_INT_COLUMNS[col])
+            elif values.notna().sum() == numeric.notna().sum():
+                compact[col] = _float32_if_exact(numeric)
+        elif pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+            compact[col] = _float32_if_exact(values)
+        elif pd.api.types.is_object_dtype(values) or pd.api.types.is_string_dtype(values):
+            if values.nunique(dropna=True) <= CATEGORICAL_MAX_UNIQUE_RATIO * max(len(values), 1):
+                compact[col] = values.astype('category')
+    dropped = len(df.columns) - len(compact.columns)
+    logger.info(f"✅ Dataset compacted: {before_mb:.1f} MB -> {_memory_mb(compact):.1f} MB "
+                f"({len(compact.columns)} columns kept, {dropped} dropped)")
+    return compact
+
+
+class DatasetSnapshot(NamedTuple):
+    """One generation of the dataset and the structures built from it"""
+    dataset: Optional[pd.DataFrame] = None
+    index: Optional[DatasetIndex] = None
+    market_stats: Optional[MarketStatsCube] = None
+    similar_cars: Optional[SimilarCarIndex] = None
+    catalog: Optional[VehicleCatalog] = None
+    price_col: Optional[str] = None
+    source_version: Optional[Tuple[int, int]] = None  # (size, mtime_ns) of the CSV read
+    loaded_at: Optional[float] = None
+
 
 class DatasetLoader:
     """Singleton class to load and cache the car dataset"""
     
     _instance = None
-    _dataset: Optional[pd.DataFrame] = None
+    _snapshot: DatasetSnapshot = DatasetSnapshot()
     _loaded = False
+    _reload_lock = threading.Lock()
     
     def __new__(cls):
         if cls._instance is None:
@@ -36,6 +143,34 @@ class DatasetLoader:
     
     def load_dataset(self):
         """Load the car dataset from CSV"""
+        version = source_version(settings.DATA_FILE)
+        self._snapshot = self._build_snapshot(self._read_dataset(), version)
+        self._loaded = True
+
+    def reload(self) -> bool:
+        """
+        Re-read DATA_FILE and swap in a new snapshot; the current one serves
+        until then. Returns False (and keeps the current snapshot) when the
+        file can't be loaded.
+        """
+        with self._reload_lock:
+            started = time.perf_counter()
+            version = source_version(settings.DATA_FILE)
+            df = self._read_dataset()
+            if df is None:
+                logger.warning("⚠️ Dataset reload failed; keeping the previous dataset")
+                return False
+            snapshot = self._build_snapshot(df, version)
+            previous = self._snapshot
+            self._snapshot = snapshot  # single reference swap
+            self._loaded = True
+        old_rows = len(previous.dataset) if previous.dataset is not None else 0
+        logger.info(f"✅ Dataset reloaded in {(time.perf_counter() - started) * 1000:.0f} ms: "
+                    f"{old_rows:,} -> {len(df):,} rows")
+        return True
+
+    def _read_dataset(self) -> Optional[pd.DataFrame]:
+        """Compact dataset with canonical columns, or None (logged) when it can't be loaded."""
         try:
             # Check if file exists
             if not settings.DATA_FILE.exists():
@@ -43,84 +178,157 @@ class DatasetLoader:
                 logger.error(f"Please ensure the dataset file exists at one of these locations:")
                 logger.error(f"  - {settings.DATA_FILE}")
                 logger.error(f"  - {settings.DATA_FILE.parent.parent / 'data' / 'cleaned_car_data.csv'}")
-                self._dataset = None
-                self._loaded = True
-                return
+                return None
             
             # Check if file is readable
             if not settings.DATA_FILE.is_file():
                 logger.error(f"Dataset path exists but is not a file: {settings.DATA_FILE}")
-                self._dataset = None
-                self._loaded = True
-                return
+                return None
             
             logger.info(f"Loading dataset from: {settings.DATA_FILE}")
-            self._dataset = pd.read_csv(settings.DATA_FILE)
+            df = read_dataset(settings.DATA_FILE, transform=compact_dataset, variant=COMPACT_VARIANT,
+                              use_cache=settings.DATASET_CACHE_ENABLED)
             
             # Verify dataset is not empty
-            if len(self._dataset) == 0:
+            if len(df) == 0:
                 logger.error("Dataset file is empty")
-                self._dataset = None
-                self._loaded = True
-                return
+                return None
             
             # Ensure price column exists (might be named differently)
-            price_columns = ['price', 'Price', 'PRICE', 'predicted_price', 'target']
-            price_col = None
-            for col in price_columns:
-                if col in self._dataset.columns:
-                    price_col = col
-                    break
-            
+            price_col = _price_column(df)
             if price_col is None:
                 logger.warning("No price column found in dataset")
             else:
-                logger.info(f"Dataset loaded successfully: {len(self._dataset):,} rows, price column: {price_col}")
+                logger.info(f"Dataset loaded successfully: {len(df):,} rows, price column: {price_col}, "
+                            f"{_memory_mb(df):.1f} MB in memory")
             
             # Verify required columns exist
             required_columns = ['make', 'model', 'location']
-            missing_columns = [col for col in required_columns if col not in self._dataset.columns]
+            missing_columns = [col for col in required_columns if col not in df.columns]
             if missing_columns:
                 logger.warning(f"Missing columns in dataset: {missing_columns}")
-            
-            self._loaded = True
+
+            # Canonical make/model/trim columns for equality-only matching
+            add_canonical_columns(df)
+            return df
         except pd.errors.EmptyDataError:
             logger.error(f"Dataset file is empty or corrupted: {settings.DATA_FILE}")
-            self._dataset = None
-            self._loaded = True
         except pd.errors.ParserError as e:
             logger.error(f"Failed to parse dataset CSV: {e}")
-            self._dataset = None
-            self._loaded = True
         except PermissionError:
             logger.error(f"Permission denied reading dataset file: {settings.DATA_FILE}")
-            self._dataset = None
-            self._loaded = True
         except Exception as e:
             logger.error(f"Failed to load dataset: {e}", exc_info=True)
-            self._dataset = None
-            self._loaded = True
-    
+        return None
+
+    @classmethod
+    def _build_snapshot(cls, df: Optional[pd.DataFrame],
+                        version: Optional[Tuple[int, int]] = None) -> DatasetSnapshot:
+        price_col = _price_column(df)
+        index = cls._build_index(df)
+        return DatasetSnapshot(
+            dataset=df,
+            index=index,
+            market_stats=cls._build_market_stats(df, index, price_col),
+            similar_cars=cls._build_similar_cars(df, price_col),
+            catalog=cls._build_catalog(df, index),
+            price_col=price_col,
+            source_version=version,
+            loaded_at=time.time(),
+        )
+
     @property
-    def dataset(self) -> Optional[pd.DataFrame]:
-        """Get the loaded dataset"""
+    def snapshot(self) -> DatasetSnapshot:
+        """Current dataset generation; read it once per request for a consistent view"""
         if not self._loaded:
             self.load_dataset()
-        return self._dataset
+        return self._snapshot
+
+    @property
+    def dataset(self) -> Optional[pd.DataFrame]:
+        """Get the loaded dataset"""
+        return self.snapshot.dataset
     
+    @property
+    def index(self) -> Optional[DatasetIndex]:
+        """Categorical make/model/year index over the loaded dataset"""
+        return self.snapshot.index
+
+    @staticmethod
+    def _build_index(df: Optional[pd.DataFrame]) -> Optional[DatasetIndex]:
+        if df is None:
+            return None
+        try:
+            return DatasetIndex(df)
+        except Exception as e:
+            logger.error(f"Failed to build dataset index: {e}", exc_info=True)
+            return None
+
+    @property
+    def market_stats(self) -> Optional[MarketStatsCube]:
+        """Precomputed price aggregates per year/condition/make/model/... (refreshed on load)"""
+        return self.snapshot.market_stats
+
+    @staticmethod
+    def _build_market_stats(df: Optional[pd.DataFrame], index: Optional[DatasetIndex],
+                            price_col: Optional[str]) -> Optional[MarketStatsCube]:
+        if df is None or index is None or price_col is None:
+            return None
+        try:
+            return MarketStatsCube(df, index, price_col)
+        except Exception as e:
+            logger.error(f"Failed to build market stats cube: {e}", exc_info=True)
+            return None
+
+    @property
+    def similar_cars(self) -> Optional[SimilarCarIndex]:
+        """Nearest-neighbour index for similar-car lookups (refreshed on load)"""
+        return self.snapshot.similar_cars
+
+    @staticmethod
+    def _build_similar_cars(df: Optional[pd.DataFrame], price_col: Optional[str]) -> Optional[SimilarCarIndex]:
+        if df is None or price_col is None:
+            return None
+        try:
+            weights = (settings.SIMILAR_CARS_YEAR_WEIGHT, settings.SIMILAR_CARS_MILEAGE_WEIGHT,
+                       settings.SIMILAR_CARS_PRICE_WEIGHT)
+            return SimilarCarIndex(df, price_col, weights=weights)
+        except Exception as e:
+            logger.error(f"Failed to build similar-car index: {e}", exc_info=True)
+            return None
+
+    @property
+    def catalog(self) -> Optional[VehicleCatalog]:
+        """Precomputed dropdown/option lists (refreshed on load)"""
+        return self.snapshot.catalog
+
+    @staticmethod
+    def _build_catalog(df: Optional[pd.DataFrame], index: Optional[DatasetIndex]) -> Optional[VehicleCatalog]:
+        if df is None or index is None:
+            return None
+        try:
+            return VehicleCatalog(df, index)
+        except Exception as e:
+            logger.error(f"Failed to build vehicle catalog: {e}", exc_info=True)
+            return None
+
     @property
     def is_loaded(self) -> bool:
         """Check if dataset is loaded"""
         return self._loaded
     
+    def prepare_for_fork(self):
+        """
+        Rebuild the dataset so forked workers can share its pages: blocks are
+        consolidated into contiguous NumPy arrays. Dtypes are unchanged.
+        Call once in the master.
+        """
+        current = self._snapshot
+        if current.dataset is None:
+            return
+        self._snapshot = self._build_snapshot(current.dataset.copy(), current.source_version)
+        logger.info(f"Dataset prepared for fork sharing: {_memory_mb(self._snapshot.dataset):.1f} MB")
+
     def get_price_column(self) -> Optional[str]:
         """Get the name of the price column"""
-        if self._dataset is None:
-            return None
-        
-        price_columns = ['price', 'Price', 'PRICE', 'predicted_price', 'target']
-        for col in price_columns:
-            if col in self._dataset.columns:
-                return col
-        return None
-
+        return self._snapshot.price_col
@@ -0,0 +1,139 @@
+"""
+Background reload of the serving dataset.
+
+daily_update_pipeline.py rewrites the dataset CSV; the backend used to keep
+serving the frame it read at startup. A daemon thread polls DATA_FILE
+(size, mtime_ns) and, once a change has been stable for one poll (the file
+is not half written), has DatasetLoader build a new snapshot - frame, index,
+stats cube, similar-car index - while the current one keeps serving, then
+swap it in. Requests already holding the old snapshot finish on it. An admin
+can trigger the same reload without waiting for the poll.
+
+Every worker process has its own DatasetLoader and watcher. A triggered
+reload (POST /api/admin/settings/dataset/reload) only reloads the worker
+that received the request; the others swap on their next poll
+(DATASET_WATCH_INTERVAL_SECONDS), or never if DATASET_WATCH_ENABLED is off.
+
+After a swap, dataset-derived caches elsewhere (CLIP make/model labels and
+their labels_version) are dropped so they rebuild from the new data.
+"""
+
+import logging
+import sys
+import threading
+import time
+from typing import Optional, Tuple
+
+from app.config import settings
+from app.services.dataset_loader import DatasetLoader, source_version
+
+logger = logging.getLogger(__name__)
+
+
+class DatasetReloader:
+    """Watches the dataset file and swaps in reloaded snapshots"""
+
+    def __init__(self, interval_seconds: float = 30.0):
+        self.interval_seconds = interval_seconds
+        self.last_reload_at: Optional[float] = None
+        self.last_reload_ms: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.reloads = 0
+        self._seen: Optional[Tuple[int, int]] = None
+        self._reload_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._trigger_thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="dataset-reload", daemon=True)
+        self._thread.start()
+        logger.info(f"Dataset reload watcher started (every {self.interval_seconds:g}s)")
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_seconds):
+            try:
+                if self.file_changed():
+                    self.reload_now()
+            except Exception as e:
+                self.last_error = str(e)
+                logger.error(f"Dataset reload check failed: {e}", exc_info=True)
+
+    def file_changed(self) -> bool:
+        """True when DATA_FILE differs from the serving snapshot and did not change since the last poll."""
+        current = source_version(settings.DATA_FILE)
+        if current is None or current == DatasetLoader.get_instance().snapshot.source_version:
+            self._seen = None
+            return False
+        stable = current == self._seen
+        self._seen = current
+        return stable
+
+    def trigger(self) -> bool:
+        """Start a reload in the background; False if one is already running."""
+        if self._reload_lock.locked() or (self._trigger_thread is not None and self._trigger_thread.is_alive()):
+            return False
+        self._trigger_thread = threading.Thread(target=self.reload_now, name="dataset-reload-trigger", daemon=True)
+        self._trigger_thread.start()
+        return True
+
+    def reload_now(self) -> bool:
+        """Reload the dataset and swap it in. Returns True if a new snapshot was installed."""
+        with self._reload_lock:
+            started = time.perf_counter()
+            try:
+                swapped = DatasetLoader.get_instance().reload()
+            except Exception as e:
+                self.last_error = str(e)
+                logger.error(f"❌ Dataset reload failed: {e}", exc_info=True)
+                return False
+            if not swapped:
+                self.last_error = "dataset could not be loaded; previous dataset kept"
+                return False
+            self._seen = None
+            self._invalidate_dependents()
+            self.last_error = None
+            self.last_reload_at = time.time()
+            self.last_reload_ms = round((time.perf_counter() - started) * 1000, 1)
+            self.reloads += 1
+            return True
+
+    @staticmethod
+    def _invalidate_dependents() -> None:
+        """Drop caches built from the previous dataset (only modules already in use)."""
+        detection = sys.modules.get('app.services.car_detection_service')
+        if detection is not None:
+            detection.invalidate_labels()
+
+    def status(self) -> dict:
+        snapshot = DatasetLoader.get_instance().snapshot
+        return {
+            'rows': len(snapshot.dataset) if snapshot.dataset is not None else 0,
+            'source_version': list(snapshot.source_version) if snapshot.source_version else None,
+            'loaded_at': snapshot.loaded_at,
+            'reloading': self._reload_lock.locked(),
+            'last_reload_at': self.last_reload_at,
+            'last_reload_ms': self.last_reload_ms,
+            'reloads': self.reloads,
+            'last_error': self.last_error,
+            'watching': self._thread is not None and self._thread.is_alive(),
+        }
+
+
+_instance: Optional[DatasetReloader] = None
+
+
+def get_dataset_reloader() -> DatasetReloader:
+    global _instance
+    if _instance is None:
+        _instance = DatasetReloader(interval_seconds=settings.DATASET_WATCH_INTERVAL_SECONDS)
+    return _instance
@@ -0,0 +1,331 @@
+"""
+Content-addressed image embedding store shared by detection and analysis.
+
+Image embeddings (CLIP for car detection, ResNet50 features for
+ImageAnalyzer) only depend on the image bytes and the model, so they are
+keyed by the SHA-256 of the file content: the same photo on another listing,
+a re-upload or a call to /api/ai/detect-car reuses the vector computed the
+first time.
+
+Layout under the store directory:
+- <space>.f32   float32 rows of one embedding space (model + preprocessing),
+                memory-mapped; a row is a slot, freed slots are reused
+- index.db      SQLite: (space, sha256) -> slot, generation, last use;
+                spaces; free slots
+
+The store is bounded by EMBEDDING_STORE_MAX_MB of live vectors; beyond that
+the least recently used entries (over all spaces) are evicted. The index is
+shared by all uvicorn workers (WAL, slot allocation in IMMEDIATE
+transactions). Vector files are written outside SQLite, so a reader checks
+after reading that each key still maps to the same slot and generation (a
+concurrent put may have evicted it and reused the slot). Store problems are
+logged and never fail a request - callers just compute the embedding again.
+
+No torch import here; callers pass the vectors they computed.
+"""
+
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.services.dataset_cache import file_sha256
+
+logger = logging.getLogger(__name__)
+
+# Evict down to this fraction of max_bytes, so a full store does not evict on every put
+_EVICT_TO = 0.9
+
+# Rows added to a .f32 file at least when it grows
+_MIN_GROW_ROWS = 256
+
+# SQLite host parameters per IN (...) query
+_QUERY_CHUNK = 500
+
+
+def image_sha256(path: str) -> Optional[str]:
+    """SHA-256 of the image file content (the store key), None if unreadable."""
+    try:
+        return file_sha256(path)
+    except OSError as e:
+        logger.warning(f"Could not hash image {path}: {e}")
+        return None
+
+
+class EmbeddingStore:
+    """SHA-256 keyed float32 vectors in memory-mapped files, SQLite index, LRU by size"""
+
+    def __init__(self, root: Path, max_bytes: int):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._maps: Dict[str, np.memmap] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        # SQLite connections must not cross fork() (preloaded gunicorn master)
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._reset_connections)
+        self.root.mkdir(parents=True, exist_ok=True)
+        conn = self._db()
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS spaces (
+                space TEXT PRIMARY KEY,
+                dim INTEGER NOT NULL,
+                next_slot INTEGER NOT NULL DEFAULT 0,
+                count INTEGER NOT NULL DEFAULT 0,
+                generation INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE TABLE IF NOT EXISTS embeddings (
+                space TEXT NOT NULL,
+                sha256 TEXT NOT NULL,
+                slot INTEGER NOT NULL,
+                generation INTEGER NOT NULL DEFAULT 0,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (space, sha256)
+            );
+            CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings(last_used);
+            CREATE TABLE IF NOT EXISTS free_slots (
+                space TEXT NOT NULL,
+                slot INTEGER NOT NULL,
+                PRIMARY KEY (space, slot)
+            );
+        """)
+
+    # ------------------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------------------
+
+    def get_many(self, space: str, keys: Sequence[Optional[str]]) -> List[Optional[np.ndarray]]:
+        """Stored vector for each key (None for misses and None keys)."""
+        found: List[Optional[np.ndarray]] = [None] * len(keys)
+        wanted = list(dict.fromkeys(k for k in keys if k))
+        if wanted:
+            try:
+                entries = self._slots(space, wanted)
+                if entries:
+                    vectors = self._read(space, {key: slot for key, (slot, _) in entries.items()})
+                    # Drop keys evicted (and their slot reused) between lookup and read
+                    current = self._slots(space, list(vectors))
+                    vectors = {key: v for key, v in vectors.items() if current.get(key) == entries[key]}
+                    found = [vectors.get(k) if k else None for k in keys]
+                    self._touch(space, list(vectors))
+            except Exception as e:
+                logger.warning(f"Embedding store read failed ({space}): {e}")
+        hits = sum(v is not None for v in found)
+        self.hits += hits
+        self.misses += len(keys) - hits
+        return found
+
+    def get(self, space: str, key: Optional[str]) -> Optional[np.ndarray]:
+        return self.get_many(space, [key])[0]
+
+    def put_many(self, space: str, keys: Sequence[Optional[str]], vectors: np.ndarray) -> None:
+        """Store one vector per key (rows of vectors); existing keys are overwritten."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        items = {k: v for k, v in zip(keys, vectors) if k}
+        if not items:
+            return
+        try:
+            with self._lock:
+                self._put(space, items, vectors.shape[1])
+        except Exception as e:
+            logger.warning(f"Embedding store write failed ({space}): {e}")
+
+    def put(self, space: str, key: Optional[str], vector: np.ndarray) -> None:
+        self.put_many(space, [key], np.asarray(vector, dtype=np.float32).reshape(1, -1))
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        spaces = self._db().execute("SELECT space, dim, count FROM spaces").fetchall()
+        return {
+            'dir': str(self.root),
+            'spaces': {space: count for space, _, count in spaces},
+            'bytes': sum(dim * 4 * count for _, dim, count in spaces),
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+        }
+
+    # ------------------------------------------------------------------
+    # Index
+    # ------------------------------------------------------------------
+
+    def _slots(self, space: str, keys: List[str]) -> Dict[str, Tuple[int, int]]:
+        """key -> (slot, generation) for the stored keys"""
+        conn = self._db()
+        slots = {}
+        for start in range(0, len(keys), _QUERY_CHUNK):
+            chunk = keys[start:start + _QUERY_CHUNK]
+            rows = conn.execute(
+                f"SELECT sha256, slot, generation FROM embeddings "
+                f"WHERE space = ? AND sha256 IN ({','.join('?' * len(chunk))})",
+                [space, *chunk]).fetchall()
+            slots.update((key, (slot, generation)) for key, slot, generation in rows)
+        return slots
+
+    def _touch(self, space: str, keys: List[str]) -> None:
+        if not keys:
+            return
+        conn = self._db()
+        now = time.time()
+        for start in range(0, len(keys), _QUERY_CHUNK):
+            chunk = keys[start:start + _QUERY_CHUNK]
+            conn.execute(
+                f"UPDATE embeddings SET last_used = ? WHERE space = ? AND sha256 IN ({','.join('?' * len(chunk))})",
+                [now, space, *chunk])
+
+    def _put(self, space: str, items: Dict[str, np.ndarray], dim: int) -> None:
+        conn = self._db()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT dim, next_slot, generation FROM spaces WHERE space = ?", (space,)).fetchone()
+            if row is None:
+                conn.execute("INSERT INTO spaces (space, dim) VALUES (?, ?)", (space, dim))
+                row = (dim, 0, 0)
+            if row[0] != dim:
+                raise ValueError(f"dimension {dim} does not match the stored {row[0]}")
+            next_slot = row[1]
+            generation = row[2] + 1
+            existing = {key: slot for key, (slot, _) in self._slots(space, list(items)).items()}
+            free = [s for (s,) in conn.execute(
+                "SELECT slot FROM free_slots WHERE space = ? ORDER BY slot LIMIT ?",
+                (space, len(items) - len(existing)))]
+            conn.executemany("DELETE FROM free_slots WHERE space = ? AND slot = ?", [(space, s) for s in free])
+            slots = dict(existing)
+            for key in items:
+                if key not in slots:
+                    if free:
+                        slots[key] = free.pop()
+                    else:
+                        slots[key] = next_slot
+                        next_slot += 1
+            # Vectors are written before the index rows commit, so readers never see an empty slot
+            self._write(space, dim, slots, items, next_slot)
+            conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (space, sha256, slot, generation, last_used) VALUES (?, ?, ?, ?, ?)",
+                [(space, key, slot, generation, now) for key, slot in slots.items()])
+            conn.execute("UPDATE spaces SET next_slot = ?, count = count + ?, generation = ? WHERE space = ?",
+                         (next_slot, len(slots) - len(existing), generation, space))
+            self._evict(conn)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        """Drop least recently used entries until the live vectors fit in max_bytes."""
+        dims = dict(conn.execute("SELECT space, dim FROM spaces"))
+        total = sum(d * 4 * c for d, c in conn.execute("SELECT dim, count FROM spaces"))
+        if total <= self.max_bytes:
+            return
+        target = self.max_bytes * _EVICT_TO
+        evicted = 0
+        while total > target:
+            rows = conn.execute(
+                "SELECT space, sha256, slot FROM embeddings ORDER BY last_used LIMIT 256").fetchall()
+            if not rows:
+                break
+            for space, sha256, slot in rows:
+                if total <= target:
+                    break
+                conn.execute("DELETE FROM embeddings WHERE space = ? AND sha256 = ?", (space, sha256))
+                conn.execute("INSERT OR IGNORE INTO free_slots (space, slot) VALUES (?, ?)", (space, slot))
+                conn.execute("UPDATE spaces SET count = count - 1 WHERE space = ?", (space,))
+                total -= dims[space] * 4
+                evicted += 1
+        if evicted:
+            logger.info(f"Evicted {evicted} least recently used embeddings")
+
+    # ------------------------------------------------------------------
+    # Vector files
+    # ------------------------------------------------------------------
+
+    def _path(self, space: str) -> Path:
+        return self.root / f"{re.sub(r'[^A-Za-z0-9_.-]', '_', space)}.f32"
+
+    def _map(self, space: str, dim: int, rows: int) -> np.memmap:
+        """Memory map of the space covering at least `rows` rows (remapped after the file grew)."""
+        mm = self._maps.get(space)
+        if mm is not None and mm.shape[0] >= rows:
+            return mm
+        path = self._path(space)
+        size = path.stat().st_size if path.exists() else 0
+        if size < rows * dim * 4:
+            raise IndexError(f"{path.name} has {size // (dim * 4)} rows, slot {rows - 1} requested")
+        mm = np.memmap(path, dtype=np.float32, mode='r+', shape=(size // (dim * 4), dim))
+        self._maps[space] = mm
+        return mm
+
+    def _read(self, space: str, slots: Dict[str, int]) -> Dict[str, np.ndarray]:
+        (dim,) = self._db().execute("SELECT dim FROM spaces WHERE space = ?", (space,)).fetchone()
+        mm = self._map(space, dim, max(slots.values()) + 1)
+        return {key: np.array(mm[slot]) for key, slot in slots.items()}
+
+    def _write(self, space: str, dim: int, slots: Dict[str, int], items: Dict[str, np.ndarray],
+               next_slot: int) -> None:
+        path = self._path(space)
+        size = path.stat().st_size if path.exists() else 0
+        capacity = size // (dim * 4)
+        if next_slot > capacity:
+            rows = max(next_slot, capacity * 2, _MIN_GROW_ROWS)
+            with open(path, 'ab') as f:
+                f.truncate(rows * dim * 4)
+        mm = self._map(space, dim, next_slot)
+        for key, slot in slots.items():
+            mm[slot] = items[key]
+
+    # ------------------------------------------------------------------
+    # Connections
+    # ------------------------------------------------------------------
+
+    def _reset_connections(self) -> None:
+        self._local = threading.local()
+        self._maps = {}
+        self._lock = threading.Lock()
+
+    def _db(self) -> sqlite3.Connection:
+        """One autocommit connection per thread; writes use explicit IMMEDIATE transactions."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.root / "index.db"), timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+
+_instance: Optional[EmbeddingStore] = None
+_instance_lock = threading.Lock()
+_instance_failed = False
+
+
+def get_embedding_store() -> Optional[EmbeddingStore]:
+    """Process-wide store configured from settings (None when disabled or unusable)."""
+    global _instance, _instance_failed
+    if _instance is not None or _instance_failed:
+        return _instance
+    with _instance_lock:
+        if _instance is None and not _instance_failed:
+            from app.config import settings
+            if not settings.EMBEDDING_STORE_ENABLED:
+                _instance_failed = True
+                return None
+            root = (Path(settings.EMBEDDING_STORE_DIR) if settings.EMBEDDING_STORE_DIR
+                    else settings.ROOT_DIR / "models" / "embedding_store")
+            try:
+                _instance = EmbeddingStore(root, settings.EMBEDDING_STORE_MAX_MB * 1024 * 1024)
+                logger.info(f"✅ Image embedding store at {root}")
+            except Exception as e:
+                logger.warning(f"Image embedding store disabled ({root}): {e}")
+                _instance_failed = True
+    return _instance
+
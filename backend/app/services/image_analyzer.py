@@ -12,6 +12,8 @@ from PIL import Image
 import io
 import warnings
 
+from app.services.embedding_store import get_embedding_store, image_sha256
+
 warnings.filterwarnings('ignore')
 
 logger = logging.getLogger(__name__)
@@ -39,12 +41,23 @@ except ImportError:
     logger.warning("PyTorch not available - image analysis will be limited")
 
 
+def torch_preprocess(img: Image.Image) -> "torch.Tensor":
+    """RGB image -> normalized (3, 224, 224) tensor for the torchvision ResNet50"""
+    transform = transforms.Compose([
+        transforms.Resize((224, 224)),
+        transforms.ToTensor(),
+        transforms.Normalize(mean=[0.485, 0.456, 0.406], std=[0.229, 0.224, 0.225])
+    ])
+    return transform(img)
+
+
 class ImageAnalyzer:
     """Service for analyzing car images"""
 
     _instance = None
     _feature_extractor = None
     _model_loaded = False
+    _backend = None  # "tensorflow", "torch" or "torchscript" (int8 export)
 
     def __new__(cls):
         if cls._instance is None:
@@ -55,9 +68,29 @@ class ImageAnalyzer:
         if not self._model_loaded:
             self._load_model()
 
+    def _load_optimized_model(self) -> bool:
+        """int8 TorchScript ResNet50 (VISION_INFERENCE_BACKEND=torchscript); False: use the eager model"""
+        from app.config import settings
+        from app.core.vision_backend import RESNET50_FILENAME, RESNET50_SOURCE, TORCHSCRIPT, attach_vision
+        if settings.VISION_INFERENCE_BACKEND != TORCHSCRIPT or not TORCH_AVAILABLE:
+            return False
+        from app.core.model_registry import get_model_registry
+        registry = get_model_registry()
+        model = attach_vision(registry.get('resnet50_int8'), registry.get('resnet50_int8_meta'),
+                              RESNET50_FILENAME, RESNET50_SOURCE)
+        if model is None:
+            return False
+        self._feature_extractor = model
+        self._backend = "torchscript"
+        self._model_loaded = True
+        logger.info("ResNet50 (int8 TorchScript) loaded successfully")
+        return True
+
     def _load_model(self):
         """Load CNN feature extractor"""
         try:
+            if self._load_optimized_model():
+                return
             if TF_AVAILABLE:
                 logger.info("Loading ResNet50 feature extractor (TensorFlow)")
                 # Load pre-trained ResNet50 without top layer
@@ -68,6 +101,7 @@ class ImageAnalyzer:
                     input_shape=(224, 224, 3)
                 )
                 self._feature_extractor = base_model
+                self._backend = "tensorflow"
                 self._model_loaded = True
                 logger.info("ResNet50 loaded successfully")
             elif TORCH_AVAILABLE:
@@ -76,6 +110,7 @@ class ImageAnalyzer:
                 model.fc = torch.nn.Identity()  # Remove classification layer
                 model.eval()
                 self._feature_extractor = model
+                self._backend = "torch"
                 self._model_loaded = True
                 logger.info("ResNet50 (PyTorch) loaded successfully")
             else:
@@ -85,9 +120,14 @@ class ImageAnalyzer:
             logger.error(f"Error loading feature extractor: {e}", exc_info=True)
             self._model_loaded = False
 
+    def _embedding_space(self) -> str:
+        """Embedding store space: each backend gives different ResNet50 features"""
+        return {"tensorflow": "resnet50-tf", "torchscript": "resnet50-int8"}.get(self._backend, "resnet50-torch")
+
     def extract_features(self, image_path: str) -> Optional[np.ndarray]:
         """
-        Extract CNN features from an image
+        Extract CNN features from an image (reused from the embedding store
+        when the same image content was seen before)
 
         Args:
             image_path: Path to image file
@@ -95,17 +135,31 @@ class ImageAnalyzer:
         Returns:
             Feature vector (2048 dimensions) or None if failed
         """
-        try:
-            if not self._model_loaded:
-                logger.warning("Feature extractor not loaded - cannot extract features")
-                return None
+        if not self._model_loaded:
+            logger.warning("Feature extractor not loaded - cannot extract features")
+            return None
+
+        store = get_embedding_store()
+        key = image_sha256(image_path) if store else None
+        if key:
+            features = store.get(self._embedding_space(), key)
+            if features is not None:
+                return features
+
+        features = self._compute_features(image_path)
+        if key and features is not None:
+            store.put(self._embedding_space(), key, features)
+        return features
 
+    def _compute_features(self, image_path: str) -> Optional[np.ndarray]:
+        """Run ResNet50 on one image file"""
+        try:
             # Load and preprocess image
             img = Image.open(image_path)
             img = img.convert('RGB')
             img = img.resize((224, 224))
 
-            if TF_AVAILABLE:
+            if self._backend == "tensorflow":
                 # Convert to array
                 img_array = keras_image.img_to_array(img)
                 img_array = np.expand_dims(img_array, axis=0)
@@ -115,14 +169,9 @@ class ImageAnalyzer:
                 features = self._feature_extractor.predict(img_array, verbose=0)
                 return features.flatten()
 
-            elif TORCH_AVAILABLE:
-                # PyTorch preprocessing
-                transform = transforms.Compose([
-                    transforms.Resize((224, 224)),
-                    transforms.ToTensor(),
-                    transforms.Normalize(mean=[0.485, 0.456, 0.406], std=[0.229, 0.224, 0.225])
-                ])
-                img_tensor = transform(img).unsqueeze(0)
+            elif self._backend in ("torch", "torchscript"):
+                # PyTorch preprocessing (same for the int8 TorchScript export)
+                img_tensor = torch_preprocess(img).unsqueeze(0)
 
                 with torch.no_grad():
                     features = self._feature_extractor(img_tensor)
@@ -0,0 +1,198 @@
+"""
+Micro-batching scheduler for single-car predictions.
+
+Concurrent /api/predict calls are queued and collected for up to
+PREDICT_BATCH_WINDOW_MS milliseconds or PREDICT_BATCH_MAX_SIZE rows, then
+predicted with one batched model call on a worker thread. Each caller awaits
+its own future, so the event loop never runs model.predict itself.
+"""
+
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.metrics import Histogram
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE_BUCKETS = [1, 2, 4, 8, 16, 32, 64, 128, 256]
+WAIT_MS_BUCKETS = [1, 2, 5, 10, 25, 50, 100, 250, 500, 1000]
+
+
+class InferenceScheduler:
+    """Collects concurrent prediction calls into batched model calls"""
+
+    def __init__(self, predict_many: Callable[[List[dict]], Tuple[np.ndarray, List[Optional[str]]]],
+                 window_ms: float = 5.0, max_batch_size: int = 32, workers: int = 1):
+        self.predict_many = predict_many
+        self.window_ms = window_ms
+        self.max_batch_size = max(1, max_batch_size)
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="predict-batch")
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        self.batches = 0
+        self.predictions = 0
+        self.batch_sizes = Histogram(BATCH_SIZE_BUCKETS)
+        self.wait_ms = Histogram(WAIT_MS_BUCKETS)
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    async def submit(self, car_data: dict) -> float:
+        """Queue one car and wait for its price from the next batch."""
+        self._ensure_started()
+        future = self._loop.create_future()
+        await self._queue.put((car_data, future, time.perf_counter()))
+        return await future
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def metrics(self) -> dict:
+        return {
+            'window_ms': self.window_ms,
+            'max_batch_size': self.max_batch_size,
+            'queue_depth': self.queue_depth,
+            'batches': self.batches,
+            'predictions': self.predictions,
+            'batch_size': self.batch_sizes.snapshot(),
+            'wait_ms': self.wait_ms.snapshot(),
+        }
+
+    async def stop(self) -> None:
+        """Stop collecting; queued callers get an error instead of hanging."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._fail_queued(self._queue, "Inference scheduler stopped")
+        self._executor.shutdown(wait=False)
+
+    # ------------------------------------------------------------------
+    # Batching loop
+    # ------------------------------------------------------------------
+
+    def _ensure_started(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._unbind()
+            self._loop = loop
+            self._queue = asyncio.Queue()
+        if self._task is None or self._task.done():
+            self._task = loop.create_task(self._run(self._queue))
+
+    def _unbind(self) -> None:
+        """Leave the previous event loop: cancel its batching task and fail its queued callers."""
+        loop, task, queue = self._loop, self._task, self._queue
+        self._loop = self._task = self._queue = None
+        if loop is None or loop.is_closed():
+            return
+
+        def shut_down() -> None:
+            if task is not None:
+                task.cancel()
+            self._fail_queued(queue, "Inference scheduler moved to another event loop")
+
+        # The old loop owns the task and futures; touch them from its own thread
+        try:
+            loop.call_soon_threadsafe(shut_down)
+        except RuntimeError:  # closed meanwhile
+            pass
+
+    @staticmethod
+    def _fail_queued(queue: Optional[asyncio.Queue], reason: str) -> None:
+        while queue is not None and not queue.empty():
+            _, future, _ = queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError(reason))
+
+    async def _collect(self, queue: asyncio.Queue) -> list:
+        """Block for the first item, then gather until the window closes or the batch is full."""
+        loop = asyncio.get_running_loop()
+        batch = [await queue.get()]
+        deadline = loop.time() + self.window_ms / 1000.0
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        # Anything already queued rides along for free
+        while len(batch) < self.max_batch_size and not queue.empty():
+            batch.append(queue.get_nowait())
+        return batch
+
+    async def _run(self, queue: asyncio.Queue) -> None:
+        """Batching loop over the queue of the loop it was started on (never a later one)."""
+        while True:
+            batch = await self._collect(queue)
+            started = time.perf_counter()
+            for _, _, enqueued in batch:
+                self.wait_ms.observe((started - enqueued) * 1000.0)
+            self.batch_sizes.observe(len(batch))
+            self.batches += 1
+            self.predictions += len(batch)
+
+            rows = [car_data for car_data, _, _ in batch]
+            try:
+                prices, errors = await asyncio.get_running_loop().run_in_executor(
+                    self._executor, self.predict_many, rows)
+            except asyncio.CancelledError:
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(RuntimeError("Inference scheduler stopped"))
+                raise
+            except Exception as e:
+                logger.error(f"❌ Batched prediction failed: {e}", exc_info=True)
+                prices, errors = np.full(len(rows), np.nan), [str(e)] * len(rows)
+
+            for (_, future, _), price, error in zip(batch, prices, errors):
+                if future.done():  # caller went away
+                    continue
+                if error is not None:
+                    future.set_exception(RuntimeError(f"Failed to predict price: {error}"))
+                else:
+                    future.set_result(float(price))
+            if len(batch) > 1:
+                logger.debug(f"Micro-batch of {len(batch)} predictions in {(time.perf_counter() - started) * 1000:.1f} ms")
+
+
+_instance: Optional[InferenceScheduler] = None
+
+
+def get_inference_scheduler() -> Optional[InferenceScheduler]:
+    """Process-wide scheduler (None when disabled or no batch predictor is available)."""
+    global _instance
+    if _instance is None:
+        from app.config import settings
+        from app.services.predictor import PREDICT_MANY_FUNCTION
+        if not settings.PREDICT_BATCH_ENABLED or PREDICT_MANY_FUNCTION is None:
+            return None
+        _instance = InferenceScheduler(
+            PREDICT_MANY_FUNCTION,
+            window_ms=settings.PREDICT_BATCH_WINDOW_MS,
+            max_batch_size=settings.PREDICT_BATCH_MAX_SIZE,
+        )
+        logger.info(f"✅ Prediction micro-batching: window {settings.PREDICT_BATCH_WINDOW_MS} ms, "
+                    f"max {settings.PREDICT_BATCH_MAX_SIZE} rows")
+    return _instance
+
+
+async def shutdown_inference_scheduler() -> None:
+    global _instance
+    if _instance is not None:
+        await _instance.stop()
+        _instance = None
@@ -0,0 +1,88 @@
+"""
+Market context - the dataset slices one prediction request works on.
+
+/api/predict used to re-derive the same make/model/year subsets in the
+handler's similar-car validation, in every MarketAnalyzer method and in the
+preview-image matching, several of them scanning the whole dataset. The
+handler now builds one MarketContext per request and passes it everywhere:
+
+- one DatasetSnapshot: dataset, DatasetIndex and MarketStatsCube of the
+  same generation, even if a reload swaps in a new one mid-request
+- make and make/model row positions (from the index, no scan)
+- lazily cached frames and stats shared by all consumers
+- the SimilarCarIndex built with the same dataset
+
+None of these scan the full dataset per request.
+"""
+
+import logging
+from typing import Callable, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from app.services.dataset_index import canonical
+from app.services.market_stats import PriceStats
+
+logger = logging.getLogger(__name__)
+
+
+class MarketContext:
+    """Per-request view of the dataset for one car"""
+
+    def __init__(self, snapshot, car_features: Dict):
+        """snapshot: the DatasetSnapshot the request read once (DatasetLoader.snapshot)"""
+        self.df: Optional[pd.DataFrame] = snapshot.dataset
+        self.index = snapshot.index
+        self.market_stats = snapshot.market_stats
+        self.similar_cars = snapshot.similar_cars
+        self.price_col: Optional[str] = snapshot.price_col
+
+        self.make = canonical(car_features.get('make'))
+        self.model = canonical(car_features.get('model'))
+
+        self._cache: Dict[object, object] = {}
+        if self.available:
+            self.make_rows = self.index.rows(self.make)
+            self.make_model_rows = self.index.rows(self.make, self.model)
+        else:
+            self.make_rows = self.make_model_rows = np.empty(0, dtype=np.intp)
+
+    @property
+    def available(self) -> bool:
+        return self.df is not None and len(self.df) > 0 and self.index is not None
+
+    def _cached(self, key, build: Callable[[], object]):
+        if key not in self._cache:
+            self._cache[key] = build()
+        return self._cache[key]
+
+    # ------------------------------------------------------------------
+    # Subsets
+    # ------------------------------------------------------------------
+
+    def make_frame(self) -> pd.DataFrame:
+        return self._cached('make_frame', lambda: self.df.iloc[self.make_rows])
+
+    def make_model_frame(self) -> pd.DataFrame:
+        return self._cached('make_model_frame', lambda: self.df.iloc[self.make_model_rows])
+
+    def canonical_make_frame(self, make_norm: str) -> pd.DataFrame:
+        """Rows whose load-time make_norm equals make_norm (code comparison, cached)."""
+        return self._cached(('make_norm', make_norm),
+                            lambda: self.df.iloc[np.flatnonzero(self.index.mask('make_norm', make_norm))])
+
+    # ------------------------------------------------------------------
+    # Stats
+    # ------------------------------------------------------------------
+
+    def similar_stats(self, min_count: int = 10) -> Optional[PriceStats]:
+        """Make/model stats, else make, else whole dataset (>= min_count listings)."""
+        if self.market_stats is None:
+            return None
+        return self._cached(('similar', min_count),
+                            lambda: self.market_stats.similar(self.make, self.model, min_count))
+
+    def price_range(self) -> Optional[tuple]:
+        """1st/99th percentile of positive dataset prices (precomputed)."""
+        return self.market_stats.price_range if self.market_stats is not None else None
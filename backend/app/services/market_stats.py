@@ -0,0 +1,228 @@
+"""
+Market statistics cube - price aggregates precomputed at dataset load.
+
+MarketAnalyzer used to filter the full dataset per request for every price
+factor (year, mileage, condition, location, make/model, fuel type), for the
+market comparison and for demand. Here each dimension is grouped once and
+stored as compact arrays (row count plus mean/median/p10/p90 price) behind a
+key -> slot dict:
+
+- year, condition, fuel_type, location, make
+- (make, model), (make, model, year)
+- mileage bucket (MILEAGE_BUCKET_KM wide)
+
+String keys use the DatasetIndex category codes, so lookups are canonical
+(stripped, lowercase) and O(1). The mileage factor's +/-20% window is
+answered exactly from a mileage-sorted prefix sum of prices (two binary
+searches). DatasetLoader rebuilds the cube whenever the dataset (re)loads.
+"""
+
+import logging
+import time
+from typing import Dict, Hashable, NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+
+from app.services.dataset_index import DatasetIndex
+
+logger = logging.getLogger(__name__)
+
+MILEAGE_BUCKET_KM = 10000
+
+# Dimensions keyed by a single DatasetIndex category code
+CATEGORY_DIMENSIONS = ['condition', 'fuel_type', 'location', 'make']
+
+
+class PriceStats(NamedTuple):
+    """Aggregate for one group; price stats are NaN when no row has a price"""
+    count: int
+    mean: float
+    median: float
+    p10: float
+    p90: float
+
+
+class GroupStats:
+    """Per-group count/mean/median/p10/p90 as parallel arrays behind a key dict"""
+
+    def __init__(self, keys: Dict[Hashable, int], count: np.ndarray, values: np.ndarray):
+        self.keys = keys
+        self.count = count          # int32 rows per group (with or without price)
+        self.values = values        # float32 (n_groups, 4): mean, median, p10, p90
+
+    @classmethod
+    def build(cls, group: np.ndarray, prices: np.ndarray, keys=None) -> 'GroupStats':
+        """
+        group: int64 group id per row (-1 = row not in any group); keys maps
+        group id -> lookup key (identity when omitted).
+        """
+        valid = group >= 0
+        frame = pd.DataFrame({'g': group[valid], 'p': prices[valid]})
+        grouped = frame.groupby('g', sort=True)['p']
+        sizes = grouped.size()
+        stats = pd.DataFrame({
+            'mean': grouped.mean(),
+            'median': grouped.median(),
+            'p10': grouped.quantile(0.1),
+            'p90': grouped.quantile(0.9),
+        }).reindex(sizes.index)
+        group_ids = sizes.index.to_numpy()
+        lookup = {(keys(g) if keys else int(g)): slot for slot, g in enumerate(group_ids)}
+        return cls(lookup, sizes.to_numpy(dtype=np.int32), stats.to_numpy(dtype=np.float32))
+
+    def get(self, key: Hashable) -> Optional[PriceStats]:
+        slot = self.keys.get(key)
+        if slot is None:
+            return None
+        mean, median, p10, p90 = (float(v) for v in self.values[slot])
+        return PriceStats(int(self.count[slot]), mean, median, p10, p90)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    @property
+    def nbytes(self) -> int:
+        return self.count.nbytes + self.values.nbytes
+
+
+def _summary(prices: np.ndarray) -> PriceStats:
+    valid = prices[~np.isnan(prices)]
+    if len(valid) == 0:
+        return PriceStats(len(prices), np.nan, np.nan, np.nan, np.nan)
+    p10, median, p90 = np.quantile(valid, [0.1, 0.5, 0.9])
+    return PriceStats(len(prices), float(valid.mean()), float(median), float(p10), float(p90))
+
+
+class MarketStatsCube:
+    """Price aggregates for every dimension MarketAnalyzer looks up"""
+
+    def __init__(self, df: pd.DataFrame, index: DatasetIndex, price_col: str):
+        started = time.perf_counter()
+        self.index = index
+        self.n_rows = len(df)
+        prices = pd.to_numeric(df[price_col], errors='coerce').to_numpy(dtype=np.float64)
+        self.overall = _summary(prices)
+        positive = prices[prices > 0]
+        # 1st/99th percentile of positive prices (prediction bounds in /api/predict)
+        self.price_range = tuple(float(q) for q in np.quantile(positive, [0.01, 0.99])) if len(positive) else None
+
+        self._dims: Dict[str, GroupStats] = {}
+        years = self._int_column(df, 'year')
+        if years is not None:
+            self._dims['year'] = GroupStats.build(years, prices)
+
+        for col in CATEGORY_DIMENSIONS:
+            codes = index.codes(col)
+            if codes is not None:
+                self._dims[col] = GroupStats.build(codes.astype(np.int64), prices)
+
+        if index.codes('make') is not None and index.codes('model') is not None:
+            make = index.codes('make').astype(np.int64)
+            model = index.codes('model').astype(np.int64)
+            n_models = max(index.n_categories('model'), 1)
+            pair = np.where((make >= 0) & (model >= 0), make * n_models + model, -1)
+            self._dims['make_model'] = GroupStats.build(pair, prices, keys=lambda g: divmod(int(g), n_models))
+            if years is not None:
+                # Years fit in 12 bits; pack (pair, year) into one int64 group id
+                triple = np.where((pair >= 0) & (years >= 0), (pair << 12) | (years & 0xFFF), -1)
+                self._dims['make_model_year'] = GroupStats.build(
+                    triple, prices, keys=lambda g: (*divmod(int(g) >> 12, n_models), int(g) & 0xFFF))
+
+        self._mileage_sorted = None
+        self._mileage_prefix = None
+        if 'mileage' in df.columns:
+            mileage = pd.to_numeric(df['mileage'], errors='coerce').to_numpy(dtype=np.float64)
+            buckets = np.where(np.isfinite(mileage) & (mileage >= 0),
+                               np.floor(np.nan_to_num(mileage) / MILEAGE_BUCKET_KM), -1).astype(np.int64)
+            self._dims['mileage_bucket'] = GroupStats.build(buckets, prices)
+            # Sorted mileage + prefix sums of (price, has-price) for exact window means
+            has = np.isfinite(mileage)
+            order = np.argsort(mileage[has], kind='stable')
+            self._mileage_sorted = mileage[has][order]
+            window_prices = prices[has][order]
+            priced = ~np.isnan(window_prices)
+            self._mileage_prefix = (
+                np.concatenate([[0.0], np.cumsum(np.where(priced, window_prices, 0.0))]),
+                np.concatenate([[0], np.cumsum(priced)]),
+            )
+
+        self.build_ms = (time.perf_counter() - started) * 1000.0
+        sizes = ", ".join(f"{name}={len(stats)}" for name, stats in self._dims.items())
+        logger.info(f"✅ Market stats cube built in {self.build_ms:.0f} ms "
+                    f"({self.nbytes / 1024:.0f} KB): {sizes}")
+
+    @staticmethod
+    def _int_column(df: pd.DataFrame, col: str) -> Optional[np.ndarray]:
+        if col not in df.columns:
+            return None
+        values = pd.to_numeric(df[col], errors='coerce').to_numpy(dtype=np.float64)
+        return np.where(np.isfinite(values), values, -1).astype(np.int64)
+
+    @property
+    def nbytes(self) -> int:
+        total = sum(stats.nbytes for stats in self._dims.values())
+        if self._mileage_sorted is not None:
+            total += self._mileage_sorted.nbytes + sum(a.nbytes for a in self._mileage_prefix)
+        return total
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+
+    def _get(self, dim: str, key) -> Optional[PriceStats]:
+        stats = self._dims.get(dim)
+        if stats is None or key is None:
+            return None
+        return stats.get(key)
+
+    def year(self, year) -> Optional[PriceStats]:
+        try:
+            return self._get('year', int(year))
+        except (ValueError, TypeError):
+            return None
+
+    def category(self, column: str, value) -> Optional[PriceStats]:
+        """Stats for condition / fuel_type / location / make == value (canonical match)."""
+        return self._get(column, self.index.code(column, value))
+
+    def make_model(self, make, model, year=None) -> Optional[PriceStats]:
+        make_code = self.index.code('make', make)
+        model_code = self.index.code('model', model)
+        if make_code is None or model_code is None:
+            return None
+        if year is None:
+            return self._get('make_model', (make_code, model_code))
+        try:
+            return self._get('make_model_year', (make_code, model_code, int(year)))
+        except (ValueError, TypeError):
+            return None
+
+    def mileage_bucket(self, mileage) -> Optional[PriceStats]:
+        try:
+            return self._get('mileage_bucket', int(float(mileage) // MILEAGE_BUCKET_KM))
+        except (ValueError, TypeError):
+            return None
+
+    def mileage_window(self, low: float, high: float) -> Optional[PriceStats]:
+        """Row count and mean price for low <= mileage <= high (median/percentiles not tracked)."""
+        if self._mileage_sorted is None:
+            return None
+        start = int(np.searchsorted(self._mileage_sorted, low, side='left'))
+        end = int(np.searchsorted(self._mileage_sorted, high, side='right'))
+        if end <= start:
+            return None
+        price_sum, priced = self._mileage_prefix
+        n_priced = int(priced[end] - priced[start])
+        mean = float(price_sum[end] - price_sum[start]) / n_priced if n_priced else np.nan
+        return PriceStats(end - start, mean, np.nan, np.nan, np.nan)
+
+    def similar(self, make, model, min_count: int = 10) -> PriceStats:
+        """
+        Stats for the closest group with at least min_count rows:
+        make/model, else make, else the whole dataset.
+        """
+        for stats in (self.make_model(make, model), self.category('make', make)):
+            if stats is not None and stats.count >= min_count:
+                return stats
+        return self.overall
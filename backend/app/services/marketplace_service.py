@@ -572,12 +572,16 @@ def search_listings(
 
         # Sort order
         order_by = "created_at DESC"
+        order_params = []
         if sort_by == 'price_low':
             order_by = "price ASC"
         elif sort_by == 'price_high':
             order_by = "price DESC"
         elif sort_by == 'newest':
             order_by = "created_at DESC"
+        elif sort_by == 'closest_price' and filters.get('target_price') is not None:
+            order_by = "ABS(price - ?) ASC, price ASC"
+            order_params = [filters['target_price']]
 
         # Get paginated results
         offset = (page - 1) * page_size
@@ -588,7 +592,7 @@ def search_listings(
             WHERE {where_sql}
             ORDER BY {order_by}
             LIMIT ? OFFSET ?
-        """, params + [page_size, offset])
+        """, params + order_params + [page_size, offset])
 
         rows = cursor.fetchall()
         listings = [dict(row) for row in rows]
@@ -17,8 +17,21 @@ BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
 if BASE_DIR not in sys.path:
     sys.path.insert(0, BASE_DIR)
 
+from app.config import settings
 from app.services.feedback_training_service import export_feedback_for_training
-from app.services.dataset_loader import DatasetLoader
+from app.services.dataset_cache import read_dataset
+from app.services.dataset_loader import PRICE_COLUMNS
+
+
+def read_training_dataset() -> Optional[pd.DataFrame]:
+    """
+    The main dataset as the model was trained on: every CSV column with its
+    CSV dtype. Not DatasetLoader.dataset, which is the compacted serving copy
+    (serving columns only, categoricals/float32, derived *_norm columns).
+    """
+    if not settings.DATA_FILE.exists():
+        return None
+    return read_dataset(settings.DATA_FILE, use_cache=settings.DATASET_CACHE_ENABLED)
 
 
 def retrain_model_with_feedback(
@@ -61,8 +74,7 @@ def retrain_model_with_feedback(
         combined_df = None
         if combine_with_main_dataset:
             try:
-                dataset_loader = DatasetLoader.get_instance()
-                main_df = dataset_loader.dataset
+                main_df = read_training_dataset()
 
                 if main_df is not None and len(main_df) > 0:
                     # Combine datasets
@@ -70,7 +82,7 @@ def retrain_model_with_feedback(
                     feedback_weighted = pd.concat([feedback_df] * int(feedback_weight))
 
                     # Ensure columns match
-                    main_price_col = dataset_loader.get_price_column()
+                    main_price_col = next((col for col in PRICE_COLUMNS if col in main_df.columns), None)
                     if main_price_col and main_price_col in main_df.columns:
                         main_df_renamed = main_df.rename(columns={main_price_col: 'price'})
                         combined_df = pd.concat([main_df_renamed, feedback_weighted], ignore_index=True)
@@ -2,9 +2,13 @@
 Predictor service - wraps model loading and prediction logic
 """
 
+import asyncio
 import logging
 import sys
 import os
+from typing import List, Optional, Tuple
+
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
@@ -22,11 +26,13 @@ try:
             sys.path.insert(0, path)
 
     PREDICT_FUNCTION = None
+    PREDICT_MANY_FUNCTION = None
 
     # Try backend/app/core/predict_price.py first (NEW - production model loader)
     try:
-        from app.core.predict_price import predict_price
+        from app.core.predict_price import predict_price, predict_price_many
         PREDICT_FUNCTION = predict_price
+        PREDICT_MANY_FUNCTION = predict_price_many
         logger.info("✅ Loaded predict_price from app.core.predict_price (production model)")
     except ImportError as e_backend:
         logger.warning(f"Failed to import from app.core.predict_price: {e_backend}")
@@ -69,6 +75,7 @@ try:
 except Exception as e:
     logger.error(f"Failed to import predict_price: {e}", exc_info=True)
     PREDICT_FUNCTION = None
+    PREDICT_MANY_FUNCTION = None
 
 
 class Predictor:
@@ -151,3 +158,46 @@ class Predictor:
             logger.error(f"Full traceback:\n{traceback.format_exc()}")
             raise RuntimeError(f"Failed to predict price: {str(e)}")
 
+    async def predict_async(self, car_data: dict) -> float:
+        """
+        Predict from an async route without blocking the event loop.
+
+        Concurrent calls are micro-batched into one model call by the
+        inference scheduler; without a batch entry point the single-row
+        predict() runs on a worker thread instead. A row the batch could not
+        price also goes through predict(), so callers keep its fallbacks
+        (dataset estimate, 15000 on errors).
+        """
+        from app.services.inference_scheduler import get_inference_scheduler
+        scheduler = get_inference_scheduler()
+        if scheduler is not None:
+            try:
+                return await scheduler.submit(car_data)
+            except RuntimeError as e:
+                logger.warning(f"Batched prediction failed, retrying single-row: {e}")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.predict, car_data)
+
+    def predict_many(self, rows: List[dict]) -> Tuple[np.ndarray, List[Optional[str]]]:
+        """
+        Predict prices for many cars in one model call
+
+        Args:
+            rows: List of car feature dictionaries (same keys as predict())
+
+        Returns:
+            (prices, errors): array of predicted prices (NaN for failed rows)
+            and a per-row list of error messages (None on success)
+        """
+        if PREDICT_MANY_FUNCTION is not None:
+            return PREDICT_MANY_FUNCTION(rows)
+
+        # Fallback predictor without a batch entry point: predict row by row
+        prices = np.full(len(rows), np.nan, dtype=np.float64)
+        errors: List[Optional[str]] = [None] * len(rows)
+        for i, car_data in enumerate(rows):
+            try:
+                prices[i] = self.predict(car_data)
+            except Exception as e:
+                errors[i] = str(e)
+        return prices, errors
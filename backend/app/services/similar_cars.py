@@ -0,0 +1,213 @@
+"""
+Similar-car engine - nearest neighbours for MarketAnalyzer.get_similar_cars.
+
+The old implementation filtered the dataset by brand tier, price band and
+year window, added year_diff / mileage_diff / price_diff columns, sorted the
+whole candidate frame, repeated all of it for an "expanded" price band and
+built the response with iterrows. SimilarCarIndex is built once per dataset
+load instead:
+
+- features: year, log1p(mileage), log(price), each standardized by its
+  dataset std, stored as one float32 (n, 3) matrix
+- segments: all rows, and luxury + premium makes only; each segment keeps its
+  row positions sorted by year, so the +/-YEAR_WINDOW window is a slice found
+  by two binary searches
+
+A query takes the year slice of its tier's segment, applies the price band
+(+/-30%, widened to +/-50% when fewer than MIN_RESULTS cars qualify), keeps
+only exact make/model matches when there are at least k of them, and picks
+the top k by weighted L1 distance with argpartition. Weights come from
+settings (SIMILAR_CARS_*_WEIGHT).
+"""
+
+import logging
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.services.canonicalization import canonical_make, canonical_model_trim
+
+logger = logging.getLogger(__name__)
+
+LUXURY_BRANDS = [
+    'rolls royce', 'rolls-royce', 'bentley', 'ferrari', 'lamborghini',
+    'aston martin', 'mclaren', 'bugatti', 'maybach'
+]
+PREMIUM_BRANDS = [
+    'mercedes-benz', 'mercedes', 'bmw', 'audi', 'porsche',
+    'lexus', 'land rover', 'jaguar', 'maserati', 'cadillac',
+    'infiniti', 'acura', 'genesis', 'tesla', 'lincoln'
+]
+
+YEAR_WINDOW = 3
+PRICE_BANDS = (0.3, 0.5)        # +/- fraction of predicted price, widened in order
+MIN_RESULTS = 3                 # widen the price band below this many candidates
+DEFAULT_WEIGHTS = (1.0, 1.0, 2.0)  # year, log mileage, log price
+MISSING_DISTANCE = 10.0         # standardized distance for a missing feature
+
+LINK_COLUMNS = ['link', 'url', 'href', 'source_url', 'listing_url']
+
+
+def brand_tier(make: str) -> str:
+    """'luxury', 'premium' or 'mid_range' from a (free-form) make string."""
+    make_lower = str(make or '').lower().strip()
+    if any(brand in make_lower for brand in LUXURY_BRANDS) or ('rolls' in make_lower and 'royce' in make_lower):
+        return 'luxury'
+    if any(brand in make_lower for brand in PREMIUM_BRANDS):
+        return 'premium'
+    return 'mid_range'
+
+
+def _numeric(df: pd.DataFrame, col: str) -> np.ndarray:
+    if col not in df.columns:
+        return np.full(len(df), np.nan)
+    return pd.to_numeric(df[col], errors='coerce').to_numpy(dtype=np.float64)
+
+
+def _codes(df: pd.DataFrame, col: str) -> Tuple[np.ndarray, Dict[str, int]]:
+    values = df[col] if isinstance(df[col].dtype, pd.CategoricalDtype) else df[col].astype('category')
+    return values.cat.codes.to_numpy(), {c: i for i, c in enumerate(values.cat.categories)}
+
+
+class SimilarCarIndex:
+    """Per-tier, year-sorted neighbour index over standardized car features"""
+
+    def __init__(self, df: pd.DataFrame, price_col: str, weights: Tuple[float, float, float] = DEFAULT_WEIGHTS):
+        started = time.perf_counter()
+        self.weights = np.asarray(weights, dtype=np.float32)
+        self.n_rows = len(df)
+
+        self.year = _numeric(df, 'year')
+        self.mileage = _numeric(df, 'mileage')
+        self.price = _numeric(df, price_col)
+
+        raw = np.column_stack([
+            self.year,
+            np.log1p(np.clip(self.mileage, 0, None)),
+            np.log(np.where(self.price > 0, self.price, np.nan)),
+        ])
+        self._mean = np.nanmean(raw, axis=0)
+        scale = np.nanstd(raw, axis=0)
+        self._scale = np.where(np.isfinite(scale) & (scale > 0), scale, 1.0)
+        self.features = ((raw - self._mean) / self._scale).astype(np.float32)
+
+        self.make_codes, self._make_lookup = _codes(df, 'make_norm')
+        self.model_codes, self._model_lookup = _codes(df, 'model_norm')
+
+        positive = self.price[self.price > 0]
+        # Price band when no predicted price is given: dataset p10..p90
+        self.default_band = tuple(np.nanquantile(self.price, [0.1, 0.9])) if len(positive) else None
+
+        upper_codes = [self._make_lookup[m] for m in {canonical_make(b) for b in LUXURY_BRANDS + PREMIUM_BRANDS}
+                       if m in self._make_lookup]
+        has_year = np.isfinite(self.year)
+        self._segments = {
+            'all': self._segment(np.flatnonzero(has_year)),
+            'upper': self._segment(np.flatnonzero(has_year & np.isin(self.make_codes, upper_codes))),
+        }
+
+        self.build_ms = (time.perf_counter() - started) * 1000.0
+        logger.info(f"✅ Similar-car index built in {self.build_ms:.0f} ms: "
+                    f"{len(self._segments['all'][0])} rows, {len(self._segments['upper'][0])} luxury/premium")
+
+    def _segment(self, rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        order = rows[np.argsort(self.year[rows], kind='stable')]
+        return order, self.year[order]
+
+    def query(self, make: str, model: str, year: int, mileage: float, predicted_price: Optional[float] = None,
+              trim: Optional[str] = None, k: int = 10) -> np.ndarray:
+        """Row positions of the k most similar cars, most similar first."""
+        order, years = self._segments['upper' if brand_tier(make) in ('luxury', 'premium') else 'all']
+        start = np.searchsorted(years, year - YEAR_WINDOW, side='left')
+        end = np.searchsorted(years, year + YEAR_WINDOW, side='right')
+        rows = order[start:end]
+        if len(rows) == 0 or k <= 0:
+            return rows[:0]
+
+        if predicted_price and predicted_price > 0:
+            bands = [(predicted_price * (1 - b), predicted_price * (1 + b)) for b in PRICE_BANDS]
+        else:
+            bands = [self.default_band] if self.default_band is not None else [None]
+        for band in bands:
+            selected = rows
+            if band is not None:
+                prices = self.price[rows]
+                selected = rows[(prices >= band[0]) & (prices <= band[1]) & (prices > 0)]
+            if len(selected) >= MIN_RESULTS:
+                break
+        if len(selected) == 0:
+            return selected
+
+        # Exact make/model matches only, when there are enough of them
+        make_code = self._make_lookup.get(canonical_make(make))
+        model_code = self._model_lookup.get(canonical_model_trim(model, trim)[0])
+        if make_code is not None and model_code is not None:
+            exact = (self.make_codes[selected] == make_code) & (self.model_codes[selected] == model_code)
+            if exact.sum() >= k:
+                selected = selected[exact]
+
+        target = (np.array([year, np.log1p(max(float(mileage or 0), 0.0)),
+                            np.log(predicted_price) if predicted_price and predicted_price > 0 else np.nan])
+                  - self._mean) / self._scale
+        weights = self.weights.copy()
+        if not np.isfinite(target[2]):
+            weights[2] = 0.0
+            target[2] = 0.0
+        distance = np.abs(self.features[selected] - target.astype(np.float32))
+        score = np.nan_to_num(distance, nan=MISSING_DISTANCE) @ weights
+
+        if len(selected) > k:
+            top = np.argpartition(score, k - 1)[:k]
+        else:
+            top = np.arange(len(selected))
+        return selected[top[np.argsort(score[top], kind='stable')]]
+
+
+def to_results(df: pd.DataFrame, rows: np.ndarray, price_col: str) -> List[Dict]:
+    """Response dicts for the selected rows, built from column arrays (no iterrows)."""
+    def column(col, default=None):
+        if col in df.columns:
+            return df[col].take(rows).to_numpy()
+        return np.full(len(rows), default, dtype=object)
+
+    labels = df.index.to_numpy()[rows]
+    years, mileages, prices = column('year', 2020), column('mileage', 0), column(price_col, 0)
+    conditions, makes, models, images = column('condition', 'Good'), column('make', ''), column('model', ''), column('image_1')
+    links = [column(col) for col in LINK_COLUMNS if col in df.columns]
+
+    results = []
+    for i, label in enumerate(labels):
+        try:
+            link = next((str(values[i]) for values in links if pd.notna(values[i])), None)
+
+            # Image URL from the dataset's image_1 column, as an API URL
+            image_url = None
+            if pd.notna(images[i]):
+                image_url = str(images[i]).strip().replace('\\', '/')
+                if image_url.startswith('car_') and image_url.endswith('.jpg'):
+                    image_url = f"/api/car-images/{image_url}"
+                elif image_url.startswith('/car_images/'):
+                    image_url = f"/api/car-images/{image_url.replace('/car_images/', '')}"
+
+            # Image id from the dataset row index (row 0 -> car_000000.jpg)
+            image_id = f"car_{int(label):06d}.jpg"
+            if not image_url:
+                image_url = f"/api/car-images/{image_id}"
+
+            results.append({
+                "year": int(years[i]),
+                "mileage": int(float(mileages[i])),
+                "condition": str(conditions[i]),
+                "price": float(prices[i]),
+                "make": str(makes[i]),
+                "model": str(models[i]),
+                "link": link,
+                "image_id": image_id,
+                "image_url": image_url
+            })
+        except (ValueError, TypeError) as e:
+            logger.warning(f"Error processing similar car row: {e}")
+            continue
+    return results
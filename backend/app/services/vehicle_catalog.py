@@ -0,0 +1,291 @@
+"""
+Vehicle catalog - every dropdown / option list, precomputed at dataset load.
+
+/api/cars/makes, /models, /trims, /fuel-types, /engine-sizes, /locations,
+/metadata and /api/available-engines|cylinders|colors used to filter the
+dataset and run unique() + string cleanup on every call. VehicleCatalog is
+built once per dataset snapshot as an immutable tree:
+
+    make -> model -> trims
+                  -> fuel types (normalized)
+                  -> engine size -> cylinders
+                  -> colors
+
+plus the dataset-wide lists (makes, locations, engine sizes, metadata).
+Group keys are the DatasetIndex canonical make/model, so lookups match the
+case-insensitive index.frame() filtering the routes used. Distinct values
+per group come from one drop_duplicates over integer codes; the cleanup
+rules are the ones the routes applied to each filtered frame.
+
+Response bodies are serialized once per key (app/core/http_cache.py) and
+served with strong ETags; the catalog of a reloaded dataset starts empty.
+"""
+
+import logging
+import threading
+import time
+from typing import Callable, Dict, FrozenSet, Hashable, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.core.http_cache import CachedBody, encode
+from app.services.dataset_index import DatasetIndex, canonical
+
+logger = logging.getLogger(__name__)
+
+VALID_FUEL_TYPES = ['Gasoline', 'Diesel', 'Electric', 'Hybrid', 'Plug-in Hybrid', 'Other']
+FUEL_TYPE_MAP = {
+    'Gasoline': 'Gasoline',
+    'Diesel': 'Diesel',
+    'Electric': 'Electric',
+    'EV': 'Electric',
+    'Hybrid': 'Hybrid',
+    'Plug-in Hybrid': 'Plug-in Hybrid',
+    'Plug-In Hybrid': 'Plug-in Hybrid',
+    'PHEV': 'Plug-in Hybrid',
+    'LPG': 'Other',
+    'Other': 'Other'
+}
+VALID_CONDITIONS = ['New', 'Like New', 'Excellent', 'Good', 'Fair', 'Poor', 'Salvage']
+COMMON_ENGINE_SIZES = [1.0, 1.2, 1.4, 1.5, 1.6, 1.8, 2.0, 2.5, 3.0, 3.5, 4.0, 5.0, 6.0]
+DEFAULT_COLORS = ['White', 'Black', 'Silver', 'Gray', 'Red', 'Blue', 'Green', 'Gold', 'Brown', 'Orange',
+                  'Yellow', 'Purple', 'Beige', 'Other']
+ENGINE_TOLERANCE = 0.1  # liters; /available-cylinders matches engines within this
+
+LOCATION_COLUMNS = ['location', 'Location', 'city', 'City', 'region', 'Region']
+TRIM_COLUMNS = ['trim', 'Trim', 'variant', 'Variant', 'version', 'Version']
+
+_MISSING_LOCATIONS = {'nan', 'none', 'null', 'n/a', '', 'unknown'}
+_MISSING_TRIMS = {'nan', 'none', 'null', 'n/a', 'na', '', 'undefined'}
+_MISSING_COLORS = {'nan', 'none', 'null', 'n/a', ''}
+
+
+# ----------------------------------------------------------------------
+# Cleanup rules (shared with the routes)
+# ----------------------------------------------------------------------
+
+def clean_names(values: Iterable) -> List[str]:
+    """Stripped, non-empty, distinct, sorted."""
+    return sorted({str(v).strip() for v in values if str(v).strip()})
+
+
+def _clean_filtered(values: Iterable, missing: Set[str]) -> List[str]:
+    names = [str(v).strip() for v in values if v and str(v).strip()]
+    return sorted({n for n in names if n.lower() not in missing})
+
+
+def normalize_fuel_types(values: Iterable) -> Set[str]:
+    """Dataset fuel type values mapped onto VALID_FUEL_TYPES (unknown values dropped)."""
+    fuel_types = set()
+    for fuel in (str(f).strip() for f in values if str(f).strip()):
+        normalized = FUEL_TYPE_MAP.get(fuel, fuel)
+        lower = fuel.lower()
+        if normalized in VALID_FUEL_TYPES:
+            fuel_types.add(normalized)
+        elif lower in ['gasoline', 'petrol', 'gas']:
+            fuel_types.add('Gasoline')
+        elif lower in ['diesel']:
+            fuel_types.add('Diesel')
+        elif lower in ['electric', 'ev', 'bev', 'zev']:
+            fuel_types.add('Electric')
+        elif lower in ['hybrid', 'hev']:
+            fuel_types.add('Hybrid')
+        elif lower in ['plug-in hybrid', 'phev', 'plug in hybrid']:
+            fuel_types.add('Plug-in Hybrid')
+    return fuel_types
+
+
+def infer_fuel_types(model: str) -> Set[str]:
+    """Fuel types implied by the model name (PHEV, hybrid, EV, diesel patterns)."""
+    model_lower = str(model).lower()
+    inferred = set()
+    if any(p in model_lower for p in ['dm-i', 'phev', 'plug-in', 'plug in', 'e-hybrid']):
+        inferred.add('Plug-in Hybrid')
+    if any(p in model_lower for p in ['hybrid', 'hev']) and 'plug-in' not in model_lower \
+            and 'phev' not in model_lower and 'dm-i' not in model_lower:
+        inferred.add('Hybrid')
+    if any(p in model_lower for p in ['ev', 'electric', 'e-', 'bev', 'zev']):
+        inferred.add('Electric')
+    if any(p in model_lower for p in ['diesel', 'tdi', 'tdci', 'cdi']):
+        inferred.add('Diesel')
+    return inferred
+
+
+def _to_float(value) -> Optional[float]:
+    try:
+        number = float(value)
+    except (ValueError, TypeError):
+        return None
+    return None if np.isnan(number) else number
+
+
+def engine_display(size: float) -> str:
+    """'2L' for whole liters, else '2.4L'."""
+    return f"{int(size)}L" if size == int(size) else f"{size}L"
+
+
+# ----------------------------------------------------------------------
+# Catalog
+# ----------------------------------------------------------------------
+
+class ModelNode(NamedTuple):
+    """Everything the option endpoints list for one make/model"""
+    trims: Tuple[str, ...]
+    fuel_types: FrozenSet[str]                   # normalized dataset fuel types
+    engines: Tuple[float, ...]                   # sorted distinct engine sizes
+    cylinders: Tuple[FrozenSet[int], ...]        # per engine: distinct cylinder counts > 0
+    colors: Tuple[str, ...]
+
+
+def _distinct_by_group(groups: np.ndarray, values: pd.Series) -> Dict[int, list]:
+    """Distinct non-null values per group id (ids < 0 skipped)."""
+    value_codes, uniques = pd.factorize(values, use_na_sentinel=True)
+    uniques = np.asarray(uniques, dtype=object)
+    pairs = pd.DataFrame({'g': groups, 'v': value_codes})
+    pairs = pairs[(pairs['g'] >= 0) & (pairs['v'] >= 0)].drop_duplicates()
+    return {int(g): uniques[rows].tolist()
+            for g, rows in pairs.groupby('g', sort=False)['v'].apply(np.asarray).items()}
+
+
+class VehicleCatalog:
+    """Immutable make -> model -> options tree plus dataset-wide option lists"""
+
+    def __init__(self, df: pd.DataFrame, index: DatasetIndex):
+        started = time.perf_counter()
+        self.columns = set(df.columns)
+        self.location_col = next((c for c in LOCATION_COLUMNS if c in df.columns), None)
+        self.trim_col = next((c for c in TRIM_COLUMNS if c in df.columns), None)
+
+        # Dataset-wide lists
+        self.makes = clean_names(df['make'].dropna().unique().tolist()) if 'make' in df.columns else []
+        self.locations = (_clean_filtered(df[self.location_col].dropna().unique().tolist(), _MISSING_LOCATIONS)
+                          if self.location_col else [])
+        self.engine_sizes = self._engine_sizes(df)
+        self.metadata = self._metadata(df)
+
+        # make -> model -> node
+        self.models: Dict[str, List[str]] = {}
+        self.nodes: Dict[Tuple[str, str], ModelNode] = {}
+        if index.codes('make') is not None and index.codes('model') is not None:
+            self._build_tree(df, index)
+
+        self._bodies: Dict[Hashable, CachedBody] = {}
+        self._bodies_lock = threading.Lock()
+        self.build_ms = (time.perf_counter() - started) * 1000.0
+        logger.info(f"✅ Vehicle catalog built in {self.build_ms:.0f} ms: {len(self.makes)} makes, "
+                    f"{len(self.nodes)} make/models, {len(self.locations)} locations")
+
+    def _build_tree(self, df: pd.DataFrame, index: DatasetIndex) -> None:
+        make_codes = index.codes('make').astype(np.int64)
+        model_codes = index.codes('model').astype(np.int64)
+        make_names = index.categories('make')
+        model_names = index.categories('model')
+        n_models = max(index.n_categories('model'), 1)
+        pair = np.where((make_codes >= 0) & (model_codes >= 0), make_codes * n_models + model_codes, -1)
+
+        for code, values in _distinct_by_group(make_codes, df['model']).items():
+            self.models[make_names[code]] = clean_names(values)
+
+        def distinct(col):
+            return _distinct_by_group(pair, df[col]) if col in df.columns else {}
+
+        trims, fuels, colors = distinct(self.trim_col), distinct('fuel_type'), distinct('color')
+        engines_by_pair = self._engine_cylinders(df, pair)
+        for g in np.unique(pair[pair >= 0]):
+            g = int(g)
+            engines = engines_by_pair.get(g, {})
+            sizes = tuple(sorted(engines))
+            self.nodes[(make_names[g // n_models], model_names[g % n_models])] = ModelNode(
+                trims=tuple(_clean_filtered(trims.get(g, []), _MISSING_TRIMS)),
+                fuel_types=frozenset(normalize_fuel_types(fuels.get(g, []))),
+                engines=sizes,
+                cylinders=tuple(frozenset(engines[s]) for s in sizes),
+                colors=tuple(_clean_filtered(colors.get(g, []), _MISSING_COLORS)),
+            )
+
+    @staticmethod
+    def _engine_cylinders(df: pd.DataFrame, pair: np.ndarray) -> Dict[int, Dict[float, Set[int]]]:
+        """pair id -> engine size -> cylinder counts seen with it."""
+        if 'engine_size' not in df.columns:
+            return {}
+        engine = pd.to_numeric(df['engine_size'], errors='coerce').to_numpy(dtype=np.float64)
+        cylinders = (pd.to_numeric(df['cylinders'], errors='coerce').to_numpy(dtype=np.float64)
+                     if 'cylinders' in df.columns else np.full(len(df), np.nan))
+        triples = pd.DataFrame({'g': pair, 'e': engine, 'c': cylinders})
+        triples = triples[(triples['g'] >= 0) & triples['e'].notna()].drop_duplicates()
+        out: Dict[int, Dict[float, Set[int]]] = {}
+        for g, e, c in triples.itertuples(index=False):
+            per_engine = out.setdefault(int(g), {}).setdefault(float(e), set())
+            if not np.isnan(c) and int(c) > 0:
+                per_engine.add(int(c))
+        return out
+
+    @staticmethod
+    def _engine_sizes(df: pd.DataFrame) -> Optional[List[float]]:
+        """All engine sizes in 0.5-10 L plus COMMON_ENGINE_SIZES; None without an engine_size column."""
+        if 'engine_size' not in df.columns:
+            return None
+        sizes = {s for s in (_to_float(v) for v in df['engine_size'].dropna().unique().tolist())
+                 if s is not None and 0.5 <= s <= 10.0}
+        return sorted(sizes | set(COMMON_ENGINE_SIZES))
+
+    @staticmethod
+    def _metadata(df: pd.DataFrame) -> Dict:
+        conditions = []
+        if 'condition' in df.columns:
+            # Dataset conditions first ("Used" counts as "Good"), then the rest of VALID_CONDITIONS
+            for cond in (str(c).strip() for c in df['condition'].dropna().unique().tolist() if str(c).strip()):
+                normalized = 'Good' if cond.lower() == 'used' else cond
+                if normalized in VALID_CONDITIONS:
+                    conditions.append(normalized)
+            conditions += [c for c in VALID_CONDITIONS if c not in conditions]
+        else:
+            conditions = list(VALID_CONDITIONS)
+
+        fuel_types = list(VALID_FUEL_TYPES)
+        if 'fuel_type' in df.columns:
+            fuel_types = sorted(normalize_fuel_types(df['fuel_type'].dropna().unique().tolist())) or fuel_types
+
+        def value_range(col, default):
+            if col not in df.columns:
+                return default
+            values = pd.to_numeric(df[col], errors='coerce').dropna()
+            return {"min": int(values.min()), "max": int(values.max())} if len(values) else default
+
+        return {
+            "conditions": conditions,
+            "fuel_types": fuel_types,
+            "year_range": value_range('year', {"min": 2000, "max": 2025}),
+            "mileage_range": value_range('mileage', {"min": 0, "max": 500000}),
+        }
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+
+    def models_for(self, make: str) -> List[str]:
+        return self.models.get(canonical(make), [])
+
+    def node(self, make: str, model: str) -> Optional[ModelNode]:
+        return self.nodes.get((canonical(make), canonical(model)))
+
+    def cylinders_for(self, make: str, model: str, engine: float) -> Optional[Set[int]]:
+        """Cylinder counts of make/model rows with an engine within ENGINE_TOLERANCE; None if no row matches."""
+        node = self.node(make, model)
+        if node is None:
+            return None
+        matched = [c for size, c in zip(node.engines, node.cylinders) if abs(size - float(engine)) < ENGINE_TOLERANCE]
+        return set().union(*matched) if matched else None
+
+    def body(self, key: Hashable, build: Callable[[], object]) -> CachedBody:
+        """
+        Serialized response for key, built on first use. Keys must come from
+        a bounded set (catalog entries), never from raw request input.
+        """
+        cached = self._bodies.get(key)
+        if cached is None:
+            cached = encode(build())
+            with self._bodies_lock:
+                cached = self._bodies.setdefault(key, cached)
+        return cached
@@ -0,0 +1,29 @@
+"""
+Gunicorn config for multi-worker deployments:
+
+    gunicorn -c gunicorn.conf.py app.main:app
+
+With PRELOAD_SHARED_STATE (default on) the master loads models and dataset
+once and workers share them copy-on-write (see app/core/preload.py). The
+master never runs inference; each worker warms the model up at app startup.
+"""
+
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 8000)}"
+workers = int(os.environ.get("WEB_CONCURRENCY", 4))
+worker_class = "uvicorn.workers.UvicornWorker"
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 120))
+
+preload_app = os.environ.get("PRELOAD_SHARED_STATE", "true").lower() in ("1", "true", "yes")
+
+
+def when_ready(server):
+    """Runs in the master after the app is imported, before workers fork."""
+    if not preload_app:
+        return
+    try:
+        from app.core.preload import preload_serving_state
+        preload_serving_state()
+    except Exception as e:
+        server.log.warning(f"Preload failed, workers will load on their own: {e}")
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: dropdown/option lists per request vs. the VehicleCatalog.
+
+"before" is the per-request work the cars/options routes did: filter the
+make/model rows, unique() the column, clean up the strings, let FastAPI
+serialize the list. "after" is the catalog lookup plus its pre-serialized
+body (what cached_json_response sends, or the 304 check against its ETag).
+
+Uses the real dataset (DatasetLoader) when present, otherwise a synthetic
+frame shaped like iqcars (60k rows by default).
+
+Usage:
+    python scripts/benchmark_catalog.py [--rows 60000] [--lookups 300]
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+SCRIPT_DIR = Path(__file__).parent
+BACKEND_DIR = SCRIPT_DIR.parent
+sys.path.insert(0, str(BACKEND_DIR))
+sys.path.insert(0, str(SCRIPT_DIR))
+
+from fastapi.encoders import jsonable_encoder
+
+from app.core.http_cache import encode
+from app.services.dataset_index import DatasetIndex
+from app.services.dataset_loader import DatasetLoader
+from app.services.vehicle_catalog import VehicleCatalog
+from benchmark_dataset_index import per_call_us, synthetic_dataset
+
+
+def with_options(df):
+    rng = np.random.default_rng(1)
+    df = df.copy()
+    df['trim'] = rng.choice(['LE', 'SE', 'XLE', 'Limited', 'Sport'], len(df))
+    df['engine_size'] = rng.choice([1.6, 2.0, 2.4, 2.5, 3.0, 3.5], len(df))
+    df['cylinders'] = np.where(df['engine_size'] > 2.5, 6, 4)
+    df['color'] = rng.choice(['White', 'Black', 'Silver', 'Gray', 'Red', 'Blue'], len(df))
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--rows', type=int, default=60000)
+    parser.add_argument('--lookups', type=int, default=300)
+    args = parser.parse_args()
+
+    df = None
+    try:
+        df = DatasetLoader.get_instance().dataset
+    except Exception:
+        pass
+    source = "dataset"
+    if df is None or len(df) == 0:
+        df = with_options(synthetic_dataset(args.rows))
+        source = "synthetic"
+
+    index = DatasetIndex(df)
+    build_start = time.perf_counter()
+    catalog = VehicleCatalog(df, index)
+    build_ms = (time.perf_counter() - build_start) * 1000
+
+    rng = random.Random(0)
+    pairs = df[['make', 'model']].dropna().drop_duplicates().astype(str).values.tolist()
+    keys = [tuple(rng.choice(pairs)) for _ in range(args.lookups)]
+
+    def scan_list(frame, col):
+        values = [str(v).strip() for v in frame[col].dropna().unique().tolist() if str(v).strip()]
+        return jsonable_encoder(sorted(set(values)))
+
+    def scan_cylinders(make, model):
+        rows = index.frame(make, model)
+        engine = pd.to_numeric(rows['engine_size'], errors='coerce')
+        rows = rows[engine.notna() & (np.abs(engine - 2.0) < 0.1)]
+        return jsonable_encoder(sorted({int(c) for c in pd.to_numeric(rows['cylinders']).dropna() if c > 0}))
+
+    def catalog_list(key, values):
+        return catalog.body(key, lambda: values)
+
+    print(f"Dataset: {source} ({len(df)} rows), lookups: {len(keys)}")
+    print(f"VehicleCatalog build: {build_ms:.1f} ms (once per load), {len(catalog.nodes)} make/models")
+    print(f"{'endpoint':<28}{'before us':>12}{'catalog us':>12}{'speedup':>10}")
+    for name, before_fn, after_fn in [
+        ("makes", lambda mk, md: scan_list(df, 'make'),
+         lambda mk, md: catalog_list('makes', catalog.makes)),
+        ("models/{make}", lambda mk, md: scan_list(index.frame(mk), 'model'),
+         lambda mk, md: catalog_list(('models', mk.lower()), catalog.models_for(mk))),
+        ("trims/{make}/{model}", lambda mk, md: scan_list(index.frame(mk, md), 'trim'),
+         lambda mk, md: catalog_list(('trims', catalog.node(mk, md).trims), list(catalog.node(mk, md).trims))),
+        ("available-cylinders", scan_cylinders,
+         lambda mk, md: catalog_list(('cylinders', tuple(sorted(catalog.cylinders_for(mk, md, 2.0) or ()))),
+                                     sorted(catalog.cylinders_for(mk, md, 2.0) or ()))),
+    ]:
+        before = per_call_us(before_fn, keys)
+        after = per_call_us(after_fn, keys)
+        print(f"{name:<28}{before:>12.1f}{after:>12.1f}{before / after:>9.1f}x")
+
+    body = encode(catalog.makes)
+    print(f"makes body: {len(body.body)} bytes, ETag {body.etag}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Benchmark listing photo detection: one image at a time vs. batched.
+
+"before" handles each photo of each listing on its own: decode, YOLO crop,
+one image-tower forward, score, in a Python loop (the old
+_detect_from_single_image flow). "after" is detect_cars_from_image_sets(): every photo of the listings
+decoded in parallel, embedded in batched forwards, votes aggregated in NumPy.
+Photos from --folder are grouped into listings of --per-listing images.
+
+Needs torch/transformers and the dataset (for the make/model labels).
+
+Usage:
+    python scripts/benchmark_clip_batch_detection.py --folder uploads/listings [--per-listing 6] [--listings 8]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).parent
+BACKEND_DIR = SCRIPT_DIR.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from app.services import car_detection_service as detection
+
+IMAGE_SUFFIXES = {'.jpg', '.jpeg', '.png', '.webp'}
+
+
+def one_by_one(listings, labels):
+    for paths in listings:
+        for path in paths:
+            img = detection._load_image(path)
+            if img is None:
+                continue
+            img = detection._crop_images([img])[0]
+            detection._score_images(detection._image_embeddings([img]), labels["makes"], labels["models_by_make"],
+                                    labels["models_by_make_filtered"], detection.COLOR_LABELS,
+                                    detection.YEAR_RANGE_LABELS)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--folder', required=True, help="folder with sample listing photos (searched recursively)")
+    parser.add_argument('--per-listing', type=int, default=6)
+    parser.add_argument('--listings', type=int, default=8)
+    args = parser.parse_args()
+
+    # Measure decode/crop/forward work, not embedding store hits
+    from app.config import settings
+    settings.EMBEDDING_STORE_ENABLED = False
+
+    if not detection.ML_AVAILABLE:
+        print("FAIL: torch/transformers are required")
+        sys.exit(1)
+    photos = sorted(str(p) for p in Path(args.folder).rglob('*') if p.suffix.lower() in IMAGE_SUFFIXES)
+    photos = photos[:args.per_listing * args.listings]
+    if not photos:
+        print(f"FAIL: no images under {args.folder}")
+        sys.exit(1)
+    listings = [photos[i:i + args.per_listing] for i in range(0, len(photos), args.per_listing)]
+
+    labels = detection._load_labels_from_dataset()
+    detection._get_text_bank()
+    one_by_one(listings[:1], labels)  # warm up
+    detection.detect_cars_from_image_sets(listings[:1])
+
+    start = time.perf_counter()
+    one_by_one(listings, labels)
+    before = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for paths in listings:
+        detection.detect_car_from_images(paths)
+    per_listing = time.perf_counter() - start
+
+    start = time.perf_counter()
+    detection.detect_cars_from_image_sets(listings)
+    all_at_once = time.perf_counter() - start
+
+    print(f"{len(photos)} photos in {len(listings)} listings, device: {detection._get_device()}")
+    print(f"{'mode':<28}{'total s':>10}{'photos/s':>10}{'speedup':>10}")
+    for name, seconds in [("one image at a time", before), ("batched per listing", per_listing),
+                          ("batched across listings", all_at_once)]:
+        print(f"{name:<28}{seconds:>10.2f}{len(photos) / seconds:>10.1f}{before / seconds:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
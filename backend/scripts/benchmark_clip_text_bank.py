@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Benchmark per-image CLIP scoring: full text+image forward vs. the text bank.
+
+"before" is what _clip_classify did for every image and attribute: run the
+processor and both CLIP towers over the prompt list (makes, the models of
+the top makes, colors, year ranges). "after" is one image-tower forward
+plus a matrix multiply per attribute against the TextEmbeddingBank. Also
+reports the bank build time and checks that both give the same top label.
+
+Needs torch/transformers and the dataset (for the make/model labels).
+
+Usage:
+    python scripts/benchmark_clip_text_bank.py [--images 5] [--top-makes 5] [--image photo.jpg]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+SCRIPT_DIR = Path(__file__).parent
+BACKEND_DIR = SCRIPT_DIR.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from PIL import Image
+
+from app.services import car_detection_service as detection
+from app.services.clip_text_bank import color_prompt, make_prompt, model_prompt, year_range_prompt
+
+
+def label_sets(labels, top_makes):
+    makes = labels["makes"]
+    sets = [[make_prompt(m) for m in makes]]
+    for make in makes[:top_makes]:
+        sets.append([model_prompt(make, m) for m in labels["models_by_make"].get(make, [])])
+    sets.append([color_prompt(c) for c in detection.COLOR_LABELS])
+    sets.append([year_range_prompt(r) for r in detection.YEAR_RANGE_LABELS])
+    return [s for s in sets if s]
+
+
+def full_forward(model, processor, image, prompts):
+    import torch
+    with torch.no_grad():
+        inputs = processor(text=prompts, images=image, return_tensors="pt", padding=True)
+        inputs = {k: v.to(detection._get_device()) for k, v in inputs.items()}
+        return model(**inputs).logits_per_image.softmax(dim=1).cpu().numpy()[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--images', type=int, default=5)
+    parser.add_argument('--top-makes', type=int, default=5)
+    parser.add_argument('--image', help="photo to score (default: a synthetic image)")
+    args = parser.parse_args()
+
+    if not detection.ML_AVAILABLE:
+        print("FAIL: torch/transformers are required")
+        sys.exit(1)
+    model, processor = detection._load_clip_model()
+    labels = detection._load_labels_from_dataset()
+    sets = label_sets(labels, args.top_makes)
+    image = Image.open(args.image).convert('RGB') if args.image else Image.new('RGB', (640, 480), color=(90, 90, 110))
+
+    start = time.perf_counter()
+    bank = detection._get_text_bank()
+    build_s = time.perf_counter() - start
+
+    def before():
+        return [full_forward(model, processor, image, prompts) for prompts in sets]
+
+    def after():
+        features = detection._image_embedding(image)
+        return [detection._clip_classify(features, prompts)[0] for prompts in sets]
+
+    before(), after()  # warm up
+    timings = {}
+    for name, fn in [("full forward", before), ("text bank", after)]:
+        start = time.perf_counter()
+        for _ in range(args.images):
+            results = fn()
+        timings[name] = (time.perf_counter() - start) / args.images * 1000
+        timings[name + " top"] = [int(np.argmax(r)) for r in results]
+
+    print(f"Prompts per image: {sum(len(s) for s in sets)} in {len(sets)} label sets, "
+          f"bank: {len(bank)} prompts (ready in {build_s:.1f}s)")
+    print(f"{'path':<16}{'ms/image':>12}")
+    for name in ("full forward", "text bank"):
+        print(f"{name:<16}{timings[name]:>12.1f}")
+    print(f"speedup: {timings['full forward'] / timings['text bank']:.1f}x, "
+          f"same top labels: {timings['full forward top'] == timings['text bank top']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: dataset lookups via str.lower() scans vs. the DatasetIndex.
+
+"before" is the pattern the routes and MarketAnalyzer used on every request:
+df[(df['make'].str.lower() == make) & (df['model'].str.lower() == model)].
+"after" is DatasetIndex.frame()/count()/mask() built once by DatasetLoader.
+
+Uses the real dataset (DatasetLoader) when present, otherwise a synthetic
+frame shaped like iqcars (60k rows by default).
+
+Usage:
+    python scripts/benchmark_dataset_index.py [--rows 60000] [--lookups 300]
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+SCRIPT_DIR = Path(__file__).parent
+BACKEND_DIR = SCRIPT_DIR.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from app.services.dataset_index import DatasetIndex
+from app.services.dataset_loader import DatasetLoader
+
+
+def synthetic_dataset(n_rows, n_makes=60, models_per_make=15):
+    rng = np.random.default_rng(0)
+    makes = np.array([f"Make{i:02d}" for i in range(n_makes)], dtype=object)
+    make_idx = rng.integers(0, n_makes, n_rows)
+    model_idx = rng.integers(0, models_per_make, n_rows)
+    return pd.DataFrame({
+        'make': makes[make_idx],
+        'model': [f"Model{m}-{k}" for m, k in zip(make_idx, model_idx)],
+        'year': rng.integers(2005, 2026, n_rows),
+        'mileage': rng.integers(0, 250000, n_rows).astype(float),
+        'price': rng.integers(3000, 90000, n_rows).astype(float),
+        'location': rng.choice(['Erbil', 'Baghdad', 'Basra', 'Duhok', 'Sulaymaniyah'], n_rows),
+        'condition': rng.choice(['Excellent', 'Good', 'Fair'], n_rows),
+        'fuel_type': rng.choice(['Gasoline', 'Diesel', 'Hybrid'], n_rows),
+    })
+
+
+def per_call_us(fn, keys):
+    start = time.perf_counter()
+    for key in keys:
+        fn(*key)
+    return (time.perf_counter() - start) / len(keys) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--rows', type=int, default=60000)
+    parser.add_argument('--lookups', type=int, default=300)
+    args = parser.parse_args()
+
+    df = None
+    try:
+        df = DatasetLoader.get_instance().dataset
+    except Exception:
+        pass
+    source = "dataset"
+    if df is None or len(df) == 0:
+        df = synthetic_dataset(args.rows)
+        source = "synthetic"
+
+    build_start = time.perf_counter()
+    index = DatasetIndex(df)
+    build_ms = (time.perf_counter() - build_start) * 1000
+
+    rng = random.Random(0)
+    pairs = df[['make', 'model']].dropna().drop_duplicates().astype(str).values.tolist()
+    keys = [tuple(rng.choice(pairs)) for _ in range(args.lookups)]
+    locations = df['location'].dropna().astype(str).unique().tolist() if 'location' in df.columns else ['Erbil']
+
+    def scan_make_model(make, model):
+        return df[(df['make'].str.lower() == make.lower()) & (df['model'].str.lower() == model.lower())]
+
+    def scan_make(make, model):
+        return df[df['make'].str.lower() == make.lower()]
+
+    def scan_count(make, model):
+        return len(df[(df['make'].str.lower() == make.lower()) & (df['model'].str.lower() == model.lower())])
+
+    def scan_location(make, model):
+        return df[df['location'].str.lower() == rng.choice(locations).lower()]
+
+    def index_location(make, model):
+        return df[index.mask('location', rng.choice(locations))]
+
+    # Sanity: both paths select the same rows (modulo surrounding whitespace)
+    make, model = keys[0]
+    assert len(scan_make_model(make, model)) <= len(index.frame(make, model))
+
+    print(f"Dataset: {source} ({len(df)} rows), lookups: {len(keys)}")
+    print(f"DatasetIndex build: {build_ms:.1f} ms (once per load)")
+    print(f"{'lookup':<28}{'scan us':>12}{'index us':>12}{'speedup':>10}")
+    for name, before_fn, after_fn in [
+        ("make + model frame", scan_make_model, lambda mk, md: index.frame(mk, md)),
+        ("make frame", scan_make, lambda mk, md: index.frame(mk)),
+        ("make + model count", scan_count, lambda mk, md: index.count(mk, md)),
+        ("location mask", scan_location, index_location),
+    ]:
+        before = per_call_us(before_fn, keys)
+        after = per_call_us(after_fn, keys)
+        print(f"{name:<28}{before:>12.1f}{after:>12.1f}{before / after:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
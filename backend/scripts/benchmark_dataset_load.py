@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Benchmark: dataset startup time and peak memory, CSV parse vs. binary cache.
+
+"before" is pd.read_csv(DATA_FILE), what every loader ran on start.
+"after (cold)" is read_dataset() on a fresh CSV: parse plus writing the
+cache. "after (warm)" is read_dataset() with a valid cache, what every later
+start does. Each run is a fresh interpreter, so nothing is warm; peak memory
+is the tracemalloc peak of the load (Python and NumPy allocations) plus the
+Arrow buffers still held after it.
+
+Works on a temporary copy of the real dataset when present, otherwise on a
+synthetic iqcars-shaped CSV (60k rows by default).
+
+Usage:
+    python scripts/benchmark_dataset_load.py [--rows 60000] [--repeat 3]
+"""
+
+import argparse
+import json
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).parent
+BACKEND_DIR = SCRIPT_DIR.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from app.config import settings
+from app.services.dataset_cache import CACHE_FORMAT, cache_paths
+
+from benchmark_dataset_index import synthetic_dataset
+
+RUNNER = r"""
+import json, sys, time, tracemalloc
+sys.path.insert(0, sys.argv[1])
+import pandas as pd
+from app.services.dataset_cache import read_dataset
+try:
+    import pyarrow
+    arrow_bytes = pyarrow.total_allocated_bytes
+except ImportError:
+    arrow_bytes = lambda: 0
+tracemalloc.start()
+started = time.perf_counter()
+df = pd.read_csv(sys.argv[2]) if sys.argv[3] == 'csv' else read_dataset(sys.argv[2])
+elapsed = (time.perf_counter() - started) * 1000
+peak = tracemalloc.get_traced_memory()[1] + arrow_bytes()
+print(json.dumps({'ms': elapsed, 'peak_mb': peak / (1024 * 1024), 'rows': len(df),
+                  'frame_mb': df.memory_usage(deep=True).sum() / (1024 * 1024)}))
+"""
+
+
+def run(csv_path: Path, mode: str) -> dict:
+    out = subprocess.run([sys.executable, '-c', RUNNER, str(BACKEND_DIR), str(csv_path), mode],
+                         check=True, capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def clear_cache(csv_path: Path):
+    for path in cache_paths(csv_path):
+        path.unlink(missing_ok=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--rows', type=int, default=60000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = Path(tmp) / 'dataset.csv'
+        if settings.DATA_FILE.exists():
+            shutil.copyfile(settings.DATA_FILE, csv_path)
+            source = f"dataset {settings.DATA_FILE.name}"
+        else:
+            synthetic_dataset(args.rows).to_csv(csv_path, index=False)
+            source = "synthetic"
+
+        results = {'before: pd.read_csv': [], 'after (cold): parse + write cache': [],
+                   'after (warm): cache hit': []}
+        for _ in range(args.repeat):
+            results['before: pd.read_csv'].append(run(csv_path, 'csv'))
+            clear_cache(csv_path)
+            results['after (cold): parse + write cache'].append(run(csv_path, 'cached'))
+            results['after (warm): cache hit'].append(run(csv_path, 'cached'))
+
+        cache_mb = cache_paths(csv_path)[0].stat().st_size / (1024 * 1024)
+        first = results['before: pd.read_csv'][0]
+        print(f"Dataset: {source} ({first['rows']} rows, CSV {csv_path.stat().st_size / (1024 * 1024):.1f} MB, "
+              f"{CACHE_FORMAT} cache {cache_mb:.1f} MB, frame {first['frame_mb']:.1f} MB)")
+        print(f"{'path':<38}{'ms':>9}{'peak MB':>10}{'speedup':>10}")
+        before_ms = statistics.median(r['ms'] for r in results['before: pd.read_csv'])
+        for name, runs in results.items():
+            ms = statistics.median(r['ms'] for r in runs)
+            peak = max(r['peak_mb'] for r in runs)
+            print(f"{name:<38}{ms:>9.0f}{peak:>10.1f}{before_ms / ms:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: per-row feature encoding cost before and after FeatureEncoder.
+
+"before" replays the old predict_price loop (if/elif chain per column,
+LabelEncoder.transform([value]) per categorical, maps rebuilt per row, one-row
+DataFrame). "after" uses the FeatureEncoder compiled by load_model().
+
+Uses models/model_info.json + encoders.pkl when present, otherwise synthetic
+encoders with a realistic vocabulary size.
+
+Usage:
+    python scripts/benchmark_feature_encoding.py [--rows 2000]
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import LabelEncoder
+
+SCRIPT_DIR = Path(__file__).parent
+BACKEND_DIR = SCRIPT_DIR.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from app.core.feature_encoder import FeatureEncoder
+from app.core.predict_price import load_model
+
+DEFAULT_FEATURES = ['year', 'mileage', 'engine_size', 'cylinders', 'age_of_car',
+                    'condition_encoded', 'fuel_type_encoded', 'location_encoded',
+                    'make_encoded', 'model_encoded']
+
+
+def legacy_encode(car_data, feature_columns, encoders):
+    """The encoding loop predict_price ran on every request before FeatureEncoder."""
+    input_data = {}
+    for col in feature_columns:
+        if col == 'age_of_car':
+            input_data[col] = max(0, 2026 - int(car_data.get('year', 2020)))
+        elif col in ('make_encoded', 'model_encoded'):
+            key = col[:-len('_encoded')]
+            value = str(car_data.get(key, '')).strip()
+            if encoders and key in encoders:
+                try:
+                    input_data[col] = encoders[key].transform([value])[0]
+                except ValueError:
+                    input_data[col] = 0
+            else:
+                input_data[col] = abs(hash(value)) % 1000
+        elif col == 'condition_encoded':
+            condition_map = {'Excellent': 0, 'Very Good': 1, 'Good': 2, 'Fair': 3, 'Poor': 4}
+            input_data[col] = condition_map.get(str(car_data.get('condition', 'Good')).strip(), 2)
+        elif col == 'fuel_type_encoded':
+            fuel_map = {'Gasoline': 0, 'Diesel': 1, 'Hybrid': 2, 'Electric': 3, 'Other': 4}
+            input_data[col] = fuel_map.get(str(car_data.get('fuel_type', 'Gasoline')).strip(), 0)
+        elif col == 'location_encoded':
+            input_data[col] = abs(hash(str(car_data.get('location', 'Unknown')).strip())) % 1000
+        elif col in car_data:
+            val = car_data[col]
+            defaults = {'year': 2020, 'mileage': 50000, 'engine_size': 2.0, 'cylinders': 4}
+            input_data[col] = defaults.get(col, 0) if val is None or pd.isna(val) else float(val)
+        else:
+            defaults = {'year': 2020, 'mileage': 50000, 'engine_size': 2.0, 'cylinders': 4}
+            input_data[col] = defaults.get(col, 0)
+    df = pd.DataFrame([input_data])
+    return df[feature_columns]
+
+
+def synthetic_artifacts(n_makes=60, n_models=900):
+    makes = [f"Make{i:03d}" for i in range(n_makes)]
+    models = [f"Model{i:04d}" for i in range(n_models)]
+    encoders = {'make': LabelEncoder().fit(makes), 'model': LabelEncoder().fit(models)}
+    return {'feature_columns': DEFAULT_FEATURES}, encoders
+
+
+def sample_rows(encoders, n):
+    rng = random.Random(0)
+    makes = list(encoders['make'].classes_) + ['UnseenMake']
+    models = list(encoders['model'].classes_) + ['UnseenModel']
+    return [{
+        'year': rng.randint(2005, 2025),
+        'mileage': float(rng.randint(0, 250000)),
+        'engine_size': rng.choice([1.6, 2.0, 2.5, 3.5]),
+        'cylinders': rng.choice([4, 6, 8]),
+        'make': rng.choice(makes),
+        'model': rng.choice(models),
+        'condition': rng.choice(['Excellent', 'Good', 'Fair']),
+        'fuel_type': rng.choice(['Gasoline', 'Diesel', 'Hybrid']),
+        'location': rng.choice(['Erbil', 'Baghdad', 'Basra', 'Duhok']),
+    } for _ in range(n)]
+
+
+def per_row_us(fn, rows):
+    start = time.perf_counter()
+    for row in rows:
+        fn(row)
+    return (time.perf_counter() - start) / len(rows) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--rows', type=int, default=2000)
+    args = parser.parse_args()
+
+    model, model_info, encoders = load_model()
+    source = "models/"
+    if model is None or not (model_info.get('feature_columns') or model_info.get('features')) \
+            or not {'make', 'model'} <= set(encoders):
+        model_info, encoders = synthetic_artifacts()
+        source = "synthetic"
+    feature_columns = model_info.get('feature_columns') or model_info.get('features')
+    rows = sample_rows(encoders, args.rows)
+
+    build_start = time.perf_counter()
+    encoder = FeatureEncoder.from_artifacts(model_info, encoders)
+    build_ms = (time.perf_counter() - build_start) * 1000
+
+    out = np.empty(encoder.n_features, dtype=np.float32)
+    before = per_row_us(lambda r: legacy_encode(r, feature_columns, encoders), rows)
+    after_row = per_row_us(lambda r: encoder.encode_row(r, out), rows)
+    after_frame = per_row_us(lambda r: encoder.to_frame(encoder.encode_row(r, out)), rows)
+
+    start = time.perf_counter()
+    encoder.encode_many(rows)
+    after_batch = (time.perf_counter() - start) / len(rows) * 1e6
+
+    print(f"Artifacts: {source} ({len(feature_columns)} features), rows: {len(rows)}")
+    print(f"FeatureEncoder build: {build_ms:.2f} ms (once per model load)")
+    print(f"{'path':<40}{'us/row':>10}{'speedup':>10}")
+    for name, value in [
+        ("before: legacy loop + 1-row DataFrame", before),
+        ("after: encode_row (float32 buffer)", after_row),
+        ("after: encode_row + to_frame", after_frame),
+        ("after: encode_many (batch)", after_batch),
+    ]:
+        print(f"{name:<40}{value:>10.1f}{before / value:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Benchmark CatBoost vs ONNX Runtime for the production tabular model.
+
+Reports single-row latency (p50/p95), batch latency and throughput, and the
+resident memory each engine adds on this machine, so each deployment can pick
+TABULAR_INFERENCE_BACKEND. Run scripts/export_onnx.py first.
+
+Usage:
+    python scripts/benchmark_inference_backends.py [--single 500] [--batches 32,256,1024]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+SCRIPT_DIR = Path(__file__).parent
+BACKEND_DIR = SCRIPT_DIR.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from app.config import settings
+from app.core import predict_price
+from app.core.model_registry import _rss_bytes, get_model_registry
+from app.core.onnx_backend import OnnxTabularModel, load_onnx_session
+
+
+def time_calls(fn, X, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn(X)
+        times.append(time.perf_counter() - start)
+    return np.array(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark tabular inference engines")
+    parser.add_argument('--single', type=int, default=500, help="single-row calls per engine")
+    parser.add_argument('--batches', default="32,256,1024", help="comma-separated batch sizes")
+    args = parser.parse_args()
+    batch_sizes = [int(b) for b in args.batches.split(',')]
+
+    registry = get_model_registry()
+    serving = predict_price.get_serving_model()
+    if serving is None or serving.feature_encoder is None:
+        print("FAIL: production_model.pkl with model_info.json feature_columns is required")
+        sys.exit(1)
+    encoder = serving.feature_encoder
+
+    df = pd.read_csv(settings.DATA_FILE)
+    rows = df.sample(n=max(batch_sizes), replace=len(df) < max(batch_sizes), random_state=0).to_dict('records')
+    X = encoder.encode_many(rows)
+
+    engines = {'catboost': (lambda m: serving.model.predict(encoder.to_frame(m)),
+                            registry.get('tabular').resident_bytes)}
+    onnx_path = registry.find('tabular_onnx')
+    if onnx_path is None:
+        print("NOTE: no production_model.onnx; run scripts/export_onnx.py to include ONNX Runtime")
+    else:
+        rss_before = _rss_bytes()
+        onnx_model = OnnxTabularModel(load_onnx_session(onnx_path))
+        rss_after = _rss_bytes()
+        engines['onnxruntime'] = (onnx_model.predict,
+                                  rss_after - rss_before if rss_before is not None and rss_after is not None else None)
+
+    print(f"Model v{serving.version}, {encoder.n_features} features")
+    print(f"{'engine':<13}{'case':<14}{'p50 ms':>10}{'p95 ms':>10}{'rows/s':>12}")
+    for name, (predict, resident) in engines.items():
+        predict(X[:8])  # warmup
+        single = time_calls(predict, X[:1], args.single) * 1000
+        print(f"{name:<13}{'single row':<14}{np.percentile(single, 50):>10.3f}{np.percentile(single, 95):>10.3f}"
+              f"{1000 / single.mean():>12,.0f}")
+        for size in batch_sizes:
+            batch = time_calls(predict, X[:size], max(5, 2000 // size)) * 1000
+            print(f"{name:<13}{f'batch {size}':<14}{np.percentile(batch, 50):>10.3f}{np.percentile(batch, 95):>10.3f}"
+                  f"{size * 1000 / batch.mean():>12,.0f}")
+        mem = f"{resident / (1024 * 1024):.1f} MB" if resident is not None else "n/a"
+        print(f"{name:<13}{'resident':<14}{mem:>20}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: get_similar_cars latency, pandas filter/sort vs. SimilarCarIndex.
+
+"before" replays the old implementation: brand-tier / price / year masks over
+the whole dataset, year_diff / mileage_diff / price_diff columns, a full sort,
+an expanded second pass when fewer than 3 cars came back, iterrows to build
+the response. "after" is SimilarCarIndex.query() + to_results().
+
+Uses the real dataset (DatasetLoader) when present, otherwise a synthetic
+frame shaped like iqcars (60k rows by default).
+
+Usage:
+    python scripts/benchmark_similar_cars.py [--rows 60000] [--queries 200]
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+SCRIPT_DIR = Path(__file__).parent
+BACKEND_DIR = SCRIPT_DIR.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from app.services.canonicalization import add_canonical_columns
+from app.services.dataset_loader import DatasetLoader
+from app.services.similar_cars import LUXURY_BRANDS, PREMIUM_BRANDS, SimilarCarIndex, brand_tier, to_results
+
+from benchmark_dataset_index import synthetic_dataset
+
+
+def legacy_similar_cars(df, price_col, car, predicted_price, limit=10):
+    """The pandas pipeline get_similar_cars ran on every request before SimilarCarIndex."""
+    def tier_make(series):
+        lower = series.astype(str).str.lower().str.strip()
+        return lower.apply(lambda x: 'rolls royce' if 'rolls' in x and 'royce' in x else x)
+
+    def search(low, high):
+        frame = df
+        if brand_tier(car['make']) in ('luxury', 'premium'):
+            allowed = ['rolls royce' if 'rolls' in b else b for b in LUXURY_BRANDS + PREMIUM_BRANDS]
+            frame = frame[tier_make(frame['make']).isin(allowed)]
+        frame = frame[(frame[price_col] >= low) & (frame[price_col] <= high) & (frame[price_col] > 0)]
+        frame = frame[(frame['year'] >= car['year'] - 3) & (frame['year'] <= car['year'] + 3)]
+        exact_mask = (tier_make(frame['make']) == car['make'].lower()) & \
+            (frame['model'].astype(str).str.lower().str.strip() == car['model'].lower())
+        if exact_mask.sum() >= limit:
+            frame = frame[exact_mask]
+        elif exact_mask.any():
+            frame = pd.concat([frame[exact_mask], frame[~exact_mask]]).reset_index(drop=True)
+        frame = frame.copy()
+        frame['year_diff'] = abs(frame['year'] - car['year'])
+        frame['mileage_diff'] = abs(frame['mileage'] - car['mileage'])
+        frame['price_diff'] = abs(frame[price_col] - predicted_price)
+        frame['similarity_score'] = frame['year_diff'] / 10 + frame['mileage_diff'] / 10000 + \
+            frame['price_diff'] / predicted_price * 5
+        return frame.sort_values('similarity_score').head(limit)
+
+    similar = search(predicted_price * 0.7, predicted_price * 1.3)
+    if len(similar) < 3:
+        similar = pd.concat([similar, search(predicted_price * 0.5, predicted_price * 1.5)]) \
+            .sort_values('similarity_score').head(limit)
+    return [{'year': int(row['year']), 'price': float(row[price_col]), 'make': str(row['make']),
+             'model': str(row['model']), 'image_id': f"car_{idx:06d}.jpg"} for idx, row in similar.iterrows()]
+
+
+def per_call_ms(fn, cars):
+    start = time.perf_counter()
+    for car in cars:
+        fn(car)
+    return (time.perf_counter() - start) / len(cars) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--rows', type=int, default=60000)
+    parser.add_argument('--queries', type=int, default=200)
+    args = parser.parse_args()
+
+    df = None
+    try:
+        df = DatasetLoader.get_instance().dataset
+    except Exception:
+        pass
+    source = "dataset"
+    if df is None or len(df) == 0:
+        df = synthetic_dataset(args.rows)
+        df.loc[df.index % 13 == 0, 'make'] = 'BMW'
+        add_canonical_columns(df)
+        source = "synthetic"
+    price_col = DatasetLoader.get_instance().get_price_column() if source == "dataset" else 'price'
+
+    build_start = time.perf_counter()
+    index = SimilarCarIndex(df, price_col)
+    build_ms = (time.perf_counter() - build_start) * 1000
+
+    rng = random.Random(0)
+    sample = df[['make', 'model', 'year', 'mileage', price_col]].dropna().sample(args.queries, random_state=0)
+    cars = [{'make': str(r.make), 'model': str(r.model), 'year': int(r.year), 'mileage': float(r.mileage),
+             'price': float(getattr(r, price_col)) * rng.uniform(0.9, 1.1)} for r in sample.itertuples()]
+
+    before = per_call_ms(lambda c: legacy_similar_cars(df, price_col, c, c['price']), cars)
+    after = per_call_ms(lambda c: to_results(df, index.query(c['make'], c['model'], c['year'], c['mileage'],
+                                                             predicted_price=c['price']), price_col), cars)
+
+    overlap = []
+    for car in cars[:50]:
+        old = {(r['make'], r['model'], r['year']) for r in legacy_similar_cars(df, price_col, car, car['price'])}
+        new = {(r['make'], r['model'], r['year'])
+               for r in to_results(df, index.query(car['make'], car['model'], car['year'], car['mileage'],
+                                                   predicted_price=car['price']), price_col)}
+        overlap.append(len(old & new) / max(len(old), 1))
+
+    print(f"Dataset: {source} ({len(df)} rows), queries: {len(cars)}")
+    print(f"SimilarCarIndex build: {build_ms:.1f} ms (once per load)")
+    print(f"{'path':<40}{'ms/query':>10}{'speedup':>10}")
+    print(f"{'before: pandas filter + sort + iterrows':<40}{before:>10.2f}{1.0:>9.1f}x")
+    print(f"{'after: SimilarCarIndex + argpartition':<40}{after:>10.2f}{before / after:>9.1f}x")
+    print(f"Mean overlap of (make, model, year) with the old ranking: {np.mean(overlap):.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Benchmark eager fp32 vs int8 TorchScript vision models on CPU.
+
+For the CLIP image tower and the ResNet50 feature extractor: cold-start load
+time, resident memory the model adds, and per-image latency at batch size 1
+(p50/p95) and at --batch, so each deployment can pick
+VISION_INFERENCE_BACKEND. Run scripts/export_vision_models.py first.
+
+Usage:
+    python scripts/benchmark_vision_backends.py [--images photos/] [--single 30] [--batch 16]
+"""
+
+import argparse
+import gc
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+SCRIPT_DIR = Path(__file__).parent
+BACKEND_DIR = SCRIPT_DIR.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+import torch
+from PIL import Image
+
+from app.core.model_registry import _rss_bytes, get_model_registry
+from app.core.vision_backend import load_torchscript
+
+IMAGE_SUFFIXES = {'.jpg', '.jpeg', '.png', '.webp'}
+
+
+def sample_images(folder, n):
+    if folder:
+        paths = sorted(p for p in Path(folder).rglob('*') if p.suffix.lower() in IMAGE_SUFFIXES)[:n]
+        if paths:
+            return [Image.open(p).convert('RGB') for p in paths]
+    rng = np.random.default_rng(0)
+    return [Image.fromarray(rng.integers(0, 255, (480, 640, 3), dtype=np.uint8)) for _ in range(n)]
+
+
+def timed_load(load):
+    gc.collect()
+    rss_before = _rss_bytes()
+    start = time.perf_counter()
+    obj = load()
+    seconds = time.perf_counter() - start
+    rss_after = _rss_bytes()
+    rss_mb = (rss_after - rss_before) / (1024 * 1024) if rss_before is not None and rss_after is not None else float('nan')
+    return obj, seconds, rss_mb
+
+
+def latency_ms(fn, single, batch):
+    """(p50, p95) ms for one image, ms per image in a batch"""
+    with torch.no_grad():
+        fn(single[:1])  # warm up
+        times = []
+        for img in single:
+            start = time.perf_counter()
+            fn([img])
+            times.append((time.perf_counter() - start) * 1000)
+        fn(batch)
+        start = time.perf_counter()
+        fn(batch)
+        per_image = (time.perf_counter() - start) * 1000 / len(batch)
+    return np.percentile(times, 50), np.percentile(times, 95), per_image
+
+
+def clip_engines():
+    from transformers import CLIPImageProcessor
+    from app.services import car_detection_service as detection
+
+    processor = CLIPImageProcessor.from_pretrained("openai/clip-vit-base-patch32")
+    path = get_model_registry().find('clip_image_int8')
+    if path is not None:
+        tower, seconds, rss = timed_load(lambda: load_torchscript(path))
+        yield "CLIP image", "int8 TorchScript", seconds, rss, \
+            lambda images: tower(processor(images=images, return_tensors="pt")["pixel_values"])
+
+    (model, clip_processor), seconds, rss = timed_load(detection._load_clip_model)
+    model.to('cpu')
+    yield "CLIP image", "fp32 eager", seconds, rss, \
+        lambda images: model.get_image_features(**clip_processor(images=images, return_tensors="pt"))
+
+
+def resnet_engines():
+    from torchvision.models import ResNet50_Weights, resnet50
+    from app.services.image_analyzer import torch_preprocess
+
+    def batch(images):
+        return torch.stack([torch_preprocess(img.resize((224, 224))) for img in images])
+
+    path = get_model_registry().find('resnet50_int8')
+    if path is not None:
+        model, seconds, rss = timed_load(lambda: load_torchscript(path))
+        yield "ResNet50", "int8 TorchScript", seconds, rss, lambda images: model(batch(images))
+
+    def load_eager():
+        m = resnet50(weights=ResNet50_Weights.IMAGENET1K_V1)
+        m.fc = torch.nn.Identity()
+        return m.eval()
+
+    model, seconds, rss = timed_load(load_eager)
+    yield "ResNet50", "fp32 eager", seconds, rss, lambda images: model(batch(images))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--images', help="folder of sample photos (default: synthetic images)")
+    parser.add_argument('--single', type=int, default=30, help="batch-1 calls per engine")
+    parser.add_argument('--batch', type=int, default=16)
+    args = parser.parse_args()
+
+    images = sample_images(args.images, max(args.single, args.batch))
+    single, batch = images[:args.single], images[:args.batch]
+    print(f"{len(images)} images, torch {torch.__version__}, {torch.get_num_threads()} threads, "
+          f"quantized engine {torch.backends.quantized.engine}")
+    print(f"{'model':<12}{'engine':<18}{'load s':>8}{'+RSS MB':>9}{'p50 ms':>9}{'p95 ms':>9}"
+          f"{'ms/img@' + str(args.batch):>12}{'speedup':>9}")
+    for engines in (clip_engines(), resnet_engines()):
+        rows = []
+        for model_name, engine, seconds, rss, fn in engines:
+            rows.append((model_name, engine, seconds, rss, *latency_ms(fn, single, batch)))
+        eager_batch = rows[-1][6]
+        for model_name, engine, seconds, rss, p50, p95, per_image in rows:
+            print(f"{model_name:<12}{engine:<18}{seconds:>8.2f}{rss:>9.0f}{p50:>9.1f}{p95:>9.1f}"
+                  f"{per_image:>12.1f}{eager_batch / per_image:>8.1f}x")
+        if len(rows) == 1:
+            print(f"  ({rows[0][0]}: no int8 export found; run scripts/export_vision_models.py)")
+
+
+if __name__ == "__main__":
+    main()
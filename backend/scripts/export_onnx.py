@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Export the production CatBoost model to ONNX and verify parity.
+
+Writes models/production_model.onnx next to production_model.pkl, runs both
+engines on held-out rows, and records the result in production_model.onnx.json.
+Without --holdout the rows come from the test split core/retrain_iqcars.py
+holds out of data/iqcars_cleaned.csv (same file, size and seed from
+app.config), never from the rows the model was fit on. The API only serves an ONNX export whose parity
+check passed for the exact production_model.pkl version.
+
+Usage:
+    python scripts/export_onnx.py [--holdout holdout.csv] [--rows 2000] [--rtol 1e-4]
+
+Requires catboost and onnxruntime.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+import pandas as pd
+from sklearn.model_selection import train_test_split
+
+SCRIPT_DIR = Path(__file__).parent
+BACKEND_DIR = SCRIPT_DIR.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from app.config import IQCARS_TRAINING_FILE, TRAINING_RANDOM_STATE, TRAINING_TEST_SIZE
+from app.core import predict_price
+from app.core.model_registry import get_model_registry
+from app.core.onnx_backend import (
+    ONNX_FILENAME, PARITY_RTOL, OnnxTabularModel, export_catboost_to_onnx,
+    load_onnx_session, parity_report, write_onnx_meta,
+)
+from app.services.dataset_cache import read_dataset
+
+
+def load_holdout(path, n_rows, seed=42):
+    """
+    Held-out rows as car dicts and where they came from: an explicit CSV,
+    else the training script's test split of its dataset (seeded sample).
+    """
+    if path:
+        return pd.read_csv(path).to_dict('records'), str(path)
+    if not IQCARS_TRAINING_FILE.exists():
+        raise FileNotFoundError(f"{IQCARS_TRAINING_FILE} (the training dataset) not found; "
+                                f"pass --holdout with a CSV of held-out cars")
+    df = read_dataset(IQCARS_TRAINING_FILE)
+    _, df = train_test_split(df, test_size=TRAINING_TEST_SIZE, random_state=TRAINING_RANDOM_STATE)
+    if len(df) > n_rows:
+        df = df.sample(n=n_rows, random_state=seed)
+    return df.to_dict('records'), f"test split of {IQCARS_TRAINING_FILE.name}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export production model to ONNX with parity check")
+    parser.add_argument('--holdout', help="CSV of held-out cars (default: the training test split of data/iqcars_cleaned.csv)")
+    parser.add_argument('--rows', type=int, default=2000)
+    parser.add_argument('--rtol', type=float, default=PARITY_RTOL)
+    args = parser.parse_args()
+
+    registry = get_model_registry()
+    tabular = registry.get('tabular')
+    serving = predict_price.get_serving_model()
+    if tabular is None or serving is None or serving.feature_encoder is None:
+        print("FAIL: production_model.pkl with model_info.json feature_columns is required")
+        sys.exit(1)
+
+    try:
+        rows, source = load_holdout(args.holdout, args.rows)
+    except FileNotFoundError as e:
+        print(f"FAIL: {e}")
+        sys.exit(1)
+
+    out_path = tabular.path.parent / ONNX_FILENAME
+    print(f"Exporting {tabular.path} (v{tabular.version}) -> {out_path}")
+    try:
+        meta = export_catboost_to_onnx(serving.model, out_path, tabular.version,
+                                       serving.feature_encoder.feature_columns)
+    except ValueError as e:
+        print(f"FAIL: {e}")
+        sys.exit(1)
+
+    X = serving.feature_encoder.encode_many(rows)
+    onnx_model = OnnxTabularModel(load_onnx_session(out_path))
+    catboost_predict = lambda m: serving.model.predict(serving.feature_encoder.to_frame(m))
+    report = parity_report(catboost_predict, onnx_model.predict, X, rtol=args.rtol)
+    report['holdout'] = source
+
+    meta['parity'] = report
+    write_onnx_meta(out_path, meta)
+
+    print(f"Parity on {report['rows']} held-out rows ({source}): max abs diff ${report['max_abs_diff']:.4f}, "
+          f"max rel diff {report['max_rel_diff']:.2e} (rtol {report['rtol']:.0e})")
+    if not report['passed']:
+        print("FAIL: ONNX output differs from CatBoost; the API will keep using CatBoost")
+        sys.exit(1)
+    print("OK: set TABULAR_INFERENCE_BACKEND=onnxruntime to serve with ONNX Runtime")
+
+
+if __name__ == "__main__":
+    main()
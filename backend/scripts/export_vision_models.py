@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Export the serving vision models as int8 TorchScript and verify parity.
+
+CLIP: the image tower of the weights car_detection_service serves (fine-tuned
+checkpoint or base CLIP), with its make head -> models/clip_image_int8.pt.
+ResNet50: ImageAnalyzer's torchvision feature extractor, calibrated on
+training photos -> models/resnet50_int8.pt.
+
+Both are compared with the fp32 eager models on the classifier validation
+split (data/splits.json from 02_prepare_dataset.py): cosine similarity of
+the embeddings and, for CLIP, make accuracy (trained head, else zero-shot
+make prompts). The result goes into each <file>.json; the API only serves
+an export whose parity check passed for the exact source weights.
+
+Usage:
+    python scripts/export_vision_models.py [--models clip,resnet50] [--val 500] [--calibration 64]
+
+Requires torch, torchvision and transformers.
+"""
+
+import argparse
+import copy
+import json
+import random
+import sys
+from pathlib import Path
+
+import numpy as np
+
+SCRIPT_DIR = Path(__file__).parent
+BACKEND_DIR = SCRIPT_DIR.parent
+ROOT = BACKEND_DIR.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from app.config import settings
+from app.core.vision_backend import (
+    CLIP_IMAGE_FILENAME, EAGER, PARITY_MAX_ACCURACY_DROP, PARITY_MIN_COSINE, RESNET50_FILENAME,
+    cosine_report, export_clip_image_tower, export_resnet50_features, load_torchscript, write_meta,
+)
+
+DEFAULT_SPLITS = ROOT / "data" / "splits.json"
+
+
+def load_split(splits, name, limit, seed=0):
+    """Records of a split whose photo exists, a seeded sample of at most limit."""
+    records = [r for r in splits.get(name, []) if Path(r["path"]).exists()]
+    if len(records) > limit:
+        records = random.Random(seed).sample(records, limit)
+    return records
+
+
+def decode(records):
+    from app.services.car_detection_service import _load_image
+    pairs = [(r, _load_image(r["path"])) for r in records]
+    return [r for r, img in pairs if img is not None], [img for _, img in pairs if img is not None]
+
+
+def predicted_makes(features, makes):
+    """Top make per embedding as detection scores it: trained head, else zero-shot prompts."""
+    from app.services import car_detection_service as detection
+    from app.services.clip_text_bank import make_prompt
+    probs = detection._classifier_make_probs(features, makes)
+    if probs is None:
+        probs, _ = detection._clip_classify(features, [make_prompt(m) for m in makes])
+    return [makes[i] for i in np.argmax(probs, axis=1)]
+
+
+def accuracy(predicted, records):
+    return float(np.mean([p.lower() == str(r["make"]).lower() for p, r in zip(predicted, records)]))
+
+
+def export_clip(out_dir, val_records, batch_size):
+    import torch
+    from app.services import car_detection_service as detection
+
+    model, processor = detection._load_clip_model()
+    records, images = decode(val_records)
+    if not images:
+        raise ValueError("no readable validation photos")
+    makes = sorted({str(r["make"]) for r in records})
+    eager = detection._image_embeddings(images)
+    eager_makes = predicted_makes(eager, makes)
+
+    head = None
+    if detection._make_classifier is not None:
+        head = (detection._make_classifier.weight.detach().cpu().numpy(),
+                detection._make_classifier.bias.detach().cpu().numpy())
+    idx_to_make = (detection._finetuned_mappings or {}).get("idx_to_make")
+    example = processor(images=images[:2], return_tensors="pt")["pixel_values"]
+    out_path = out_dir / CLIP_IMAGE_FILENAME
+    print(f"Exporting CLIP image tower ({detection._clip_model_id}) -> {out_path}")
+    meta = export_clip_image_tower(model, example, out_path, detection._clip_model_id, head, idx_to_make)
+    # The export moved the shared vision submodules to CPU; keep the eager model consistent
+    model.to(detection._get_device())
+
+    tower = load_torchscript(out_path)
+    chunks = []
+    with torch.no_grad():
+        for start in range(0, len(images), batch_size):
+            pixels = processor(images=images[start:start + batch_size], return_tensors="pt")["pixel_values"]
+            chunks.append(tower(pixels).numpy())
+    optimized = np.concatenate(chunks)
+    optimized_makes = predicted_makes(optimized, makes)
+
+    report = cosine_report(eager, optimized)
+    report.update({
+        "split": "val",
+        "makes": len(makes),
+        "accuracy_fp32": accuracy(eager_makes, records),
+        "accuracy_int8": accuracy(optimized_makes, records),
+        "top1_agreement": float(np.mean([a == b for a, b in zip(eager_makes, optimized_makes)])),
+        "max_accuracy_drop": PARITY_MAX_ACCURACY_DROP,
+    })
+    report["passed"] = bool(report["mean_cosine"] >= PARITY_MIN_COSINE
+                            and report["accuracy_fp32"] - report["accuracy_int8"] <= PARITY_MAX_ACCURACY_DROP)
+    meta["parity"] = report
+    write_meta(out_path, meta)
+    print(f"CLIP parity on {report['images']} validation photos: make accuracy "
+          f"{report['accuracy_fp32']:.3f} fp32 -> {report['accuracy_int8']:.3f} int8, "
+          f"top-1 agreement {report['top1_agreement']:.3f}, cosine mean {report['mean_cosine']:.4f} "
+          f"min {report['min_cosine']:.4f}")
+    return report["passed"]
+
+
+def export_resnet50(out_dir, train_records, val_records, batch_size):
+    import torch
+    from torchvision.models import ResNet50_Weights, resnet50
+    from app.services.image_analyzer import torch_preprocess
+
+    def batches(images):
+        for start in range(0, len(images), batch_size):
+            yield torch.stack([torch_preprocess(img.resize((224, 224))) for img in images[start:start + batch_size]])
+
+    model = resnet50(weights=ResNet50_Weights.IMAGENET1K_V1)
+    model.fc = torch.nn.Identity()
+    model.eval()
+    _, calibration = decode(train_records)
+    _, images = decode(val_records)
+    if not calibration or not images:
+        raise ValueError("no readable calibration/validation photos")
+
+    out_path = out_dir / RESNET50_FILENAME
+    print(f"Exporting ResNet50 features ({len(calibration)} calibration photos) -> {out_path}")
+    meta = export_resnet50_features(copy.deepcopy(model), list(batches(calibration)), out_path)
+
+    optimized_model = load_torchscript(out_path)
+    with torch.no_grad():
+        eager = np.concatenate([model(b).numpy() for b in batches(images)])
+        optimized = np.concatenate([optimized_model(b).numpy() for b in batches(images)])
+    report = cosine_report(eager, optimized)
+    report["split"] = "val"
+    report["passed"] = bool(report["mean_cosine"] >= PARITY_MIN_COSINE)
+    meta["parity"] = report
+    write_meta(out_path, meta)
+    print(f"ResNet50 parity on {report['images']} validation photos: cosine mean {report['mean_cosine']:.4f} "
+          f"min {report['min_cosine']:.4f}")
+    return report["passed"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--models', default="clip,resnet50", help="comma-separated: clip, resnet50")
+    parser.add_argument('--splits', type=Path, default=DEFAULT_SPLITS)
+    parser.add_argument('--val', type=int, default=500, help="validation photos for the parity check")
+    parser.add_argument('--calibration', type=int, default=64, help="training photos to calibrate ResNet50")
+    parser.add_argument('--batch-size', type=int, default=16)
+    parser.add_argument('--out-dir', type=Path, default=None, help="default: the models directory")
+    args = parser.parse_args()
+
+    if not args.splits.exists():
+        print(f"FAIL: {args.splits} not found; run scripts/02_prepare_dataset.py first")
+        sys.exit(1)
+    with open(args.splits, encoding="utf-8") as f:
+        splits = json.load(f)
+    val_records = load_split(splits, "val", args.val)
+    train_records = load_split(splits, "train", args.calibration)
+    out_dir = args.out_dir or settings.MODEL_DIR
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    # Reference numbers come from the fp32 eager models
+    settings.VISION_INFERENCE_BACKEND = EAGER
+    settings.EMBEDDING_STORE_ENABLED = False
+
+    results = {}
+    for name in [m.strip() for m in args.models.split(',') if m.strip()]:
+        try:
+            if name == "clip":
+                results[name] = export_clip(out_dir, val_records, args.batch_size)
+            elif name == "resnet50":
+                results[name] = export_resnet50(out_dir, train_records, val_records, args.batch_size)
+            else:
+                print(f"Unknown model '{name}' (use clip, resnet50)")
+                results[name] = False
+        except (ValueError, ImportError, RuntimeError) as e:
+            print(f"FAIL: {name}: {e}")
+            results[name] = False
+
+    if not all(results.values()):
+        failed = ', '.join(n for n, ok in results.items() if not ok)
+        print(f"FAIL: {failed} did not pass parity; the API keeps serving the eager model")
+        sys.exit(1)
+    print("OK: set VISION_INFERENCE_BACKEND=torchscript to serve the int8 models")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Measure per-worker memory with and without master preload.
+
+Forks N workers the way gunicorn does. "independent": each worker loads the
+models and dataset itself (today's behaviour). "preload": the master calls
+preload_serving_state() (models, consolidated dataset, gc.freeze) and
+workers inherit it. Every worker then serves some synthetic traffic before reporting its
+private/shared/PSS memory from /proc/self/smaps_rollup (Linux).
+
+Usage:
+    python scripts/measure_worker_memory.py [--workers 4]
+"""
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).parent
+BACKEND_DIR = SCRIPT_DIR.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from app.core.preload import memory_report, preload_serving_state
+
+
+def simulate_traffic():
+    """Touch the model and dataset the way requests do."""
+    from app.core.predict_price import predict_price_many
+    from app.services.dataset_loader import DatasetLoader
+
+    rows = [{'year': 2010 + i % 14, 'mileage': 5000.0 * i, 'make': 'Toyota', 'model': 'Camry'} for i in range(64)]
+    for _ in range(5):
+        predict_price_many(rows)
+    loader = DatasetLoader.get_instance()
+    df = loader.dataset
+    price_col = loader.get_price_column()
+    if df is not None and price_col and 'make' in df.columns:
+        df.groupby(df['make'].astype(str).str.lower())[price_col].median()
+
+
+def fork_workers(n, load_in_worker):
+    children = []
+    for _ in range(n):
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_fd)
+            code = 0
+            try:
+                if load_in_worker:
+                    preload_serving_state(freeze=False)
+                simulate_traffic()
+                os.write(write_fd, json.dumps(memory_report()).encode())
+            except Exception as e:
+                os.write(write_fd, json.dumps({'error': str(e)}).encode())
+                code = 1
+            finally:
+                os._exit(code)
+        os.close(write_fd)
+        children.append((pid, read_fd))
+
+    reports = []
+    for pid, read_fd in children:
+        with os.fdopen(read_fd) as f:
+            reports.append(json.loads(f.read() or '{}'))
+        os.waitpid(pid, 0)
+    return reports
+
+
+def mb(value):
+    return f"{value / (1024 * 1024):>9.1f}" if value is not None else f"{'n/a':>9}"
+
+
+def print_reports(title, reports):
+    print(f"\n{title}")
+    print(f"{'pid':>8}{'rss MB':>9}{'pss MB':>9}{'shared':>9}{'private':>9}")
+    for r in reports:
+        if 'error' in r:
+            print(f"  worker failed: {r['error']}")
+            continue
+        print(f"{r['pid']:>8}{mb(r['rss'])}{mb(r['pss'])}{mb(r['shared'])}{mb(r['private'])}")
+    pss = [r['pss'] for r in reports if r.get('pss') is not None]
+    private = [r['private'] for r in reports if r.get('private') is not None]
+    if pss:
+        print(f"{'total':>8}{'':>9}{mb(sum(pss))}{'':>9}{mb(sum(private))}")
+    return sum(pss) if pss else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-worker memory with and without preload")
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args()
+    if not hasattr(os, 'fork'):
+        print("FAIL: fork() is required (Linux/macOS)")
+        sys.exit(1)
+
+    # Independent first: the master must not hold anything yet
+    before = print_reports(f"independent: {args.workers} workers each load models + dataset",
+                           fork_workers(args.workers, load_in_worker=True))
+    preload_serving_state()
+    after = print_reports(f"preload: master loads once, {args.workers} workers share copy-on-write",
+                          fork_workers(args.workers, load_in_worker=False))
+    if before and after:
+        print(f"\nNode PSS across workers: {mb(before).strip()} MB -> {mb(after).strip()} MB "
+              f"({(1 - after / before) * 100:.0f}% less)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Tests for the paginate-first budget search
+"""
+
+import sys
+import os
+import asyncio
+
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.api.routes import budget
+from app.services.dataset_loader import DatasetLoader
+
+
+def test_top_k_order_matches_full_sort_with_ties():
+    rng = np.random.default_rng(0)
+    primary = rng.integers(0, 20, 500).astype(float)
+    secondary = rng.random(500)
+    full = np.lexsort((secondary, primary))
+    for k in [1, 7, 50, 500, 600]:
+        assert budget._top_k_order(primary, secondary, k).tolist() == full[:k].tolist()
+
+
+def test_search_pages_merge_dataset_and_marketplace(monkeypatch):
+    df = pd.DataFrame({
+        'make': ['Toyota'] * 6,
+        'model': ['Camry'] * 6,
+        'year': [2015, 2016, 2017, 2018, 2019, 2020],
+        'mileage': [50000.0] * 6,
+        'cylinders': [4, 4, np.nan, 4, 4, 4],
+        'price': [9000.0, 10000.0, 10100.0, 10500.0, 11000.0, 0.0],
+    })
+    monkeypatch.setattr(DatasetLoader, '_instance', None)
+    loader = DatasetLoader()
+    monkeypatch.setattr(loader, '_snapshot', DatasetLoader._build_snapshot(df))
+    monkeypatch.setattr(loader, '_loaded', True)
+    listings = [{'id': 1, 'make': 'Kia', 'model': 'Rio', 'year': 2019, 'price': 10200.0, 'mileage': 1000}]
+    requested = {}
+
+    def search_listings(filters, page=1, page_size=15, sort_by='newest'):
+        requested.update(page_size=page_size, sort_by=sort_by, target_price=filters.get('target_price'))
+        return listings, len(listings)
+
+    monkeypatch.setattr(budget, 'search_listings', search_listings)
+
+    def search(page):
+        return asyncio.run(budget.search_budget(
+            budget=10000, min_price=None, max_price=None, make=None, model=None, min_year=None, max_year=None,
+            max_mileage=None, condition=None, fuel_type=None, transmission=None, location=None, source=None,
+            page=page, page_size=2))
+
+    first, second = search(1), search(2)
+    # Rows with no price or no cylinders never count; the exact budget match ranks first
+    assert first.total == second.total == 5
+    assert [(r.source, r.price) for r in first.results] == [('database', 10000.0), ('marketplace', 10200.0)]
+    assert [(r.source, r.price) for r in second.results] == [('database', 10500.0), ('database', 9000.0)]
+    assert requested == {'page_size': 4, 'sort_by': 'closest_price', 'target_price': 10000}
@@ -0,0 +1,71 @@
+"""
+Tests for the shared, batched YOLO car cropper
+"""
+
+import sys
+import os
+
+import numpy as np
+from PIL import Image
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services import car_cropper
+from app.services.car_cropper import CarCropper
+
+
+class _Tensor:
+    def __init__(self, values):
+        self.values = np.asarray(values, dtype=np.float32)
+
+    def cpu(self):
+        return self
+
+    def numpy(self):
+        return self.values
+
+
+class _Boxes:
+    def __init__(self, classes, xyxy):
+        self.cls = _Tensor(classes)
+        self.xyxy = _Tensor(np.reshape(xyxy, (-1, 4)))
+
+    def __len__(self):
+        return len(self.cls.values)
+
+
+class _FakeYolo:
+    """Person (0) everywhere; a small and a large car in the first image of each batch"""
+
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, images, verbose=False):
+        self.batches.append(len(images))
+        results = []
+        for i, _ in enumerate(images):
+            if i == 0:
+                boxes = _Boxes([0, 2, 7], [[0, 0, 90, 90], [0, 0, 10, 10], [10, 20, 50, 40]])
+            else:
+                boxes = _Boxes([0], [[0, 0, 90, 90]])
+            results.append(type('Result', (), {'boxes': boxes})())
+        return results
+
+
+def test_crop_images_batches_and_crops_largest_vehicle(monkeypatch):
+    monkeypatch.setattr(car_cropper, 'YOLO_AVAILABLE', True)
+    cropper = CarCropper(batch_size=2)
+    cropper._model = _FakeYolo()
+    images = [Image.new('RGB', (100, 100)) for _ in range(3)]
+
+    crops = cropper.crop_images(images)
+    assert cropper._model.batches == [2, 1]
+    assert crops[0].size == (40, 20) and crops[1] is None and crops[2].size == (40, 20)
+
+
+def test_cropper_without_ultralytics_returns_no_crops(monkeypatch):
+    monkeypatch.setattr(car_cropper, 'YOLO_AVAILABLE', False)
+    cropper = CarCropper()
+    assert not cropper.available and not cropper.load()
+    assert cropper.crop_images([Image.new('RGB', (10, 10))]) == [None]
@@ -0,0 +1,51 @@
+"""
+Tests for the persisted CLIP text-embedding bank
+"""
+
+import sys
+import os
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.clip_text_bank import TextEmbeddingBank, detection_prompts, make_prompt, model_prompt
+
+
+def _encoder(calls):
+    def encode(texts):
+        calls.append(list(texts))
+        rng = np.random.default_rng([sum(map(ord, t)) for t in texts])
+        vectors = rng.standard_normal((len(texts), 8))
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    return encode
+
+
+def test_bank_persists_per_key_and_scores_like_clip(tmp_path):
+    labels = {"makes": ["Toyota", "BMW"], "models_by_make": {"Toyota": ["Camry"], "BMW": ["X5"]}}
+    prompts = detection_prompts(labels, ["Red"], ["2010s"])
+    assert prompts[:2] == [make_prompt("Toyota"), make_prompt("BMW")] and len(prompts) == 6
+
+    calls = []
+    bank = TextEmbeddingBank.load_or_build(tmp_path, "v1_base", prompts, _encoder(calls), logit_scale=100.0)
+    assert len(calls) == 1 and (tmp_path / "clip_text_bank_v1_base.npy").exists()
+
+    # Same key and prompts: loaded from disk (float16), nothing re-encoded
+    loaded = TextEmbeddingBank.load_or_build(tmp_path, "v1_base", prompts, _encoder(calls), logit_scale=100.0)
+    assert len(calls) == 1
+    assert np.allclose(loaded.embeddings, bank.embeddings, atol=1e-3)
+
+    image = np.full(8, 1 / np.sqrt(8))
+    labels_for_make = [model_prompt("Toyota", "Camry"), model_prompt("BMW", "X5")]
+    expected = 100.0 * np.stack([bank.embeddings[prompts.index(p)] for p in labels_for_make]) @ image
+    assert np.allclose(loaded.logits(image, labels_for_make), expected, atol=0.2)
+
+    # Prompts outside the bank are encoded once and then served from memory
+    loaded.logits(image, ["a photo of a Teal car in daylight"], encode=_encoder(calls))
+    loaded.logits(image, ["a photo of a Teal car in daylight"], encode=_encoder(calls))
+    assert len(calls) == 2
+
+    # A new labels version replaces the old files
+    TextEmbeddingBank.load_or_build(tmp_path, "v2_base", prompts, _encoder(calls), logit_scale=100.0)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["clip_text_bank_v2_base.json", "clip_text_bank_v2_base.npy"]
@@ -0,0 +1,58 @@
+"""
+Tests for the binary dataset cache
+"""
+
+import sys
+import os
+
+import pandas as pd
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services import dataset_cache
+from app.services.dataset_cache import cache_paths, read_dataset
+
+
+def _write_csv(path, prices):
+    pd.DataFrame({'make': ['Toyota', 'BMW', 'Kia'], 'price': prices}).to_csv(path, index=False)
+
+
+def test_cache_hit_skips_csv_parse(tmp_path, monkeypatch):
+    csv_path = tmp_path / 'cars.csv'
+    _write_csv(csv_path, [1000, 2000, 3000])
+    to_category = lambda df: df.astype({'make': 'category'})
+
+    first = read_dataset(csv_path, transform=to_category, variant='cat')
+    assert all(p.exists() for p in cache_paths(csv_path, 'cat'))
+
+    def fail(*args, **kwargs):
+        raise AssertionError("CSV parsed despite a valid cache")
+    monkeypatch.setattr(dataset_cache.pd, 'read_csv', fail)
+    cached = read_dataset(csv_path, transform=to_category, variant='cat')
+
+    assert isinstance(cached['make'].dtype, pd.CategoricalDtype)
+    pd.testing.assert_frame_equal(cached, first)
+
+
+def test_cache_rebuilt_when_csv_changes(tmp_path):
+    csv_path = tmp_path / 'cars.csv'
+    _write_csv(csv_path, [1000, 2000, 3000])
+    assert read_dataset(csv_path)['price'].tolist() == [1000, 2000, 3000]
+
+    # Same size, different content, same mtime: the hash check catches it
+    stat = csv_path.stat()
+    _write_csv(csv_path, [1000, 2000, 4000])
+    os.utime(csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+    assert read_dataset(csv_path)['price'].tolist() == [1000, 2000, 4000]
+
+
+def test_touched_csv_keeps_cache(tmp_path, monkeypatch):
+    csv_path = tmp_path / 'cars.csv'
+    _write_csv(csv_path, [1000, 2000, 3000])
+    read_dataset(csv_path)
+    stat = csv_path.stat()
+    os.utime(csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    monkeypatch.setattr(dataset_cache.pd, 'read_csv', lambda *a, **k: pd.DataFrame())
+    assert read_dataset(csv_path)['price'].tolist() == [1000, 2000, 3000]
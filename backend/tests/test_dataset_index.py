@@ -0,0 +1,59 @@
+"""
+Tests for the categorical dataset index
+"""
+
+import sys
+import os
+
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.dataset_index import DatasetIndex
+
+
+def _frame():
+    return pd.DataFrame({
+        'make': ['Toyota', 'toyota ', 'BMW', None, 'Toyota', 'Kia'],
+        'model': ['Camry', 'camry', 'X5', 'Camry', 'Corolla', None],
+        'year': [2020, 2020, 2019, 2020, np.nan, 2018],
+        'location': ['Erbil', 'erbil', 'Baghdad', 'Erbil', None, 'Basra'],
+    }, index=[10, 11, 12, 13, 14, 15])
+
+
+def test_lookups_match_case_insensitive_scan():
+    df = _frame()
+    index = DatasetIndex(df)
+
+    assert index.rows('TOYOTA').tolist() == [0, 1, 4]
+    assert index.frame(' toyota', 'CAMRY').index.tolist() == [10, 11]
+    assert index.count('toyota', 'camry', 2020) == 2
+    assert index.count('toyota', 'corolla', 2020) == 0  # missing year is never grouped
+    assert index.count('kia') == 1 and index.count('kia', 'anything') == 0
+    assert index.count('unknown') == 0
+    assert index.mask('location', 'ERBIL').tolist() == [True, True, False, True, False, False]
+    assert not index.mask('location', 'nowhere').any()
+    assert sorted(index.models('toyota')) == ['camry', 'corolla']
+    assert index.has_model('bmw', 'x5') and not index.has_make('audi')
+    assert pd.isna(index.column('make').loc[13])
+
+
+def test_canonical_columns_match_scalar_rules():
+    from app.services.canonicalization import add_canonical_columns, canonical_make, canonical_model_trim
+
+    df = pd.DataFrame({
+        'make': ['Rolls Royce', 'rolls-royce ', 'Land Rover', None, 'BMW'],
+        'model': ['Ghost', 'Ghost Black Badge', 'Range Rover', 'X5', None],
+        'trim': [' Black Badge', None, 'HSE', np.nan, 'M Sport'],
+    })
+    add_canonical_columns(df)
+
+    assert df['make_norm'].tolist() == ['rolls-royce', 'rolls-royce', 'land-rover', '', 'bmw']
+    assert df['model_norm'].tolist()[:2] == ['ghost', 'ghost']
+    assert df['trim_norm'].tolist()[:3] == ['black badge', 'black badge', 'hse']
+    for row in df.itertuples():
+        assert canonical_make(row.make) == row.make_norm
+        assert canonical_model_trim(row.model, row.trim) == (row.model_norm, row.trim_norm)
+        assert f"{row.model_norm} {row.trim_norm}".strip() == row.model_trim_norm
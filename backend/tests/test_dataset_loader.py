@@ -0,0 +1,45 @@
+"""
+Tests for the compact serving dataset
+"""
+
+import sys
+import os
+
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.dataset_loader import compact_dataset
+
+
+def test_compact_dataset_keeps_values_with_smaller_dtypes():
+    df = pd.DataFrame({
+        'make': ['Toyota', 'Toyota', 'BMW', None],
+        'model': ['Camry', 'Camry', 'X5', 'Camry'],
+        'year': [2020, 2019, 2018, 2020],
+        'cylinders': [4.0, np.nan, 6.0, 4.0],
+        'mileage': [50000.0, 120000.0, np.nan, 0.0],
+        'engine_size': [2.4, 2.5, 3.0, 2.4],
+        'price': [15000, 12000, 30000, 16000],
+        'description': ['a', 'b', 'c', 'd'],
+    }, index=[5, 6, 7, 8])
+
+    compact = compact_dataset(df)
+
+    assert 'description' not in compact.columns
+    assert compact.index.tolist() == [5, 6, 7, 8]
+    assert isinstance(compact['make'].dtype, pd.CategoricalDtype)
+    assert compact['year'].dtype == np.int16
+    # Missing values cannot be small ints; float32 keeps them exactly
+    assert compact['cylinders'].dtype == np.float32
+    assert compact['mileage'].dtype == np.float32
+    assert compact['price'].dtype == np.float32
+    # 2.4 is not exact in float32, so engine_size stays float64
+    assert compact['engine_size'].dtype == np.float64
+
+    for col in compact.columns:
+        expected = df[col].astype(object).where(df[col].notna(), None).tolist()
+        actual = compact[col].astype(object).where(compact[col].notna(), None).tolist()
+        assert actual == expected, col
@@ -0,0 +1,73 @@
+"""
+Tests for the background dataset reload (snapshot swap)
+"""
+
+import sys
+import os
+import types
+
+import pandas as pd
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import Settings
+from app.services.dataset_loader import DatasetLoader
+from app.services.dataset_reloader import DatasetReloader
+
+
+def _write_csv(path, n_rows):
+    pd.DataFrame({
+        'make': ['Toyota'] * n_rows,
+        'model': ['Camry'] * n_rows,
+        'year': [2015 + i for i in range(n_rows)],
+        'mileage': [50000.0 + 1000 * i for i in range(n_rows)],
+        'location': ['Erbil'] * n_rows,
+        'price': [10000.0 + 1000 * i for i in range(n_rows)],
+    }).to_csv(path, index=False)
+
+
+def test_reload_swaps_snapshot_and_invalidates_labels(tmp_path, monkeypatch):
+    csv_path = tmp_path / 'cars.csv'
+    _write_csv(csv_path, 3)
+    monkeypatch.setattr(Settings, 'DATA_FILE', property(lambda self: csv_path))
+    monkeypatch.setattr(DatasetLoader, '_instance', None)
+    invalidated = []
+    monkeypatch.setitem(sys.modules, 'app.services.car_detection_service',
+                        types.SimpleNamespace(invalidate_labels=lambda: invalidated.append(True)))
+
+    loader = DatasetLoader.get_instance()
+    old = loader.snapshot
+    assert len(old.dataset) == 3
+
+    reloader = DatasetReloader()
+    assert not reloader.file_changed()
+
+    _write_csv(csv_path, 5)
+    os.utime(csv_path, ns=(old.source_version[1] + 10**9, old.source_version[1] + 10**9))
+    # A change is only acted on once it was seen unchanged by two polls
+    assert not reloader.file_changed()
+    assert reloader.file_changed()
+
+    assert reloader.reload_now()
+    new = loader.snapshot
+    assert len(new.dataset) == 5 and new.index.count('toyota', 'camry') == 5
+    assert new.market_stats.overall.count == 5
+    # Requests holding the old snapshot keep a consistent view
+    assert len(old.dataset) == 3 and old.index.count('toyota', 'camry') == 3
+    assert invalidated == [True]
+    assert not reloader.file_changed()
+
+
+def test_failed_reload_keeps_serving_snapshot(tmp_path, monkeypatch):
+    csv_path = tmp_path / 'cars.csv'
+    _write_csv(csv_path, 3)
+    monkeypatch.setattr(Settings, 'DATA_FILE', property(lambda self: csv_path))
+    monkeypatch.setattr(DatasetLoader, '_instance', None)
+
+    loader = DatasetLoader.get_instance()
+    old = loader.snapshot
+    csv_path.write_text('')
+
+    assert not DatasetReloader().reload_now()
+    assert loader.snapshot is old
@@ -0,0 +1,76 @@
+"""
+Tests for the content-addressed image embedding store
+"""
+
+import sys
+import os
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.embedding_store import EmbeddingStore, image_sha256
+
+
+def test_store_keys_by_content_and_persists(tmp_path):
+    photos = []
+    for name, content in [('a.jpg', b'photo-1'), ('copy.jpg', b'photo-1'), ('b.jpg', b'photo-2')]:
+        path = tmp_path / name
+        path.write_bytes(content)
+        photos.append(str(path))
+    keys = [image_sha256(p) for p in photos]
+    assert keys[0] == keys[1] != keys[2]
+    assert image_sha256(str(tmp_path / 'missing.jpg')) is None
+
+    store = EmbeddingStore(tmp_path / 'store', max_bytes=1 << 20)
+    vectors = np.arange(8, dtype=np.float32).reshape(2, 4)
+    store.put_many('clip', [keys[0], keys[2]], vectors)
+    found = store.get_many('clip', keys + [None])
+    assert np.array_equal(found[1], vectors[0]) and np.array_equal(found[2], vectors[1])
+    assert found[3] is None and store.get('resnet50', keys[0]) is None
+
+    # A vector of another dimension for the same space is refused, not stored
+    store.put('clip', 'other', np.zeros(3))
+    assert store.get('clip', 'other') is None
+
+    reopened = EmbeddingStore(tmp_path / 'store', max_bytes=1 << 20)
+    assert np.array_equal(reopened.get('clip', keys[2]), vectors[1])
+
+
+def test_store_evicts_least_recently_used_and_reuses_slots(tmp_path):
+    # Room for 10 vectors of 4 float32
+    store = EmbeddingStore(tmp_path, max_bytes=10 * 16)
+    for i in range(10):
+        store.put('clip', f'k{i}', np.full(4, i, dtype=np.float32))
+    store.get('clip', 'k0')  # k0 becomes the most recently used
+
+    store.put('clip', 'k10', np.full(4, 10, dtype=np.float32))
+    stats = store.stats()
+    assert stats['bytes'] <= 0.9 * 10 * 16
+    assert store.get('clip', 'k0') is not None and store.get('clip', 'k1') is None
+    assert np.array_equal(store.get('clip', 'k10'), np.full(4, 10, dtype=np.float32))
+
+    for i in range(11, 14):
+        store.put('clip', f'k{i}', np.full(4, i, dtype=np.float32))
+    assert (tmp_path / 'clip.f32').stat().st_size == 256 * 16  # freed slots reused, no growth
+    assert [int(store.get('clip', f'k{i}')[0]) for i in range(11, 14)] == [11, 12, 13]
+
+
+def test_read_racing_an_eviction_is_a_miss(tmp_path):
+    """A slot evicted and refilled by another worker between lookup and read is not returned"""
+    store = EmbeddingStore(tmp_path, max_bytes=2 * 16)
+    other_worker = EmbeddingStore(tmp_path, max_bytes=2 * 16)
+    store.put('clip', 'a', np.full(4, 1, dtype=np.float32))
+    store.put('clip', 'b', np.full(4, 2, dtype=np.float32))
+    read = store._read
+
+    def read_after_eviction(space, slots):
+        other_worker.put('clip', 'c', np.full(4, 3, dtype=np.float32))  # evicts 'a'
+        other_worker.put('clip', 'd', np.full(4, 4, dtype=np.float32))  # reuses its slot
+        return read(space, slots)
+
+    store._read = read_after_eviction
+    assert store.get('clip', 'a') is None
+    store._read = read
+    assert np.array_equal(store.get('clip', 'd'), np.full(4, 4, dtype=np.float32))
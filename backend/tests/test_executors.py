@@ -0,0 +1,75 @@
+"""
+Tests for the bounded executor pools
+"""
+
+import asyncio
+import sys
+import os
+import threading
+from typing import Optional
+
+import pytest
+from fastapi import Depends, FastAPI, Request
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core import executors
+from app.core.executors import BoundedExecutor, PoolSaturatedError, offload
+
+
+def test_full_pool_rejects_and_counts():
+    """Workers + queue is the admission limit; extra calls fail fast"""
+    pool = BoundedExecutor('test', max_workers=1, max_queue=1)
+    release = threading.Event()
+
+    async def scenario():
+        first = asyncio.ensure_future(pool.run(release.wait))
+        second = asyncio.ensure_future(pool.run(lambda: 'queued'))
+        await asyncio.sleep(0.05)
+        assert pool.queue_length == 1
+        with pytest.raises(PoolSaturatedError):
+            await pool.run(lambda: 'rejected')
+        release.set()
+        return await first, await second
+
+    try:
+        assert asyncio.run(scenario()) == (True, 'queued')
+        metrics = pool.metrics()
+        assert metrics['rejected'] == 1
+        assert metrics['completed'] == 2
+        assert metrics['queue_length'] == 0
+        assert metrics['wait_ms']['count'] == 2
+    finally:
+        pool.shutdown()
+
+
+def test_offloaded_route_keeps_signature_and_returns_503(monkeypatch):
+    """FastAPI sees the original parameters; a saturated pool becomes 503"""
+    pool = BoundedExecutor('test', max_workers=1, max_queue=0)
+    monkeypatch.setattr(executors, '_pools', {'test': pool})
+    app = FastAPI()
+
+    @app.exception_handler(PoolSaturatedError)
+    async def saturated(request: Request, exc: PoolSaturatedError):
+        return JSONResponse(status_code=503, content={}, headers={"Retry-After": str(exc.retry_after)})
+
+    def user() -> str:
+        return 'alice'
+
+    @app.get("/items/{item_id}")
+    @offload('test')
+    def read_item(item_id: int, q: Optional[str] = None, who: str = Depends(user)):
+        assert threading.current_thread().name.startswith('pool-test')
+        return {"item_id": item_id, "q": q, "who": who}
+
+    client = TestClient(app)
+    assert client.get("/items/3?q=x").json() == {"item_id": 3, "q": "x", "who": "alice"}
+
+    pool.max_workers = 0  # simulate every slot taken
+    response = client.get("/items/3")
+    assert response.status_code == 503
+    assert response.headers['retry-after'] == '1'
+    pool.shutdown()
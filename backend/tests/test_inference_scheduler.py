@@ -0,0 +1,100 @@
+"""
+Tests for the prediction micro-batching scheduler
+"""
+
+import asyncio
+import sys
+import os
+import threading
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.inference_scheduler import InferenceScheduler
+
+
+def fake_predict_many(rows):
+    prices = np.array([float(r.get('year', 0)) for r in rows])
+    errors = [None if r.get('year') else 'missing year' for r in rows]
+    return prices, errors
+
+
+def test_concurrent_calls_share_one_batch():
+    """Calls arriving within the window are predicted together"""
+    calls = []
+
+    def predict_many(rows):
+        calls.append(len(rows))
+        return fake_predict_many(rows)
+
+    async def run():
+        scheduler = InferenceScheduler(predict_many, window_ms=50, max_batch_size=8)
+        results = await asyncio.gather(*[scheduler.submit({'year': 2000 + i}) for i in range(5)])
+        metrics = scheduler.metrics()
+        await scheduler.stop()
+        return results, metrics
+
+    results, metrics = asyncio.run(run())
+    assert results == [2000.0 + i for i in range(5)]
+    assert calls == [5]
+    assert metrics['batches'] == 1
+    assert metrics['batch_size']['buckets']['8'] == 1
+    assert metrics['wait_ms']['count'] == 5
+
+
+def test_batches_respect_max_size_and_row_errors():
+    """Full batches flush early and a bad row only fails its own caller"""
+    calls = []
+
+    def predict_many(rows):
+        calls.append(len(rows))
+        return fake_predict_many(rows)
+
+    async def run():
+        scheduler = InferenceScheduler(predict_many, window_ms=200, max_batch_size=2)
+        results = await asyncio.gather(
+            scheduler.submit({'year': 2010}), scheduler.submit({}), scheduler.submit({'year': 2012}),
+            return_exceptions=True)
+        await scheduler.stop()
+        return results
+
+    results = asyncio.run(run())
+    assert results[0] == 2010.0 and results[2] == 2012.0
+    assert isinstance(results[1], RuntimeError)
+    assert calls[0] == 2
+
+
+def test_new_event_loop_fails_callers_of_the_old_one():
+    """Rebinding cancels the old loop's batching task; its callers get errors, not hangs"""
+    release = threading.Event()
+    started = threading.Event()
+
+    def predict_many(rows):
+        started.set()
+        release.wait(5)
+        return fake_predict_many(rows)
+
+    scheduler = InferenceScheduler(predict_many, window_ms=1, max_batch_size=1)
+    old_results = []
+
+    def old_loop():
+        async def run():
+            return await asyncio.wait_for(asyncio.gather(
+                scheduler.submit({'year': 2001}), scheduler.submit({'year': 2002}), return_exceptions=True), 5)
+        old_results.extend(asyncio.run(run()))
+
+    thread = threading.Thread(target=old_loop)
+    thread.start()
+    assert started.wait(5)  # first call in flight, second queued
+
+    async def new_loop():
+        threading.Timer(0.1, release.set).start()
+        result = await scheduler.submit({'year': 2003})
+        await scheduler.stop()
+        return result
+
+    assert asyncio.run(new_loop()) == 2003.0
+    thread.join(5)
+    assert len(old_results) == 2
+    assert all(isinstance(r, RuntimeError) for r in old_results)
@@ -0,0 +1,80 @@
+"""
+Tests for the precomputed market statistics cube
+"""
+
+import sys
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.dataset_index import DatasetIndex
+from app.services.market_stats import MarketStatsCube
+
+
+def _frame(n=2000):
+    rng = np.random.default_rng(1)
+    df = pd.DataFrame({
+        'make': rng.choice(['Toyota', 'Kia', 'BMW'], n),
+        'model': rng.choice(['A', 'B', 'C', 'D'], n),
+        'year': rng.integers(2010, 2025, n),
+        'mileage': rng.integers(0, 200000, n).astype(float),
+        'price': rng.integers(3000, 60000, n).astype(float),
+        'condition': rng.choice(['Good', 'Excellent', 'Fair'], n),
+        'fuel_type': rng.choice(['Gasoline', 'Diesel'], n),
+        'location': rng.choice(['Erbil', 'Baghdad'], n),
+    })
+    df.loc[::97, 'price'] = np.nan
+    return df
+
+
+def test_cube_matches_dataset_scans():
+    df = _frame()
+    cube = MarketStatsCube(df, DatasetIndex(df), 'price')
+
+    subset = df[(df['make'] == 'Kia') & (df['model'] == 'B') & (df['year'] == 2015)]
+    stats = cube.make_model('KIA', 'b', 2015)
+    assert stats.count == len(subset)
+    assert stats.mean == pytest.approx(subset['price'].mean(), rel=1e-6)
+    assert stats.median == pytest.approx(subset['price'].median(), rel=1e-6)
+    assert stats.p90 == pytest.approx(subset['price'].quantile(0.9), rel=1e-6)
+
+    assert cube.year(2012).mean == pytest.approx(df[df['year'] == 2012]['price'].mean(), rel=1e-6)
+    assert cube.category('fuel_type', 'diesel').count == int((df['fuel_type'] == 'Diesel').sum())
+    assert cube.category('location', 'Nowhere') is None
+
+    window = df[(df['mileage'] >= 40000) & (df['mileage'] <= 60000)]
+    stats = cube.mileage_window(40000, 60000)
+    assert stats.count == len(window)
+    assert stats.mean == pytest.approx(window['price'].mean(), rel=1e-9)
+
+    # similar(): make/model when it has >= 10 rows, otherwise broadens
+    assert cube.similar('Toyota', 'A').count == int(((df['make'] == 'Toyota') & (df['model'] == 'A')).sum())
+    assert cube.similar('Toyota', 'Z').count == int((df['make'] == 'Toyota').sum())
+    assert cube.similar('Lada', 'Z') == cube.overall
+
+
+def test_price_factors_match_condition_case_insensitively():
+    """Condition rows spelled 'good', ' Good' and 'GOOD' all count toward the Good factor"""
+    from app.services.dataset_loader import DatasetSnapshot
+    from app.services.market_analyzer import MarketAnalyzer
+    from app.services.market_context import MarketContext
+
+    df = _frame(300)
+    df['condition'] = np.resize(['Good', 'good', ' GOOD', 'Fair'], len(df))
+    index = DatasetIndex(df)
+    cube = MarketStatsCube(df, index, 'price')
+    mixed = df[df['condition'].str.strip().str.lower() == 'good']
+    assert cube.category('condition', 'Good').count == len(mixed)
+    assert cube.category('condition', 'Good').mean == pytest.approx(mixed['price'].mean(), rel=1e-6)
+
+    car = {'make': 'Kia', 'model': 'B', 'year': 2015, 'mileage': 60000, 'condition': 'Good'}
+    snapshot = DatasetSnapshot(dataset=df, index=index, market_stats=cube, price_col='price')
+    factors = MarketAnalyzer.__new__(MarketAnalyzer).get_price_factors(
+        car, 20000.0, MarketContext(snapshot, car))
+    condition = next(f for f in factors if f['factor'] == 'Condition')
+    assert condition['impact'] == pytest.approx(20000.0 - mixed['price'].mean(), abs=0.05)
@@ -0,0 +1,39 @@
+"""
+Tests for the model registry artifact lookup
+"""
+
+import json
+import pickle
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core import model_registry
+from app.core.model_registry import get_model_registry
+
+
+def test_sidecars_come_from_the_tabular_models_directory(tmp_path, monkeypatch):
+    """model_info/encoders next to the loaded production_model.pkl win over earlier MODEL_DIRS"""
+    stale, current = tmp_path / 'stale', tmp_path / 'current'
+    stale.mkdir()
+    current.mkdir()
+    (stale / 'model_info.json').write_text(json.dumps({'version': 'stale'}))
+    (current / 'model_info.json').write_text(json.dumps({'version': 'current'}))
+    with open(current / 'production_model.pkl', 'wb') as f:
+        pickle.dump({'model': 'estimator'}, f)
+    with open(stale / 'encoders.pkl', 'wb') as f:
+        pickle.dump({'make': 'stale'}, f)
+    monkeypatch.setattr(model_registry, 'MODEL_DIRS', [stale, current])
+
+    registry = get_model_registry()
+    registry.clear()
+    try:
+        assert registry.get('tabular').path == current / 'production_model.pkl'
+        assert registry.get_object('model_info') == {'version': 'current'}
+        assert registry.find('model_info', fresh=True) == current / 'model_info.json'
+        # Not shipped with the model: still found in the other directories
+        assert registry.get_object('encoders') == {'make': 'stale'}
+    finally:
+        registry.clear()
@@ -0,0 +1,48 @@
+"""
+Tests for the feedback retraining export
+"""
+
+import sys
+import os
+
+import pandas as pd
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import Settings, settings
+from app.services import model_retrainer
+
+
+def test_training_export_keeps_original_columns_and_dtypes(tmp_path, monkeypatch):
+    """The main dataset is read from the CSV as trained on, not the compact serving copy"""
+    main = pd.DataFrame({
+        'make': ['Toyota', 'BMW', 'Toyota'],
+        'model': ['Camry', 'X5', 'Corolla'],
+        'year': [2020, 2018, 2015],
+        'mileage': [50000.0, 120000.0, 90000.5],
+        'price': [15000.5, 30000.0, 9000.0],
+        'description': ['a', 'b', 'c'],
+        'color': ['white', 'black', 'white'],
+    })
+    csv_path = tmp_path / 'cars.csv'
+    main.to_csv(csv_path, index=False)
+    feedback = pd.DataFrame({'make': ['Kia'], 'model': ['Rio'], 'year': [2019], 'mileage': [40000.0],
+                             'price': [11000.0]})
+    monkeypatch.setattr(Settings, 'DATA_FILE', property(lambda self: csv_path))
+    monkeypatch.setattr(settings, 'DATASET_CACHE_ENABLED', False)
+    monkeypatch.setattr(model_retrainer, 'BASE_DIR', str(tmp_path))
+    monkeypatch.setattr(model_retrainer, 'export_feedback_for_training', lambda **kwargs: feedback)
+
+    result = model_retrainer.retrain_model_with_feedback(min_feedback_samples=1, feedback_weight=1)
+    assert result['success'], result
+    assert result['total_samples'] == 4
+
+    source = pd.read_csv(csv_path)
+    pd.testing.assert_frame_equal(model_retrainer.read_training_dataset(), source)
+    exported = pd.read_csv(result['training_data_path'])
+    assert list(exported.columns) == list(source.columns)
+    original = exported.iloc[:len(source)]
+    for col in source.columns:
+        assert original[col].dtype == source[col].dtype, col
+        assert original[col].tolist() == source[col].tolist(), col
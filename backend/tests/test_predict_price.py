@@ -0,0 +1,247 @@
+"""
+Tests for the production model prediction module
+"""
+
+import pytest
+import sys
+import os
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core import predict_price as pp
+from app.core.feature_encoder import FeatureEncoder, stable_bucket
+from app.core.prediction_cache import PredictionCache
+
+FEATURE_COLUMNS = ['year', 'mileage', 'engine_size', 'cylinders', 'age_of_car',
+                   'condition_encoded', 'fuel_type_encoded', 'location_encoded',
+                   'make_encoded', 'model_encoded']
+
+
+class FakeModel:
+    """Stands in for CatBoost: price is a linear function of the encoded row"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def predict(self, df):
+        self.calls += 1
+        return (df['year'] * 10 + df['make_encoded'] * 1000 - df['mileage'] / 100).to_numpy()
+
+
+class PicklableModel:
+    """Constant-offset model that survives a pickle round trip"""
+
+    def __init__(self, offset):
+        self.offset = offset
+
+    def predict(self, df):
+        return (df['year'] * 0 + self.offset).to_numpy()
+
+
+@pytest.fixture
+def fake_model(monkeypatch):
+    model = FakeModel()
+    serving = pp.ServingModel(
+        model=model, model_info={'feature_columns': FEATURE_COLUMNS}, encoders={},
+        feature_encoder=FeatureEncoder(FEATURE_COLUMNS, {}), version='v1', loaded_at=0.0)
+    monkeypatch.setattr(pp, '_active', serving)
+    monkeypatch.setattr(pp, '_prediction_cache', None)
+    return model
+
+
+@pytest.fixture
+def cache(monkeypatch, fake_model):
+    cache = PredictionCache(max_size=100)
+    cache.set_model_version('v1')
+    monkeypatch.setattr(pp, '_prediction_cache', cache)
+    return cache
+
+
+def test_predict_price_many_calls_model_once(fake_model):
+    """A batch is predicted with exactly one model call"""
+    rows = [{'year': 2015 + i % 5, 'mileage': 40000, 'make': 'Toyota', 'model': 'Camry'}
+            for i in range(50)]
+    prices, errors = pp.predict_price_many(rows)
+    assert fake_model.calls == 1
+    assert prices.shape == (50,)
+    assert errors == [None] * 50
+
+
+def test_predict_price_many_matches_single_row(fake_model):
+    """Batch results match predict_price row by row"""
+    rows = [
+        {'year': 2020, 'mileage': 30000, 'make': 'Toyota', 'model': 'Camry', 'condition': 'Fair'},
+        {'year': 2012, 'mileage': None, 'make': 'BMW', 'model': 'X5', 'fuel_type': 'Diesel'},
+    ]
+    prices, _ = pp.predict_price_many(rows)
+    for row, price in zip(rows, prices):
+        assert price == pytest.approx(pp.predict_price(row))
+
+
+def test_predict_price_many_reports_row_errors(fake_model):
+    """Invalid rows get an error and NaN without failing the batch"""
+    rows = [{'year': 2020, 'make': 'Kia', 'model': 'Rio'},
+            {'year': 'abc', 'make': 'Kia', 'model': 'Rio'}]
+    prices, errors = pp.predict_price_many(rows)
+    assert errors[0] is None and np.isfinite(prices[0])
+    assert errors[1] is not None and np.isnan(prices[1])
+
+
+def test_feature_encoder_uses_vocabularies():
+    """Known labels map to their encoder index, unseen labels to 0"""
+    from sklearn.preprocessing import LabelEncoder
+    make_encoder = LabelEncoder().fit(['BMW', 'Kia', 'Toyota'])
+    encoder = FeatureEncoder(['make_encoded', 'age_of_car', 'mileage'], {'make': make_encoder})
+    X = encoder.encode_many([{'make': 'Toyota', 'year': 2020}, {'make': 'Lada'}])
+    assert X.dtype == np.float32
+    assert X[:, 0].tolist() == [2.0, 0.0]
+    assert X[0, 2] == 50000
+    assert encoder.encode_row({'make': 'Toyota', 'year': 2020}).tolist() == X[0].tolist()
+
+
+def test_location_encoding_is_deterministic():
+    """Labels without an encoder use a process-independent bucket, not hash()"""
+    import zlib
+    encoder = FeatureEncoder(['location_encoded'], {})
+    assert encoder.encode_row({'location': ' Erbil '})[0] == zlib.crc32(b'Erbil') % 1000
+    assert stable_bucket('Erbil') == zlib.crc32(b'Erbil') % 1000
+
+
+def test_repeat_predictions_skip_model(fake_model, cache):
+    """Cached valuations are served without calling the model"""
+    car = {'year': 2018, 'mileage': 60000, 'make': 'Toyota', 'model': 'Camry'}
+    first = pp.predict_price(car)
+    prices, _ = pp.predict_price_many([car, dict(car, year=2019)])
+    assert fake_model.calls == 2
+    assert prices[0] == first
+    pp.predict_price_many([car, dict(car, year=2019)])
+    assert fake_model.calls == 2
+    assert cache.hits == 3
+
+
+def test_shared_cache_tier_and_version_invalidation(tmp_path):
+    """Workers share the SQLite tier; a new model version drops old entries"""
+    db_path = str(tmp_path / 'cache.db')
+    vector = np.array([2018, 60000, 0, 0], dtype=np.float32)
+    worker_a = PredictionCache(max_size=10, db_path=db_path)
+    worker_b = PredictionCache(max_size=10, db_path=db_path)
+    worker_a.set_model_version('v1')
+    worker_b.set_model_version('v1')
+    worker_a.put(vector, 21000.0)
+    assert worker_b.get(vector) == 21000.0
+    worker_b.set_model_version('v2')
+    assert worker_b.get(vector) is None
+    assert worker_a.get(vector) == 21000.0  # still in worker A's LRU for v1
+
+
+def test_model_registry_loads_each_artifact_once(tmp_path, monkeypatch):
+    """Artifacts are unpickled once and exposed as versioned handles"""
+    import pickle
+    from app.core import model_registry as mr
+
+    with open(tmp_path / 'production_model.pkl', 'wb') as f:
+        pickle.dump({'model': 'estimator', 'price_range_models': {'budget': 'sub'}}, f)
+    monkeypatch.setattr(mr, 'MODEL_DIRS', [tmp_path])
+    registry = mr.ModelRegistry()
+    registry.clear()
+    loads = []
+    original = mr.ARTIFACTS['tabular']
+    monkeypatch.setitem(mr.ARTIFACTS, 'tabular', mr.ArtifactSpec(
+        'tabular', original.filenames, lambda p: loads.append(p) or mr._load_pickle(p)))
+    try:
+        assert registry.tabular_model() == 'estimator'
+        assert registry.get('tabular') is registry.get('tabular')
+        assert registry.get_object('price_range_models') == {'budget': 'sub'}
+        assert registry.get('scaler') is None
+        assert len(loads) == 1
+        assert len(registry.version('tabular')) == 16
+        assert [a['name'] for a in registry.report()] == ['tabular', 'price_range_models']
+    finally:
+        registry.clear()
+
+
+def test_hot_swap_replaces_model_without_reload(tmp_path, monkeypatch):
+    """A new production_model.pkl is loaded, warmed up and swapped in"""
+    import json
+    import pickle
+    from app.core import model_registry as mr
+    from app.core.model_hot_swap import ModelHotSwapper
+
+    def write_model(offset, mtime):
+        path = tmp_path / 'production_model.pkl'
+        with open(path, 'wb') as f:
+            pickle.dump({'model': PicklableModel(offset)}, f)
+        os.utime(path, (mtime, mtime))
+
+    (tmp_path / 'model_info.json').write_text(json.dumps({'feature_columns': FEATURE_COLUMNS}))
+    write_model(20000.0, 1_000_000)
+    monkeypatch.setattr(mr, 'MODEL_DIRS', [tmp_path])
+    monkeypatch.setattr(pp, '_active', None)
+    monkeypatch.setattr(pp, '_using_fallback', False)
+    registry = mr.ModelRegistry()
+    registry.clear()
+    swapper = ModelHotSwapper()
+    car = {'year': 2018, 'make': 'Kia', 'model': 'Rio'}
+    try:
+        assert pp.predict_price(car) == 20000.0
+        old_version = pp.get_model_version()
+        assert swapper.check_now() is False
+
+        write_model(30000.0, 2_000_000)
+        assert swapper.check_now() is True
+        assert pp.predict_price(car) == 30000.0
+        status = swapper.status()
+        assert status['active_version'] != old_version
+        assert status['pending_version'] is None
+        assert swapper.last_warmup_ms is not None
+    finally:
+        registry.clear()
+
+
+def test_hot_swap_drops_deleted_sidecar(tmp_path, monkeypatch):
+    """A deleted sidecar is swapped out once, not reloaded on every poll"""
+    import json
+    import pickle
+    from app.core import model_registry as mr
+    from app.core.model_hot_swap import ModelHotSwapper
+
+    with open(tmp_path / 'production_model.pkl', 'wb') as f:
+        pickle.dump({'model': PicklableModel(20000.0)}, f)
+    with open(tmp_path / 'encoders.pkl', 'wb') as f:
+        pickle.dump({}, f)
+    (tmp_path / 'model_info.json').write_text(json.dumps({'feature_columns': FEATURE_COLUMNS}))
+    monkeypatch.setattr(mr, 'MODEL_DIRS', [tmp_path])
+    monkeypatch.setattr(pp, '_active', None)
+    monkeypatch.setattr(pp, '_using_fallback', False)
+    registry = mr.ModelRegistry()
+    registry.clear()
+    swapper = ModelHotSwapper()
+    try:
+        assert pp.predict_price({'year': 2018, 'make': 'Kia', 'model': 'Rio'}) == 20000.0
+        assert registry.get('encoders') is not None
+
+        (tmp_path / 'encoders.pkl').unlink()
+        assert swapper.check_now() is True
+        assert registry.get('encoders') is None
+        assert swapper.check_now() is False
+        assert swapper.swaps == 1
+    finally:
+        registry.clear()
+
+
+def test_onnx_parity_and_stale_exports():
+    """Parity is checked per row and stale/unverified exports are not served"""
+    from types import SimpleNamespace
+    from app.core.onnx_backend import attach_onnx, parity_report
+
+    X = np.arange(6, dtype=np.float32).reshape(3, 2)
+    reference = lambda m: m[:, 0] * 1000 + 5000
+    assert parity_report(reference, lambda m: reference(m) + 0.01, X)['passed']
+    assert not parity_report(reference, lambda m: reference(m) * 1.01, X)['passed']
+
+    onnx = SimpleNamespace(obj=object())
+    meta = SimpleNamespace(obj={'source_version': 'old', 'feature_columns': ['a', 'b'], 'parity': {'passed': True}})
+    assert attach_onnx(onnx, meta, 'new', ['a', 'b']) is None
+    assert attach_onnx(None, meta, 'old', ['a', 'b']) is None
@@ -0,0 +1,51 @@
+"""
+Tests for the similar-car neighbour index
+"""
+
+import sys
+import os
+
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.canonicalization import add_canonical_columns
+from app.services.similar_cars import SimilarCarIndex, to_results
+
+
+def _frame(n=3000):
+    rng = np.random.default_rng(2)
+    df = pd.DataFrame({
+        'make': rng.choice(['Toyota', 'Kia', 'BMW', 'Rolls Royce'], n),
+        'model': rng.choice(['A', 'B', 'C'], n),
+        'year': rng.integers(2005, 2025, n),
+        'mileage': rng.integers(0, 250000, n).astype(float),
+        'price': rng.integers(3000, 90000, n).astype(float),
+        'condition': 'Good',
+    })
+    return add_canonical_columns(df)
+
+
+def test_query_respects_filters_and_ranks_by_weighted_distance():
+    df = _frame()
+    index = SimilarCarIndex(df, 'price')
+
+    rows = index.query('Kia', 'B', 2015, 60000, predicted_price=20000, k=10)
+    assert len(rows) == 10
+    assert (np.abs(df['year'].to_numpy()[rows] - 2015) <= 3).all()
+    assert ((df['price'].to_numpy()[rows] >= 14000) & (df['price'].to_numpy()[rows] <= 26000)).all()
+
+    # Luxury input only sees luxury/premium makes
+    rows = index.query('Rolls-Royce', 'A', 2018, 10000, predicted_price=60000, k=10)
+    assert set(df['make'].to_numpy()[rows]) <= {'BMW', 'Rolls Royce'}
+
+    # A dominant year weight puts same-year cars first
+    year_first = SimilarCarIndex(df, 'price', weights=(100.0, 1.0, 1.0))
+    rows = year_first.query('Toyota', 'Z', 2012, 80000, predicted_price=30000, k=5)
+    assert (df['year'].to_numpy()[rows] == 2012).all()
+
+    results = to_results(df, rows, 'price')
+    assert [r['image_id'] for r in results] == [f"car_{i:06d}.jpg" for i in df.index[rows]]
+    assert results[0]['image_url'].startswith('/api/car-images/')
@@ -0,0 +1,64 @@
+"""
+Tests for per-stage request timing (Server-Timing + stage histograms)
+"""
+
+import sys
+import os
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core import timing
+from app.core.executors import offload
+from app.middleware.timing import ServerTimingMiddleware
+
+
+def test_stages_reach_header_and_histograms():
+    """Laps recorded on a pool thread show up in Server-Timing and /metrics histograms"""
+    app = FastAPI()
+    app.add_middleware(ServerTimingMiddleware, sample_rate=1.0)
+    seen = {}
+
+    @app.post("/api/predict")
+    @offload('cpu')
+    def predict():
+        timing.lap("dispatch")
+        time.sleep(0.01)
+        timing.lap("model")
+        with timing.span("market.demand"):
+            seen['sampled'] = timing.debug_sampled()
+        return {"ok": True}
+
+    @app.get("/api/other")
+    async def other():
+        return {"timer": timing.current() is not None}
+
+    client = TestClient(app)
+    response = client.post("/api/predict")
+    assert response.status_code == 200
+    header = response.headers['server-timing']
+    names = [part.split(';')[0] for part in header.split(', ')]
+    assert names == ['dispatch', 'model', 'market.demand', 'total']
+    assert float(header.split('model;dur=')[1].split(',')[0]) >= 10.0
+    assert seen['sampled'] is True
+
+    snapshot = timing.get_stage_metrics().snapshot()['/api/predict']
+    assert snapshot['requests'] >= 1
+    assert snapshot['stages_ms']['model']['count'] >= 1
+
+    # Untimed routes get no timer and no header
+    response = client.get("/api/other")
+    assert response.json() == {"timer": False}
+    assert 'server-timing' not in response.headers
+
+
+def test_helpers_are_noops_outside_a_request():
+    timing.lap("ignored")
+    with timing.span("ignored"):
+        pass
+    assert timing.current() is None
+    assert timing.debug_sampled() is False
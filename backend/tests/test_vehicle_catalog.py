@@ -0,0 +1,70 @@
+"""
+Tests for the precomputed vehicle catalog and its ETag responses
+"""
+
+import sys
+import os
+
+import numpy as np
+import pandas as pd
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.http_cache import cached_json_response, encode
+from app.services.dataset_index import DatasetIndex
+from app.services.vehicle_catalog import VehicleCatalog
+
+
+def _catalog():
+    df = pd.DataFrame({
+        'make': ['Toyota', 'toyota ', 'Toyota', 'BMW', None],
+        'model': ['Camry', 'Camry', 'Corolla', 'X5', 'Camry'],
+        'trim': ['LE', ' SE ', 'nan', 'xDrive', 'LE'],
+        'fuel_type': ['Gasoline', 'petrol', 'PHEV', 'Diesel', 'Gasoline'],
+        'engine_size': [2.5, 2.45, 1.8, 3.0, 2.5],
+        'cylinders': [4, 4, 4, np.nan, 6],
+        'color': ['White', 'none', 'Red', 'Black', 'Blue'],
+        'location': ['Erbil', 'unknown', 'Baghdad', 'Erbil', 'Duhok'],
+    })
+    return VehicleCatalog(df, DatasetIndex(df))
+
+
+def test_catalog_tree_matches_case_insensitive_lookups():
+    catalog = _catalog()
+
+    assert catalog.makes == ['BMW', 'Toyota', 'toyota']
+    assert catalog.models_for('TOYOTA') == ['Camry', 'Corolla']
+    assert catalog.locations == ['Baghdad', 'Duhok', 'Erbil']
+
+    camry = catalog.node('toyota', ' camry')
+    assert camry.trims == ('LE', 'SE')
+    assert camry.fuel_types == {'Gasoline'}
+    assert camry.engines == (2.45, 2.5) and camry.colors == ('White',)
+    assert catalog.node('Toyota', 'Corolla').trims == ()
+    assert catalog.node('Kia', 'Rio') is None
+
+    assert catalog.cylinders_for('Toyota', 'Camry', 2.5) == {4}
+    assert catalog.cylinders_for('BMW', 'X5', 3.0) == set()
+    assert catalog.cylinders_for('Toyota', 'Camry', 3.0) is None
+
+
+def test_cached_json_response_answers_304_for_current_etag():
+    body = encode(['BMW', 'Toyota'])
+    app = FastAPI()
+
+    @app.get('/makes')
+    async def makes(request: Request):
+        return cached_json_response(request, body, 300)
+
+    client = TestClient(app)
+    first = client.get('/makes')
+    assert first.status_code == 200 and first.json() == ['BMW', 'Toyota']
+    assert first.headers['etag'] == body.etag
+    assert first.headers['cache-control'] == 'public, max-age=300, must-revalidate'
+
+    assert client.get('/makes', headers={'If-None-Match': body.etag}).status_code == 304
+    assert client.get('/makes', headers={'If-None-Match': f'"other", W/{body.etag}'}).status_code == 304
+    assert client.get('/makes', headers={'If-None-Match': '"other"'}).status_code == 200
@@ -0,0 +1,31 @@
+"""
+Tests for the int8 vision artifact checks
+"""
+
+import sys
+import os
+from types import SimpleNamespace
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.vision_backend import PARITY_MIN_COSINE, attach_vision, cosine_report
+
+
+def test_cosine_parity_and_stale_exports():
+    """Cosine is per image; stale or unverified exports are not served"""
+    rng = np.random.default_rng(0)
+    reference = rng.standard_normal((20, 8))
+    close = cosine_report(reference, reference * 3 + rng.normal(0, 0.01, reference.shape))
+    assert close['images'] == 20 and close['min_cosine'] > PARITY_MIN_COSINE
+    assert cosine_report(reference, -reference)['mean_cosine'] < 0
+
+    tower = SimpleNamespace(obj=object())
+    meta = SimpleNamespace(obj={'source_version': 'openai/clip-vit-base-patch32', 'parity': {'passed': True}})
+    assert attach_vision(tower, meta, 'clip_image_int8.pt', 'openai/clip-vit-base-patch32') is tower.obj
+    assert attach_vision(tower, meta, 'clip_image_int8.pt', 'finetuned:1:2') is None
+    assert attach_vision(None, meta, 'clip_image_int8.pt', 'openai/clip-vit-base-patch32') is None
+    unverified = SimpleNamespace(obj={'source_version': 'openai/clip-vit-base-patch32', 'parity': {'passed': False}})
+    assert attach_vision(tower, unverified, 'clip_image_int8.pt', 'openai/clip-vit-base-patch32') is None
@@ -47,6 +47,15 @@ def safe_float(value, default=None):
     except (ValueError, TypeError):
         return default
 
+def _model_registry():
+    """Backend ModelRegistry when running inside the API, so artifacts are shared (None otherwise)"""
+    try:
+        from app.core.model_registry import get_model_registry
+        return get_model_registry()
+    except ImportError:
+        return None
+
+
 def load_model():
     """Load the trained model with proper error handling - tries v4 model first (83.76% accuracy)"""
 
@@ -70,7 +79,16 @@ def load_model():
     # Get base directory (same as config.py uses - project root)
     BASE_DIR = Path(__file__).parent.parent.resolve()
 
-    for model_path in model_paths:
+    # Inside the API the production model is already loaded by the registry
+    registry = _model_registry()
+    if registry is not None:
+        tabular = registry.get('tabular')
+        if tabular is not None and isinstance(tabular.obj, dict) and 'model' in tabular.obj:
+            model_data = tabular.obj
+            model_path_used = str(tabular.path)
+            print(f"[OK] Using shared model from registry: {tabular.path} (v{tabular.version})", file=sys.stderr)
+
+    for model_path in (model_paths if model_data is None else []):
         # Handle both relative and absolute paths
         if Path(model_path).is_absolute():
             full_path = Path(model_path)
@@ -141,7 +159,11 @@ def load_model():
     # Try to load model_info.json for feature ordering (production model)
     model_info_json_path = BASE_DIR / 'models' / 'model_info.json'
     model_info_json = {}
-    if model_info_json_path.exists():
+    if registry is not None and registry.get('model_info') is not None:
+        model_info_json = registry.get_object('model_info')
+        if isinstance(model_info_json.get('features'), list):
+            features = model_info_json['features']
+    elif model_info_json_path.exists():
         try:
             import json
             with open(model_info_json_path, 'r') as f:
@@ -171,7 +193,8 @@ def load_model():
     make_popularity_map = model_data.get('make_popularity_map', None)
 
     # Advanced model support - load encoders from 'encoders' dict
-    encoders = model_data.get('encoders', {})
+    # (copied: model_data may be the registry's shared object)
+    encoders = dict(model_data.get('encoders', {}))
 
     # Backward compatibility - load individual encoders if 'encoders' dict not present
     if not encoders:
@@ -192,6 +215,9 @@ def load_model():
     # Load scaler (REQUIRED for v3/v4 models)
     scaler = model_data.get('scaler', None)
 
+    if scaler is None and registry is not None:
+        scaler = registry.get_object('scaler')
+
     # Try loading from separate file if not in model (production model or v4 saves separately)
     if scaler is None:
         scaler_paths = [
@@ -222,6 +248,9 @@ def load_model():
             print(
                 f"[WARNING] Scaler not found for {model_version} model! This may cause prediction errors.", file=sys.stderr)
 
+    if not encoders and registry is not None:
+        encoders = dict(registry.get_object('encoders') or {})
+
     # Try loading encoders from separate file if not in model (production model or v3/v4 saves separately)
     if not encoders or (model_version == '2.0' and not encoders):
         encoder_paths = [
@@ -892,6 +921,22 @@ def _get_cached_model():
             _luxury_brands_cache, _premium_brands_cache, _brand_reliability_cache, _price_range_models_cache,
             _image_features_enabled_cache, _image_feature_dim_cache, _model_version_cache, _model_rmse_cache)
 
+
+def _trace_enabled():
+    """Verbose per-prediction stderr output: DEBUG_PREDICTIONS, or an API request picked by sampling"""
+    if config.DEBUG_PREDICTIONS:
+        return True
+    try:
+        from app.core.timing import debug_sampled
+        return debug_sampled()
+    except ImportError:
+        return False
+
+
+def _no_trace(*args, **kwargs):
+    pass
+
+
 # ============================================================================
 # Predict Price
 # ============================================================================
@@ -933,52 +978,55 @@ def predict_price(car_data, return_confidence=False):
      encoders, luxury_brands, premium_brands, brand_reliability, price_range_models,
      image_features_enabled, image_feature_dim, model_version, model_rmse) = _get_cached_model()
 
+    # Per-call trace output (DEBUG_PREDICTIONS or a sampled API request)
+    trace = print if _trace_enabled() else _no_trace
+
     # ========================================================================
     # CRITICAL DEBUG LOGGING - MODEL LOADING VERIFICATION
     # ========================================================================
     import sys
-    print("\n" + "=" * 80, file=sys.stderr)
-    print("🔍 PREDICTION DEBUG - MODEL LOADING VERIFICATION", file=sys.stderr)
-    print("=" * 80, file=sys.stderr)
-    print(f"✅ Model loaded successfully", file=sys.stderr)
-    print(f"📦 Model Name: {model_name}", file=sys.stderr)
-    print(f"📦 Model Version: {model_version}", file=sys.stderr)
-    print(f"📦 Model Type: {type(model).__name__}", file=sys.stderr)
-    print(f"📦 Target Transform: {target_transform}", file=sys.stderr)
-    print(f"📦 Transform Offset: {transform_offset}", file=sys.stderr)
+    trace("\n" + "=" * 80, file=sys.stderr)
+    trace("🔍 PREDICTION DEBUG - MODEL LOADING VERIFICATION", file=sys.stderr)
+    trace("=" * 80, file=sys.stderr)
+    trace(f"✅ Model loaded successfully", file=sys.stderr)
+    trace(f"📦 Model Name: {model_name}", file=sys.stderr)
+    trace(f"📦 Model Version: {model_version}", file=sys.stderr)
+    trace(f"📦 Model Type: {type(model).__name__}", file=sys.stderr)
+    trace(f"📦 Target Transform: {target_transform}", file=sys.stderr)
+    trace(f"📦 Transform Offset: {transform_offset}", file=sys.stderr)
     # Safe RMSE formatting
     try:
         rmse_float = float(model_rmse) if model_rmse is not None else None
         if rmse_float is not None:
-            print(f"📦 Model RMSE: ${rmse_float:,.2f}", file=sys.stderr)
+            trace(f"📦 Model RMSE: ${rmse_float:,.2f}", file=sys.stderr)
         else:
-            print("📦 Model RMSE: N/A", file=sys.stderr)
+            trace("📦 Model RMSE: N/A", file=sys.stderr)
     except (ValueError, TypeError):
-        print("📦 Model RMSE: N/A", file=sys.stderr)
-    print(f"📦 Features Count: {len(features)}", file=sys.stderr)
-    print(f"📦 Has Scaler: {scaler is not None}", file=sys.stderr)
-    print(f"📦 Has Poly Transformer: {poly_transformer is not None}", file=sys.stderr)
-    print(f"📦 Image Features Enabled: {image_features_enabled}", file=sys.stderr)
+        trace("📦 Model RMSE: N/A", file=sys.stderr)
+    trace(f"📦 Features Count: {len(features)}", file=sys.stderr)
+    trace(f"📦 Has Scaler: {scaler is not None}", file=sys.stderr)
+    trace(f"📦 Has Poly Transformer: {poly_transformer is not None}", file=sys.stderr)
+    trace(f"📦 Image Features Enabled: {image_features_enabled}", file=sys.stderr)
     if image_features_enabled:
-        print(f"📦 Image Feature Dimension: {image_feature_dim}", file=sys.stderr)
-    print("=" * 80, file=sys.stderr)
+        trace(f"📦 Image Feature Dimension: {image_feature_dim}", file=sys.stderr)
+    trace("=" * 80, file=sys.stderr)
 
     # ========================================================================
     # CRITICAL DEBUG LOGGING - INPUT FEATURES VERIFICATION
     # ========================================================================
-    print("\n" + "=" * 80, file=sys.stderr)
-    print("🔍 PREDICTION DEBUG - INPUT FEATURES VERIFICATION", file=sys.stderr)
-    print("=" * 80, file=sys.stderr)
-    print(f"📋 Input car_data:", file=sys.stderr)
+    trace("\n" + "=" * 80, file=sys.stderr)
+    trace("🔍 PREDICTION DEBUG - INPUT FEATURES VERIFICATION", file=sys.stderr)
+    trace("=" * 80, file=sys.stderr)
+    trace(f"📋 Input car_data:", file=sys.stderr)
     if isinstance(car_data, dict):
         for key, value in car_data.items():
-            print(f"   {key}: {value} (type: {type(value).__name__})", file=sys.stderr)
+            trace(f"   {key}: {value} (type: {type(value).__name__})", file=sys.stderr)
     else:
-        print(f"   Type: {type(car_data)}", file=sys.stderr)
-    print(f"📋 Expected features (from model): {len(features)} features", file=sys.stderr)
-    print(f"   First 10: {features[:10] if len(features) > 10 else features}", file=sys.stderr)
-    print(f"📋 Original features (before poly): {len(original_features) if original_features else 'N/A'}", file=sys.stderr)
-    print("=" * 80, file=sys.stderr)
+        trace(f"   Type: {type(car_data)}", file=sys.stderr)
+    trace(f"📋 Expected features (from model): {len(features)} features", file=sys.stderr)
+    trace(f"   First 10: {features[:10] if len(features) > 10 else features}", file=sys.stderr)
+    trace(f"📋 Original features (before poly): {len(original_features) if original_features else 'N/A'}", file=sys.stderr)
+    trace("=" * 80, file=sys.stderr)
     
     # Prepare features
     try:
@@ -986,9 +1034,9 @@ def predict_price(car_data, return_confidence=False):
                                      poly_transformer, numeric_cols_for_poly, original_features, make_popularity_map,
                                      encoders, luxury_brands, premium_brands, brand_reliability)
         
-        print(f"\n✅ Features prepared successfully", file=sys.stderr)
-        print(f"📊 Tabular features shape: {X_tabular.shape}", file=sys.stderr)
-        print(f"📊 Tabular features columns: {list(X_tabular.columns)[:10]}..." if len(X_tabular.columns) > 10 else f"📊 Tabular features columns: {list(X_tabular.columns)}", file=sys.stderr)
+        trace(f"\n✅ Features prepared successfully", file=sys.stderr)
+        trace(f"📊 Tabular features shape: {X_tabular.shape}", file=sys.stderr)
+        trace(f"📊 Tabular features columns: {list(X_tabular.columns)[:10]}..." if len(X_tabular.columns) > 10 else f"📊 Tabular features columns: {list(X_tabular.columns)}", file=sys.stderr)
 
         # Add image features if model uses them (v3/v4 models)
         if image_features_enabled and image_feature_dim > 0:
@@ -1050,7 +1098,7 @@ def predict_price(car_data, return_confidence=False):
                 print(
                     f"[DEBUG] Tabular features: {X_tabular_array.shape[1]}, Image features: {image_feature_dim}, Total: {X.shape[1]}", file=sys.stderr)
                 if model_version == 'v4':
-                    print(
+                    trace(
                         f"[DEBUG] v4 model: Scaled only tabular features, kept image features unscaled", file=sys.stderr)
         else:
             # No image features - use tabular only
@@ -1072,10 +1120,10 @@ def predict_price(car_data, return_confidence=False):
                 print(
                     f"[ERROR] price_per_km found in features! This should not happen.", file=sys.stderr)
             else:
-                print(f"[OK] price_per_km NOT in features (correct)",
+                trace(f"[OK] price_per_km NOT in features (correct)",
                       file=sys.stderr)
             if hasattr(X, 'iloc'):
-                print(
+                trace(
                     f"[DEBUG] First row sample (first 5 values): {dict(list(X.iloc[0].to_dict().items())[:5]) if len(X) > 0 else 'Empty'}", file=sys.stderr)
     except Exception as e:
         raise ValueError(f"Error preparing features: {str(e)}") from e
@@ -1085,17 +1133,17 @@ def predict_price(car_data, return_confidence=False):
         # ========================================================================
         # CRITICAL DEBUG LOGGING - RAW MODEL OUTPUT
         # ========================================================================
-        print("\n" + "=" * 80, file=sys.stderr)
-        print("🔍 PREDICTION DEBUG - RAW MODEL OUTPUT", file=sys.stderr)
-        print("=" * 80, file=sys.stderr)
-        print(f"📦 Model Name: {model_name}", file=sys.stderr)
-        print(f"📦 Model Version: {model_version}", file=sys.stderr)
-        print(f"📦 Target Transform: {target_transform}", file=sys.stderr)
-        print(f"📦 Model Type: {type(model).__name__}", file=sys.stderr)
-        print(f"📦 Input Features Shape: {X.shape}", file=sys.stderr)
-        print(f"📦 Expected Features Count: {len(features) + (image_feature_dim if image_features_enabled else 0)}", file=sys.stderr)
-        print(f"📦 Has Scaler: {scaler is not None}", file=sys.stderr)
-        print(f"📦 Image Features Enabled: {image_features_enabled}", file=sys.stderr)
+        trace("\n" + "=" * 80, file=sys.stderr)
+        trace("🔍 PREDICTION DEBUG - RAW MODEL OUTPUT", file=sys.stderr)
+        trace("=" * 80, file=sys.stderr)
+        trace(f"📦 Model Name: {model_name}", file=sys.stderr)
+        trace(f"📦 Model Version: {model_version}", file=sys.stderr)
+        trace(f"📦 Target Transform: {target_transform}", file=sys.stderr)
+        trace(f"📦 Model Type: {type(model).__name__}", file=sys.stderr)
+        trace(f"📦 Input Features Shape: {X.shape}", file=sys.stderr)
+        trace(f"📦 Expected Features Count: {len(features) + (image_feature_dim if image_features_enabled else 0)}", file=sys.stderr)
+        trace(f"📦 Has Scaler: {scaler is not None}", file=sys.stderr)
+        trace(f"📦 Image Features Enabled: {image_features_enabled}", file=sys.stderr)
         
         # Scale if needed - CRITICAL: Check feature count match first
         # Note: For v4 models with image features, scaling is already done above
@@ -1119,14 +1167,14 @@ def predict_price(car_data, return_confidence=False):
                     print(f"⚠️ [WARNING] Skipping scaling to prevent crash. Model may produce different results.", file=sys.stderr)
                     should_scale = False
                 else:
-                    print(f"✅ Scaler feature count matches: {scaler_n_features} features", file=sys.stderr)
+                    trace(f"✅ Scaler feature count matches: {scaler_n_features} features", file=sys.stderr)
         
         if should_scale:
             try:
                 X_scaled = scaler.transform(X)
-                print(f"✅ Features scaled using RobustScaler before prediction", file=sys.stderr)
-                print(f"📊 Scaled features shape: {X_scaled.shape}", file=sys.stderr)
-                print(f"📊 Scaled features sample (first 5): {X_scaled[0][:5] if hasattr(X_scaled, '__getitem__') else 'N/A'}", file=sys.stderr)
+                trace(f"✅ Features scaled using RobustScaler before prediction", file=sys.stderr)
+                trace(f"📊 Scaled features shape: {X_scaled.shape}", file=sys.stderr)
+                trace(f"📊 Scaled features sample (first 5): {X_scaled[0][:5] if hasattr(X_scaled, '__getitem__') else 'N/A'}", file=sys.stderr)
                 predictions_log = model.predict(X_scaled)
             except ValueError as e:
                 print(f"⚠️ [ERROR] Scaler transform failed: {e}", file=sys.stderr)
@@ -1135,34 +1183,34 @@ def predict_price(car_data, return_confidence=False):
         else:
             # Already scaled (v4 with images) or no scaler needed
             if image_features_enabled and model_version == 'v4':
-                print(f"✅ Features already scaled (v4: tabular only)", file=sys.stderr)
+                trace(f"✅ Features already scaled (v4: tabular only)", file=sys.stderr)
             else:
-                print(f"⚠️ No scaling applied (scaler is None or feature mismatch)", file=sys.stderr)
+                trace(f"⚠️ No scaling applied (scaler is None or feature mismatch)", file=sys.stderr)
             predictions_log = model.predict(X)
         
         # ========================================================================
         # CRITICAL: Log RAW model output BEFORE any transformations
         # ========================================================================
-        print("\n" + "-" * 80, file=sys.stderr)
-        print("🔍 RAW MODEL OUTPUT (BEFORE TRANSFORMATIONS)", file=sys.stderr)
-        print("-" * 80, file=sys.stderr)
-        print(f"📊 Raw prediction_log (from model.predict): {predictions_log}", file=sys.stderr)
-        print(f"📊 Type: {type(predictions_log)}", file=sys.stderr)
+        trace("\n" + "-" * 80, file=sys.stderr)
+        trace("🔍 RAW MODEL OUTPUT (BEFORE TRANSFORMATIONS)", file=sys.stderr)
+        trace("-" * 80, file=sys.stderr)
+        trace(f"📊 Raw prediction_log (from model.predict): {predictions_log}", file=sys.stderr)
+        trace(f"📊 Type: {type(predictions_log)}", file=sys.stderr)
         if isinstance(predictions_log, np.ndarray):
-            print(f"📊 Shape: {predictions_log.shape}, dtype: {predictions_log.dtype}", file=sys.stderr)
-            print(f"📊 First value: {predictions_log[0] if len(predictions_log) > 0 else 'N/A'}", file=sys.stderr)
-        print(f"📊 Repr: {repr(predictions_log)}", file=sys.stderr)
-        print("-" * 80, file=sys.stderr)
+            trace(f"📊 Shape: {predictions_log.shape}, dtype: {predictions_log.dtype}", file=sys.stderr)
+            trace(f"📊 First value: {predictions_log[0] if len(predictions_log) > 0 else 'N/A'}", file=sys.stderr)
+        trace(f"📊 Repr: {repr(predictions_log)}", file=sys.stderr)
+        trace("-" * 80, file=sys.stderr)
 
         # Apply inverse transformation if model was trained with log transform
         if target_transform == 'log1p':
             # Inverse of log1p is expm1: exp(x) - 1
-            print(f"\n🔄 Applying inverse transformation: expm1 (inverse of log1p)", file=sys.stderr)
-            print(f"   Formula: exp(x) - 1", file=sys.stderr)
-            print(f"   Input (log space): {predictions_log}", file=sys.stderr)
+            trace(f"\n🔄 Applying inverse transformation: expm1 (inverse of log1p)", file=sys.stderr)
+            trace(f"   Formula: exp(x) - 1", file=sys.stderr)
+            trace(f"   Input (log space): {predictions_log}", file=sys.stderr)
             predictions = np.expm1(predictions_log)
-            print(f"   Output (price space): {predictions}", file=sys.stderr)
-            print(f"✅ Transformation complete", file=sys.stderr)
+            trace(f"   Output (price space): {predictions}", file=sys.stderr)
+            trace(f"✅ Transformation complete", file=sys.stderr)
             # With log transform, predictions should always be non-negative
             # Check for unrealistic predictions (likely model issue)
             if np.any(predictions < 0):
@@ -1188,7 +1236,7 @@ def predict_price(car_data, return_confidence=False):
                 if config.DEBUG_PREDICTIONS:
                     print(
                         f"[DEBUG] Predictions appear to be in log space (range 0-15): {predictions_log}", file=sys.stderr)
-                print(
+                trace(
                     f"[INFO] Applying expm1 transform (model likely trained with log transform but flag missing)", file=sys.stderr)
                 predictions = np.expm1(predictions_log)
                 if config.DEBUG_PREDICTIONS:
@@ -1210,9 +1258,9 @@ def predict_price(car_data, return_confidence=False):
         # ========================================================================
         # FINAL PREDICTION VALUE (BEFORE VALIDATION/CAPPING)
         # ========================================================================
-        print("\n" + "-" * 80, file=sys.stderr)
-        print("🔍 FINAL PREDICTION VALUE (AFTER TRANSFORMATIONS)", file=sys.stderr)
-        print("-" * 80, file=sys.stderr)
+        trace("\n" + "-" * 80, file=sys.stderr)
+        trace("🔍 FINAL PREDICTION VALUE (AFTER TRANSFORMATIONS)", file=sys.stderr)
+        trace("-" * 80, file=sys.stderr)
         # CRITICAL: Ensure prediction is always a valid number
         try:
             if isinstance(predictions, np.ndarray):
@@ -1235,11 +1283,11 @@ def predict_price(car_data, return_confidence=False):
         
         # Safe formatting
         try:
-            print(f"📊 Final prediction (before validation): ${final_pred:,.2f}", file=sys.stderr)
+            trace(f"📊 Final prediction (before validation): ${final_pred:,.2f}", file=sys.stderr)
         except (ValueError, TypeError):
-            print(f"📊 Final prediction (before validation): ${final_pred}", file=sys.stderr)
-        print(f"📊 Type: {type(predictions)}", file=sys.stderr)
-        print("-" * 80, file=sys.stderr)
+            trace(f"📊 Final prediction (before validation): ${final_pred}", file=sys.stderr)
+        trace(f"📊 Type: {type(predictions)}", file=sys.stderr)
+        trace("-" * 80, file=sys.stderr)
         
         # CRITICAL: Ensure predictions are always valid numbers and in reasonable range
         # Convert to numpy array for easier handling
@@ -1278,28 +1326,28 @@ def predict_price(car_data, return_confidence=False):
         # ========================================================================
         # VERIFICATION: No extra multipliers or currency conversions
         # ========================================================================
-        print("\n" + "-" * 80, file=sys.stderr)
-        print("🔍 VERIFICATION - NO MULTIPLIERS OR CURRENCY CONVERSIONS", file=sys.stderr)
-        print("-" * 80, file=sys.stderr)
-        print(f"✅ No multipliers applied (raw model output → expm1 → final)", file=sys.stderr)
-        print(f"✅ No currency conversions applied (USD assumed)", file=sys.stderr)
-        print(f"✅ Transformation chain:", file=sys.stderr)
-        print(f"   1. Raw model output (log space): {predictions_log}", file=sys.stderr)
+        trace("\n" + "-" * 80, file=sys.stderr)
+        trace("🔍 VERIFICATION - NO MULTIPLIERS OR CURRENCY CONVERSIONS", file=sys.stderr)
+        trace("-" * 80, file=sys.stderr)
+        trace(f"✅ No multipliers applied (raw model output → expm1 → final)", file=sys.stderr)
+        trace(f"✅ No currency conversions applied (USD assumed)", file=sys.stderr)
+        trace(f"✅ Transformation chain:", file=sys.stderr)
+        trace(f"   1. Raw model output (log space): {predictions_log}", file=sys.stderr)
         if target_transform == 'log1p':
-            print(f"   2. Applied expm1: exp({predictions_log}) - 1 = {predictions}", file=sys.stderr)
+            trace(f"   2. Applied expm1: exp({predictions_log}) - 1 = {predictions}", file=sys.stderr)
         else:
-            print(f"   2. No transformation (old model): {predictions}", file=sys.stderr)
+            trace(f"   2. No transformation (old model): {predictions}", file=sys.stderr)
         # Safe formatting
         try:
             final_pred_float = float(final_pred)
-            print(f"   3. Final prediction: ${final_pred_float:,.2f}", file=sys.stderr)
+            trace(f"   3. Final prediction: ${final_pred_float:,.2f}", file=sys.stderr)
         except (ValueError, TypeError):
-            print(f"   3. Final prediction: ${final_pred}", file=sys.stderr)
-        print("-" * 80, file=sys.stderr)
+            trace(f"   3. Final prediction: ${final_pred}", file=sys.stderr)
+        trace("-" * 80, file=sys.stderr)
         
-        print("\n" + "=" * 80, file=sys.stderr)
-        print("✅ PREDICTION DEBUG COMPLETE", file=sys.stderr)
-        print("=" * 80 + "\n", file=sys.stderr)
+        trace("\n" + "=" * 80, file=sys.stderr)
+        trace("✅ PREDICTION DEBUG COMPLETE", file=sys.stderr)
+        trace("=" * 80 + "\n", file=sys.stderr)
 
     except Exception as e:
         print(f"[ERROR] Prediction error: {str(e)}", file=sys.stderr)
@@ -1476,6 +1524,113 @@ def predict_price(car_data, return_confidence=False):
     # Normal return - already validated above
     return final_prediction
 
+# ============================================================================
+# Batch Prediction
+# ============================================================================
+
+
+def predict_price_many(rows, return_confidence=False):
+    """
+    Predict prices for many cars with a single model call
+
+    Unlike calling predict_price in a loop, features for all rows are prepared
+    column-wise in one DataFrame and the model is invoked exactly once.
+
+    Parameters:
+    -----------
+    rows : list of dict or pd.DataFrame
+        Car information, one entry per car
+    return_confidence : bool
+        Whether to also return 95% confidence bounds
+
+    Returns:
+    --------
+    predictions : np.ndarray
+        Predicted prices (NaN for rows that failed validation)
+    errors : list
+        Error message per row, or None when the row was predicted
+    confidence_intervals : dict, optional
+        'lower_95' / 'upper_95' arrays if return_confidence=True
+    """
+    if isinstance(rows, pd.DataFrame):
+        rows = rows.to_dict('records')
+    rows = [dict(r) for r in rows]
+    n = len(rows)
+    predictions = np.full(n, np.nan, dtype=np.float64)
+    errors = [None] * n
+
+    # Validate each row up front so one bad row does not fail the batch
+    for i, car_data in enumerate(rows):
+        is_valid, row_errors = validate_car_data(car_data)
+        if not is_valid:
+            errors[i] = "; ".join(row_errors)
+    valid = np.array([e is None for e in errors], dtype=bool)
+
+    if valid.any():
+        (model, features, model_name, make_encoder, model_encoder, target_transform, transform_offset,
+         poly_transformer, numeric_cols_for_poly, original_features, make_popularity_map, scaler,
+         encoders, luxury_brands, premium_brands, brand_reliability, price_range_models,
+         image_features_enabled, image_feature_dim, model_version, model_rmse) = _get_cached_model()
+
+        batch_df = pd.DataFrame([rows[i] for i in np.flatnonzero(valid)])
+        try:
+            X_tabular = prepare_features(batch_df, features, make_encoder, model_encoder,
+                                         poly_transformer, numeric_cols_for_poly, original_features,
+                                         make_popularity_map, encoders, luxury_brands, premium_brands,
+                                         brand_reliability)
+            X = X_tabular.values
+
+            scaled = False
+            if image_features_enabled and image_feature_dim > 0:
+                image_features = extract_image_features(batch_df, image_feature_dim)
+                if model_version == 'v4' and scaler is not None:
+                    # v4: scale only tabular features, keep image features unscaled
+                    try:
+                        X = scaler.transform(X)
+                    except ValueError as e:
+                        print(f"⚠️ [WARNING] Scaler transform failed: {e}", file=sys.stderr)
+                    scaled = True
+                X = np.hstack([X, image_features])
+
+            if scaler is not None and not scaled:
+                try:
+                    X = scaler.transform(X)
+                except ValueError as e:
+                    print(f"⚠️ [WARNING] Scaler transform failed: {e}", file=sys.stderr)
+
+            raw = np.asarray(model.predict(X), dtype=np.float64).reshape(-1)
+        except Exception as e:
+            print(f"[ERROR] Batch prediction error: {str(e)}", file=sys.stderr)
+            for i in np.flatnonzero(valid):
+                errors[i] = f"Error making prediction: {str(e)}"
+            valid[:] = False
+        else:
+            # Same inverse transform and bounds as predict_price, decided per row:
+            # without the log1p flag, an output in (0, 15) is taken as log-space
+            if target_transform == 'log1p':
+                log_space = np.ones(len(raw), dtype=bool)
+            else:
+                log_space = (raw > 0) & (raw < 15)
+            batch_pred = raw.copy()
+            batch_pred[log_space] = np.expm1(raw[log_space])
+            batch_pred = np.where(np.isfinite(batch_pred), batch_pred, 15000.0)
+            predictions[valid] = np.clip(batch_pred, 500.0, 300000.0)
+
+    if not return_confidence:
+        return predictions, errors
+
+    rmse_val = safe_float(model_rmse) if valid.any() else None
+    if rmse_val is not None and rmse_val > 0:
+        std = np.full(n, rmse_val)
+    else:
+        std = predictions * 0.15
+    confidence_intervals = {
+        'lower_95': np.maximum(0, predictions - 1.96 * std),
+        'upper_95': predictions + 1.96 * std,
+        'std': std
+    }
+    return predictions, errors, confidence_intervals
+
 # ============================================================================
 # Main Function for Command Line Use
 # ============================================================================
@@ -22,6 +22,9 @@ import os
 import time
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 from gpu import detect_nvidia_gpu, get_gpu_info
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend'))
+from app.config import IQCARS_TRAINING_FILE, TRAINING_RANDOM_STATE, TRAINING_TEST_SIZE
+from app.services.dataset_cache import read_dataset
 from gpu_monitor import GPUMonitor
 
 # Try importing ML libraries
@@ -47,14 +50,14 @@ except ImportError:
     print("Warning: XGBoost not available. Install with: pip install xgboost")
 
 
-def load_cleaned_data(data_path='data/iqcars_cleaned.csv'):
+def load_cleaned_data(data_path=IQCARS_TRAINING_FILE):
     """Load cleaned IQCars dataset"""
     data_path = Path(data_path)
     if not data_path.exists():
         raise FileNotFoundError(f"Cleaned dataset not found: {data_path}")
     
     print(f"Loading dataset from {data_path}...")
-    df = pd.read_csv(data_path)
+    df = read_dataset(data_path)
     print(f"Loaded {len(df)} rows, {len(df.columns)} columns")
     return df
 
@@ -640,7 +643,7 @@ def evaluate_model(model, X, y, cv_folds=5):
     
     # Final train/test split
     X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=0.2, random_state=42
+        X, y, test_size=TRAINING_TEST_SIZE, random_state=TRAINING_RANDOM_STATE
     )
     
     # Train final model
@@ -845,7 +848,7 @@ def main():
         print("⚠️  No GPU detected, using CPU")
     
     # Load data
-    data_path = Path('data/iqcars_cleaned.csv')
+    data_path = IQCARS_TRAINING_FILE
     if not data_path.exists():
         print(f"\n❌ Error: {data_path} not found!")
         print("Please run the data pipeline first:")
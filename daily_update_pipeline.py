@@ -17,6 +17,8 @@ import json
 # Add Web Scraping Tool to path
 scraper_path = Path(__file__).parent / "Web Scraping Tool"
 sys.path.insert(0, str(scraper_path))
+# backend/ for the shared dataset cache (app.services.dataset_cache)
+sys.path.append(str(Path(__file__).parent / "backend"))
 
 try:
     from webscriping import IQCarsScraper
@@ -25,6 +27,7 @@ except ImportError:
     IQCarsScraper = None
 
 import config
+from app.services.dataset_cache import read_dataset
 
 # Setup logging
 log_dir = Path(__file__).parent
@@ -225,7 +228,7 @@ class DailyUpdatePipeline:
         try:
             data_path = config.CLEANED_DATA_FILE
             if os.path.exists(data_path):
-                self.existing_data = pd.read_csv(data_path)
+                self.existing_data = read_dataset(data_path)
                 logger.info(f"Loaded {len(self.existing_data)} existing records")
                 
                 # Initialize price comparator
@@ -402,8 +405,11 @@ class DailyUpdatePipeline:
                 self.existing_data.to_csv(backup_path, index=False)
                 logger.info(f"Backup saved to {backup_path}")
             
-            # Save updated dataset
-            combined_data.to_csv(config.CLEANED_DATA_FILE, index=False)
+            # Save updated dataset (temp file + rename: a running backend
+            # watching the file never reads it half written)
+            tmp_path = f"{config.CLEANED_DATA_FILE}.tmp"
+            combined_data.to_csv(tmp_path, index=False)
+            os.replace(tmp_path, config.CLEANED_DATA_FILE)
             logger.info(f"Updated dataset saved: {len(combined_data)} records")
             
             return True
@@ -2,83 +2,55 @@
 Batch Prediction Script - Predict prices for multiple cars from CSV
 """
 
-import pandas as pd
-from predict_manual import predict_price, load_model_components
+import os
 import sys
+import pandas as pd
+
+# Add core directory to path (same layout as streamlit_app.py)
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+for path in [BASE_DIR, os.path.join(BASE_DIR, 'core')]:
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from predict_price import predict_price_many
+
 
 def predict_from_csv(csv_file, output_file='predictions.csv'):
     """
     Predict prices for cars in CSV file
 
     CSV should have columns:
-    - year, mileage, engine_size, cylinders, make, model, condition, fuel_type
-    - image_path (optional)
+    - year, mileage, engine_size, cylinders, make, model, condition, fuel_type, location
     """
     print(f"Loading CSV: {csv_file}")
     df = pd.read_csv(csv_file)
 
     print(f"Found {len(df)} cars")
 
-    # Load model once (for efficiency)
-    print("\nLoading model...")
-    ensemble_model, encoders, scaler, feature_info, cnn_model, preprocess_func = load_model_components()
+    # Predict all rows with a single model call
+    print("\nPredicting...")
+    prices, errors = predict_price_many(df)
 
     predictions = []
 
-    for idx, row in df.iterrows():
-        try:
-            car_data = {
-                'year': int(row['year']),
-                'mileage': float(row['mileage']),
-                'engine_size': float(row['engine_size']),
-                'cylinders': int(row['cylinders']),
-                'make': str(row['make']),
-                'model': str(row['model']),
-                'condition': str(row['condition']),
-                'fuel_type': str(row['fuel_type'])
-            }
-
-            image_path = row.get('image_path', None)
-            if pd.isna(image_path):
-                image_path = None
-
-            # Import prediction function components
-            from predict_manual import create_tabular_features, extract_image_features
-            import numpy as np
-
-            # Create features
-            tabular_features = create_tabular_features(car_data, encoders)
-
-            if image_path:
-                image_features = extract_image_features(image_path, cnn_model, preprocess_func)
-            else:
-                image_features = np.zeros(2048)
-
-            # Combine and scale
-            combined_features = np.hstack([tabular_features, image_features])
-            combined_features_scaled = scaler.transform([combined_features])
-
-            # Predict
-            price = ensemble_model.predict(combined_features_scaled)[0]
-            price = max(0, price)
-
+    for pos, (_, row) in enumerate(df.iterrows()):
+        if errors[pos] is None:
+            price = float(prices[pos])
             predictions.append({
-                'make': car_data['make'],
-                'model': car_data['model'],
-                'year': car_data['year'],
+                'make': row.get('make', 'Unknown'),
+                'model': row.get('model', 'Unknown'),
+                'year': row.get('year', 'Unknown'),
                 'predicted_price': price
             })
-
-            print(f"  [{idx+1}/{len(df)}] {car_data['make']} {car_data['model']} ({car_data['year']}): ${price:,.2f}")
-
-        except Exception as e:
-            print(f"  [{idx+1}/{len(df)}] Error: {e}")
+            print(f"  [{pos+1}/{len(df)}] {row.get('make')} {row.get('model')} ({row.get('year')}): ${price:,.2f}")
+        else:
+            print(f"  [{pos+1}/{len(df)}] Error: {errors[pos]}")
             predictions.append({
                 'make': row.get('make', 'Unknown'),
                 'model': row.get('model', 'Unknown'),
                 'year': row.get('year', 'Unknown'),
                 'predicted_price': None,
-                'error': str(e)
+                'error': errors[pos]
             })
 
     # Save results
@@ -22,6 +22,9 @@ warnings.filterwarnings('ignore')
 # Add paths
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, BASE_DIR)
+sys.path.append(os.path.join(BASE_DIR, 'backend'))
+
+from app.services.dataset_cache import read_dataset
 
 print("=" * 80)
 print("IMPROVED MODEL RETRAINING")
@@ -40,7 +43,7 @@ if not os.path.exists(data_path):
     print(f"ERROR: Data file not found at {data_path}")
     sys.exit(1)
 
-df = pd.read_csv(data_path)
+df = read_dataset(data_path)
 print(f"  Loaded: {len(df):,} rows, {len(df.columns)} columns")
 
 # Ensure price column exists
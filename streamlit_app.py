@@ -40,12 +40,17 @@ if core_dir not in sys.path:
     sys.path.insert(0, core_dir)
 if app_dir not in sys.path:
     sys.path.insert(0, app_dir)
+# backend/ for the shared dataset cache (app.services.dataset_cache)
+backend_dir = os.path.join(current_dir, 'backend')
+if backend_dir not in sys.path:
+    sys.path.append(backend_dir)
 
-from predict_price import load_model, prepare_features, predict_price
+from predict_price import load_model, prepare_features, predict_price, predict_price_many
 import plotly.express as px
 import plotly.graph_objects as go
 import config
 from translations import t
+from app.services.dataset_cache import read_dataset
 
 # ============================================================================
 # IOS DETECTION AND HELPER FUNCTIONS
@@ -1798,7 +1803,7 @@ def load_model_cached():
 def load_data_cached():
     """Load the dataset - cached for performance"""
     try:
-        df = pd.read_csv(config.CLEANED_DATA_FILE)
+        df = read_dataset(config.CLEANED_DATA_FILE)
         return df
     except Exception as e:
         st.error(f"Error loading data: {e}")
@@ -2799,19 +2804,22 @@ with tab1:
                             predictions_list = []
                             errors = []
                             
-                            for idx, row in batch_df.iterrows():
+                            # One batched model call for the whole file
+                            try:
+                                prices, row_errors, confidence = predict_price_many(batch_df, return_confidence=True)
+                            except Exception as e:
+                                prices, row_errors, confidence = None, [str(e)] * len(batch_df), None
+                            progress_bar.progress(1.0)
+
+                            for pos, (idx, row) in enumerate(batch_df.iterrows()):
+                                if row_errors[pos] is not None:
+                                    errors.append(f"Row {idx+1}: {row_errors[pos]}")
+                                    continue
                                 try:
                                     car_data = row.to_dict()
-                                    price, confidence = predict_price(car_data, return_confidence=True)
-                                    
-                                    # Extract and convert to Python float
-                                    pred_price_raw = price[0] if isinstance(price, np.ndarray) else price
-                                    pred_price = float(pred_price_raw)
-                                    
-                                    lower_raw = confidence['lower_95'][0] if isinstance(confidence['lower_95'], np.ndarray) else confidence['lower_95']
-                                    upper_raw = confidence['upper_95'][0] if isinstance(confidence['upper_95'], np.ndarray) else confidence['upper_95']
-                                    lower = float(lower_raw)
-                                    upper = float(upper_raw)
+                                    pred_price = float(prices[pos])
+                                    lower = float(confidence['lower_95'][pos])
+                                    upper = float(confidence['upper_95'][pos])
                                     
                                     # BUG FIX 1: Handle negative prices
                                     if pred_price < 0:
@@ -2839,9 +2847,6 @@ with tab1:
                                         'lower_95_ci': to_python_float(lower),
                                         'upper_95_ci': to_python_float(upper)
                                     })
-                                    # Update progress every 10 rows for better performance
-                                    if (idx + 1) % 10 == 0 or (idx + 1) == len(batch_df):
-                                        progress_bar.progress((idx + 1) / len(batch_df))
                                 except Exception as e:
                                     errors.append(f"Row {idx+1}: {str(e)}")
                             